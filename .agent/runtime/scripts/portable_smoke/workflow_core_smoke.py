@@ -1,12 +1,18 @@
 #!/usr/bin/env python3
-"""檔案用途：提供 workflow-core shared portable smoke suite 的最小可執行骨架。"""
+"""檔案用途：workflow-core shared portable smoke suite；以 check registry 並行驗證 anchors、manifest/profile、skill scripts、schemas 與文件連結。"""
 
 from __future__ import annotations
 
 import argparse
 import json
+import os
+import re
+import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Callable, NamedTuple
 
 
 SCRIPT_DIR = Path(__file__).resolve().parent
@@ -15,13 +21,21 @@ if str(PARENT_DIR) not in sys.path:
     sys.path.insert(0, str(PARENT_DIR))
 
 from workflow_core_manifest import (  # noqa: E402
+    get_canonical_manifest_path,
+    get_default_export_profile_name,
+    get_export_profile,
+    get_export_profiles,
     get_projection_artifact_path,
     get_required_live_paths,
     get_smoke_suite_path,
     load_manifest,
+    manifest_cache_stats,
     manifest_default_path,
+    normalize_path,
+    path_matches_pattern,
     pattern_anchor,
 )
+from workflow_core_tracing import collect_timings, traced  # noqa: E402
 
 
 EXIT_PASS = 0
@@ -29,32 +43,282 @@ EXIT_WARN = 10
 EXIT_FAIL = 20
 EXIT_ERROR = 30
 
+SKILLS_ROOT = ".agent/skills"
+SCHEMAS_ROOT = ".agent/skills/schemas"
+MARKDOWN_LINK_RE = re.compile(r"\[[^\]]*\]\(([^)\s]+)(?:\s+\"[^\"]*\")?\)")
+
+
+class SmokeContext(NamedTuple):
+    repo_root: Path
+    manifest_path: Path
+    manifest: dict[str, Any]
+
+
+CoverPatterns = tuple[str, ...] | Callable[[dict[str, Any]], list[str]]
+
+
+class SmokeCheck(NamedTuple):
+    name: str
+    covers: CoverPatterns
+    run: Callable[[SmokeContext], tuple[bool, dict[str, Any]]]
+
+
+# 每個 check 互相獨立、只讀檔案，可在 thread pool 並行；covers 決定 --changed-only 時哪些 check 需要重跑。
+# 輸入由 manifest 決定的 check 以 callable 宣告 covers，依當次 manifest 算出 patterns。
+SMOKE_CHECKS: list[SmokeCheck] = []
+
+
+def smoke_check(name: str, covers: CoverPatterns = ()) -> Callable:
+    def register(func: Callable[[SmokeContext], tuple[bool, dict[str, Any]]]) -> Callable:
+        SMOKE_CHECKS.append(SmokeCheck(name=name, covers=covers, run=func))
+        return func
+
+    return register
+
+
+def active_profile(manifest: dict[str, Any]) -> dict[str, Any] | None:
+    name = get_default_export_profile_name(manifest)
+    return get_export_profile(manifest, name) if name else None
 
-def run_portable_smoke(repo_root: Path, manifest_path: Path) -> dict:
-    manifest = load_manifest(manifest_path)
-    projection_artifact_path = get_projection_artifact_path(manifest)
-    smoke_suite_path = get_smoke_suite_path(manifest)
 
-    missing_live_paths: list[str] = []
-    present_live_paths: list[str] = []
+def profile_selects(profile: dict[str, Any], path: str) -> bool:
+    return any(path_matches_pattern(path, item) for item in profile["includes"]) and not any(
+        path_matches_pattern(path, item) for item in profile["excludes"]
+    )
+
+
+def required_live_path_covers(manifest: dict[str, Any]) -> list[str]:
+    # check 只看 anchor 是否存在；anchor 底下任何變動（例如刪光檔案使目錄消失）都可能改變結果。
+    covers: list[str] = []
     for pattern in get_required_live_paths(manifest):
         anchor = pattern_anchor(pattern)
-        if anchor and (repo_root / anchor).exists():
-            present_live_paths.append(pattern)
+        covers.extend([anchor, anchor + "/**"] if anchor else [pattern])
+    return covers
+
+
+def profile_include_covers(manifest: dict[str, Any]) -> list[str]:
+    # 連結可指向 profile 內任何檔案，因此 profile 選到的路徑一變動就需重跑。
+    profile = active_profile(manifest)
+    return list(profile["includes"]) if profile else []
+
+
+def iter_repo_files(repo_root: Path, rel_root: str, suffix: str) -> list[str]:
+    base = repo_root / rel_root
+    if base.is_file():
+        return [normalize_path(rel_root)] if base.name.endswith(suffix) else []
+    found: list[str] = []
+    for current, dirnames, filenames in os.walk(base):
+        dirnames[:] = sorted(item for item in dirnames if item != "__pycache__" and not item.startswith("."))
+        for filename in sorted(filenames):
+            if filename.endswith(suffix):
+                found.append(normalize_path(str((Path(current) / filename).relative_to(repo_root))))
+    return found
+
+
+@smoke_check("projection_artifact_declared")
+def check_projection_artifact_declared(context: SmokeContext) -> tuple[bool, dict[str, Any]]:
+    path = get_projection_artifact_path(context.manifest)
+    return bool(path), {"projection_artifact_path": path}
+
+
+@smoke_check("smoke_suite_declared")
+def check_smoke_suite_declared(context: SmokeContext) -> tuple[bool, dict[str, Any]]:
+    path = get_smoke_suite_path(context.manifest)
+    return bool(path), {"smoke_suite_path": path}
+
+
+@smoke_check("agent_entry_present", covers=(".agent/workflows/AGENT_ENTRY.md",))
+def check_agent_entry_present(context: SmokeContext) -> tuple[bool, dict[str, Any]]:
+    return (context.repo_root / ".agent" / "workflows" / "AGENT_ENTRY.md").exists(), {}
+
+
+@smoke_check("required_live_paths_present", covers=required_live_path_covers)
+def check_required_live_paths_present(context: SmokeContext) -> tuple[bool, dict[str, Any]]:
+    missing: list[str] = []
+    present: list[str] = []
+    for pattern in get_required_live_paths(context.manifest):
+        anchor = pattern_anchor(pattern)
+        if anchor and (context.repo_root / anchor).exists():
+            present.append(pattern)
         else:
-            missing_live_paths.append(pattern)
+            missing.append(pattern)
+    return not missing, {"missing": missing, "present": present}
 
-    checks = {
-        "projection_artifact_declared": bool(projection_artifact_path),
-        "smoke_suite_declared": bool(smoke_suite_path),
-        "agent_entry_present": (repo_root / ".agent" / "workflows" / "AGENT_ENTRY.md").exists(),
-        "required_live_paths_present": not missing_live_paths,
+
+@smoke_check("manifest_profiles_consistent")
+def check_manifest_profiles_consistent(context: SmokeContext) -> tuple[bool, dict[str, Any]]:
+    problems: list[str] = []
+    names = [str(item.get("name", "")).strip() for item in get_export_profiles(context.manifest)]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        problems.append(f"duplicate export profile names: {', '.join(duplicates)}")
+    for name in names:
+        if name and not get_export_profile(context.manifest, name)["includes"]:
+            problems.append(f"export profile has no includes: {name}")
+    profile = active_profile(context.manifest)
+    if profile is None:
+        problems.append("manifest declares no active export profile")
+    else:
+        shipped = {
+            "canonical_manifest_path": get_canonical_manifest_path(context.manifest),
+            "projection_artifact_path": get_projection_artifact_path(context.manifest),
+            "portable_smoke_suite_path": get_smoke_suite_path(context.manifest),
+        }
+        for key, path in shipped.items():
+            if path and not profile_selects(profile, path):
+                problems.append(f"active profile {profile['name']} does not export {key}: {path}")
+    return not problems, {"active_profile": profile["name"] if profile else None, "problems": problems}
+
+
+@smoke_check("skill_scripts_compile", covers=(SKILLS_ROOT + "/**",))
+def check_skill_scripts_compile(context: SmokeContext) -> tuple[bool, dict[str, Any]]:
+    errors: list[str] = []
+    paths = iter_repo_files(context.repo_root, SKILLS_ROOT, ".py")
+    for rel_path in paths:
+        try:
+            # 只編譯不執行：skill scripts 的 top-level 可能改 sys.path 或讀 argv，不適合在共用 process 內 import。
+            compile((context.repo_root / rel_path).read_bytes(), rel_path, "exec", dont_inherit=True)
+        except (SyntaxError, ValueError) as exc:
+            errors.append(f"{rel_path}: {exc}")
+    return not errors, {"checked_count": len(paths), "errors": errors}
+
+
+@smoke_check("schema_files_valid", covers=(SCHEMAS_ROOT + "/**",))
+def check_schema_files_valid(context: SmokeContext) -> tuple[bool, dict[str, Any]]:
+    errors: list[str] = []
+    paths = iter_repo_files(context.repo_root, SCHEMAS_ROOT, ".json")
+    for rel_path in paths:
+        try:
+            payload = json.loads((context.repo_root / rel_path).read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            errors.append(f"{rel_path}: {exc}")
+            continue
+        if not isinstance(payload, dict) or not ("$schema" in payload or "type" in payload):
+            errors.append(f"{rel_path}: not a JSON schema object")
+    return not errors, {"checked_count": len(paths), "errors": errors}
+
+
+@smoke_check("doc_links_resolve", covers=profile_include_covers)
+def check_doc_links_resolve(context: SmokeContext) -> tuple[bool, dict[str, Any]]:
+    profile = active_profile(context.manifest)
+    if profile is None:
+        return True, {"checked_count": 0, "skipped_count": 0, "broken": []}
+    docs = sorted(
+        {
+            path
+            for pattern in profile["includes"]
+            for path in iter_repo_files(context.repo_root, pattern_anchor(pattern), ".md")
+            if profile_selects(profile, path)
+        }
+    )
+    broken: list[str] = []
+    checked = 0
+    skipped = 0
+    for doc in docs:
+        text = (context.repo_root / doc).read_text(encoding="utf-8", errors="replace")
+        for match in MARKDOWN_LINK_RE.finditer(text):
+            target = match.group(1).split("#", 1)[0]
+            if not target or re.match(r"^[a-zA-Z][a-zA-Z0-9+.-]*:", target) or target.startswith("/"):
+                continue
+            resolved = normalize_path(os.path.normpath(str(Path(doc).parent / target)))
+            # 只驗證 profile 內互相引用的連結；指向 overlay 或 downstream 自有檔案的連結在 downstream 可能合法地不存在。
+            if resolved.startswith("../") or not profile_selects(profile, resolved):
+                skipped += 1
+                continue
+            checked += 1
+            if not (context.repo_root / resolved).exists():
+                broken.append(f"{doc} -> {match.group(1)}")
+    return not broken, {"checked_count": checked, "skipped_count": skipped, "broken": broken}
+
+
+def check_cover_patterns(check: SmokeCheck, manifest: dict[str, Any]) -> list[str]:
+    return list(check.covers(manifest)) if callable(check.covers) else list(check.covers)
+
+
+def check_covers_paths(check: SmokeCheck, changed_paths: list[str], manifest_rel_path: str, manifest: dict[str, Any]) -> bool:
+    # manifest 變動會影響每個 check 的輸入，因此一律重跑。
+    patterns = check_cover_patterns(check, manifest)
+    return any(
+        path == manifest_rel_path or any(path_matches_pattern(path, pattern) for pattern in patterns) for path in changed_paths
+    )
+
+
+def collect_changed_paths(repo_root: Path) -> list[str]:
+    proc = subprocess.run(
+        ["git", "-C", str(repo_root), "status", "--porcelain=v1", "-z", "--untracked-files=all"],
+        check=False,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip() or "git status failed")
+    records = proc.stdout.split("\0")
+    changed: list[str] = []
+    index = 0
+    while index < len(records):
+        record = records[index]
+        index += 1
+        if len(record) < 4:
+            continue
+        changed.append(normalize_path(record[3:]))
+        if "R" in record[:2] or "C" in record[:2]:
+            changed.append(normalize_path(records[index]))
+            index += 1
+    return changed
+
+
+def run_smoke_check(check: SmokeCheck, context: SmokeContext) -> dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        ok, details = check.run(context)
+    except Exception as exc:
+        ok, details = False, {"error": f"{type(exc).__name__}: {exc}"}
+    return {
+        "name": check.name,
+        "ok": ok,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+        "details": details,
     }
+
+
+@traced("portable-smoke")
+def run_portable_smoke(
+    repo_root: Path,
+    manifest_path: Path,
+    changed_paths: list[str] | None = None,
+    jobs: int | None = None,
+) -> dict:
+    """Run the registered smoke checks concurrently; with `changed_paths`, only the checks covering them run."""
+    manifest = load_manifest(manifest_path)
+    projection_artifact_path = get_projection_artifact_path(manifest)
+    smoke_suite_path = get_smoke_suite_path(manifest)
+    context = SmokeContext(repo_root=repo_root, manifest_path=manifest_path, manifest=manifest)
+
+    selected = list(SMOKE_CHECKS)
+    if changed_paths is not None:
+        try:
+            manifest_rel_path = normalize_path(str(manifest_path.resolve().relative_to(repo_root.resolve())))
+        except ValueError:
+            manifest_rel_path = ""
+        selected = [check for check in SMOKE_CHECKS if check_covers_paths(check, changed_paths, manifest_rel_path, manifest)]
+
+    if selected:
+        with ThreadPoolExecutor(max_workers=max(1, min(jobs or os.cpu_count() or 1, len(selected)))) as pool:
+            check_results = list(pool.map(lambda check: run_smoke_check(check, context), selected))
+    else:
+        check_results = []
+    skipped_checks = [check.name for check in SMOKE_CHECKS if check not in selected]
+
+    live_paths = next((item["details"] for item in check_results if item["name"] == "required_live_paths_present"), {})
+    checks = {item["name"]: item["ok"] for item in check_results}
     failures = [key for key, ok in checks.items() if not ok]
     notes: list[str] = []
     if failures:
         notes.append("portable smoke detected contract failures")
         status = "fail"
+    elif not check_results:
+        notes.append("no portable smoke checks cover the changed paths")
+        status = "pass"
     else:
         notes.append("portable smoke verified manifest and required live path anchors")
         status = "pass"
@@ -65,9 +329,12 @@ def run_portable_smoke(repo_root: Path, manifest_path: Path) -> dict:
         "manifest_path": str(manifest_path.resolve()),
         "projection_artifact_path": projection_artifact_path,
         "smoke_suite_path": smoke_suite_path,
+        "changed_only": changed_paths is not None,
         "checks": checks,
-        "missing_required_live_paths": missing_live_paths,
-        "present_required_live_paths": present_live_paths,
+        "check_results": check_results,
+        "skipped_checks": skipped_checks,
+        "missing_required_live_paths": live_paths.get("missing", []),
+        "present_required_live_paths": live_paths.get("present", []),
         "failures": failures,
         "notes": notes,
     }
@@ -82,8 +349,15 @@ def format_text_report(result: dict) -> str:
         f"smoke_suite_path: {result['smoke_suite_path']}",
     ]
     lines.append("checks:")
-    for key, ok in result["checks"].items():
-        lines.append(f"  - {key}: {'OK' if ok else 'FAIL'}")
+    for item in result["check_results"]:
+        lines.append(f"  - {item['name']}: {'OK' if item['ok'] else 'FAIL'} ({item['duration_ms']} ms)")
+        for key in ("problems", "errors", "broken"):
+            for detail in item["details"].get(key, []):
+                lines.append(f"      {detail}")
+        if item["details"].get("error"):
+            lines.append(f"      {item['details']['error']}")
+    if result["skipped_checks"]:
+        lines.append(f"skipped_checks: {', '.join(result['skipped_checks'])}")
     if result["missing_required_live_paths"]:
         lines.append("missing_required_live_paths:")
         for item in result["missing_required_live_paths"]:
@@ -114,6 +388,9 @@ def build_parser() -> argparse.ArgumentParser:
         default=None,
         help="workflow-core canonical manifest path（預設：<repo-root>/core_ownership_manifest.yml）",
     )
+    parser.add_argument("--changed-only", action="store_true", help="只執行涵蓋 git status 中變更路徑的 checks")
+    parser.add_argument("--changed-path", action="append", default=[], help="指定變更路徑（可重複，隱含 --changed-only）")
+    parser.add_argument("--jobs", type=int, default=None, help="並行執行 checks 的 thread 數（預設：CPU 數）")
     parser.add_argument("--json", action="store_true", help="輸出 JSON")
     return parser
 
@@ -124,7 +401,12 @@ def main(argv: list[str] | None = None) -> int:
     repo_root = args.repo_root.resolve()
     manifest_path = args.manifest.resolve() if args.manifest else manifest_default_path(repo_root)
     try:
-        result = run_portable_smoke(repo_root=repo_root, manifest_path=manifest_path)
+        changed_paths = None
+        if args.changed_path:
+            changed_paths = [normalize_path(item) for item in args.changed_path]
+        elif args.changed_only:
+            changed_paths = collect_changed_paths(repo_root)
+        result = run_portable_smoke(repo_root=repo_root, manifest_path=manifest_path, changed_paths=changed_paths, jobs=args.jobs)
     except Exception as exc:
         if args.json:
             print(json.dumps({"status": "error", "error": str(exc)}, ensure_ascii=False, indent=2), file=sys.stderr)
@@ -132,8 +414,9 @@ def main(argv: list[str] | None = None) -> int:
             print(f"workflow-core portable smoke error: {exc}", file=sys.stderr)
         return EXIT_ERROR
 
+    timings = collect_timings()
     if args.json:
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+        print(json.dumps({**result, "manifest_cache": manifest_cache_stats(), "timings": timings}, ensure_ascii=False, indent=2))
     else:
         print(format_text_report(result))
     return exit_code_for_status(result["status"])
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""檔案用途：以 git OID 為 key 的 downstream 本地 blob store，讓各 release 的 staging root 以 hardlink 組裝並可 gc。"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from workflow_core_contracts import (  # noqa: E402
+    GitBlobReader,
+    ProgressCallback,
+    TreeEntry,
+    emit_event,
+    git_blob_oid,
+    shared_blob_reader,
+    write_json_file,
+)
+from workflow_core_tracing import count_bytes_written  # noqa: E402
+
+
+EXIT_PASS = 0
+EXIT_ERROR = 30
+BLOB_STORE_REL_PATH = ".workflow-core/objects"
+BLOB_STORE_INDEX_FORMAT = 1
+DEFAULT_KEEP_RELEASES = 3
+READ_ONLY_MODE = 0o444
+EXECUTABLE_TREE_MODE = "100755"
+
+
+def link_object(source: Path, target: Path) -> bool:
+    try:
+        os.link(source, target)
+    except OSError:
+        return False
+    return True
+
+
+class BlobStore:
+    """Objects live at `<root>/<oid[:2]>/<oid[2:]>`; `releases.json` records which OIDs each release uses and when it was last staged.
+
+    Objects are written read-only and `releases.json` also keeps the stat fingerprint of each object verified against its
+    OID, so a reused object is only re-hashed when its size/mtime/inode changed since that verification.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    @classmethod
+    def for_repo(cls, repo_root: Path) -> "BlobStore":
+        return cls(repo_root / BLOB_STORE_REL_PATH)
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / "releases.json"
+
+    def object_path(self, oid: str) -> Path:
+        return self.root / oid[:2] / oid[2:]
+
+    def load_index(self) -> dict[str, Any]:
+        try:
+            index = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {"format": BLOB_STORE_INDEX_FORMAT, "releases": {}, "objects": {}}
+        if not isinstance(index, dict) or index.get("format") != BLOB_STORE_INDEX_FORMAT or not isinstance(index.get("releases"), dict):
+            return {"format": BLOB_STORE_INDEX_FORMAT, "releases": {}, "objects": {}}
+        if not isinstance(index.get("objects"), dict):
+            index["objects"] = {}
+        return index
+
+    def object_fingerprint(self, oid: str) -> list[int] | None:
+        try:
+            stat = self.object_path(oid).stat()
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+    def has_object(self, entry: TreeEntry, verified: dict[str, list[int]] | None = None) -> bool:
+        """Whether the stored object still hashes to `entry.oid`; `verified` caches fingerprints of objects already checked."""
+        fingerprint = self.object_fingerprint(entry.oid)
+        if fingerprint is None or fingerprint[0] != entry.size:
+            return False
+        if verified is not None and verified.get(entry.oid) == fingerprint:
+            return True
+        # 指紋不符代表 object 可能經由 hardlink 被原地改寫過；重新 hash，不符就當作缺少、重新抓取。
+        try:
+            payload = self.object_path(entry.oid).read_bytes()
+        except OSError:
+            return False
+        if git_blob_oid(payload, len(entry.oid)) != entry.oid:
+            return False
+        if verified is not None:
+            verified[entry.oid] = fingerprint
+        return True
+
+    def put_object(self, oid: str, payload: bytes) -> None:
+        target = self.object_path(oid)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        temp_path.write_bytes(payload)
+        # object 會被 hardlink 進 staging / projection；唯讀可避免經由那些路徑原地改寫 store 內容。
+        os.chmod(temp_path, READ_ONLY_MODE)
+        os.replace(temp_path, target)
+        count_bytes_written(len(payload))
+
+    def fetch_missing(self, repo_root: Path, entries: dict[str, TreeEntry]) -> dict[str, int]:
+        """Copy blobs the store does not have yet (or whose stored copy no longer matches its OID) out of git."""
+        index = self.load_index()
+        verified = index["objects"]
+        missing = {entry.oid: entry for entry in entries.values() if not self.has_object(entry, verified)}
+        reader = shared_blob_reader(repo_root)
+        owns_reader = reader is None
+        if reader is None:
+            reader = GitBlobReader(repo_root)
+        fetched_bytes = 0
+        try:
+            for oid in sorted(missing):
+                payload = reader.read_object(oid)
+                self.put_object(oid, payload)
+                fetched_bytes += len(payload)
+                verified[oid] = self.object_fingerprint(oid)
+        finally:
+            if owns_reader:
+                reader.close()
+        write_json_file(self.index_path, index)
+        reused = len({entry.oid for entry in entries.values()}) - len(missing)
+        return {"fetched_objects": len(missing), "fetched_bytes": fetched_bytes, "reused_objects": reused}
+
+    def assemble(self, entries: dict[str, TreeEntry], output_root: Path, on_event: ProgressCallback | None = None) -> dict[str, int]:
+        """Hardlink every path into `output_root`; falls back to copying when the staging root is on another filesystem.
+
+        Executable entries are always copied and marked executable: the shared object stays read-only 0444 for every mode.
+
+        Emits `path-written` (with the tree OID) as each path lands, so pipeline consumers start before the whole tree is linked.
+        """
+        counts = {"hardlink": 0, "copy": 0}
+        for rel_path, entry in sorted(entries.items()):
+            source = self.object_path(entry.oid)
+            target = output_root / rel_path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            executable = entry.mode == EXECUTABLE_TREE_MODE
+            if not executable and link_object(source, target):
+                counts["hardlink"] += 1
+            else:
+                shutil.copyfile(source, target)
+                if executable:
+                    os.chmod(target, 0o755)
+                count_bytes_written(entry.size)
+                counts["copy"] += 1
+            emit_event(on_event, "path-written", path=rel_path, bytes=entry.size, oid=entry.oid)
+        return counts
+
+    def record_release(self, release_ref: str, entries: dict[str, TreeEntry]) -> None:
+        index = self.load_index()
+        index["releases"][release_ref] = {
+            "last_used": time.time(),
+            "oids": sorted({entry.oid for entry in entries.values()}),
+        }
+        write_json_file(self.index_path, index)
+
+    def list_objects(self) -> list[str]:
+        if not self.root.is_dir():
+            return []
+        return sorted(
+            f"{directory.name}{path.name}"
+            for directory in self.root.iterdir()
+            if directory.is_dir() and len(directory.name) == 2
+            for path in directory.iterdir()
+            if not path.name.endswith(".tmp")
+        )
+
+    def gc(self, keep_releases: int = DEFAULT_KEEP_RELEASES) -> dict[str, Any]:
+        """Keep the `keep_releases` most recently staged releases (LRU) and delete objects no kept release references."""
+        index = self.load_index()
+        ordered = sorted(index["releases"].items(), key=lambda item: item[1].get("last_used", 0), reverse=True)
+        kept = dict(ordered[: max(keep_releases, 0)])
+        evicted_releases = [name for name, _ in ordered[max(keep_releases, 0) :]]
+        live_oids = {oid for release in kept.values() for oid in release.get("oids", [])}
+        removed_objects = 0
+        removed_bytes = 0
+        for oid in self.list_objects():
+            if oid in live_oids:
+                continue
+            path = self.object_path(oid)
+            try:
+                removed_bytes += path.stat().st_size
+                path.unlink()
+                removed_objects += 1
+            except OSError:
+                continue
+            try:
+                path.parent.rmdir()
+            except OSError:
+                pass
+        if self.root.is_dir():
+            index["releases"] = kept
+            index["objects"] = {oid: fingerprint for oid, fingerprint in index["objects"].items() if oid in live_oids}
+            write_json_file(self.index_path, index)
+        return {
+            "kept_releases": list(kept),
+            "evicted_releases": evicted_releases,
+            "removed_objects": removed_objects,
+            "removed_bytes": removed_bytes,
+        }
+
+    def stats(self) -> dict[str, Any]:
+        objects = self.list_objects()
+        index = self.load_index()
+        return {
+            "store_root": str(self.root.resolve()),
+            "object_count": len(objects),
+            "object_bytes": sum(self.object_path(oid).stat().st_size for oid in objects),
+            "releases": {
+                name: {"last_used": release.get("last_used"), "object_count": len(release.get("oids", []))}
+                for name, release in index["releases"].items()
+            },
+        }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("action", choices=["gc", "stats"], help="gc：依 release LRU 淘汰未被引用的 objects；stats：列出 store 狀態")
+    parser.add_argument("--repo-root", type=Path, default=Path.cwd(), help="Repo 根目錄（預設：目前目錄）")
+    parser.add_argument("--keep-releases", type=int, default=DEFAULT_KEEP_RELEASES, help="gc 時保留最近使用的 release 數量")
+    parser.add_argument("--json", action="store_true", help="輸出 JSON")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    store = BlobStore.for_repo(args.repo_root.resolve())
+    try:
+        result = store.gc(args.keep_releases) if args.action == "gc" else store.stats()
+    except Exception as exc:
+        if args.json:
+            print(json.dumps({"status": "error", "error": str(exc)}, ensure_ascii=False, indent=2), file=sys.stderr)
+        else:
+            print(f"workflow-core blob store error: {exc}", file=sys.stderr)
+        return EXIT_ERROR
+
+    result = {"status": "pass", "action": args.action, **result}
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(f"workflow-core blob store {args.action}: {result['status']}")
+        for key, value in result.items():
+            if key not in {"status", "action"}:
+                print(f"{key}: {value}")
+    return EXIT_PASS
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,578 @@
+#!/usr/bin/env python3
+"""檔案用途：以 inotify watcher 記錄 working tree 變更，讓重複執行的 sync precheck 只需重掃變更過的路徑。"""
+
+from __future__ import annotations
+
+import argparse
+import ctypes
+import errno
+import itertools
+import json
+import os
+import select
+import signal
+import struct
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, NamedTuple
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from workflow_core_tracing import count_subprocess  # noqa: E402
+
+
+EXIT_PASS = 0
+EXIT_WARN = 10
+EXIT_ERROR = 30
+JOURNAL_DIR_NAME = "workflow-core-journal"
+JOURNAL_FORMAT = 1
+HEARTBEAT_INTERVAL_SECONDS = 1.0
+HEARTBEAT_STALE_SECONDS = 5.0
+COOKIE_TIMEOUT_SECONDS = 2.0
+WATCHER_START_TIMEOUT_SECONDS = 10.0
+MAX_INCREMENTAL_PATHS = 1000
+LOG_ROTATE_BYTES = 8 << 20
+INCREMENTAL_UNTRACKED_MODES = ("all", "no")
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+TREE_WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+    | IN_DONT_FOLLOW
+)
+EVENT_HEADER = struct.Struct("iIII")
+_COOKIE_COUNTER = itertools.count()
+
+
+class WatchLimitReached(RuntimeError):
+    """`fs.inotify.max_user_watches` is exhausted; the journal cannot cover the whole tree."""
+
+
+class JournalPlan(NamedTuple):
+    """How a precheck should scan: `incremental` re-runs git status only for `changed_paths` on top of `baseline_entries`."""
+
+    mode: str
+    backend: str | None
+    reason: str
+    changed_paths: frozenset[str] = frozenset()
+    baseline_entries: tuple[dict[str, Any], ...] = ()
+    cursor: dict[str, Any] | None = None
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "mode": self.mode,
+            "reason": self.reason,
+            "changed_path_count": len(self.changed_paths),
+        }
+
+
+def resolve_git_dir(repo_root: Path) -> Path | None:
+    """`.git` directory, or the `gitdir:` target for worktrees/submodules; no git subprocess needed."""
+    dot_git = repo_root / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    try:
+        text = dot_git.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if not text.startswith("gitdir:"):
+        return None
+    target = Path(text[len("gitdir:") :].strip())
+    return target if target.is_absolute() else (repo_root / target).resolve()
+
+
+def load_libc() -> Any | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+    except OSError:
+        return None
+    if not all(hasattr(libc, name) for name in ("inotify_init1", "inotify_add_watch", "inotify_rm_watch")):
+        return None
+    return libc
+
+
+def inotify_available() -> bool:
+    return load_libc() is not None
+
+
+def fsmonitor_configured(repo_root: Path) -> bool:
+    proc = subprocess.run(
+        ["git", "-C", str(repo_root), "config", "--get", "core.fsmonitor"],
+        check=False,
+        capture_output=True,
+        text=True,
+    )
+    count_subprocess()
+    return proc.returncode == 0 and proc.stdout.strip().lower() not in {"", "false", "no", "off", "0"}
+
+
+def process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def stat_token(path: Path) -> list[int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size, stat.st_ino]
+
+
+def git_state_fingerprint(git_dir: Path) -> dict[str, Any]:
+    """Stat tokens for everything outside the working tree that changes what `git status` reports."""
+    try:
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        head = ""
+    fingerprint: dict[str, Any] = {
+        "head": head,
+        "index": stat_token(git_dir / "index"),
+        "packed_refs": stat_token(git_dir / "packed-refs"),
+        "info_exclude": stat_token(git_dir / "info" / "exclude"),
+    }
+    if head.startswith("ref: "):
+        fingerprint["head_ref"] = stat_token(git_dir / head[len("ref: ") :])
+    return fingerprint
+
+
+class InotifyWatcher:
+    """Thin ctypes wrapper over one inotify instance."""
+
+    def __init__(self, libc: Any) -> None:
+        self.libc = libc
+        self.fd = libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+    def add_watch(self, path: Path, mask: int) -> int | None:
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd >= 0:
+            return wd
+        error = ctypes.get_errno()
+        if error == errno.ENOSPC:
+            raise WatchLimitReached(f"inotify watch limit reached while watching {path}")
+        if error in {errno.ENOENT, errno.ENOTDIR, errno.EACCES}:
+            # 目錄在建立 watch 前就被刪除或無權限；其上層的事件已經記錄這個路徑。
+            return None
+        raise OSError(error, os.strerror(error), str(path))
+
+    def remove_watch(self, wd: int) -> None:
+        self.libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self, timeout: float) -> list[tuple[int, int, str]]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        payload = os.read(self.fd, 1 << 16)
+        events: list[tuple[int, int, str]] = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(payload):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(payload, offset)
+            start = offset + EVENT_HEADER.size
+            name = os.fsdecode(payload[start : start + length].rstrip(b"\0"))
+            events.append((wd, mask, name))
+            offset = start + length
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class ChangeJournal:
+    """Journal files live under `<git-dir>/workflow-core-journal/` so they never show up in `git status`.
+
+    The watcher appends one NDJSON record per changed path to `log-<generation>.ndjson`. A precheck drops a cookie
+    file into `cookies/`; once the watcher logs that cookie, every event that happened before the precheck started
+    is in the log (inotify delivers events in order), so the precheck can read up to the cookie and trust the result.
+    """
+
+    def __init__(self, repo_root: Path) -> None:
+        self.repo_root = repo_root
+        self.git_dir = resolve_git_dir(repo_root)
+        self.directory = (self.git_dir or repo_root / ".git") / JOURNAL_DIR_NAME
+
+    @property
+    def state_path(self) -> Path:
+        return self.directory / "state.json"
+
+    @property
+    def baseline_path(self) -> Path:
+        return self.directory / "baseline.json"
+
+    @property
+    def cookies_dir(self) -> Path:
+        return self.directory / "cookies"
+
+    def log_path(self, generation: int) -> Path:
+        return self.directory / f"log-{generation}.ndjson"
+
+    def load_json(self, path: Path) -> dict[str, Any] | None:
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(payload, dict) or payload.get("format") != JOURNAL_FORMAT:
+            return None
+        return payload
+
+    def write_json(self, path: Path, payload: dict[str, Any]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        temp_path.write_text(json.dumps({"format": JOURNAL_FORMAT, **payload}, ensure_ascii=False) + "\n", encoding="utf-8")
+        os.replace(temp_path, path)
+
+    def load_state(self) -> dict[str, Any] | None:
+        return self.load_json(self.state_path)
+
+    def stale_reason(self, state: dict[str, Any] | None) -> str | None:
+        if state is None or not process_alive(int(state.get("pid", 0))):
+            return "watcher-not-running"
+        if state.get("overflowed"):
+            return "watcher-overflowed"
+        if time.time() - float(state.get("heartbeat", 0)) > HEARTBEAT_STALE_SECONDS:
+            return "watcher-heartbeat-stale"
+        return None
+
+    def sync(self, generation: int, start_offset: int, timeout: float = COOKIE_TIMEOUT_SECONDS) -> tuple[int, set[str]] | None:
+        """Drop a cookie and read the log from `start_offset` until the watcher echoes it; None when it never does."""
+        cookie = f"{os.getpid()}-{next(_COOKIE_COUNTER)}-{time.time_ns()}"
+        self.cookies_dir.mkdir(parents=True, exist_ok=True)
+        (self.cookies_dir / cookie).touch()
+        changed: set[str] = set()
+        offset = start_offset
+        pending = b""
+        deadline = time.monotonic() + timeout
+        try:
+            with self.log_path(generation).open("rb") as handle:
+                handle.seek(start_offset)
+                while True:
+                    chunk = handle.read()
+                    if not chunk:
+                        if time.monotonic() > deadline:
+                            return None
+                        time.sleep(0.002)
+                        continue
+                    pending += chunk
+                    *lines, pending = pending.split(b"\n")
+                    for line in lines:
+                        offset += len(line) + 1
+                        record = json.loads(line)
+                        if record.get("cookie") == cookie:
+                            return offset, changed
+                        if "path" in record:
+                            changed.add(record["path"])
+        except (OSError, ValueError):
+            return None
+        finally:
+            try:
+                (self.cookies_dir / cookie).unlink()
+            except OSError:
+                pass
+
+    def plan(self, options_key: str) -> JournalPlan:
+        state = self.load_state()
+        reason = self.stale_reason(state)
+        if reason is not None:
+            backend = "fsmonitor" if fsmonitor_configured(self.repo_root) else None
+            return JournalPlan("full", backend, reason)
+
+        watcher = {"pid": state["pid"], "started_at": state["started_at"], "generation": state["generation"]}
+        baseline = self.load_json(self.baseline_path)
+        same_log = baseline is not None and baseline.get("watcher") == watcher
+        synced = self.sync(int(watcher["generation"]), int(baseline["offset"]) if same_log else 0)
+        if synced is None:
+            return JournalPlan("full", "inotify", "cookie-timeout")
+        offset, changed = synced
+        # fingerprint 取在掃描之前；掃描期間若有人 `git add`，存 baseline 時會因前後不符而放棄。
+        cursor = {"watcher": watcher, "offset": offset, "options": options_key, "git_state": git_state_fingerprint(self.git_dir)}
+
+        if baseline is None:
+            reason = "no-baseline"
+        elif not same_log:
+            reason = "watcher-restarted"
+        elif baseline.get("options") != options_key:
+            reason = "options-changed"
+        elif baseline.get("git_state") != cursor["git_state"]:
+            reason = "git-state-changed"
+        elif any(Path(path).name == ".gitignore" for path in changed):
+            reason = "gitignore-changed"
+        elif len(changed) > MAX_INCREMENTAL_PATHS:
+            reason = "too-many-changes"
+        else:
+            return JournalPlan("incremental", "inotify", "journal-fresh", frozenset(changed), tuple(baseline["entries"]), cursor)
+        return JournalPlan("full", "inotify", reason, frozenset(changed), (), cursor)
+
+    def save_baseline(self, cursor: dict[str, Any], entries: list[dict[str, Any]]) -> bool:
+        """Persist the scan result as the next precheck's baseline unless git state moved while scanning."""
+        if git_state_fingerprint(self.git_dir) != cursor["git_state"]:
+            try:
+                self.baseline_path.unlink()
+            except OSError:
+                pass
+            return False
+        self.write_json(self.baseline_path, {**cursor, "saved_at": time.time(), "entries": entries})
+        return True
+
+    def status(self) -> dict[str, Any]:
+        state = self.load_state()
+        baseline = self.load_json(self.baseline_path)
+        return {
+            "journal_dir": str(self.directory),
+            "inotify_available": inotify_available(),
+            "watcher": state,
+            "stale_reason": self.stale_reason(state),
+            "baseline_saved_at": baseline.get("saved_at") if baseline else None,
+            "baseline_entry_count": len(baseline.get("entries", [])) if baseline else None,
+        }
+
+
+def path_is_covered(path: str | None, changed_paths: frozenset[str]) -> bool:
+    """True when `path` or one of its parent directories changed (a changed directory covers its whole subtree)."""
+    if not path:
+        return False
+    parts = path.rstrip("/").split("/")
+    return any("/".join(parts[: depth + 1]) in changed_paths for depth in range(len(parts)))
+
+
+def run_watcher(repo_root: Path) -> int:
+    """Watch every directory outside `.git` and append changed paths to the journal until SIGTERM."""
+    libc = load_libc()
+    if libc is None:
+        raise RuntimeError("inotify is not available on this platform")
+    journal = ChangeJournal(repo_root)
+    if journal.git_dir is None:
+        raise RuntimeError(f"not a git working tree: {repo_root}")
+    existing = journal.load_state()
+    if existing is not None and journal.stale_reason(existing) is None and existing.get("pid") != os.getpid():
+        raise RuntimeError(f"change journal watcher already running (pid {existing['pid']})")
+
+    journal.directory.mkdir(parents=True, exist_ok=True)
+    for stale in [*journal.directory.glob("log-*.ndjson"), journal.baseline_path]:
+        stale.unlink(missing_ok=True)
+    journal.cookies_dir.mkdir(exist_ok=True)
+    for cookie in journal.cookies_dir.iterdir():
+        cookie.unlink(missing_ok=True)
+
+    watcher = InotifyWatcher(libc)
+    directories: dict[int, str] = {}
+    state: dict[str, Any] = {
+        "pid": os.getpid(),
+        "repo_root": str(repo_root),
+        "started_at": time.time(),
+        "heartbeat": time.time(),
+        "generation": 1,
+        "overflowed": False,
+        "watch_count": 0,
+    }
+
+    def add_tree(rel_root: str) -> None:
+        for dirpath, dirnames, _ in os.walk(repo_root / rel_root):
+            rel = Path(dirpath).relative_to(repo_root).as_posix()
+            rel = "" if rel == "." else rel
+            if rel == "":
+                dirnames[:] = [name for name in dirnames if name != ".git"]
+            wd = watcher.add_watch(Path(dirpath), TREE_WATCH_MASK)
+            if wd is not None:
+                directories[wd] = rel
+
+    def drop_tree(rel_root: str) -> None:
+        for wd, rel in list(directories.items()):
+            if rel == rel_root or rel.startswith(f"{rel_root}/"):
+                directories.pop(wd)
+                watcher.remove_watch(wd)
+
+    stop = {"requested": False}
+
+    def request_stop(signum: int, frame: Any) -> None:
+        stop["requested"] = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    log_handle = journal.log_path(1).open("ab")
+    try:
+        cookie_wd = watcher.add_watch(journal.cookies_dir, IN_CREATE)
+        try:
+            add_tree("")
+        except WatchLimitReached:
+            state["overflowed"] = True
+        state["watch_count"] = len(directories)
+        journal.write_json(journal.state_path, state)
+
+        while not stop["requested"]:
+            events = watcher.read_events(HEARTBEAT_INTERVAL_SECONDS)
+            records: list[dict[str, str]] = []
+            seen: set[str] = set()
+            for wd, mask, name in events:
+                if mask & IN_Q_OVERFLOW:
+                    state["overflowed"] = True
+                    continue
+                if wd == cookie_wd:
+                    records.append({"cookie": name})
+                    continue
+                parent = directories.get(wd)
+                if parent is None:
+                    continue
+                if mask & IN_IGNORED:
+                    directories.pop(wd, None)
+                    continue
+                if not name:
+                    if parent == "" and mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                        state["overflowed"] = True
+                    # 子目錄自身的 delete/move 已由上層目錄的事件記錄。
+                    continue
+                rel = f"{parent}/{name}" if parent else name
+                if mask & IN_ISDIR:
+                    if mask & IN_MOVED_FROM:
+                        drop_tree(rel)
+                    elif mask & (IN_CREATE | IN_MOVED_TO):
+                        try:
+                            add_tree(rel)
+                        except WatchLimitReached:
+                            state["overflowed"] = True
+                if rel not in seen:
+                    seen.add(rel)
+                    records.append({"path": rel})
+            if records:
+                log_handle.write(b"".join(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n" for record in records))
+                log_handle.flush()
+            if log_handle.tell() > LOG_ROTATE_BYTES:
+                # 換新 generation 後舊 baseline 的 offset 失效，下一次 precheck 會完整重掃一次。
+                log_handle.close()
+                journal.log_path(state["generation"]).unlink(missing_ok=True)
+                state["generation"] += 1
+                log_handle = journal.log_path(state["generation"]).open("ab")
+            if records or time.time() - state["heartbeat"] >= HEARTBEAT_INTERVAL_SECONDS:
+                state["heartbeat"] = time.time()
+                state["watch_count"] = len(directories)
+                journal.write_json(journal.state_path, state)
+    finally:
+        log_handle.close()
+        watcher.close()
+        journal.state_path.unlink(missing_ok=True)
+    return EXIT_PASS
+
+
+def start_watcher(repo_root: Path, timeout: float = WATCHER_START_TIMEOUT_SECONDS) -> dict[str, Any]:
+    """Spawn `watch` as a detached process and wait until it has written its first state record."""
+    journal = ChangeJournal(repo_root)
+    state = journal.load_state()
+    if journal.stale_reason(state) is None:
+        return {"started": False, "watcher": state}
+    if not inotify_available():
+        raise RuntimeError("inotify is not available on this platform")
+    proc = subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "watch", "--repo-root", str(repo_root)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        state = journal.load_state()
+        if state is not None and state.get("pid") == proc.pid:
+            return {"started": True, "watcher": state}
+        if proc.poll() is not None:
+            raise RuntimeError(f"change journal watcher exited with code {proc.returncode}")
+        time.sleep(0.02)
+    proc.terminate()
+    raise RuntimeError("change journal watcher did not become ready in time")
+
+
+def stop_watcher(repo_root: Path, timeout: float = WATCHER_START_TIMEOUT_SECONDS) -> dict[str, Any]:
+    journal = ChangeJournal(repo_root)
+    state = journal.load_state()
+    if state is None or not process_alive(int(state.get("pid", 0))):
+        journal.state_path.unlink(missing_ok=True)
+        return {"stopped": False}
+    os.kill(int(state["pid"]), signal.SIGTERM)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and journal.state_path.exists():
+        time.sleep(0.02)
+    return {"stopped": True, "pid": state["pid"]}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "action",
+        choices=["watch", "start", "stop", "status"],
+        help="watch：前景執行 watcher；start/stop：背景啟動或停止 watcher；status：列出 journal 狀態",
+    )
+    parser.add_argument("--repo-root", type=Path, default=Path.cwd(), help="Repo 根目錄（預設：目前目錄）")
+    parser.add_argument("--json", action="store_true", help="輸出 JSON")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    repo_root = args.repo_root.resolve()
+    try:
+        if args.action == "watch":
+            return run_watcher(repo_root)
+        if args.action == "start":
+            result = start_watcher(repo_root)
+        elif args.action == "stop":
+            result = stop_watcher(repo_root)
+        else:
+            result = ChangeJournal(repo_root).status()
+    except Exception as exc:
+        if args.json:
+            print(json.dumps({"status": "error", "error": str(exc)}, ensure_ascii=False, indent=2), file=sys.stderr)
+        else:
+            print(f"workflow-core change journal error: {exc}", file=sys.stderr)
+        return EXIT_ERROR
+
+    status = "warn" if args.action == "status" and result["stale_reason"] else "pass"
+    result = {"status": status, "action": args.action, **result}
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(f"workflow-core change journal {args.action}: {status}")
+        for key, value in result.items():
+            if key not in {"status", "action"}:
+                print(f"{key}: {value}")
+    return EXIT_WARN if status == "warn" else EXIT_PASS
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
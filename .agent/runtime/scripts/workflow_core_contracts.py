@@ -3,15 +3,24 @@
 
 from __future__ import annotations
 
+import bisect
+import fnmatch
+import hashlib
+import importlib.util
 import json
+import os
 import shlex
 import shutil
 import subprocess
+import sys
 import re
+import tempfile
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, NamedTuple
 
 from workflow_core_manifest import (
+    CompiledPatternSet,
+    compile_patterns,
     get_canonical_manifest_path,
     get_managed_patterns,
     get_overlay_patterns,
@@ -20,10 +29,69 @@ from workflow_core_manifest import (
     get_smoke_suite_path,
     get_state_patterns,
     load_manifest,
+    load_manifest_snapshot,
     normalize_path,
     path_matches_pattern,
     pattern_anchor,
 )
+from workflow_core_tracing import count_bytes_read, count_bytes_written, count_subprocess, traced
+
+
+ProgressCallback = Callable[[dict[str, Any]], None]
+NDJSON_SUMMARY_KEPT_LISTS = frozenset({"notes", "failures"})
+
+
+def emit_event(on_event: ProgressCallback | None, event: str, **fields: Any) -> None:
+    if on_event is not None:
+        on_event({"event": event, **fields})
+
+
+def write_ndjson_record(record: dict[str, Any]) -> None:
+    sys.stdout.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+    sys.stdout.flush()
+
+
+def write_ndjson_error(exc: BaseException) -> None:
+    """Terminal record when a `--ndjson` run raises: one line on stdout like every other record, never pretty-printed."""
+    write_ndjson_record({"event": "error", "status": "error", "error": str(exc)})
+
+
+def summarize_result_for_stream(result: dict[str, Any]) -> dict[str, Any]:
+    """Compact summary record for `--ndjson`: per-path lists were already streamed as events, so only their counts remain.
+
+    This bounds what a consumer has to read and parse, not the wrapper's own memory: results still carry the full path
+    lists because stage metadata, sync locks and the `--json` report are built from them.
+    """
+    summary: dict[str, Any] = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            summary[key] = summarize_result_for_stream(value)
+        elif isinstance(value, list) and key not in NDJSON_SUMMARY_KEPT_LISTS:
+            summary[f"{key}_count"] = len(value)
+        else:
+            summary[key] = value
+    return summary
+
+
+_SCRIPT_MODULE_CACHE: dict[tuple[str, str], tuple[tuple[int, int], Any]] = {}
+
+
+def load_script_module(file_path: Path, module_name: str) -> Any:
+    """Load a script by path once per (name, path, mtime, size); warm processes reuse smoke/projection modules."""
+    resolved = file_path.resolve()
+    stat = resolved.stat()
+    key = (module_name, str(resolved))
+    fingerprint = (stat.st_mtime_ns, stat.st_size)
+    cached = _SCRIPT_MODULE_CACHE.get(key)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    spec = importlib.util.spec_from_file_location(module_name, resolved)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"unable to load module: {file_path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    _SCRIPT_MODULE_CACHE[key] = (fingerprint, module)
+    return module
 
 
 def git_run(repo_root: Path, args: list[str], check: bool = True) -> subprocess.CompletedProcess[str]:
@@ -35,6 +103,8 @@ def git_run(repo_root: Path, args: list[str], check: bool = True) -> subprocess.
         capture_output=True,
         text=True,
     )
+    count_subprocess()
+    count_bytes_read(len(proc.stdout))
     if check and proc.returncode != 0:
         message = proc.stderr.strip() or proc.stdout.strip() or f"git {' '.join(args)} failed"
         raise RuntimeError(message)
@@ -63,25 +133,448 @@ def safe_ref_label(value: str) -> str:
     return safe.strip(".-") or "ref"
 
 
-def fetch_ref(repo_root: Path, remote: str, ref: str, local_ref: str) -> str:
-    git_run(repo_root, ["fetch", "--no-tags", remote, f"{ref}:{local_ref}"])
+REMOTE_FETCH_MODES = ("full", "partial")
+PARTIAL_CLONE_FILTER = "blob:none"
+FILTER_IGNORED_MARKER = "filtering not recognized by server"
+PARTIAL_FETCH_GIT_PATH = "workflow-core/partial-fetch"
+PARTIAL_FETCH_REMOTE = "source"
+
+
+def resolve_git_path(repo_root: Path, rel_path: str) -> Path:
+    """`git rev-parse --git-path`, anchored at `repo_root` (git prints it relative to the working directory)."""
+    path = Path(git_run(repo_root, ["rev-parse", "--git-path", rel_path]).stdout.strip())
+    return path if path.is_absolute() else repo_root / path
+
+
+def packed_object_bytes(repo_root: Path) -> int:
+    pack_dir = resolve_git_path(repo_root, "objects/pack")
+    return sum(path.stat().st_size for path in pack_dir.glob("*.pack")) if pack_dir.is_dir() else 0
+
+
+def measured_fetch(
+    repo_root: Path,
+    fetch_args: list[str],
+    fetch_log: list[dict[str, Any]] | None,
+    kind: str,
+    config: list[str] | None = None,
+    blob_filter: str | None = None,
+) -> dict[str, Any] | None:
+    """Run `git fetch`; with a `fetch_log`, keep the received pack as-is and record its on-disk size."""
+    config_args = [arg for item in config or [] for arg in ("-c", item)]
+    filter_args = [f"--filter={blob_filter}"] if blob_filter is not None else []
+    if fetch_log is None:
+        git_run(repo_root, [*config_args, "fetch", *filter_args, *fetch_args])
+        return None
+    before = packed_object_bytes(repo_root)
+    # unpackLimit=1 讓 git 不把小 pack 展開成 loose objects，pack 目錄大小差即為這次傳輸量。
+    proc = git_run(repo_root, [*config_args, "-c", "fetch.unpackLimit=1", "fetch", *filter_args, *fetch_args])
+    record: dict[str, Any] = {"kind": kind, "bytes": packed_object_bytes(repo_root) - before}
+    if blob_filter is not None:
+        record["filter_honored"] = FILTER_IGNORED_MARKER not in proc.stderr
+    fetch_log.append(record)
+    return record
+
+
+def partial_fetch_object_repo(repo_root: Path, remote: str) -> Path:
+    """Bare scratch repo under `<git-dir>/workflow-core/partial-fetch/` that receives depth=1, blob-filtered fetches from `remote`.
+
+    Fetching with `--depth`/`--filter` into the working repo would turn its remote into a promisor, write
+    `.git/shallow` and graft the fetched ref; the scratch repo keeps all of that out of the working repo, and
+    living in the git dir keeps it out of the worktree that sync precheck classifies.
+    """
+    object_repo = resolve_git_path(repo_root, PARTIAL_FETCH_GIT_PATH) / f"{safe_ref_label(remote)}.git"
+    if not (object_repo / "HEAD").is_file():
+        object_repo.mkdir(parents=True, exist_ok=True)
+        git_run(object_repo, ["init", "-q", "--bare"])
+    proc = git_run(repo_root, ["remote", "get-url", remote], check=False)
+    url = proc.stdout.strip() if proc.returncode == 0 else remote
+    if not Path(url).is_absolute() and (repo_root / url).exists():
+        url = str((repo_root / url).resolve())
+    git_run(object_repo, ["config", f"remote.{PARTIAL_FETCH_REMOTE}.url", url])
+    return object_repo
+
+
+def fetch_ref(
+    repo_root: Path,
+    remote: str,
+    ref: str,
+    local_ref: str,
+    depth: int | None = None,
+    blob_filter: str | None = None,
+    fetch_log: list[dict[str, Any]] | None = None,
+) -> str:
+    depth_args = [f"--depth={depth}"] if depth is not None else []
+    measured_fetch(repo_root, ["--no-tags", *depth_args, remote, f"{ref}:{local_ref}"], fetch_log, "ref", blob_filter=blob_filter)
     resolved = resolve_ref(repo_root, local_ref)
     if resolved is None:
         raise RuntimeError(f"failed to resolve fetched ref: {local_ref}")
     return resolved
 
 
+def missing_blob_oids(repo_root: Path, ref: str) -> set[str]:
+    """Blobs reachable from `ref` that a partial clone has not fetched yet (listed without triggering lazy fetches)."""
+    proc = git_run(repo_root, ["rev-list", "--objects", "--missing=print", ref])
+    return {line[1:] for line in proc.stdout.splitlines() if line.startswith("?")}
+
+
+def fetch_missing_blobs(
+    repo_root: Path,
+    remote: str,
+    ref: str,
+    paths: list[str],
+    fetch_log: list[dict[str, Any]] | None = None,
+) -> int:
+    """Batch-fetch the blobs for `paths` at `ref` that are still missing; returns how many were requested.
+
+    A partial clone would otherwise lazy-fetch them one round trip per blob the first time they are read.
+    """
+    wanted = {entry.oid for entry in list_tree_entries_for_paths(repo_root, ref, paths, with_sizes=False).values()}
+    missing = sorted(wanted & missing_blob_oids(repo_root, ref))
+    for start in range(0, len(missing), GIT_PATHSPEC_BATCH_SIZE):
+        batch = missing[start : start + GIT_PATHSPEC_BATCH_SIZE]
+        # noop negotiation：只要這批 blob，不必和 remote 來回比對 commit 歷史。
+        record = measured_fetch(
+            repo_root,
+            ["--no-tags", "--no-write-fetch-head", "--recurse-submodules=no", remote, *batch],
+            fetch_log,
+            "blobs",
+            config=["fetch.negotiationAlgorithm=noop"],
+            blob_filter=PARTIAL_CLONE_FILTER,
+        )
+        if record is not None:
+            record["object_count"] = len(batch)
+    return len(missing)
+
+
 def list_files_at_ref(repo_root: Path, ref: str) -> list[str]:
     proc = git_run(repo_root, ["ls-tree", "-r", "--name-only", ref])
     return [normalize_path(line) for line in proc.stdout.splitlines() if line.strip()]
 
 
+class TreeEntry(NamedTuple):
+    mode: str
+    oid: str
+    size: int
+
+
+def git_blob_oid(payload: bytes, oid_length: int = 40) -> str:
+    """Same OID `git hash-object` gives `payload` (sha1, or sha256 for 64-hex object names)."""
+    digest = hashlib.sha256() if oid_length == 64 else hashlib.sha1()
+    digest.update(b"blob %d\0" % len(payload))
+    digest.update(payload)
+    return digest.hexdigest()
+
+
+def list_tree_entries_at_ref(repo_root: Path, ref: str) -> dict[str, TreeEntry]:
+    proc = git_run(repo_root, ["ls-tree", "-r", "-l", "-z", "--full-tree", ref])
+    entries: dict[str, TreeEntry] = {}
+    for record in proc.stdout.split("\0"):
+        if not record:
+            continue
+        meta, _, path = record.partition("\t")
+        mode, object_type, oid, size = meta.split()
+        if object_type != "blob":
+            continue
+        entries[normalize_path(path)] = TreeEntry(mode=mode, oid=oid, size=int(size))
+    return entries
+
+
+def list_tree_entries_for_paths(repo_root: Path, ref: str, paths: list[str], with_sizes: bool = True) -> dict[str, TreeEntry]:
+    """`list_tree_entries_at_ref` limited to `paths`, safe in a blob-filtered partial clone.
+
+    `ls-tree -l` needs every blob's size and would lazy-fetch the whole tree; here the tree is listed without sizes
+    and only the selected OIDs go through `cat-file --batch-check` (size -1 when `with_sizes` is off).
+    """
+    wanted = set(paths)
+    proc = git_run(repo_root, ["ls-tree", "-r", "-z", "--full-tree", ref])
+    listed: dict[str, tuple[str, str]] = {}
+    for record in proc.stdout.split("\0"):
+        if not record:
+            continue
+        meta, _, path = record.partition("\t")
+        mode, object_type, oid = meta.split()
+        path = normalize_path(path)
+        if object_type == "blob" and path in wanted:
+            listed[path] = (mode, oid)
+    sizes: dict[str, int] = {}
+    if with_sizes and listed:
+        oids = sorted({oid for _, oid in listed.values()})
+        check = subprocess.run(
+            ["git", "-C", str(repo_root), "cat-file", "--batch-check=%(objectname) %(objectsize)"],
+            input="\n".join(oids) + "\n",
+            check=False,
+            capture_output=True,
+            text=True,
+        )
+        count_subprocess()
+        count_bytes_read(len(check.stdout))
+        if check.returncode != 0:
+            raise RuntimeError(check.stderr.strip() or "git cat-file --batch-check failed")
+        for line in check.stdout.splitlines():
+            oid, _, size = line.partition(" ")
+            if size.isdigit():
+                sizes[oid] = int(size)
+    return {path: TreeEntry(mode=mode, oid=oid, size=sizes.get(oid, -1)) for path, (mode, oid) in listed.items()}
+
+
+SYNC_LOCK_FORMAT = 1
+SYNC_LOCK_REL_PATH = ".workflow-core/sync-lock.json"
+
+
+def default_sync_lock_path(repo_root: Path) -> Path:
+    return repo_root / SYNC_LOCK_REL_PATH
+
+
+def load_sync_lock(lock_path: Path) -> dict[str, Any] | None:
+    try:
+        payload = json.loads(lock_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(payload, dict) or payload.get("format") != SYNC_LOCK_FORMAT or not isinstance(payload.get("entries"), dict):
+        return None
+    return payload
+
+
+def build_sync_lock(release_ref: str, resolved_source_ref: str | None, profile_name: str | None, entries: dict[str, TreeEntry]) -> dict[str, Any]:
+    return {
+        "format": SYNC_LOCK_FORMAT,
+        "release_ref": release_ref,
+        "resolved_source_ref": resolved_source_ref,
+        "profile_name": profile_name,
+        "entries": {path: entry._asdict() for path, entry in sorted(entries.items())},
+    }
+
+
+def plan_incremental_sync(
+    previous_lock: dict[str, Any] | None,
+    current_entries: dict[str, TreeEntry],
+    installed_entries: dict[str, TreeEntry] | None = None,
+) -> dict[str, Any]:
+    """Compare release tree OIDs against the installed lock; paths whose committed blob drifted from the lock are re-applied."""
+    locked = previous_lock["entries"] if previous_lock else {}
+    added: list[str] = []
+    modified: list[str] = []
+    unchanged: list[str] = []
+    skipped_bytes = 0
+    for path, entry in sorted(current_entries.items()):
+        locked_entry = locked.get(path)
+        if locked_entry is None:
+            added.append(path)
+            continue
+        installed = installed_entries.get(path) if installed_entries is not None else None
+        drifted = installed_entries is not None and (installed is None or installed.oid != locked_entry.get("oid"))
+        if locked_entry.get("oid") != entry.oid or locked_entry.get("mode") != entry.mode or drifted:
+            modified.append(path)
+            continue
+        unchanged.append(path)
+        skipped_bytes += entry.size
+    return {
+        "baseline_release_ref": previous_lock.get("release_ref") if previous_lock else None,
+        "added_paths": added,
+        "modified_paths": modified,
+        "deleted_paths": sorted(path for path in locked if path not in current_entries),
+        "skipped_file_count": len(unchanged),
+        "skipped_bytes": skipped_bytes,
+    }
+
+
+RELEASE_BUNDLE_FORMAT = 1
+BUNDLE_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class ReleaseBundleEntry(NamedTuple):
+    path: str
+    size: int
+    mode: str
+    sha256: str
+    oid: str
+    offset: int
+
+
+def release_bundle_paths(output_dir: Path, release_ref: str) -> tuple[Path, Path]:
+    stem = f"workflow-core-release-{safe_ref_label(release_ref)}.bundle"
+    return output_dir / f"{stem}.json", output_dir / f"{stem}.pack"
+
+
+def write_release_bundle(
+    repo_root: Path,
+    ref: str,
+    paths: list[str],
+    tree_entries: dict[str, TreeEntry],
+    index_path: Path,
+    pack_path: Path,
+    metadata: dict[str, Any],
+) -> dict[str, Any]:
+    """Write the export tree as one content-addressed pack (identical blobs stored once) plus a per-file JSON index."""
+    pack_path.parent.mkdir(parents=True, exist_ok=True)
+    offsets_by_sha: dict[str, int] = {}
+    files: list[dict[str, Any]] = []
+    pack_digest = hashlib.sha256()
+    offset = 0
+    reader = shared_blob_reader(repo_root)
+    owns_reader = reader is None
+    if reader is None:
+        reader = GitBlobReader(repo_root)
+    try:
+        with pack_path.open("wb") as pack:
+            for rel_path in sorted(paths):
+                entry = tree_entries[rel_path]
+                payload = reader.read_bytes(ref, rel_path)
+                digest = hashlib.sha256(payload).hexdigest()
+                if digest not in offsets_by_sha:
+                    offsets_by_sha[digest] = offset
+                    pack.write(payload)
+                    pack_digest.update(payload)
+                    count_bytes_written(len(payload))
+                    offset += len(payload)
+                files.append(
+                    ReleaseBundleEntry(
+                        path=rel_path,
+                        size=len(payload),
+                        mode=entry.mode,
+                        sha256=digest,
+                        oid=entry.oid,
+                        offset=offsets_by_sha[digest],
+                    )._asdict()
+                )
+    finally:
+        if owns_reader:
+            reader.close()
+    index = {
+        "format": RELEASE_BUNDLE_FORMAT,
+        **metadata,
+        "pack_file": pack_path.name,
+        "pack_size": offset,
+        "pack_sha256": pack_digest.hexdigest(),
+        "file_count": len(files),
+        "total_bytes": sum(item["size"] for item in files),
+        "files": files,
+    }
+    write_json_file(index_path, index)
+    return index
+
+
+def load_release_bundle(index_path: Path) -> dict[str, Any]:
+    try:
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise RuntimeError(f"unable to read release bundle index {index_path}: {exc}") from exc
+    if not isinstance(index, dict) or index.get("format") != RELEASE_BUNDLE_FORMAT or not isinstance(index.get("files"), list):
+        raise RuntimeError(f"unsupported release bundle index format: {index_path}")
+    pack_path = index_path.parent / str(index.get("pack_file") or "")
+    if not pack_path.is_file() or pack_path.stat().st_size != index.get("pack_size"):
+        raise RuntimeError(f"release bundle pack is missing or truncated: {pack_path}")
+    return {**index, "index_path": str(index_path.resolve()), "pack_path": str(pack_path.resolve())}
+
+
+def bundle_tree_entries(bundle: dict[str, Any]) -> dict[str, TreeEntry]:
+    return {item["path"]: TreeEntry(mode=item["mode"], oid=item["oid"], size=item["size"]) for item in bundle["files"]}
+
+
+def extract_release_bundle(
+    bundle: dict[str, Any],
+    paths: list[str],
+    output_root: Path,
+    on_event: ProgressCallback | None = None,
+) -> list[str]:
+    """Copy the requested members out of the pack by offset, checking each payload against its indexed sha256."""
+    entries = {item["path"]: item for item in bundle["files"]}
+    written_paths: list[str] = []
+    with open(bundle["pack_path"], "rb") as pack:
+        for rel_path in paths:
+            entry = entries.get(rel_path)
+            if entry is None:
+                raise RuntimeError(f"{rel_path} is not in release bundle {bundle['index_path']}")
+            pack.seek(entry["offset"])
+            payload = pack.read(entry["size"])
+            count_bytes_read(len(payload))
+            if len(payload) != entry["size"] or hashlib.sha256(payload).hexdigest() != entry["sha256"]:
+                raise RuntimeError(f"release bundle member failed sha256 verification: {rel_path}")
+            target_path = output_root / rel_path
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            target_path.write_bytes(payload)
+            count_bytes_written(len(payload))
+            written_paths.append(rel_path)
+            emit_event(on_event, "path-written", path=rel_path, bytes=len(payload), oid=entry["oid"], sha256=entry["sha256"])
+    return written_paths
+
+
+WORKTREE_SKIPPED_DIR_NAMES = frozenset({".git", "__pycache__"})
+DEFAULT_WORKTREE_PRUNE_PATTERNS = [".workflow-core/**"]
+WORKTREE_LISTING_MODES = ("auto", "git", "scan")
+
+
+def is_skipped_worktree_file(rel_path: str) -> bool:
+    if rel_path.endswith(".pyc"):
+        return True
+    return any(segment in WORKTREE_SKIPPED_DIR_NAMES for segment in rel_path.split("/")[:-1])
+
+
+def list_git_worktree_files(root: Path) -> list[str] | None:
+    if shutil.which("git") is None:
+        return None
+    prefix_proc = git_run(root, ["rev-parse", "--show-prefix"], check=False)
+    if prefix_proc.returncode != 0 or prefix_proc.stdout.strip():
+        return None
+    listed_proc = git_run(root, ["ls-files", "-z", "--cached", "--others", "--exclude-standard"], check=False)
+    deleted_proc = git_run(root, ["ls-files", "-z", "--deleted"], check=False)
+    if listed_proc.returncode != 0 or deleted_proc.returncode != 0:
+        return None
+    deleted = {item for item in deleted_proc.stdout.split("\0") if item}
+    return sorted({item for item in listed_proc.stdout.split("\0") if item and item not in deleted})
+
+
+def scan_worktree_files(root: Path, prune_set: CompiledPatternSet) -> list[str]:
+    files: list[str] = []
+    pending: list[tuple[str, str]] = [("", str(root))]
+    while pending:
+        rel_dir, dir_path = pending.pop()
+        try:
+            iterator = os.scandir(dir_path)
+        except OSError:
+            continue
+        with iterator:
+            for entry in iterator:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in WORKTREE_SKIPPED_DIR_NAMES or prune_set.covers_directory(rel_path):
+                        continue
+                    pending.append((rel_path, entry.path))
+                elif entry.is_file() and not rel_path.endswith(".pyc") and not prune_set.matches(rel_path):
+                    files.append(rel_path)
+    return sorted(files)
+
+
+def list_worktree_files(root: Path, prune_patterns: list[str] | None = None, mode: str = "auto") -> list[str]:
+    """List worktree files under `root`, never entering subtrees covered by `prune_patterns`.
+
+    `git` mode reads the index plus untracked, non-ignored files; `scan` walks the
+    tree with `os.scandir`; `auto` prefers git when `root` is a work tree top level.
+    """
+    if mode not in WORKTREE_LISTING_MODES:
+        raise ValueError(f"unsupported worktree listing mode: {mode}")
+    prune_set = compile_patterns([*DEFAULT_WORKTREE_PRUNE_PATTERNS, *(prune_patterns or [])])
+    if mode != "scan":
+        git_files = list_git_worktree_files(root)
+        if git_files is not None:
+            return [
+                path
+                for path in git_files
+                if not is_skipped_worktree_file(path) and not prune_set.matches(path)
+            ]
+        if mode == "git":
+            raise RuntimeError(f"git worktree listing is unavailable for: {root}")
+    return scan_worktree_files(root, prune_set)
+
+
 def read_bytes_at_ref(repo_root: Path, ref: str, path: str) -> bytes:
     proc = subprocess.run(
         ["git", "-C", str(repo_root), "show", f"{ref}:{normalize_path(path)}"],
         check=False,
         capture_output=True,
     )
+    count_subprocess()
+    count_bytes_read(len(proc.stdout))
     if proc.returncode != 0:
         message = proc.stderr.decode("utf-8", errors="replace").strip() or proc.stdout.decode(
             "utf-8", errors="replace"
@@ -94,10 +587,144 @@ def read_text_at_ref(repo_root: Path, ref: str, path: str, encoding: str = "utf-
     return read_bytes_at_ref(repo_root, ref, path).decode(encoding)
 
 
-def checkout_paths_from_ref(repo_root: Path, ref: str, paths: list[str]) -> None:
-    if not paths:
-        return
-    git_run(repo_root, ["checkout", ref, "--", *paths])
+class GitBlobReader:
+    """Stream blobs through one long-lived `git cat-file --batch` process instead of one `git show` per path."""
+
+    def __init__(self, repo_root: Path) -> None:
+        self.repo_root = repo_root
+        self._proc: subprocess.Popen[bytes] | None = None
+
+    def __enter__(self) -> "GitBlobReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _ensure_process(self) -> subprocess.Popen[bytes]:
+        if self._proc is None:
+            if shutil.which("git") is None:
+                raise RuntimeError("git command not found on PATH")
+            self._proc = subprocess.Popen(
+                ["git", "-C", str(self.repo_root), "cat-file", "--batch"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            count_subprocess()
+        return self._proc
+
+    def read_bytes(self, ref: str, path: str) -> bytes:
+        return self.read_blob(ref, path)[1]
+
+    def read_blob(self, ref: str, path: str) -> tuple[str, bytes]:
+        """`(oid, payload)` of `path` at `ref`; the OID comes from the tree, not from hashing what was read."""
+        normalized = normalize_path(path)
+        if "\n" in normalized or "\n" in ref:
+            oid = git_run(self.repo_root, ["rev-parse", "--verify", "--quiet", f"{ref}:{normalized}"]).stdout.strip()
+            return oid, read_bytes_at_ref(self.repo_root, ref, normalized)
+        return self._read_object(f"{ref}:{normalized}", f"{path} at {ref}")
+
+    def read_object(self, oid: str) -> bytes:
+        return self._read_object(oid, f"object {oid}")[1]
+
+    def _read_object(self, spec: str, label: str) -> tuple[str, bytes]:
+        proc = self._ensure_process()
+        try:
+            proc.stdin.write(f"{spec}\n".encode("utf-8"))
+            proc.stdin.flush()
+        except BrokenPipeError as exc:
+            self.close()
+            raise RuntimeError("git cat-file --batch exited unexpectedly") from exc
+        header = proc.stdout.readline()
+        if not header:
+            self.close()
+            raise RuntimeError("git cat-file --batch exited unexpectedly")
+        fields = header.decode("utf-8", errors="replace").rstrip("\n").split(" ")
+        if len(fields) != 3 or not fields[2].isdigit():
+            raise RuntimeError(f"unable to read {label}")
+        oid, object_type, size = fields
+        payload = proc.stdout.read(int(size))
+        proc.stdout.read(1)
+        count_bytes_read(len(payload))
+        if object_type != "blob":
+            raise RuntimeError(f"{label} is a {object_type}, not a blob")
+        return oid, payload
+
+    def read_text(self, ref: str, path: str, encoding: str = "utf-8") -> str:
+        return self.read_bytes(ref, path).decode(encoding)
+
+    def close(self) -> None:
+        proc = self._proc
+        self._proc = None
+        if proc is None:
+            return
+        if proc.stdin is not None:
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        if proc.stdout is not None:
+            proc.stdout.close()
+
+
+_SHARED_BLOB_READERS: dict[str, GitBlobReader] | None = None
+
+
+def enable_shared_blob_readers() -> None:
+    """Keep one `git cat-file --batch` session per repo alive across calls (used by the workflow-core daemon)."""
+    global _SHARED_BLOB_READERS
+    if _SHARED_BLOB_READERS is None:
+        _SHARED_BLOB_READERS = {}
+
+
+def close_shared_blob_readers() -> None:
+    global _SHARED_BLOB_READERS
+    for reader in (_SHARED_BLOB_READERS or {}).values():
+        reader.close()
+    _SHARED_BLOB_READERS = None
+
+
+def shared_blob_reader(repo_root: Path) -> GitBlobReader | None:
+    if _SHARED_BLOB_READERS is None:
+        return None
+    key = str(repo_root.resolve())
+    reader = _SHARED_BLOB_READERS.get(key)
+    if reader is None:
+        reader = _SHARED_BLOB_READERS[key] = GitBlobReader(repo_root)
+    return reader
+
+
+def write_paths_from_ref(
+    repo_root: Path,
+    ref: str,
+    paths: list[str],
+    output_root: Path,
+    reader: GitBlobReader | None = None,
+    on_event: ProgressCallback | None = None,
+) -> list[str]:
+    written_paths: list[str] = []
+    active_reader = reader or shared_blob_reader(repo_root)
+    owns_reader = active_reader is None
+    if active_reader is None:
+        active_reader = GitBlobReader(repo_root)
+    try:
+        for rel_path in paths:
+            target_path = output_root / rel_path
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            oid, payload = active_reader.read_blob(ref, rel_path)
+            target_path.write_bytes(payload)
+            count_bytes_written(len(payload))
+            written_paths.append(rel_path)
+            emit_event(on_event, "path-written", path=rel_path, bytes=len(payload), oid=oid)
+    finally:
+        if owns_reader:
+            active_reader.close()
+    return written_paths
 
 
 def worktree_path_matches_ref(repo_root: Path, ref: str, path: str) -> bool:
@@ -105,6 +732,71 @@ def worktree_path_matches_ref(repo_root: Path, ref: str, path: str) -> bool:
     return proc.returncode == 0
 
 
+GIT_PATHSPEC_BATCH_SIZE = 1000
+
+
+def run_git_with_input(repo_root: Path, args: list[str], payload: bytes, env: dict[str, str]) -> None:
+    proc = subprocess.run(["git", "-C", str(repo_root), *args], input=payload, check=False, capture_output=True, env=env)
+    count_subprocess()
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.decode("utf-8", errors="replace").strip() or f"git {' '.join(args)} failed")
+
+
+def checkout_entries_to_root(repo_root: Path, entries: dict[str, TreeEntry], target_root: Path) -> None:
+    """Write `entries` under `target_root` the way `git checkout` would write them into the worktree.
+
+    A throwaway index holds only these entries and `git checkout-index --prefix` writes them out, so `.gitattributes`
+    smudge, eol and LFS filters, executable bits and symlinks all apply; the repo index is not touched.
+    """
+    if not entries:
+        return
+    with tempfile.TemporaryDirectory(prefix="workflow-core-index-") as temp_dir:
+        env = {**os.environ, "GIT_INDEX_FILE": str(Path(temp_dir) / "index")}
+        index_info = b"".join(f"{entry.mode} {entry.oid}\t{path}\0".encode("utf-8") for path, entry in entries.items())
+        run_git_with_input(repo_root, ["update-index", "-z", "--index-info"], index_info, env)
+        prefix = f"{target_root.resolve()}{os.sep}"
+        checkout_paths = b"".join(f"{path}\0".encode("utf-8") for path in entries)
+        run_git_with_input(repo_root, ["checkout-index", "-f", "-z", "--stdin", f"--prefix={prefix}"], checkout_paths, env)
+    count_bytes_written(sum((target_root / path).lstat().st_size for path in entries))
+
+
+def update_index_from_ref(repo_root: Path, ref: str, paths: list[str]) -> None:
+    """Point the index entries for `paths` at `ref` without touching the worktree (the index half of `git checkout ref -- paths`).
+
+    Paths absent from `ref` (managed files the release deleted) drop out of the index, like `git rm --cached`.
+    """
+    for start in range(0, len(paths), GIT_PATHSPEC_BATCH_SIZE):
+        git_run(repo_root, ["--literal-pathspecs", "reset", "-q", ref, "--", *paths[start : start + GIT_PATHSPEC_BATCH_SIZE]])
+
+
+def paths_matching_ref(repo_root: Path, ref: str, paths: list[str]) -> list[str]:
+    """Batched `worktree_path_matches_ref`: one `git diff --name-only` per pathspec batch instead of one per path."""
+    differing: set[str] = set()
+    for start in range(0, len(paths), GIT_PATHSPEC_BATCH_SIZE):
+        batch = paths[start : start + GIT_PATHSPEC_BATCH_SIZE]
+        proc = git_run(repo_root, ["--literal-pathspecs", "diff", "--name-only", "-z", "--no-renames", ref, "--", *batch])
+        differing.update(normalize_path(item) for item in proc.stdout.split("\0") if item)
+    return [path for path in paths if path not in differing]
+
+
+COMPARE_CHUNK_SIZE = 1024 * 1024
+
+
+def files_have_same_content(left: Path, right: Path, chunk_size: int = COMPARE_CHUNK_SIZE) -> bool:
+    try:
+        if left.stat().st_size != right.stat().st_size:
+            return False
+        with left.open("rb") as left_handle, right.open("rb") as right_handle:
+            while True:
+                left_chunk = left_handle.read(chunk_size)
+                if left_chunk != right_handle.read(chunk_size):
+                    return False
+                if not left_chunk:
+                    return True
+    except OSError:
+        return False
+
+
 def run_shell_command(repo_root: Path, command: str) -> tuple[bool, str]:
     proc = subprocess.run(
         shlex.split(command),
@@ -113,6 +805,7 @@ def run_shell_command(repo_root: Path, command: str) -> tuple[bool, str]:
         capture_output=True,
         text=True,
     )
+    count_subprocess()
     output = (proc.stdout or proc.stderr or "").strip()
     return proc.returncode == 0, output
 
@@ -151,7 +844,7 @@ def patterns_overlap(left: str, right: str) -> bool:
 
 def collect_split_targets(manifest: dict[str, Any]) -> list[str]:
     targets: list[str] = []
-    managed_patterns = get_managed_patterns(manifest)
+    managed_set = compile_patterns(get_managed_patterns(manifest))
     for item in manifest.get("split_required", []):
         if not isinstance(item, dict):
             continue
@@ -159,7 +852,7 @@ def collect_split_targets(manifest: dict[str, Any]) -> list[str]:
             normalized = normalize_path(part)
             if not normalized:
                 continue
-            if any(path_matches_pattern(normalized, managed_pattern) for managed_pattern in managed_patterns):
+            if managed_set.matches(normalized):
                 continue
             if normalized not in targets:
                 targets.append(normalized)
@@ -178,6 +871,63 @@ def collect_local_install_targets(manifest: dict[str, Any]) -> list[str]:
     return [local_target] if local_target else []
 
 
+_RANGE_END = "\U0010ffff"
+
+
+class PatternAnchorIndex:
+    """Pattern anchors kept sorted so `patterns_overlap` partners come from range scans, not a pairwise loop.
+
+    `hits(pattern)` returns the indexed patterns whose anchor is `pattern`'s anchor or below it, or which
+    `path_matches_pattern(anchor, pattern)` accepts; the reverse direction comes from an index over the other side.
+    """
+
+    def __init__(self, patterns: list[str]) -> None:
+        anchored = [(pattern_anchor(pattern), index) for index, pattern in enumerate(patterns)]
+        self.anchors = sorted((anchor, index) for anchor, index in anchored if anchor)
+        self.anchor_keys = [anchor for anchor, _ in self.anchors]
+        # path_matches_pattern 會先 normalize 路徑，因此 match 查詢改用 normalize 後的 anchor 排序。
+        self.probes = sorted((normalize_path(anchor), index) for anchor, index in self.anchors)
+        self.probe_keys = [probe for probe, _ in self.probes]
+
+    @staticmethod
+    def scan(keys: list[str], entries: list[tuple[str, int]], low: str, high: str) -> list[tuple[str, int]]:
+        return entries[bisect.bisect_left(keys, low) : bisect.bisect_left(keys, high)]
+
+    def prefixed(self, keys: list[str], entries: list[tuple[str, int]], prefix: str) -> list[tuple[str, int]]:
+        return self.scan(keys, entries, prefix, prefix + _RANGE_END)
+
+    def hits(self, pattern: str) -> set[int]:
+        anchor = pattern_anchor(pattern)
+        if not anchor:
+            return set()
+        found = {index for _, index in self.scan(self.anchor_keys, self.anchors, anchor, anchor + "\0")}
+        found.update(index for _, index in self.prefixed(self.anchor_keys, self.anchors, anchor + "/"))
+
+        normalized = normalize_path(pattern)
+        if normalized.endswith("/**") and not any(char in normalized[:-3] for char in "*?["):
+            found.update(index for _, index in self.prefixed(self.probe_keys, self.probes, normalized[:-3]))
+        elif any(char in normalized for char in "*?["):
+            literal = normalized[: min(normalized.find(char) for char in "*?[" if char in normalized)]
+            found.update(
+                index
+                for probe, index in self.prefixed(self.probe_keys, self.probes, literal)
+                if fnmatch.fnmatchcase(probe, normalized)
+            )
+        else:
+            found.update(index for _, index in self.scan(self.probe_keys, self.probes, normalized, normalized + "\0"))
+            found.update(index for _, index in self.prefixed(self.probe_keys, self.probes, normalized + "/"))
+        return found
+
+
+def overlapping_pattern_pairs(left_patterns: list[str], right_patterns: list[str]) -> set[tuple[int, int]]:
+    """All `(left_index, right_index)` with `patterns_overlap(left, right)`, in O((m+f) log(m+f) + k) for non-glob patterns."""
+    left_index = PatternAnchorIndex(left_patterns)
+    right_index = PatternAnchorIndex(right_patterns)
+    pairs = {(left, right) for right, pattern in enumerate(right_patterns) for left in left_index.hits(pattern)}
+    pairs.update((left, right) for left, pattern in enumerate(left_patterns) for right in right_index.hits(pattern))
+    return pairs
+
+
 def collect_managed_path_violations(manifest: dict[str, Any]) -> list[str]:
     managed_patterns = get_managed_patterns(manifest)
     forbidden_patterns = [
@@ -187,14 +937,14 @@ def collect_managed_path_violations(manifest: dict[str, Any]) -> list[str]:
         *collect_local_install_targets(manifest),
     ]
 
-    violations: list[str] = []
-    for managed_pattern in managed_patterns:
-        for forbidden_pattern in forbidden_patterns:
-            if patterns_overlap(managed_pattern, forbidden_pattern):
-                violations.append(f"{managed_pattern} overlaps {forbidden_pattern}")
-    return sorted(set(violations))
+    violations = {
+        f"{managed_patterns[managed]} overlaps {forbidden_patterns[forbidden]}"
+        for managed, forbidden in overlapping_pattern_pairs(managed_patterns, forbidden_patterns)
+    }
+    return sorted(violations)
 
 
+@traced("evaluate-manifest-contract")
 def evaluate_manifest_contract(repo_root: Path, manifest_path: Path, extra_required_live_paths: list[str] | None = None) -> dict[str, Any]:
     manifest = load_manifest(manifest_path)
     live_paths = compute_required_live_path_status(repo_root, manifest, extra_paths=extra_required_live_paths)
@@ -230,6 +980,130 @@ def evaluate_manifest_contract(repo_root: Path, manifest_path: Path, extra_requi
     }
 
 
+CONTRACT_SNAPSHOT_FORMAT = 2
+CONTRACT_SNAPSHOT_GIT_PATH = "workflow-core/contract-snapshot.json"
+
+
+def default_contract_snapshot_path(repo_root: Path) -> Path:
+    """Inside the git dir, so the cache never shows up next to the tracked release artifacts."""
+    return resolve_git_path(repo_root, CONTRACT_SNAPSHOT_GIT_PATH)
+
+
+def contract_snapshot_key(repo_root: Path, manifest_path: Path, extra_required_live_paths: list[str] | None) -> dict[str, Any] | None:
+    """HEAD + index stat + manifest sha256; None when there is no HEAD to key on (not a repo or unborn branch)."""
+    proc = git_run(repo_root, ["rev-parse", "--git-path", "index", "--verify", "-q", "HEAD"], check=False)
+    lines = proc.stdout.splitlines()
+    if proc.returncode != 0 or len(lines) < 2:
+        return None
+    index_path = Path(lines[0]) if Path(lines[0]).is_absolute() else repo_root / lines[0]
+    try:
+        index_stat = index_path.stat()
+        index_state = [index_stat.st_mtime_ns, index_stat.st_size]
+    except OSError:
+        index_state = None
+    return {
+        "head": lines[1],
+        "index": index_state,
+        "manifest_path": str(manifest_path.resolve()),
+        "manifest_sha256": load_manifest_snapshot(manifest_path).sha256,
+        "extra_required_live_paths": sorted(normalize_path(path) for path in extra_required_live_paths or []),
+    }
+
+
+def contract_required_patterns(contract: dict[str, Any]) -> list[str]:
+    return [*contract["required_live_paths"]["existing"], *contract["required_live_paths"]["missing"]]
+
+
+def contract_probe_paths(contract: dict[str, Any]) -> list[str]:
+    # contract 中唯一依賴 worktree（而非 HEAD/index/manifest）的部分：這幾個 anchor 是否存在。
+    anchors = [pattern_anchor(pattern) for pattern in contract_required_patterns(contract)]
+    return sorted(
+        {
+            path
+            for path in [*anchors, contract["projection_artifact_path"], contract["smoke_suite_path"], ".agent/workflows/AGENT_ENTRY.md"]
+            if path
+        }
+    )
+
+
+def glob_match_digest(repo_root: Path, pattern: str) -> str:
+    """Digest of every worktree file matching glob `pattern` (path, size, mtime) under its anchor."""
+    digest = hashlib.sha256()
+    for dirpath, dirnames, filenames in os.walk(repo_root / pattern_anchor(pattern)):
+        dirnames[:] = sorted(name for name in dirnames if name not in WORKTREE_SKIPPED_DIR_NAMES)
+        for name in sorted(filenames):
+            file_path = Path(dirpath) / name
+            rel_path = normalize_path(str(file_path.relative_to(repo_root)))
+            if is_skipped_worktree_file(rel_path) or not path_matches_pattern(rel_path, pattern):
+                continue
+            try:
+                info = file_path.lstat()
+            except OSError:
+                continue
+            digest.update(f"{rel_path}\0{info.st_size}\0{info.st_mtime_ns}\n".encode("utf-8", errors="surrogateescape"))
+    return digest.hexdigest()
+
+
+def contract_glob_probes(repo_root: Path, contract: dict[str, Any]) -> dict[str, str]:
+    # glob 型 required live path 只檢查 anchor 不夠：anchor 下符合 glob 的檔案變動時也要重算。
+    return {
+        pattern: glob_match_digest(repo_root, pattern)
+        for pattern in contract_required_patterns(contract)
+        if any(char in pattern for char in "*?[")
+    }
+
+
+@traced("contract-snapshot")
+def evaluate_manifest_contract_cached(
+    repo_root: Path,
+    manifest_path: Path,
+    extra_required_live_paths: list[str] | None = None,
+    snapshot_path: Path | None = None,
+) -> dict[str, Any]:
+    """`evaluate_manifest_contract` memoized under `<git-dir>/workflow-core/` across release steps.
+
+    The snapshot is reused while HEAD, the index stat and the manifest hash are unchanged, the probed anchors
+    still exist (or not) as recorded and the files matching glob required live paths are unchanged; otherwise it
+    is recomputed and rewritten. The result carries a `contract_snapshot` record saying which happened.
+    """
+    key = contract_snapshot_key(repo_root, manifest_path, extra_required_live_paths)
+    if key is None:
+        contract = evaluate_manifest_contract(repo_root, manifest_path, extra_required_live_paths)
+        return {**contract, "contract_snapshot": {"status": "disabled", "reason": "no-head", "path": None}}
+
+    target_path = snapshot_path or default_contract_snapshot_path(repo_root)
+    try:
+        payload = json.loads(target_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        payload = None
+    if not isinstance(payload, dict) or payload.get("format") != CONTRACT_SNAPSHOT_FORMAT:
+        reason = "missing"
+    elif payload.get("key") != key:
+        reason = "inputs-changed"
+    elif any((repo_root / path).exists() != exists for path, exists in payload.get("probes", {}).items()):
+        reason = "anchors-changed"
+    elif payload.get("glob_probes") != contract_glob_probes(repo_root, payload["contract"]):
+        reason = "matches-changed"
+    else:
+        record = {"status": "hit", "reason": None, "path": str(target_path.resolve())}
+        return {**payload["contract"], "manifest": load_manifest(manifest_path), "contract_snapshot": record}
+
+    contract = evaluate_manifest_contract(repo_root, manifest_path, extra_required_live_paths)
+    persisted = {name: value for name, value in contract.items() if name != "manifest"}
+    probes = {path: (repo_root / path).exists() for path in contract_probe_paths(contract)}
+    written_path = write_json_file(
+        target_path,
+        {
+            "format": CONTRACT_SNAPSHOT_FORMAT,
+            "key": key,
+            "probes": probes,
+            "glob_probes": contract_glob_probes(repo_root, contract),
+            "contract": persisted,
+        },
+    )
+    return {**contract, "contract_snapshot": {"status": "miss", "reason": reason, "path": written_path}}
+
+
 def write_json_file(target_path: Path, payload: dict[str, Any]) -> str:
     target_path.parent.mkdir(parents=True, exist_ok=True)
     target_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""檔案用途：以 Unix socket 常駐 workflow-core wrapper，保留 manifest、pattern index 與 git cat-file session 的 warm cache。"""
+
+from __future__ import annotations
+
+# client 路徑在 wrapper 的重量級 import 之前執行，因此這裡只 import 必要的 stdlib；
+# server 與 CLI 才需要的模組在各自函式內延遲載入。
+import json
+import os
+import socket
+import stat
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+DAEMON_SOCKET_ENV = "WORKFLOW_CORE_DAEMON_SOCKET"
+DAEMON_DISABLE_ENV = "WORKFLOW_CORE_DAEMON"
+FORWARDED_ENV_PREFIXES = ("WORKFLOW_CORE_", "GIT_")
+FORWARDED_ENV_KEYS = ("PATH", "HOME")
+DEFAULT_IDLE_TIMEOUT_SECONDS = 900.0
+CONNECT_TIMEOUT_SECONDS = 0.5
+DELEGATED_COMMANDS = {
+    "export_landing_checklist": "workflow_core_export_landing_checklist",
+    "release_precheck": "workflow_core_release_precheck",
+    "sync_apply": "workflow_core_sync_apply",
+    "sync_precheck": "workflow_core_sync_precheck",
+    "sync_stage": "workflow_core_sync_stage",
+    "sync_update": "workflow_core_sync_update",
+    "sync_verify": "workflow_core_sync_verify",
+}
+
+EXIT_PASS = 0
+EXIT_FAIL = 20
+EXIT_ERROR = 30
+
+
+def default_socket_path() -> Path:
+    configured = os.environ.get(DAEMON_SOCKET_ENV)
+    if configured:
+        return Path(configured)
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / f"workflow-core-daemon-{uid}.sock"
+    import tempfile
+
+    # 共用暫存目錄下的固定路徑可被其他使用者搶先建立，因此改放在 0700 的個人目錄內。
+    return Path(tempfile.gettempdir()) / f"workflow-core-daemon-{uid}" / "daemon.sock"
+
+
+def directory_is_private(path: Path) -> bool:
+    """Owned by this user (or root) and not writable by group/others, so nobody else can swap the socket inside it."""
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISDIR(info.st_mode) and info.st_uid in (os.getuid(), 0) and not info.st_mode & 0o022
+
+
+def socket_is_trusted(socket_path: Path) -> bool:
+    """Only talk to a socket this user owns, inside a directory no other user can write to."""
+    if not hasattr(os, "getuid"):
+        return False
+    try:
+        info = os.lstat(socket_path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid() and directory_is_private(socket_path.parent)
+
+
+def script_fingerprint(script_dir: Path = SCRIPT_DIR) -> dict[str, int]:
+    paths = [*script_dir.glob("*.py"), *script_dir.glob("portable_smoke/*.py")]
+    return {path.relative_to(script_dir).as_posix(): path.stat().st_mtime_ns for path in sorted(paths)}
+
+
+def is_forwarded_env_key(key: str) -> bool:
+    return key.startswith(FORWARDED_ENV_PREFIXES) or key in FORWARDED_ENV_KEYS
+
+
+def forwarded_environment() -> dict[str, str]:
+    return {key: value for key, value in os.environ.items() if is_forwarded_env_key(key)}
+
+
+def swap_environment(env: dict[str, str]) -> dict[str, str | None]:
+    """Replace the daemon's forwarded keys with the client's for one request; returns the values to restore afterwards."""
+    keys = {key for key in os.environ if is_forwarded_env_key(key)} | {key for key in env if is_forwarded_env_key(key)}
+    # daemon 內的 wrapper 絕不可再委派回自己，這個開關不接受 client 覆寫。
+    keys.discard(DAEMON_DISABLE_ENV)
+    previous = {key: os.environ.get(key) for key in keys}
+    for key in keys:
+        if key in env:
+            os.environ[key] = env[key]
+        else:
+            os.environ.pop(key, None)
+    return previous
+
+
+def restore_environment(previous: dict[str, str | None]) -> None:
+    for key, value in previous.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+
+
+def send_request(socket_path: Path, payload: dict[str, Any], timeout: float | None = None) -> dict[str, Any]:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(CONNECT_TIMEOUT_SECONDS)
+        client.connect(str(socket_path))
+        client.settimeout(timeout)
+        client.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+        client.shutdown(socket.SHUT_WR)
+        chunks: list[bytes] = []
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return json.loads(b"".join(chunks).decode("utf-8"))
+
+
+def delegate_to_daemon(command: str, argv: list[str] | None) -> int | None:
+    """Run `command` inside a live daemon; return None so the caller falls back to in-process execution."""
+    if os.environ.get(DAEMON_DISABLE_ENV) == "0" or not hasattr(socket, "AF_UNIX"):
+        return None
+    socket_path = default_socket_path()
+    if not socket_is_trusted(socket_path):
+        return None
+    try:
+        response = send_request(
+            socket_path,
+            {
+                "command": command,
+                "argv": list(sys.argv[1:] if argv is None else argv),
+                "cwd": os.getcwd(),
+                "env": forwarded_environment(),
+                "script_dir": str(SCRIPT_DIR),
+            },
+        )
+    except (OSError, ValueError):
+        return None
+    if response.get("status") != "ok":
+        return None
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    return int(response.get("exit_code", EXIT_ERROR))
+
+
+def exit_if_delegated(command: str) -> None:
+    """Called from a wrapper's `__main__` guard before its heavy imports; exits with the daemon's result when delegated."""
+    if "--ndjson" in sys.argv[1:]:
+        # daemon 會整段緩衝 stdout，串流輸出必須在本地 process 執行。
+        return
+    delegated = delegate_to_daemon(command, None)
+    if delegated is not None:
+        sys.stdout.flush()
+        raise SystemExit(delegated)
+
+
+class WorkflowCoreDaemon:
+    def __init__(self, socket_path: Path, idle_timeout: float = DEFAULT_IDLE_TIMEOUT_SECONDS) -> None:
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.fingerprint = script_fingerprint()
+        self.started_at = time.monotonic()
+        self.request_count = 0
+        self.running = False
+
+    def run_command(self, command: str, argv: list[str], cwd: str, env: dict[str, str] | None = None) -> dict[str, Any]:
+        import contextlib
+        import importlib
+        import io
+
+        from workflow_core_manifest import MANIFEST_CACHE
+        from workflow_core_tracing import TRACER
+
+        module = importlib.import_module(DELEGATED_COMMANDS[command])
+        # 前一個 request 若以錯誤結束，tracer 可能殘留 phase；每個 request 都從乾淨狀態開始。
+        TRACER.reset()
+        # manifest cache 的內容跨 request 保留，但 manifest_cache 統計只回報這次 request 的命中數。
+        MANIFEST_CACHE.reset_stats()
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        previous_cwd = os.getcwd()
+        previous_env = swap_environment(env) if env is not None else {}
+        try:
+            os.chdir(cwd)
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    exit_code = module.main(argv)
+                except SystemExit as exc:
+                    exit_code = exc.code if isinstance(exc.code, int) else (EXIT_PASS if exc.code is None else EXIT_ERROR)
+        finally:
+            os.chdir(previous_cwd)
+            restore_environment(previous_env)
+        return {"status": "ok", "exit_code": exit_code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        command = request.get("command")
+        if command == "ping":
+            return {"status": "ok", "pid": os.getpid(), "requests": self.request_count, "uptime_seconds": round(time.monotonic() - self.started_at, 3)}
+        if command == "shutdown":
+            self.running = False
+            return {"status": "ok"}
+        if command not in DELEGATED_COMMANDS:
+            return {"status": "unsupported", "error": f"unsupported command: {command}"}
+        if request.get("script_dir") != str(SCRIPT_DIR):
+            return {"status": "unsupported", "error": "daemon serves a different scripts directory"}
+        if script_fingerprint() != self.fingerprint:
+            self.running = False
+            return {"status": "stale", "error": "workflow-core scripts changed on disk; daemon is exiting"}
+        self.request_count += 1
+        env = request.get("env")
+        return self.run_command(
+            command,
+            list(request.get("argv") or []),
+            str(request.get("cwd") or os.getcwd()),
+            {str(key): str(value) for key, value in env.items()} if isinstance(env, dict) else None,
+        )
+
+    def serve(self) -> None:
+        import contextlib
+
+        from workflow_core_contracts import close_shared_blob_readers, enable_shared_blob_readers
+
+        # wrapper main() 在 daemon 內執行時不可再委派回自己。
+        os.environ[DAEMON_DISABLE_ENV] = "0"
+        enable_shared_blob_readers()
+        self.socket_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if not directory_is_private(self.socket_path.parent):
+            raise RuntimeError(f"daemon socket directory is writable by other users: {self.socket_path.parent}")
+        if self.socket_path.exists() or self.socket_path.is_symlink():
+            self.socket_path.unlink()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            server.bind(str(self.socket_path))
+            os.chmod(self.socket_path, 0o600)
+            server.listen()
+            server.settimeout(self.idle_timeout)
+            self.running = True
+            while self.running:
+                try:
+                    connection, _ = server.accept()
+                except socket.timeout:
+                    break
+                with connection:
+                    connection.settimeout(None)
+                    chunks: list[bytes] = []
+                    while True:
+                        chunk = connection.recv(65536)
+                        if not chunk:
+                            break
+                        chunks.append(chunk)
+                    try:
+                        response = self.handle(json.loads(b"".join(chunks).decode("utf-8")))
+                    except Exception as exc:
+                        response = {"status": "error", "error": str(exc)}
+                    with contextlib.suppress(OSError):
+                        connection.sendall(json.dumps(response, ensure_ascii=False).encode("utf-8"))
+        finally:
+            server.close()
+            with contextlib.suppress(OSError):
+                self.socket_path.unlink()
+            close_shared_blob_readers()
+
+
+def build_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("action", choices=["serve", "status", "stop"], help="serve：前景啟動 daemon；status / stop：查詢或停止既有 daemon")
+    parser.add_argument("--socket", type=Path, default=None, help=f"Unix socket 路徑（預設：${DAEMON_SOCKET_ENV}、$XDG_RUNTIME_DIR/workflow-core-daemon-<uid>.sock 或暫存目錄下 0700 的 workflow-core-daemon-<uid>/daemon.sock）")
+    parser.add_argument("--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT_SECONDS, help="閒置多少秒後自動結束")
+    parser.add_argument("--json", action="store_true", help="輸出 JSON")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    socket_path = args.socket.resolve() if args.socket else default_socket_path()
+
+    if args.action == "serve":
+        WorkflowCoreDaemon(socket_path, idle_timeout=args.idle_timeout).serve()
+        return EXIT_PASS
+
+    try:
+        result = send_request(socket_path, {"command": "ping" if args.action == "status" else "shutdown"}, timeout=5.0)
+    except (OSError, ValueError) as exc:
+        result = {"status": "unavailable", "error": str(exc)}
+    result = {**result, "socket_path": str(socket_path)}
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(f"workflow-core daemon {args.action}: {result['status']}")
+        for key, value in result.items():
+            if key != "status":
+                print(f"{key}: {value}")
+    return EXIT_PASS if result["status"] == "ok" else EXIT_FAIL
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -14,9 +14,15 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
+if __name__ == "__main__":
+    from workflow_core_daemon import exit_if_delegated
+
+    exit_if_delegated("export_landing_checklist")
+
 from workflow_core_contracts import write_json_file  # noqa: E402
 from workflow_core_export_materialize import analyze_export_profile, exit_code_for_status  # noqa: E402
-from workflow_core_manifest import manifest_default_path  # noqa: E402
+from workflow_core_manifest import manifest_cache_stats, manifest_default_path  # noqa: E402
+from workflow_core_tracing import collect_timings, traced  # noqa: E402
 
 
 EXIT_PASS = 0
@@ -112,6 +118,7 @@ def render_landing_checklist(result: dict) -> str:
     return "\n".join(lines)
 
 
+@traced("export-landing-checklist")
 def run_export_landing_checklist(
     repo_root: Path,
     manifest_path: Path,
@@ -198,8 +205,9 @@ def main(argv: list[str] | None = None) -> int:
             print(f"workflow-core export landing-checklist error: {exc}", file=sys.stderr)
         return EXIT_ERROR
 
+    timings = collect_timings()
     if args.json:
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+        print(json.dumps({**result, "manifest_cache": manifest_cache_stats(), "timings": timings}, ensure_ascii=False, indent=2))
     else:
         print(format_text_report(result))
     return exit_code_for_status(str(result["status"]))
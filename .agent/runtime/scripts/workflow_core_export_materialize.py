@@ -14,17 +14,31 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
-from workflow_core_contracts import patterns_overlap, resolve_ref, write_json_file  # noqa: E402
+from workflow_core_contracts import (  # noqa: E402
+    GitBlobReader,
+    ProgressCallback,
+    emit_event,
+    list_worktree_files as contracts_list_worktree_files,
+    overlapping_pattern_pairs,
+    resolve_ref,
+    summarize_result_for_stream,
+    write_json_file,
+    write_ndjson_error,
+    write_ndjson_record,
+    write_paths_from_ref,
+)
 from workflow_core_manifest import (  # noqa: E402
+    compile_patterns,
     get_default_export_profile_name,
     get_export_profile,
     get_managed_patterns,
     get_state_patterns,
     load_manifest,
+    manifest_cache_stats,
     manifest_default_path,
     normalize_path,
-    path_matches_pattern,
 )
+from workflow_core_tracing import collect_timings, count_bytes_read, count_subprocess, trace_phase, traced  # noqa: E402
 
 
 EXIT_PASS = 0
@@ -33,32 +47,8 @@ EXIT_FAIL = 20
 EXIT_ERROR = 30
 
 
-def list_worktree_files(repo_root: Path) -> list[str]:
-    files: list[str] = []
-    for path in repo_root.rglob("*"):
-        if not path.is_file():
-            continue
-        rel_path = normalize_path(str(path.relative_to(repo_root)))
-        if rel_path == ".git" or rel_path.startswith(".git/"):
-            continue
-        if "/__pycache__/" in f"/{rel_path}" or rel_path.endswith(".pyc"):
-            continue
-        files.append(rel_path)
-    return sorted(set(files))
-
-
-def read_blob_at_ref(repo_root: Path, ref: str, path: str) -> bytes:
-    proc = subprocess.run(
-        ["git", "-C", str(repo_root), "show", f"{ref}:{path}"],
-        check=False,
-        capture_output=True,
-    )
-    if proc.returncode != 0:
-        message = proc.stderr.decode("utf-8", errors="replace").strip() or proc.stdout.decode(
-            "utf-8", errors="replace"
-        ).strip()
-        raise RuntimeError(message or f"unable to read {path} at {ref}")
-    return proc.stdout
+def list_worktree_files(repo_root: Path, prune_patterns: list[str] | None = None) -> list[str]:
+    return contracts_list_worktree_files(repo_root, prune_patterns=prune_patterns)
 
 
 def list_files_at_ref(repo_root: Path, ref: str) -> list[str]:
@@ -68,6 +58,8 @@ def list_files_at_ref(repo_root: Path, ref: str) -> list[str]:
         capture_output=True,
         text=True,
     )
+    count_subprocess()
+    count_bytes_read(len(proc.stdout))
     if proc.returncode != 0:
         message = proc.stderr.strip() or proc.stdout.strip() or f"unable to list files at {ref}"
         raise RuntimeError(message)
@@ -81,39 +73,24 @@ def ensure_empty_output_dir(output_dir: Path) -> None:
 
 
 def validate_profile_contract(profile: dict, managed_patterns: list[str]) -> list[str]:
-    violations: list[str] = []
-    for include_pattern in profile["includes"]:
-        if not any(patterns_overlap(include_pattern, managed_pattern) for managed_pattern in managed_patterns):
-            violations.append(f"{include_pattern} is not backed by a managed_path contract")
-    return violations
+    backed = {include for include, _ in overlapping_pattern_pairs(profile["includes"], managed_patterns)}
+    return [
+        f"{include_pattern} is not backed by a managed_path contract"
+        for index, include_pattern in enumerate(profile["includes"])
+        if index not in backed
+    ]
 
 
 def select_export_paths(files_at_ref: list[str], includes: list[str], excludes: list[str]) -> list[str]:
-    selected: list[str] = []
-    for path in files_at_ref:
-        if not any(path_matches_pattern(path, pattern) for pattern in includes):
-            continue
-        if any(path_matches_pattern(path, pattern) for pattern in excludes):
-            continue
-        selected.append(path)
-    return selected
+    return compile_patterns(includes).filter_paths(files_at_ref, excludes=compile_patterns(excludes))
 
 
 def find_unmatched_patterns(files_at_ref: list[str], patterns: list[str]) -> list[str]:
-    unmatched: list[str] = []
-    for pattern in patterns:
-        if not any(path_matches_pattern(path, pattern) for path in files_at_ref):
-            unmatched.append(pattern)
-    return unmatched
+    return compile_patterns(patterns).unmatched_patterns(files_at_ref)
 
 
 def matched_paths_for_pattern(paths: list[str], pattern: str, excludes: list[str] | None = None) -> list[str]:
-    excluded = excludes or []
-    return [
-        path
-        for path in paths
-        if path_matches_pattern(path, pattern) and not any(path_matches_pattern(path, exclude) for exclude in excluded)
-    ]
+    return compile_patterns([pattern]).filter_paths(paths, excludes=compile_patterns(excludes or []))
 
 
 def analyze_export_profile(
@@ -130,12 +107,16 @@ def analyze_export_profile(
         raise RuntimeError(f"source ref does not resolve: {source_ref or 'HEAD'}")
 
     files_at_ref = list_files_at_ref(repo_root, resolved_source_ref)
-    worktree_files = list_worktree_files(repo_root)
     managed_patterns = get_managed_patterns(manifest)
     state_patterns = get_state_patterns(manifest)
+    # 只 prune 判定時本來就會排除的 profile excludes 與 state；overlay 路徑仍可能被 include 選到。
+    worktree_files = list_worktree_files(repo_root, prune_patterns=[*profile["excludes"], *state_patterns])
     contract_violations = validate_profile_contract(profile, managed_patterns)
     selected_paths = select_export_paths(files_at_ref, profile["includes"], profile["excludes"])
-    effective_excludes = [*profile["excludes"], *state_patterns]
+    include_set = compile_patterns(profile["includes"])
+    effective_exclude_set = compile_patterns([*profile["excludes"], *state_patterns])
+    source_ref_buckets = include_set.match_paths(files_at_ref, excludes=effective_exclude_set)
+    worktree_buckets = include_set.match_paths(worktree_files, excludes=effective_exclude_set)
 
     include_pattern_statuses: list[dict[str, object]] = []
     ready_patterns: list[str] = []
@@ -143,8 +124,8 @@ def analyze_export_profile(
     missing_patterns: list[str] = []
 
     for pattern in profile["includes"]:
-        source_ref_matches = matched_paths_for_pattern(files_at_ref, pattern, effective_excludes)
-        worktree_matches = matched_paths_for_pattern(worktree_files, pattern, effective_excludes)
+        source_ref_matches = source_ref_buckets[pattern]
+        worktree_matches = worktree_buckets[pattern]
         if source_ref_matches:
             status = "ready"
             ready_patterns.append(pattern)
@@ -193,14 +174,16 @@ def analyze_export_profile(
     }
 
 
-def materialize_paths(repo_root: Path, ref: str, selected_paths: list[str], output_dir: Path) -> list[str]:
-    written_paths: list[str] = []
-    for rel_path in selected_paths:
-        target_path = output_dir / rel_path
-        target_path.parent.mkdir(parents=True, exist_ok=True)
-        target_path.write_bytes(read_blob_at_ref(repo_root, ref, rel_path))
-        written_paths.append(normalize_path(str(target_path.relative_to(output_dir))))
-    return written_paths
+def materialize_paths(
+    repo_root: Path,
+    ref: str,
+    selected_paths: list[str],
+    output_dir: Path,
+    reader: GitBlobReader | None = None,
+    on_event: ProgressCallback | None = None,
+) -> list[str]:
+    written_paths = write_paths_from_ref(repo_root, ref, selected_paths, output_dir, reader=reader, on_event=on_event)
+    return [normalize_path(path) for path in written_paths]
 
 
 def metadata_output_path(output_dir: Path, profile_name: str) -> Path:
@@ -208,19 +191,23 @@ def metadata_output_path(output_dir: Path, profile_name: str) -> Path:
     return output_dir / f"workflow-core-export-{safe_name}.json"
 
 
+@traced("export-materialize")
 def run_export_materialize(
     repo_root: Path,
     manifest_path: Path,
     output_dir: Path,
     profile_name: str | None = None,
     source_ref: str | None = None,
+    on_event: ProgressCallback | None = None,
 ) -> dict:
+    emit_event(on_event, "phase", phase="analyze-profile", state="start")
     analysis = analyze_export_profile(
         repo_root=repo_root,
         manifest_path=manifest_path,
         profile_name=profile_name,
         source_ref=source_ref,
     )
+    emit_event(on_event, "phase", phase="analyze-profile", state="done", selected_path_count=analysis["selected_path_count"])
     manifest = load_manifest(manifest_path)
     profile = get_export_profile(manifest, analysis["profile_name"])
     resolved_source_ref = str(analysis["source_ref"])
@@ -240,7 +227,10 @@ def run_export_materialize(
         metadata_path = None
     else:
         ensure_empty_output_dir(output_dir)
-        written_paths = materialize_paths(repo_root, resolved_source_ref, selected_paths, output_dir)
+        emit_event(on_event, "phase", phase="materialize", state="start")
+        with trace_phase("materialize"):
+            written_paths = materialize_paths(repo_root, resolved_source_ref, selected_paths, output_dir, on_event=on_event)
+        emit_event(on_event, "phase", phase="materialize", state="done", written_path_count=len(written_paths))
         payload = {
             "profile_name": profile["name"],
             "profile_status": profile["status"],
@@ -336,6 +326,7 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--source-ref", default=None, help="要 materialize 的來源 ref，預設為 HEAD")
     parser.add_argument("--output", type=Path, required=True, help="匯出目錄（必須不存在或為空）")
     parser.add_argument("--json", action="store_true", help="輸出 JSON")
+    parser.add_argument("--ndjson", action="store_true", help="逐行輸出 NDJSON progress events，最後附上精簡 summary record")
     return parser
 
 
@@ -351,16 +342,22 @@ def main(argv: list[str] | None = None) -> int:
             output_dir=args.output.resolve(),
             profile_name=args.profile,
             source_ref=args.source_ref,
+            on_event=write_ndjson_record if args.ndjson else None,
         )
     except Exception as exc:
-        if args.json:
+        if args.ndjson:
+            write_ndjson_error(exc)
+        elif args.json:
             print(json.dumps({"status": "error", "error": str(exc)}, ensure_ascii=False, indent=2), file=sys.stderr)
         else:
             print(f"workflow-core export materialize error: {exc}", file=sys.stderr)
         return EXIT_ERROR
 
-    if args.json:
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+    timings = collect_timings()
+    if args.ndjson:
+        write_ndjson_record({"event": "summary", **summarize_result_for_stream(result), "manifest_cache": manifest_cache_stats(), "timings": timings})
+    elif args.json:
+        print(json.dumps({**result, "manifest_cache": manifest_cache_stats(), "timings": timings}, ensure_ascii=False, indent=2))
     else:
         print(format_text_report(result))
     return exit_code_for_status(result["status"])
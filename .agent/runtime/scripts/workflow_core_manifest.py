@@ -4,8 +4,19 @@
 from __future__ import annotations
 
 import fnmatch
+import functools
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, NamedTuple
+
+
+MANIFEST_DISK_CACHE_ENV = "WORKFLOW_CORE_MANIFEST_DISK_CACHE"
+MANIFEST_CACHE_FORMAT = 1
+MANIFEST_CACHE_MAX_ENTRIES = 64
 
 
 def normalize_path(value: str) -> str:
@@ -124,7 +135,7 @@ def parse_yaml_sequence(tokens: list[tuple[int, str]], index: int, indent: int)
     return sequence, index
 
 
-def load_manifest_text(text: str, source_label: str = "<memory>") -> dict[str, Any]:
+def parse_manifest_text(text: str, source_label: str = "<memory>") -> dict[str, Any]:
     tokens = tokenize_yaml(text)
     if not tokens:
         raise ValueError(f"manifest is empty: {source_label}")
@@ -136,10 +147,222 @@ def load_manifest_text(text: str, source_label: str = "<memory>") -> dict[str, A
     return parsed
 
 
+class FrozenDict(dict):
+    """Read-only dict used for cached manifest snapshots; still JSON-serializable and `isinstance(..., dict)`."""
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> Any:
+        raise TypeError("cached manifest snapshots are immutable")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self) -> tuple[type, tuple[dict[str, Any]]]:
+        """copy, deepcopy and pickle yield plain mutable dicts and lists; the cached snapshot itself stays frozen."""
+        return dict, (thaw_manifest_value(self),)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> dict[str, Any]:
+        return thaw_manifest_value(self)
+
+
+def freeze_manifest_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze_manifest_value(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_manifest_value(item) for item in value)
+    return value
+
+
+def thaw_manifest_value(value: Any) -> Any:
+    """Inverse of `freeze_manifest_value`: mutable dicts and lists, as the YAML parser produced them."""
+    if isinstance(value, dict):
+        return {key: thaw_manifest_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw_manifest_value(item) for item in value]
+    return value
+
+
+class ManifestSnapshot(NamedTuple):
+    source_label: str
+    sha256: str
+    mtime_ns: int | None
+    manifest: FrozenDict
+    managed_patterns: tuple[str, ...]
+    overlay_patterns: tuple[str, ...]
+    state_patterns: tuple[str, ...]
+    required_live_paths: tuple[str, ...]
+    worktree_prune_patterns: tuple[str, ...]
+    export_profiles: FrozenDict
+
+
+def build_manifest_snapshot(parsed: dict[str, Any], source_label: str, sha256: str, mtime_ns: int | None) -> ManifestSnapshot:
+    """Freeze `parsed` and precompute the derived views; the `get_*` helpers read them back through `manifest.snapshot`."""
+    manifest = freeze_manifest_value(parsed)
+    profiles: dict[str, Any] = {}
+    for profile in _export_profile_items(manifest):
+        name = str(profile.get("name", "")).strip()
+        if name and name not in profiles:
+            profiles[name] = freeze_manifest_value(get_export_profile(manifest, name))
+    snapshot = ManifestSnapshot(
+        source_label=source_label,
+        sha256=sha256,
+        mtime_ns=mtime_ns,
+        manifest=manifest,
+        managed_patterns=tuple(get_managed_patterns(manifest)),
+        overlay_patterns=tuple(get_overlay_patterns(manifest)),
+        state_patterns=tuple(get_state_patterns(manifest)),
+        required_live_paths=tuple(get_required_live_paths(manifest)),
+        worktree_prune_patterns=tuple(get_worktree_prune_patterns(manifest)),
+        export_profiles=FrozenDict(profiles),
+    )
+    manifest.snapshot = snapshot
+    return snapshot
+
+
+def cached_snapshot(manifest: dict[str, Any]) -> ManifestSnapshot | None:
+    return getattr(manifest, "snapshot", None) if isinstance(manifest, FrozenDict) else None
+
+
+def remember_bounded(cache: OrderedDict[Any, Any], key: Any, value: Any, limit: int = MANIFEST_CACHE_MAX_ENTRIES) -> None:
+    """LRU insert: the long-lived daemon sees many manifest revisions, so only the most recent `limit` stay cached."""
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > limit:
+        cache.popitem(last=False)
+
+
+def default_manifest_disk_cache_dir(manifest_path: Path) -> Path:
+    return manifest_path.resolve().parent / ".workflow-core" / "cache"
+
+
+class ManifestCache:
+    """Parsed-manifest cache keyed by content sha256, shared by every wrapper in one process.
+
+    `disk_cache_dir` (or `WORKFLOW_CORE_MANIFEST_DISK_CACHE=1`) additionally persists parsed
+    manifests as JSON so that the next wrapper process can skip the YAML parser.
+    """
+
+    def __init__(self, disk_cache_dir: Path | None = None) -> None:
+        self.disk_cache_dir = disk_cache_dir
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._by_sha: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._snapshots: OrderedDict[tuple[str, str, int | None], ManifestSnapshot] = OrderedDict()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "entries": len(self._by_sha),
+        }
+
+    def reset_stats(self) -> None:
+        """Zero the counters but keep cached entries (the daemon reports each request's own hits and misses)."""
+        self.hits = self.misses = self.disk_hits = 0
+
+    def clear(self) -> None:
+        self._by_sha.clear()
+        self._snapshots.clear()
+        self.reset_stats()
+
+    def _resolve_disk_cache_dir(self, manifest_path: Path | None) -> Path | None:
+        if self.disk_cache_dir is not None:
+            return self.disk_cache_dir
+        if manifest_path is not None and os.environ.get(MANIFEST_DISK_CACHE_ENV) == "1":
+            return default_manifest_disk_cache_dir(manifest_path)
+        return None
+
+    def _read_disk_entry(self, cache_dir: Path | None, sha256: str) -> dict[str, Any] | None:
+        if cache_dir is None:
+            return None
+        cache_file = cache_dir / f"manifest-{sha256}.json"
+        try:
+            payload = json.loads(cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if payload.get("format") != MANIFEST_CACHE_FORMAT or payload.get("sha256") != sha256:
+            return None
+        parsed = payload.get("manifest")
+        return parsed if isinstance(parsed, dict) else None
+
+    def _write_disk_entry(self, cache_dir: Path | None, sha256: str, parsed: dict[str, Any]) -> None:
+        if cache_dir is None:
+            return
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            cache_file = cache_dir / f"manifest-{sha256}.json"
+            temp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            payload = {"format": MANIFEST_CACHE_FORMAT, "sha256": sha256, "manifest": parsed}
+            temp_file.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(temp_file, cache_file)
+        except OSError:
+            return
+
+    def load_text(
+        self,
+        text: str,
+        source_label: str = "<memory>",
+        mtime_ns: int | None = None,
+        manifest_path: Path | None = None,
+    ) -> ManifestSnapshot:
+        sha256 = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        snapshot_key = (source_label, sha256, mtime_ns)
+        snapshot = self._snapshots.get(snapshot_key)
+        if snapshot is not None:
+            self.hits += 1
+            self._snapshots.move_to_end(snapshot_key)
+            return snapshot
+
+        parsed = self._by_sha.get(sha256)
+        if parsed is not None:
+            self.hits += 1
+            self._by_sha.move_to_end(sha256)
+        else:
+            cache_dir = self._resolve_disk_cache_dir(manifest_path)
+            parsed = self._read_disk_entry(cache_dir, sha256)
+            if parsed is not None:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                parsed = parse_manifest_text(text, source_label=source_label)
+                self._write_disk_entry(cache_dir, sha256, parsed)
+            remember_bounded(self._by_sha, sha256, parsed)
+
+        snapshot = build_manifest_snapshot(parsed, source_label=source_label, sha256=sha256, mtime_ns=mtime_ns)
+        remember_bounded(self._snapshots, snapshot_key, snapshot)
+        return snapshot
+
+    def load(self, manifest_path: Path) -> ManifestSnapshot:
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"manifest not found: {manifest_path}")
+        mtime_ns = manifest_path.stat().st_mtime_ns
+        text = manifest_path.read_text(encoding="utf-8")
+        return self.load_text(
+            text,
+            source_label=str(manifest_path.resolve()),
+            mtime_ns=mtime_ns,
+            manifest_path=manifest_path,
+        )
+
+
+MANIFEST_CACHE = ManifestCache()
+
+
+def manifest_cache_stats() -> dict[str, int]:
+    return MANIFEST_CACHE.stats()
+
+
+def load_manifest_snapshot(manifest_path: Path) -> ManifestSnapshot:
+    return MANIFEST_CACHE.load(manifest_path)
+
+
+def load_manifest_text(text: str, source_label: str = "<memory>") -> dict[str, Any]:
+    return MANIFEST_CACHE.load_text(text, source_label=source_label).manifest
+
+
 def load_manifest(manifest_path: Path) -> dict[str, Any]:
-    if not manifest_path.exists():
-        raise FileNotFoundError(f"manifest not found: {manifest_path}")
-    return load_manifest_text(manifest_path.read_text(encoding="utf-8"), source_label=str(manifest_path))
+    return load_manifest_snapshot(manifest_path).manifest
 
 
 def unique_paths(values: list[str]) -> list[str]:
@@ -163,6 +386,137 @@ def path_matches_pattern(path: str, pattern: str) -> bool:
     return normalized_path == normalized_pattern or normalized_path.startswith(normalized_pattern + "/")
 
 
+class _PatternTrieNode:
+    __slots__ = ("children", "segment_patterns", "raw_prefixes")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _PatternTrieNode] = {}
+        self.segment_patterns: list[int] = []
+        self.raw_prefixes: list[tuple[str, int]] = []
+
+
+class CompiledPatternSet:
+    """Pre-normalized pattern set with the same semantics as `path_matches_pattern`.
+
+    Plain and `<prefix>/**` patterns live in a path-segment trie; glob patterns are
+    folded into one combined regex so a path is checked once against the whole set.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: tuple[str, ...] = tuple(unique_paths([str(item) for item in patterns]))
+        self._root = _PatternTrieNode()
+        self._globs: list[tuple[int, re.Pattern[str]]] = []
+        for index, pattern in enumerate(self.patterns):
+            if pattern.endswith("/**") and not any(char in pattern[:-3] for char in "*?["):
+                head, separator, partial = pattern[:-3].rpartition("/")
+                node = self._walk_or_create(head.split("/") if separator else [])
+                node.raw_prefixes.append((partial, index))
+            elif any(char in pattern for char in "*?["):
+                self._globs.append((index, re.compile(fnmatch.translate(pattern))))
+            else:
+                self._walk_or_create(pattern.split("/")).segment_patterns.append(index)
+        self._combined_glob = (
+            re.compile("|".join(f"(?:{regex.pattern})" for _, regex in self._globs)) if self._globs else None
+        )
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def _walk_or_create(self, segments: list[str]) -> _PatternTrieNode:
+        node = self._root
+        for segment in segments:
+            node = node.children.setdefault(segment, _PatternTrieNode())
+        return node
+
+    def _trie_indexes(self, path: str, first_only: bool) -> list[int]:
+        found: list[int] = []
+        node = self._root
+        for segment in path.split("/"):
+            for partial, index in node.raw_prefixes:
+                if segment.startswith(partial):
+                    found.append(index)
+                    if first_only:
+                        return found
+            child = node.children.get(segment)
+            if child is None:
+                break
+            node = child
+            if node.segment_patterns:
+                found.extend(node.segment_patterns)
+                if first_only:
+                    return found
+        return found
+
+    def matches(self, path: str) -> bool:
+        normalized = normalize_path(path)
+        if self._trie_indexes(normalized, first_only=True):
+            return True
+        return self._combined_glob is not None and self._combined_glob.match(normalized) is not None
+
+    def matching_patterns(self, path: str) -> list[str]:
+        normalized = normalize_path(path)
+        indexes = set(self._trie_indexes(normalized, first_only=False))
+        if self._combined_glob is not None and self._combined_glob.match(normalized) is not None:
+            indexes.update(index for index, regex in self._globs if regex.match(normalized) is not None)
+        return [self.patterns[index] for index in sorted(indexes)]
+
+    def filter_paths(self, paths: Iterable[str], excludes: "CompiledPatternSet | None" = None) -> list[str]:
+        return [path for path in paths if self.matches(path) and not (excludes is not None and excludes.matches(path))]
+
+    def match_paths(self, paths: Iterable[str], excludes: "CompiledPatternSet | None" = None) -> dict[str, list[str]]:
+        buckets: dict[str, list[str]] = {pattern: [] for pattern in self.patterns}
+        for path in paths:
+            matched = self.matching_patterns(path)
+            if not matched or (excludes is not None and excludes.matches(path)):
+                continue
+            for pattern in matched:
+                buckets[pattern].append(path)
+        return buckets
+
+    def covers_directory(self, directory: str) -> bool:
+        """Return True only when every path below `directory` is guaranteed to match."""
+        normalized = normalize_path(directory).rstrip("/")
+        if self._trie_indexes(normalized, first_only=True):
+            return True
+        return any(
+            self.patterns[index].endswith("*") and regex.match(normalized + "/") is not None
+            for index, regex in self._globs
+        )
+
+    def unmatched_patterns(self, paths: Iterable[str]) -> list[str]:
+        remaining = set(self.patterns)
+        for path in paths:
+            if not remaining:
+                break
+            remaining.difference_update(self.matching_patterns(path))
+        return [pattern for pattern in self.patterns if pattern in remaining]
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_pattern_tuple(patterns: tuple[str, ...]) -> CompiledPatternSet:
+    return CompiledPatternSet(patterns)
+
+
+def compile_patterns(patterns: Iterable[str] | CompiledPatternSet) -> CompiledPatternSet:
+    if isinstance(patterns, CompiledPatternSet):
+        return patterns
+    return _compile_pattern_tuple(tuple(str(item) for item in patterns))
+
+
+def classify_path_by_pattern_sets(
+    path: str,
+    ordered_sets: list[tuple[str, CompiledPatternSet]],
+    default: str = "unclassified",
+) -> str:
+    for category, pattern_set in ordered_sets:
+        if pattern_set.matches(path):
+            return category
+    return default
+
+
 def pattern_anchor(pattern: str) -> str:
     normalized = normalize_path(pattern)
     if normalized.endswith("/**"):
@@ -179,28 +533,40 @@ def split_compound_targets(value: str) -> list[str]:
 
 
 def get_required_live_paths(manifest: dict[str, Any]) -> list[str]:
+    snapshot = cached_snapshot(manifest)
+    if snapshot is not None:
+        return list(snapshot.required_live_paths)
     contract = manifest.get("root_path_contract", {})
     values = contract.get("required_live_paths", [])
     return unique_paths([str(item) for item in values])
 
 
 def get_managed_patterns(manifest: dict[str, Any]) -> list[str]:
+    snapshot = cached_snapshot(manifest)
+    if snapshot is not None:
+        return list(snapshot.managed_patterns)
     managed = manifest.get("managed_paths", [])
     return unique_paths([str(item.get("path", "")) for item in managed if isinstance(item, dict)])
 
 
 def get_overlay_patterns(manifest: dict[str, Any]) -> list[str]:
+    snapshot = cached_snapshot(manifest)
+    if snapshot is not None:
+        return list(snapshot.overlay_patterns)
     excluded = manifest.get("excluded_paths", [])
     return unique_paths([str(item.get("path", "")) for item in excluded if isinstance(item, dict)])
 
 
 def get_state_patterns(manifest: dict[str, Any]) -> list[str]:
+    snapshot = cached_snapshot(manifest)
+    if snapshot is not None:
+        return list(snapshot.state_patterns)
     patterns: list[str] = []
-    managed_patterns = get_managed_patterns(manifest)
+    managed_set = compile_patterns(get_managed_patterns(manifest))
     for item in manifest.get("split_required", []):
         if isinstance(item, dict):
             for target in split_compound_targets(str(item.get("recommended_target", ""))):
-                if any(path_matches_pattern(target, managed_pattern) for managed_pattern in managed_patterns):
+                if managed_set.matches(target):
                     continue
                 patterns.append(target)
 
@@ -223,6 +589,13 @@ def get_state_patterns(manifest: dict[str, Any]) -> list[str]:
     return unique_paths(patterns)
 
 
+def get_worktree_prune_patterns(manifest: dict[str, Any]) -> list[str]:
+    snapshot = cached_snapshot(manifest)
+    if snapshot is not None:
+        return list(snapshot.worktree_prune_patterns)
+    return unique_paths([*get_state_patterns(manifest), *get_overlay_patterns(manifest)])
+
+
 def get_projection_artifact_path(manifest: dict[str, Any]) -> str:
     section = manifest.get("projection_bootstrap", {})
     return normalize_path(str(section.get("artifact_path", "")))
@@ -238,13 +611,17 @@ def get_canonical_manifest_path(manifest: dict[str, Any]) -> str:
     return normalize_path(str(section.get("canonical_manifest_path", "")))
 
 
-def get_export_profiles(manifest: dict[str, Any]) -> list[dict[str, Any]]:
+def _export_profile_items(manifest: dict[str, Any]) -> list[dict[str, Any]]:
     values = manifest.get("export_profiles", [])
     return [item for item in values if isinstance(item, dict)]
 
 
+def get_export_profiles(manifest: dict[str, Any]) -> list[dict[str, Any]]:
+    return [thaw_manifest_value(item) for item in _export_profile_items(manifest)]
+
+
 def get_default_export_profile_name(manifest: dict[str, Any]) -> str:
-    for profile in get_export_profiles(manifest):
+    for profile in _export_profile_items(manifest):
         name = str(profile.get("name", "")).strip()
         status = str(profile.get("status", "")).strip().lower()
         if name and status == "active":
@@ -257,7 +634,13 @@ def get_export_profile(manifest: dict[str, Any], profile_name: str) -> dict[str,
     if not requested_name:
         raise KeyError("export profile name is required")
 
-    for profile in get_export_profiles(manifest):
+    snapshot = cached_snapshot(manifest)
+    if snapshot is not None:
+        if requested_name not in snapshot.export_profiles:
+            raise KeyError(f"export profile not found: {requested_name}")
+        return thaw_manifest_value(snapshot.export_profiles[requested_name])
+
+    for profile in _export_profile_items(manifest):
         if str(profile.get("name", "")).strip() != requested_name:
             continue
         includes = unique_paths([str(item) for item in profile.get("includes", [])])
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Bounded-queue worker pipeline used to overlap workflow-core sync phases path by path."""
+
+from __future__ import annotations
+
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from workflow_core_tracing import TRACER  # noqa: E402
+
+
+DEFAULT_PIPELINE_WORKERS = 4
+DEFAULT_PIPELINE_QUEUE_SIZE = 64
+_DONE = object()
+
+
+class PipelineStage(NamedTuple):
+    """`handler` maps one item to the next stage's input; returning None drops the item."""
+
+    name: str
+    handler: Callable[[Any], Any]
+    workers: int = 1
+
+
+class PipelineAborted(RuntimeError):
+    """Raised inside the producer once a downstream stage has failed."""
+
+
+def run_pipeline(
+    produce: Callable[[Callable[[Any], None]], Any],
+    stages: list[PipelineStage],
+    queue_size: int = DEFAULT_PIPELINE_QUEUE_SIZE,
+) -> tuple[Any, list[Any], dict[str, Any]]:
+    """Run `produce(emit)` on the calling thread while each stage drains its bounded queue on worker threads.
+
+    A full queue blocks the stage feeding it, so a slow consumer throttles the producer instead of buffering the
+    whole tree. The first handler error stops further handler calls (queues keep draining so nothing deadlocks)
+    and is re-raised after every worker has exited. Returns the producer's return value, the last stage's
+    outputs (in completion order) and per-stage counters.
+    """
+    if not stages:
+        raise ValueError("pipeline needs at least one stage")
+    queues: list[queue.Queue] = [queue.Queue(maxsize=max(queue_size, 1)) for _ in stages]
+    outputs: list[Any] = []
+    errors: list[BaseException] = []
+    failed = threading.Event()
+    lock = threading.Lock()
+    remaining_workers = [max(stage.workers, 1) for stage in stages]
+    stats = {
+        stage.name: {"workers": max(stage.workers, 1), "items": 0, "emitted": 0, "busy_ms": 0.0, "max_queue_depth": 0}
+        for stage in stages
+    }
+    parent_stack = TRACER.current_stack()
+
+    def put(index: int, item: Any) -> None:
+        queues[index].put(item)
+        depth = queues[index].qsize()
+        with lock:
+            stage_stats = stats[stages[index].name]
+            stage_stats["max_queue_depth"] = max(stage_stats["max_queue_depth"], depth)
+
+    def worker(index: int) -> None:
+        stage = stages[index]
+        stage_stats = stats[stage.name]
+        with TRACER.adopt(parent_stack):
+            while True:
+                item = queues[index].get()
+                if item is _DONE:
+                    break
+                if failed.is_set():
+                    continue
+                started = time.perf_counter()
+                try:
+                    result = stage.handler(item)
+                except BaseException as exc:
+                    with lock:
+                        errors.append(exc)
+                    failed.set()
+                    continue
+                finally:
+                    with lock:
+                        stage_stats["items"] += 1
+                        stage_stats["busy_ms"] += (time.perf_counter() - started) * 1000
+                if result is None:
+                    continue
+                with lock:
+                    stage_stats["emitted"] += 1
+                if index + 1 < len(stages):
+                    put(index + 1, result)
+                else:
+                    with lock:
+                        outputs.append(result)
+        with lock:
+            remaining_workers[index] -= 1
+            last_worker = remaining_workers[index] == 0
+        if last_worker and index + 1 < len(stages):
+            for _ in range(stats[stages[index + 1].name]["workers"]):
+                queues[index + 1].put(_DONE)
+
+    threads = [
+        threading.Thread(target=worker, args=(index,), name=f"pipeline-{stage.name}-{slot}", daemon=True)
+        for index, stage in enumerate(stages)
+        for slot in range(max(stage.workers, 1))
+    ]
+    for thread in threads:
+        thread.start()
+
+    def emit(item: Any) -> None:
+        if failed.is_set():
+            raise PipelineAborted("pipeline stage failed; aborting producer")
+        put(0, item)
+
+    started = time.perf_counter()
+    produced: Any = None
+    try:
+        produced = produce(emit)
+    except PipelineAborted:
+        pass
+    finally:
+        for _ in range(stats[stages[0].name]["workers"]):
+            queues[0].put(_DONE)
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+    for stage_stats in stats.values():
+        stage_stats["busy_ms"] = round(stage_stats["busy_ms"], 3)
+    return produced, outputs, {"wall_ms": round((time.perf_counter() - started) * 1000, 3), "queue_size": queue_size, "stages": stats}
@@ -5,26 +5,37 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import shutil
 import sys
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
+from workflow_core_contracts import files_have_same_content, list_worktree_files  # noqa: E402
 from workflow_core_manifest import (  # noqa: E402
+    compile_patterns,
     get_managed_patterns,
     get_projection_artifact_path,
     get_required_live_paths,
+    get_worktree_prune_patterns,
     load_manifest,
+    manifest_cache_stats,
     manifest_default_path,
     normalize_path,
-    path_matches_pattern,
     pattern_anchor,
 )
 from workflow_core_obsidian_restricted_mount import run_generate_downstream_obsidian_mount  # noqa: E402
+from workflow_core_tracing import collect_timings, count_bytes_written, trace_phase, traced  # noqa: E402
+from workflow_core_transaction import ApplyTransaction  # noqa: E402
 
 
 EXIT_PASS = 0
@@ -33,6 +44,11 @@ EXIT_FAIL = 20
 EXIT_ERROR = 30
 INDEX_PATH = "doc/implementation_plan_index.md"
 INDEX_PLACEHOLDER = "# Implementation Plan Index\n\n> Placeholder generated by workflow_core_projection.py bootstrap stub.\n"
+# auto：內容相同即略過，否則 reflink → copy_file_range → copy；hardlink 需明確指定，避免 repo 檔案與 staging tree 共用 inode。
+PROJECTION_STRATEGIES = ("auto", "hardlink", "copy")
+# prestaged：呼叫端的 transaction 已寫好該路徑（sync update pipeline），projection 不再重寫。
+PROJECTION_RESULT_STRATEGIES = ("unchanged", "prestaged", "hardlink", "reflink", "copy_file_range", "copy")
+FICLONE = 0x40049409
 
 
 def classify_required_live_paths(repo_root: Path, manifest: dict) -> dict[str, list[str]]:
@@ -76,33 +92,137 @@ def ensure_required_live_path_anchors(repo_root: Path, manifest: dict) -> list[s
 
 
 def select_managed_paths(source_root: Path, manifest: dict) -> list[str]:
-    managed_patterns = get_managed_patterns(manifest)
-    selected_paths: list[str] = []
-    for path in source_root.rglob("*"):
-        if not path.is_file():
-            continue
-        rel_path = normalize_path(str(path.relative_to(source_root)))
-        if any(path_matches_pattern(rel_path, pattern) for pattern in managed_patterns):
-            selected_paths.append(rel_path)
-    return sorted(set(selected_paths))
+    managed_set = compile_patterns(get_managed_patterns(manifest))
+    source_files = list_worktree_files(source_root, prune_patterns=get_worktree_prune_patterns(manifest))
+    return managed_set.filter_paths(source_files)
+
+
+def reflink_file(source_path: Path, target_path: Path) -> bool:
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    with source_path.open("rb") as source, target_path.open("wb") as target:
+        try:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+        except OSError:
+            return False
+    return True
+
+
+def copy_file_range_file(source_path: Path, target_path: Path) -> bool:
+    if not hasattr(os, "copy_file_range"):
+        return False
+    size = source_path.stat().st_size
+    with source_path.open("rb") as source, target_path.open("wb") as target:
+        copied = 0
+        try:
+            while copied < size:
+                chunk = os.copy_file_range(source.fileno(), target.fileno(), size - copied)
+                if chunk == 0:
+                    break
+                copied += chunk
+        except OSError:
+            return False
+    return copied == size
+
+
+def git_file_mode(source_path: Path) -> int:
+    """Mode git would check the file out with: 0755 when any execute bit is set, otherwise 0644."""
+    return 0o755 if source_path.stat().st_mode & 0o111 else 0o644
+
+
+def copy_file_times(source_path: Path, target_path: Path) -> None:
+    source_stat = source_path.stat()
+    os.utime(target_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+
+
+def write_projected_file(source_path: Path, target_path: Path, strategy: str = "auto") -> str:
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    # 任何策略都先移除舊檔：目標可能是先前 hardlink 出來的或 symlink，原地覆寫會連帶改到另一端。
+    if target_path.exists() or target_path.is_symlink():
+        target_path.unlink()
+    # 權限依 git tree 的 0644/0755 決定，不沿用來源 inode（blob store object 是唯讀的）。
+    mode = git_file_mode(source_path)
+    if strategy == "hardlink" and source_path.stat().st_mode & 0o777 == mode:
+        try:
+            os.link(source_path, target_path)
+            return "hardlink"
+        except OSError:
+            pass
+    if strategy == "copy":
+        shutil.copyfile(source_path, target_path)
+        used = "copy"
+    elif reflink_file(source_path, target_path):
+        used = "reflink"
+    elif copy_file_range_file(source_path, target_path):
+        used = "copy_file_range"
+    else:
+        shutil.copyfile(source_path, target_path)
+        used = "copy"
+    os.chmod(target_path, mode)
+    copy_file_times(source_path, target_path)
+    return used
+
+
+def target_is_current(source_path: Path, target_path: Path) -> bool:
+    return target_path.is_file() and (os.path.samefile(source_path, target_path) or files_have_same_content(source_path, target_path))
 
 
-def materialize_managed_paths(repo_root: Path, source_root: Path, selected_paths: list[str]) -> list[str]:
+def project_file(source_path: Path, target_path: Path, strategy: str = "auto") -> str:
+    """Project one file and return the strategy that was used; identical targets are left untouched."""
+    if target_is_current(source_path, target_path):
+        return "unchanged"
+    return write_projected_file(source_path, target_path, strategy)
+
+
+def materialize_managed_paths(
+    repo_root: Path,
+    source_root: Path,
+    selected_paths: list[str],
+    strategy: str = "auto",
+    transactional: bool = True,
+    transaction: ApplyTransaction | None = None,
+) -> tuple[list[str], dict[str, int]]:
+    """Project changed files; with `transactional`, they are staged under a journal and swapped in only after all writes succeed.
+
+    A caller-supplied `transaction` (already holding sync apply's writes and deletes) receives the projection writes
+    and is committed here, so the whole apply lands in one swap.
+    """
     projected_paths: list[str] = []
+    already_staged = transaction.staged_paths() if transaction else set()
+    strategy_counts = dict.fromkeys(PROJECTION_RESULT_STRATEGIES, 0)
+    changed: list[tuple[str, Path]] = []
     for rel_path in selected_paths:
         source_path = source_root / rel_path
         target_path = repo_root / rel_path
         if not source_path.exists():
             continue
-        if source_path.resolve() == target_path.resolve():
-            projected_paths.append(rel_path)
-            continue
-        target_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(source_path, target_path)
         projected_paths.append(rel_path)
-    return projected_paths
-
+        if rel_path in already_staged:
+            strategy_counts["prestaged"] += 1
+            continue
+        if source_path.resolve() == target_path.resolve() or target_is_current(source_path, target_path):
+            strategy_counts["unchanged"] += 1
+            continue
+        changed.append((rel_path, source_path))
 
+    if transaction is None and transactional and changed:
+        transaction = ApplyTransaction.begin(repo_root)
+    try:
+        for rel_path, source_path in changed:
+            target_path = transaction.stage_write(rel_path) if transaction else repo_root / rel_path
+            strategy_counts[write_projected_file(source_path, target_path, strategy)] += 1
+            count_bytes_written(source_path.stat().st_size)
+        if transaction:
+            with trace_phase("commit"):
+                transaction.commit()
+    except BaseException:
+        if transaction:
+            transaction.rollback()
+        raise
+    return projected_paths, strategy_counts
+
+
+@traced("projection")
 def run_projection(
     repo_root: Path,
     manifest_path: Path,
@@ -111,7 +231,12 @@ def run_projection(
     emit_obsidian_restricted_mount_sample: bool = False,
     obsidian_mount_output_dir: Path | None = None,
     force_obsidian_mount_sample: bool = False,
+    strategy: str = "auto",
+    transactional: bool = True,
+    transaction: ApplyTransaction | None = None,
 ) -> dict:
+    if strategy not in PROJECTION_STRATEGIES:
+        raise ValueError(f"unsupported projection strategy: {strategy}")
     manifest = load_manifest(manifest_path)
     projection_artifact_path = get_projection_artifact_path(manifest)
     effective_source_root = (source_root or repo_root).resolve()
@@ -120,7 +245,9 @@ def run_projection(
 
     created_paths = ensure_required_live_path_anchors(repo_root, manifest)
     selected_paths = select_managed_paths(effective_source_root, manifest)
-    projected_paths = materialize_managed_paths(repo_root, effective_source_root, selected_paths)
+    projected_paths, strategy_counts = materialize_managed_paths(
+        repo_root, effective_source_root, selected_paths, strategy=strategy, transactional=transactional, transaction=transaction
+    )
 
     checks = classify_required_live_paths(repo_root, manifest)
 
@@ -163,12 +290,16 @@ def run_projection(
         "missing_required_live_paths": missing_paths,
         "created_paths": created_paths,
         "projected_paths": projected_paths,
+        "strategy": strategy,
+        "strategy_counts": strategy_counts,
+        "transactional": transactional,
         "obsidian_mount_sample_generated": bool(mount_result),
         "obsidian_mount_output_dir": str(Path(mount_result["output_dir"]).resolve()) if mount_result else None,
         "notes": notes,
     }
 
 
+@traced("projection-stub")
 def run_projection_stub(
     repo_root: Path,
     manifest_path: Path,
@@ -177,6 +308,9 @@ def run_projection_stub(
     emit_obsidian_restricted_mount_sample: bool = False,
     obsidian_mount_output_dir: Path | None = None,
     force_obsidian_mount_sample: bool = False,
+    strategy: str = "auto",
+    transactional: bool = True,
+    transaction: ApplyTransaction | None = None,
 ) -> dict:
     return run_projection(
         repo_root=repo_root,
@@ -186,6 +320,9 @@ def run_projection_stub(
         emit_obsidian_restricted_mount_sample=emit_obsidian_restricted_mount_sample,
         obsidian_mount_output_dir=obsidian_mount_output_dir,
         force_obsidian_mount_sample=force_obsidian_mount_sample,
+        strategy=strategy,
+        transactional=transactional,
+        transaction=transaction,
     )
 
 
@@ -207,6 +344,11 @@ def format_text_report(result: dict) -> str:
         lines.append("created_paths:")
         for item in result["created_paths"]:
             lines.append(f"  - {item}")
+    lines.append(
+        f"strategy: {result['strategy']} ("
+        + ", ".join(f"{name}={count}" for name, count in result["strategy_counts"].items())
+        + ")"
+    )
     if result["projected_paths"]:
         lines.append("projected_paths:")
         for item in result["projected_paths"]:
@@ -274,6 +416,18 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="若 sample 已存在且內容不同，允許覆蓋",
     )
+    parser.add_argument(
+        "--strategy",
+        choices=PROJECTION_STRATEGIES,
+        default="auto",
+        help="檔案投影方式：auto（略過相同內容，優先 reflink / copy_file_range）、hardlink 或 copy",
+    )
+    parser.add_argument(
+        "--no-transaction",
+        dest="transactional",
+        action="store_false",
+        help="逐檔原地寫入，不經過 .workflow-core/transactions journal（預設會先 stage 再原子換入）",
+    )
     parser.add_argument("--json", action="store_true", help="輸出 JSON")
     return parser
 
@@ -292,6 +446,8 @@ def main(argv: list[str] | None = None) -> int:
             emit_obsidian_restricted_mount_sample=bool(args.emit_obsidian_restricted_mount_sample),
             obsidian_mount_output_dir=args.obsidian_mount_output_dir.resolve() if args.obsidian_mount_output_dir else None,
             force_obsidian_mount_sample=bool(args.force_obsidian_mount_sample),
+            strategy=args.strategy,
+            transactional=bool(args.transactional),
         )
     except Exception as exc:
         if args.json:
@@ -300,8 +456,9 @@ def main(argv: list[str] | None = None) -> int:
             print(f"workflow-core projection stub error: {exc}", file=sys.stderr)
         return EXIT_ERROR
 
+    timings = collect_timings()
     if args.json:
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+        print(json.dumps({**result, "manifest_cache": manifest_cache_stats(), "timings": timings}, ensure_ascii=False, indent=2))
     else:
         print(format_text_report(result))
     return exit_code_for_status(result["status"])
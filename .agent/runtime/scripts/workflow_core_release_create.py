@@ -14,9 +14,29 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
-from workflow_core_contracts import default_release_artifacts_dir, git_run, ref_exists, resolve_ref, write_json_file  # noqa: E402
-from workflow_core_manifest import manifest_default_path  # noqa: E402
+from workflow_core_contracts import (  # noqa: E402
+    default_release_artifacts_dir,
+    git_run,
+    list_tree_entries_at_ref,
+    read_text_at_ref,
+    ref_exists,
+    release_bundle_paths,
+    resolve_ref,
+    write_json_file,
+    write_release_bundle,
+)
+from workflow_core_manifest import (  # noqa: E402
+    get_default_export_profile_name,
+    get_export_profile,
+    get_state_patterns,
+    load_manifest_text,
+    manifest_cache_stats,
+    manifest_default_path,
+    normalize_path,
+)
 from workflow_core_release_precheck import run_release_precheck  # noqa: E402
+from workflow_core_sync_stage import select_export_paths  # noqa: E402
+from workflow_core_tracing import collect_timings, traced  # noqa: E402
 
 
 EXIT_PASS = 0
@@ -34,14 +54,64 @@ def default_output_path(repo_root: Path, release_ref: str, output: Path | None)
     return output / f"workflow-core-release-{safe_ref}.metadata.json"
 
 
+def create_release_bundle(
+    repo_root: Path,
+    manifest_path: Path,
+    release_ref: str,
+    resolved_source_ref: str,
+    profile_name: str | None,
+    output_dir: Path,
+) -> dict:
+    manifest_rel_path = normalize_path(str(manifest_path.resolve().relative_to(repo_root.resolve())))
+    manifest_text = read_text_at_ref(repo_root, resolved_source_ref, manifest_rel_path)
+    manifest = load_manifest_text(manifest_text, source_label=f"{resolved_source_ref}:{manifest_rel_path}")
+    profile = get_export_profile(manifest, profile_name or get_default_export_profile_name(manifest))
+    tree_entries = list_tree_entries_at_ref(repo_root, resolved_source_ref)
+    selected_paths = select_export_paths(sorted(tree_entries), profile["includes"], [*profile["excludes"], *get_state_patterns(manifest)])
+    if not selected_paths:
+        raise RuntimeError("export profile matched no files at source ref; release bundle was not created")
+    index_path, pack_path = release_bundle_paths(output_dir, release_ref)
+    index = write_release_bundle(
+        repo_root,
+        resolved_source_ref,
+        selected_paths,
+        tree_entries,
+        index_path,
+        pack_path,
+        {
+            "release_ref": release_ref,
+            "resolved_source_ref": resolved_source_ref,
+            "manifest_path": manifest_rel_path,
+            "profile": {key: profile[key] for key in ("name", "status", "purpose", "deferred_paths", "notes")},
+        },
+    )
+    return {
+        "index_path": str(index_path.resolve()),
+        "pack_path": str(pack_path.resolve()),
+        "file_count": index["file_count"],
+        "total_bytes": index["total_bytes"],
+        "pack_size": index["pack_size"],
+        "pack_sha256": index["pack_sha256"],
+    }
+
+
+@traced("release-create")
 def run_release_create(
     repo_root: Path,
     manifest_path: Path,
     release_ref: str,
     source_ref: str | None = None,
     output_path: Path | None = None,
+    bundle: bool = False,
+    profile_name: str | None = None,
+    use_contract_snapshot: bool = True,
 ) -> dict:
-    precheck = run_release_precheck(repo_root=repo_root, manifest_path=manifest_path, release_candidate_ref=release_ref)
+    precheck = run_release_precheck(
+        repo_root=repo_root,
+        manifest_path=manifest_path,
+        release_candidate_ref=release_ref,
+        use_contract_snapshot=use_contract_snapshot,
+    )
     if precheck["status"] != "pass":
         return {
             "status": "fail",
@@ -67,6 +137,23 @@ def run_release_create(
             "notes": ["release tag already exists"],
         }
 
+    resolved_output_path = default_output_path(repo_root, release_ref, output_path)
+    notes = ["created workflow-core release tag and metadata"]
+    bundle_result = None
+    if bundle:
+        # bundle 先於 tag 建立：export profile 在來源 ref 上失敗時不留下半套 release。
+        bundle_result = create_release_bundle(
+            repo_root=repo_root,
+            manifest_path=manifest_path,
+            release_ref=release_ref,
+            resolved_source_ref=resolved_source_ref,
+            profile_name=profile_name,
+            output_dir=resolved_output_path.parent,
+        )
+        notes.append(
+            f"wrote release bundle with {bundle_result['file_count']} files ({bundle_result['pack_size']} pack bytes after content dedup)"
+        )
+
     git_run(repo_root, ["tag", release_ref, resolved_source_ref])
     created_artifacts = [f"git:refs/tags/{release_ref}"]
 
@@ -79,8 +166,10 @@ def run_release_create(
         "breaking_contracts": [],
         "migration_notes": [],
     }
+    if bundle_result is not None:
+        metadata["bundle"] = bundle_result
+        created_artifacts.extend([bundle_result["index_path"], bundle_result["pack_path"]])
 
-    resolved_output_path = default_output_path(repo_root, release_ref, output_path)
     if resolved_output_path is not None:
         created_artifacts.append(write_json_file(resolved_output_path, metadata))
 
@@ -91,7 +180,8 @@ def run_release_create(
         "release_ref": release_ref,
         "source_ref": resolved_source_ref,
         "created_artifacts": created_artifacts,
-        "notes": ["created workflow-core release tag and metadata"],
+        "bundle": bundle_result,
+        "notes": notes,
     }
 
 
@@ -103,6 +193,9 @@ def format_text_report(result: dict) -> str:
         f"release_ref: {result['release_ref']}",
         f"source_ref: {result['source_ref']}",
     ]
+    if result.get("bundle"):
+        lines.append(f"bundle_index: {result['bundle']['index_path']}")
+        lines.append(f"bundle_files: {result['bundle']['file_count']} (pack {result['bundle']['pack_size']} bytes)")
     if result["created_artifacts"]:
         lines.append("created_artifacts:")
         for item in result["created_artifacts"]:
@@ -131,6 +224,9 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--manifest", type=Path, default=None, help="workflow-core canonical manifest path")
     parser.add_argument("--source-ref", default=None, help="來源 ref，預設為 HEAD")
     parser.add_argument("--output", type=Path, default=None, help="metadata JSON 輸出路徑或目錄")
+    parser.add_argument("--bundle", action="store_true", help="另外輸出 curated export tree 的 release bundle（pack + 檔案索引），供 sync stage 離線使用")
+    parser.add_argument("--profile", default=None, help="bundle 使用的 export profile；未指定時使用 manifest active profile")
+    parser.add_argument("--no-contract-snapshot", action="store_true", help="不讀寫 git dir 中的 contract evaluation snapshot，一律重新計算")
     parser.add_argument("--json", action="store_true", help="輸出 JSON")
     return parser
 
@@ -147,6 +243,9 @@ def main(argv: list[str] | None = None) -> int:
             release_ref=args.release_ref,
             source_ref=args.source_ref,
             output_path=args.output.resolve() if args.output else None,
+            bundle=bool(args.bundle),
+            profile_name=args.profile,
+            use_contract_snapshot=not args.no_contract_snapshot,
         )
     except Exception as exc:
         if args.json:
@@ -155,8 +254,9 @@ def main(argv: list[str] | None = None) -> int:
             print(f"workflow-core release create error: {exc}", file=sys.stderr)
         return EXIT_ERROR
 
+    timings = collect_timings()
     if args.json:
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+        print(json.dumps({**result, "manifest_cache": manifest_cache_stats(), "timings": timings}, ensure_ascii=False, indent=2))
     else:
         print(format_text_report(result))
     return exit_code_for_status(result["status"])
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""檔案用途：比對兩個 workflow-core release（或已安裝 lock 與候選 ref）的 tree OIDs，依 export profile include pattern 列出變更與 byte 差異。"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from workflow_core_contracts import (  # noqa: E402
+    GitBlobReader,
+    TreeEntry,
+    default_sync_lock_path,
+    list_tree_entries_at_ref,
+    load_sync_lock,
+    resolve_ref,
+    write_json_file,
+)
+from workflow_core_manifest import (  # noqa: E402
+    compile_patterns,
+    get_default_export_profile_name,
+    get_export_profile,
+    get_state_patterns,
+    load_manifest_text,
+    manifest_cache_stats,
+    manifest_default_path,
+    normalize_path,
+)
+from workflow_core_release_create import default_output_path  # noqa: E402
+from workflow_core_sync_stage import select_export_paths  # noqa: E402
+from workflow_core_tracing import collect_timings, trace_phase, traced  # noqa: E402
+
+
+EXIT_PASS = 0
+EXIT_WARN = 10
+EXIT_FAIL = 20
+EXIT_ERROR = 30
+UNMATCHED_GROUP = "(outside-profile)"
+
+
+def load_release_metadata(repo_root: Path, release_ref: str) -> dict[str, Any] | None:
+    """Metadata JSON that `run_release_create` wrote for `release_ref`, if it is in the release artifacts dir."""
+    metadata_path = default_output_path(repo_root, release_ref, None)
+    try:
+        payload = json.loads(metadata_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def resolve_release_ref(repo_root: Path, release_ref: str, metadata: dict[str, Any] | None) -> str:
+    resolved = resolve_ref(repo_root, release_ref)
+    if resolved is None and metadata and metadata.get("source_ref"):
+        resolved = resolve_ref(repo_root, str(metadata["source_ref"]))
+    if resolved is None:
+        raise RuntimeError(f"release ref does not resolve: {release_ref}")
+    return resolved
+
+
+def load_profile_at_ref(reader: GitBlobReader, resolved_ref: str, manifest_rel_path: str, profile_name: str | None) -> dict[str, Any]:
+    manifest = load_manifest_text(reader.read_text(resolved_ref, manifest_rel_path), source_label=f"{resolved_ref}:{manifest_rel_path}")
+    profile = get_export_profile(manifest, profile_name or get_default_export_profile_name(manifest))
+    return {
+        "name": profile["name"],
+        "includes": list(profile["includes"]),
+        "excludes": [*profile["excludes"], *get_state_patterns(manifest)],
+    }
+
+
+def select_profile_entries(entries: dict[str, TreeEntry], profile: dict[str, Any]) -> dict[str, TreeEntry]:
+    return {path: entries[path] for path in select_export_paths(sorted(entries), profile["includes"], profile["excludes"])}
+
+
+def pair_exact_renames(removed: dict[str, TreeEntry], added: dict[str, TreeEntry]) -> list[tuple[str, str]]:
+    """Pair removed/added paths that carry the same blob OID; a same-basename candidate wins when there are several."""
+    added_by_oid: dict[str, list[str]] = {}
+    for path, entry in sorted(added.items()):
+        added_by_oid.setdefault(entry.oid, []).append(path)
+    pairs: list[tuple[str, str]] = []
+    for path, entry in sorted(removed.items()):
+        candidates = added_by_oid.get(entry.oid)
+        if not candidates:
+            continue
+        basename = path.rsplit("/", 1)[-1]
+        target = next((candidate for candidate in candidates if candidate.rsplit("/", 1)[-1] == basename), candidates[0])
+        candidates.remove(target)
+        pairs.append((path, target))
+    return pairs
+
+
+def diff_tree_entries(
+    old_entries: dict[str, TreeEntry],
+    new_entries: dict[str, TreeEntry],
+    include_patterns: list[str],
+) -> dict[str, Any]:
+    """Classify paths by OID only (sizes come from `ls-tree -l`, so no blob is read) and bucket them by include pattern."""
+    includes = compile_patterns(include_patterns)
+    groups: dict[str, dict[str, Any]] = {}
+
+    def group_for(path: str) -> dict[str, Any]:
+        matched = includes.matching_patterns(path)
+        key = matched[0] if matched else UNMATCHED_GROUP
+        return groups.setdefault(key, {"include_pattern": key, "added": [], "modified": [], "removed": [], "renamed": [], "byte_delta": 0})
+
+    added = {path: entry for path, entry in new_entries.items() if path not in old_entries}
+    removed = {path: entry for path, entry in old_entries.items() if path not in new_entries}
+    renames = pair_exact_renames(removed, added)
+    for source, target in renames:
+        removed.pop(source)
+        added.pop(target)
+        group_for(target)["renamed"].append({"from": source, "to": target, "size": new_entries[target].size})
+
+    summary = {"added": 0, "modified": 0, "removed": 0, "renamed": len(renames), "unchanged": 0, "bytes_added": 0, "bytes_removed": 0}
+    for path, entry in sorted(added.items()):
+        group = group_for(path)
+        group["added"].append({"path": path, "size": entry.size})
+        group["byte_delta"] += entry.size
+        summary["added"] += 1
+        summary["bytes_added"] += entry.size
+    for path, entry in sorted(removed.items()):
+        group = group_for(path)
+        group["removed"].append({"path": path, "size": entry.size})
+        group["byte_delta"] -= entry.size
+        summary["removed"] += 1
+        summary["bytes_removed"] += entry.size
+    for path, entry in sorted(new_entries.items()):
+        previous = old_entries.get(path)
+        if previous is None:
+            continue
+        if previous.oid == entry.oid and previous.mode == entry.mode:
+            summary["unchanged"] += 1
+            continue
+        delta = entry.size - previous.size
+        group = group_for(path)
+        group["modified"].append({"path": path, "old_size": previous.size, "new_size": entry.size, "byte_delta": delta})
+        group["byte_delta"] += delta
+        summary["modified"] += 1
+        summary["bytes_added"] += max(delta, 0)
+        summary["bytes_removed"] += max(-delta, 0)
+
+    summary["byte_delta"] = summary["bytes_added"] - summary["bytes_removed"]
+    order = {pattern: index for index, pattern in enumerate(includes.patterns)}
+    ordered_groups = sorted(groups.values(), key=lambda group: order.get(group["include_pattern"], len(order)))
+    return {"summary": summary, "groups": ordered_groups}
+
+
+def side_report(kind: str, release_ref: str | None, resolved_ref: str | None, entries: dict[str, TreeEntry]) -> dict[str, Any]:
+    return {
+        "kind": kind,
+        "release_ref": release_ref,
+        "resolved_ref": resolved_ref,
+        "file_count": len(entries),
+        "total_bytes": sum(entry.size for entry in entries.values()),
+    }
+
+
+@traced("release-diff")
+def run_release_diff(
+    repo_root: Path,
+    to_ref: str,
+    from_ref: str | None = None,
+    sync_lock_path: Path | None = None,
+    manifest_path: Path | None = None,
+    profile_name: str | None = None,
+    output_path: Path | None = None,
+) -> dict[str, Any]:
+    if not str(to_ref or "").strip():
+        raise ValueError("to_ref is required")
+    manifest_rel_path = normalize_path(
+        str((manifest_path or manifest_default_path(repo_root)).resolve().relative_to(repo_root.resolve()))
+    )
+    notes: list[str] = []
+    to_metadata = load_release_metadata(repo_root, to_ref)
+    resolved_to = resolve_release_ref(repo_root, to_ref, to_metadata)
+
+    with GitBlobReader(repo_root) as reader:
+        to_profile = load_profile_at_ref(reader, resolved_to, manifest_rel_path, profile_name)
+        with trace_phase("list-tree"):
+            new_entries = select_profile_entries(list_tree_entries_at_ref(repo_root, resolved_to), to_profile)
+
+        if from_ref:
+            resolved_from = resolve_release_ref(repo_root, from_ref, load_release_metadata(repo_root, from_ref))
+            try:
+                from_profile = load_profile_at_ref(reader, resolved_from, manifest_rel_path, to_profile["name"])
+            except (RuntimeError, ValueError, KeyError):
+                from_profile = to_profile
+                notes.append(f"profile {to_profile['name']} is not readable at {from_ref}; using the candidate profile for both sides")
+            with trace_phase("list-tree"):
+                old_entries = select_profile_entries(list_tree_entries_at_ref(repo_root, resolved_from), from_profile)
+            from_side = side_report("ref", from_ref, resolved_from, old_entries)
+        else:
+            lock_path = sync_lock_path or default_sync_lock_path(repo_root)
+            lock = load_sync_lock(lock_path)
+            if lock is None:
+                raise RuntimeError(f"no installed sync lock at {lock_path}; pass --from-ref to compare two releases")
+            old_entries = {
+                path: TreeEntry(mode=entry["mode"], oid=entry["oid"], size=int(entry["size"])) for path, entry in lock["entries"].items()
+            }
+            if lock.get("profile_name") and lock["profile_name"] != to_profile["name"]:
+                notes.append(f"installed lock was synced with profile {lock['profile_name']}, candidate uses {to_profile['name']}")
+            from_side = side_report("lock", lock.get("release_ref"), lock.get("resolved_source_ref"), old_entries)
+
+    with trace_phase("diff"):
+        diff = diff_tree_entries(old_entries, new_entries, to_profile["includes"])
+
+    to_side = side_report("ref", to_ref, resolved_to, new_entries)
+    to_side["metadata"] = (
+        {key: to_metadata.get(key) for key in ("requires_projection", "requires_manual_followup", "breaking_contracts", "migration_notes")}
+        if to_metadata
+        else None
+    )
+    status = "pass"
+    if to_metadata and (to_metadata.get("breaking_contracts") or to_metadata.get("requires_manual_followup")):
+        status = "warn"
+        notes.append("candidate release metadata lists breaking contracts or manual follow-up")
+    if diff["summary"]["renamed"]:
+        notes.append("renames are exact-content matches by blob OID; a moved and edited file shows as removed + added")
+
+    result = {
+        "status": status,
+        "repo_root": str(repo_root.resolve()),
+        "manifest_path": manifest_rel_path,
+        "profile_name": to_profile["name"],
+        "from": from_side,
+        "to": to_side,
+        "summary": diff["summary"],
+        "groups": diff["groups"],
+        "report_path": None,
+        "notes": notes,
+    }
+    if output_path is not None:
+        result["report_path"] = str(output_path.resolve())
+        write_json_file(output_path, result)
+    return result
+
+
+def format_text_report(result: dict[str, Any]) -> str:
+    summary = result["summary"]
+    from_side = result["from"]
+    lines = [
+        f"workflow-core release diff: {result['status']}",
+        f"from: {from_side['release_ref']} ({from_side['kind']}, {from_side['file_count']} files)",
+        f"to: {result['to']['release_ref']} ({result['to']['file_count']} files)",
+        f"profile: {result['profile_name']}",
+        (
+            f"added: {summary['added']}  modified: {summary['modified']}  removed: {summary['removed']}  "
+            f"renamed: {summary['renamed']}  unchanged: {summary['unchanged']}"
+        ),
+        f"byte_delta: {summary['byte_delta']:+d} (+{summary['bytes_added']} / -{summary['bytes_removed']})",
+    ]
+    for group in result["groups"]:
+        lines.append(f"{group['include_pattern']}: {group['byte_delta']:+d} bytes")
+        for item in group["added"]:
+            lines.append(f"  A {item['path']} (+{item['size']})")
+        for item in group["modified"]:
+            lines.append(f"  M {item['path']} ({item['byte_delta']:+d})")
+        for item in group["removed"]:
+            lines.append(f"  D {item['path']} (-{item['size']})")
+        for item in group["renamed"]:
+            lines.append(f"  R {item['from']} -> {item['to']}")
+    if result.get("report_path"):
+        lines.append(f"report_path: {result['report_path']}")
+    if result["notes"]:
+        lines.append("notes:")
+        for note in result["notes"]:
+            lines.append(f"  - {note}")
+    return "\n".join(lines)
+
+
+def exit_code_for_status(status: str) -> int:
+    if status == "pass":
+        return EXIT_PASS
+    if status == "warn":
+        return EXIT_WARN
+    if status == "fail":
+        return EXIT_FAIL
+    return EXIT_ERROR
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repo-root", type=Path, default=Path.cwd(), help="Repo 根目錄（預設：目前目錄）")
+    parser.add_argument("--to-ref", required=True, help="候選 release ref")
+    parser.add_argument("--from-ref", default=None, help="比對基準 release ref；未指定時改用已安裝的 sync lock")
+    parser.add_argument("--sync-lock", type=Path, default=None, help="比對基準 sync lock 路徑（預設：<repo-root>/.workflow-core/sync-lock.json）")
+    parser.add_argument("--manifest", type=Path, default=None, help="workflow-core canonical manifest path（以 ref 上的內容為準）")
+    parser.add_argument("--profile", default=None, help="export profile；未指定時使用候選 ref manifest 的 active profile")
+    parser.add_argument("--output", type=Path, default=None, help="另外把 JSON 報告寫到指定路徑")
+    parser.add_argument("--json", action="store_true", help="輸出 JSON")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        result = run_release_diff(
+            repo_root=args.repo_root.resolve(),
+            to_ref=args.to_ref,
+            from_ref=args.from_ref,
+            sync_lock_path=args.sync_lock.resolve() if args.sync_lock else None,
+            manifest_path=args.manifest,
+            profile_name=args.profile,
+            output_path=args.output,
+        )
+    except Exception as exc:
+        if args.json:
+            print(json.dumps({"status": "error", "error": str(exc)}, ensure_ascii=False, indent=2), file=sys.stderr)
+        else:
+            print(f"workflow-core release diff error: {exc}", file=sys.stderr)
+        return EXIT_ERROR
+
+    timings = collect_timings()
+    if args.json:
+        print(json.dumps({**result, "manifest_cache": manifest_cache_stats(), "timings": timings}, ensure_ascii=False, indent=2))
+    else:
+        print(format_text_report(result))
+    return exit_code_for_status(result["status"])
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,7 +4,6 @@
 from __future__ import annotations
 
 import argparse
-import importlib.util
 import json
 import sys
 from pathlib import Path
@@ -14,8 +13,14 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
-from workflow_core_contracts import evaluate_manifest_contract  # noqa: E402
-from workflow_core_manifest import manifest_default_path  # noqa: E402
+if __name__ == "__main__":
+    from workflow_core_daemon import exit_if_delegated
+
+    exit_if_delegated("release_precheck")
+
+from workflow_core_contracts import evaluate_manifest_contract, evaluate_manifest_contract_cached, load_script_module  # noqa: E402
+from workflow_core_manifest import manifest_cache_stats, manifest_default_path  # noqa: E402
+from workflow_core_tracing import collect_timings, traced  # noqa: E402
 
 
 EXIT_PASS = 0
@@ -25,16 +30,20 @@ EXIT_ERROR = 30
 
 
 def load_module(file_path: Path, module_name: str):
-    spec = importlib.util.spec_from_file_location(module_name, file_path)
-    if spec is None or spec.loader is None:
-        raise RuntimeError(f"unable to load module: {file_path}")
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
-
-
-def run_release_precheck(repo_root: Path, manifest_path: Path, release_candidate_ref: str | None = None) -> dict:
-    contract = evaluate_manifest_contract(repo_root, manifest_path)
+    return load_script_module(file_path, module_name)
+
+
+@traced("release-precheck")
+def run_release_precheck(
+    repo_root: Path,
+    manifest_path: Path,
+    release_candidate_ref: str | None = None,
+    use_contract_snapshot: bool = True,
+) -> dict:
+    if use_contract_snapshot:
+        contract = evaluate_manifest_contract_cached(repo_root, manifest_path)
+    else:
+        contract = evaluate_manifest_contract(repo_root, manifest_path)
     notes: list[str] = []
     failures: list[str] = []
     portable_smoke_ok = False
@@ -81,6 +90,7 @@ def run_release_precheck(repo_root: Path, manifest_path: Path, release_candidate
         "missing_required_live_paths": contract["required_live_paths"]["missing"],
         "projection_artifact_exists": contract["projection_artifact_exists"],
         "smoke_suite_exists": contract["smoke_suite_exists"],
+        "contract_snapshot": contract.get("contract_snapshot"),
         "notes": notes,
     }
 
@@ -125,6 +135,7 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--repo-root", type=Path, default=Path.cwd(), help="Repo 根目錄（預設：目前目錄）")
     parser.add_argument("--release-candidate-ref", default=None, help="可選的 release candidate ref")
     parser.add_argument("--manifest", type=Path, default=None, help="workflow-core canonical manifest path")
+    parser.add_argument("--no-contract-snapshot", action="store_true", help="不讀寫 git dir 中的 contract evaluation snapshot，一律重新計算")
     parser.add_argument("--json", action="store_true", help="輸出 JSON")
     return parser
 
@@ -135,7 +146,12 @@ def main(argv: list[str] | None = None) -> int:
     repo_root = args.repo_root.resolve()
     manifest_path = args.manifest.resolve() if args.manifest else manifest_default_path(repo_root)
     try:
-        result = run_release_precheck(repo_root=repo_root, manifest_path=manifest_path, release_candidate_ref=args.release_candidate_ref)
+        result = run_release_precheck(
+            repo_root=repo_root,
+            manifest_path=manifest_path,
+            release_candidate_ref=args.release_candidate_ref,
+            use_contract_snapshot=not args.no_contract_snapshot,
+        )
     except Exception as exc:
         if args.json:
             print(json.dumps({"status": "error", "error": str(exc)}, ensure_ascii=False, indent=2), file=sys.stderr)
@@ -143,8 +159,9 @@ def main(argv: list[str] | None = None) -> int:
             print(f"workflow-core release precheck error: {exc}", file=sys.stderr)
         return EXIT_ERROR
 
+    timings = collect_timings()
     if args.json:
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+        print(json.dumps({**result, "manifest_cache": manifest_cache_stats(), "timings": timings}, ensure_ascii=False, indent=2))
     else:
         print(format_text_report(result))
     return exit_code_for_status(result["status"])
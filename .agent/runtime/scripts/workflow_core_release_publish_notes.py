@@ -14,8 +14,14 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
-from workflow_core_contracts import default_release_artifacts_dir, evaluate_manifest_contract, write_json_file  # noqa: E402
-from workflow_core_manifest import manifest_default_path  # noqa: E402
+from workflow_core_contracts import (  # noqa: E402
+    default_release_artifacts_dir,
+    evaluate_manifest_contract,
+    evaluate_manifest_contract_cached,
+    write_json_file,
+)
+from workflow_core_manifest import manifest_cache_stats, manifest_default_path  # noqa: E402
+from workflow_core_tracing import collect_timings, traced  # noqa: E402
 
 
 EXIT_PASS = 0
@@ -63,14 +69,19 @@ def render_release_note(release_ref: str, manifest_path: str, projection_artifac
     return "\n".join(lines) + "\n"
 
 
+@traced("release-publish-notes")
 def run_release_publish_notes(
     repo_root: Path,
     manifest_path: Path,
     release_ref: str,
     metadata_path: Path | None = None,
     output_path: Path | None = None,
+    use_contract_snapshot: bool = True,
 ) -> dict:
-    contract = evaluate_manifest_contract(repo_root, manifest_path)
+    if use_contract_snapshot:
+        contract = evaluate_manifest_contract_cached(repo_root, manifest_path)
+    else:
+        contract = evaluate_manifest_contract(repo_root, manifest_path)
     metadata = load_metadata(metadata_path)
 
     if not contract["live_path_contract_ok"] or not contract["projection_artifact_exists"] or not contract["smoke_suite_exists"]:
@@ -82,6 +93,7 @@ def run_release_publish_notes(
             "output_path": None,
             "requires_projection": bool(contract["projection_artifact_path"]),
             "requires_manual_followup": True,
+            "contract_snapshot": contract.get("contract_snapshot"),
             "notes": ["manifest contract is incomplete; publish-notes aborted"],
         }
 
@@ -122,6 +134,7 @@ def run_release_publish_notes(
         "output_path": str(markdown_path.resolve()) if markdown_path is not None else None,
         "requires_projection": requires_projection,
         "requires_manual_followup": requires_manual_followup,
+        "contract_snapshot": contract.get("contract_snapshot"),
         "notes": notes,
     }
 
@@ -160,6 +173,7 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--manifest", type=Path, default=None, help="workflow-core canonical manifest path")
     parser.add_argument("--metadata", type=Path, default=None, help="可選的 release metadata JSON")
     parser.add_argument("--output", type=Path, default=None, help="輸出 markdown 路徑或目錄")
+    parser.add_argument("--no-contract-snapshot", action="store_true", help="不讀寫 git dir 中的 contract evaluation snapshot，一律重新計算")
     parser.add_argument("--json", action="store_true", help="輸出 JSON")
     return parser
 
@@ -176,6 +190,7 @@ def main(argv: list[str] | None = None) -> int:
             release_ref=args.release_ref,
             metadata_path=args.metadata.resolve() if args.metadata else None,
             output_path=args.output.resolve() if args.output else None,
+            use_contract_snapshot=not args.no_contract_snapshot,
         )
     except Exception as exc:
         if args.json:
@@ -184,8 +199,9 @@ def main(argv: list[str] | None = None) -> int:
             print(f"workflow-core release publish-notes error: {exc}", file=sys.stderr)
         return EXIT_ERROR
 
+    timings = collect_timings()
     if args.json:
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+        print(json.dumps({**result, "manifest_cache": manifest_cache_stats(), "timings": timings}, ensure_ascii=False, indent=2))
     else:
         print(format_text_report(result))
     return exit_code_for_status(result["status"])
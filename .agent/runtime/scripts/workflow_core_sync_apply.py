@@ -4,7 +4,6 @@
 from __future__ import annotations
 
 import argparse
-import importlib.util
 import json
 import sys
 from pathlib import Path
@@ -14,10 +13,40 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
-from workflow_core_contracts import checkout_paths_from_ref, evaluate_manifest_contract, list_files_at_ref, ref_exists  # noqa: E402
-from workflow_core_manifest import manifest_default_path, normalize_path, path_matches_pattern  # noqa: E402
+if __name__ == "__main__":
+    from workflow_core_daemon import exit_if_delegated
+
+    exit_if_delegated("sync_apply")
+
+from workflow_core_blob_store import BLOB_STORE_REL_PATH  # noqa: E402
+from workflow_core_contracts import (  # noqa: E402
+    ProgressCallback,
+    TreeEntry,
+    build_sync_lock,
+    checkout_entries_to_root,
+    default_sync_lock_path,
+    emit_event,
+    evaluate_manifest_contract,
+    list_files_at_ref,
+    list_tree_entries_at_ref,
+    list_tree_entries_for_paths,
+    load_script_module,
+    load_sync_lock,
+    plan_incremental_sync,
+    ref_exists,
+    resolve_ref,
+    summarize_result_for_stream,
+    update_index_from_ref,
+    write_json_file,
+    write_ndjson_error,
+    write_ndjson_record,
+)
+from workflow_core_manifest import compile_patterns, manifest_cache_stats, manifest_default_path, normalize_path  # noqa: E402
 from workflow_core_obsidian_restricted_mount import run_generate_downstream_obsidian_mount  # noqa: E402
 from workflow_core_sync_precheck import run_sync_precheck  # noqa: E402
+from workflow_core_sync_stage import load_stage_metadata  # noqa: E402
+from workflow_core_tracing import collect_timings, trace_phase, traced  # noqa: E402
+from workflow_core_transaction import TRANSACTION_ROOT_REL, ApplyTransaction, recover_pending_transactions  # noqa: E402
 
 
 EXIT_PASS = 0
@@ -27,12 +56,7 @@ EXIT_ERROR = 30
 
 
 def load_projection_module(projection_script: Path):
-    spec = importlib.util.spec_from_file_location("workflow_core_projection_runtime", projection_script)
-    if spec is None or spec.loader is None:
-        raise RuntimeError(f"unable to load projection script: {projection_script}")
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
+    return load_script_module(projection_script, "workflow_core_projection_runtime")
 
 
 def normalize_staging_root(repo_root: Path, staging_root: Path | None) -> tuple[Path | None, str | None]:
@@ -46,8 +70,15 @@ def normalize_staging_root(repo_root: Path, staging_root: Path | None) -> tuple[
     return resolved, relative
 
 
-def precheck_allows_staging_tree_only_warning(precheck: dict, staging_root_rel: str | None) -> bool:
-    if not staging_root_rel or precheck.get("status") != "warn":
+def precheck_allows_staging_tree_only_warning(
+    precheck: dict,
+    staging_root_rel: str | None,
+    sync_lock_rel: str | None = None,
+    blob_store_rel: str | None = None,
+    transaction_root_rel: str | None = None,
+) -> bool:
+    allowed_roots = [item for item in [staging_root_rel, sync_lock_rel, blob_store_rel, transaction_root_rel] if item]
+    if not allowed_roots or precheck.get("status") != "warn":
         return False
     if precheck.get("core_divergence_paths") or precheck.get("state_only_paths"):
         return False
@@ -57,7 +88,31 @@ def precheck_allows_staging_tree_only_warning(precheck: dict, staging_root_rel:
     ]
     if not review_paths:
         return False
-    return all(path == staging_root_rel or path.startswith(staging_root_rel + "/") for path in review_paths)
+    return all(any(path == root or path.startswith(root + "/") for root in allowed_roots) for path in review_paths)
+
+
+def relative_sync_lock_path(repo_root: Path, lock_path: Path) -> str | None:
+    try:
+        return normalize_path(str(lock_path.resolve().relative_to(repo_root.resolve())))
+    except ValueError:
+        return None
+
+
+def stage_deleted_managed_paths(repo_root: Path, paths: list[str], transaction: ApplyTransaction) -> list[str]:
+    removed = [rel_path for rel_path in paths if (repo_root / rel_path).is_file() or (repo_root / rel_path).is_symlink()]
+    for rel_path in removed:
+        transaction.stage_delete(rel_path)
+    return removed
+
+
+def stage_paths_from_ref(repo_root: Path, ref: str, paths: list[str], transaction: ApplyTransaction) -> None:
+    """direct-root 寫入：經 git checkout-index 把 blob 寫進 transaction（套用 .gitattributes filters 與 mode），與刪除、projection 一起換入。"""
+    if not paths:
+        return
+    entries = list_tree_entries_for_paths(repo_root, ref, paths, with_sizes=False)
+    for rel_path in paths:
+        transaction.stage_write(rel_path)
+    checkout_entries_to_root(repo_root, entries, transaction.new_path("."))
 
 
 def select_sync_mode(explicit_mode: str | None, projection_artifact_path: str) -> str:
@@ -66,6 +121,7 @@ def select_sync_mode(explicit_mode: str | None, projection_artifact_path: str) -
     return "staging-plus-projection" if projection_artifact_path else "direct-root"
 
 
+@traced("sync-apply")
 def run_sync_apply(
     repo_root: Path,
     manifest_path: Path,
@@ -76,11 +132,32 @@ def run_sync_apply(
     emit_obsidian_restricted_mount_sample: bool = False,
     obsidian_mount_output_dir: Path | None = None,
     force_obsidian_mount_sample: bool = False,
+    incremental: bool = False,
+    sync_lock_path: Path | None = None,
+    rollback_pending: bool = False,
+    precheck_result: dict | None = None,
+    prestaged_transaction: ApplyTransaction | None = None,
+    on_event: ProgressCallback | None = None,
 ) -> dict:
+    if prestaged_transaction is not None:
+        # sync update 已在開始 pipeline 前處理殘留 journal；此時唯一未完成的就是 prestaged transaction 本身。
+        recovered_transactions = []
+    else:
+        recovered_transactions = recover_pending_transactions(repo_root, "rollback" if rollback_pending else "resume")
     resolved_staging_root, staging_root_rel = normalize_staging_root(repo_root, staging_root)
+    effective_lock_path = sync_lock_path or default_sync_lock_path(repo_root)
     contract = evaluate_manifest_contract(repo_root, manifest_path)
-    precheck = run_sync_precheck(repo_root=repo_root, release_ref=release_ref, manifest_path=manifest_path)
-    allow_staging_warning = precheck_allows_staging_tree_only_warning(precheck, staging_root_rel)
+    emit_event(on_event, "phase", phase="precheck", state="start")
+    # sync update 的 pipeline 會在 stage 期間先跑好 precheck 再傳進來，避免重複掃一次 git status。
+    precheck = precheck_result or run_sync_precheck(repo_root=repo_root, release_ref=release_ref, manifest_path=manifest_path)
+    emit_event(on_event, "phase", phase="precheck", state="done", status=precheck["status"])
+    allow_staging_warning = precheck_allows_staging_tree_only_warning(
+        precheck,
+        staging_root_rel,
+        relative_sync_lock_path(repo_root, effective_lock_path) if incremental else None,
+        BLOB_STORE_REL_PATH if (repo_root / BLOB_STORE_REL_PATH).is_dir() else None,
+        TRANSACTION_ROOT_REL if precheck_result is not None else None,
+    )
     if precheck["status"] != "pass" and not allow_staging_warning:
         return {
             "status": "fail",
@@ -112,21 +189,34 @@ def run_sync_apply(
         }
 
     resolved_mode = select_sync_mode(sync_mode, contract["projection_artifact_path"])
+    managed_set = compile_patterns(contract["managed_patterns"])
+    incremental_plan = None
+    stage_metadata = None
+    lock_entries: dict[str, TreeEntry] | None = None
     if resolved_staging_root is not None:
         files_at_ref = sorted(
             normalize_path(str(path.relative_to(resolved_staging_root)))
             for path in resolved_staging_root.rglob("*")
             if path.is_file()
         )
+        stage_metadata = load_stage_metadata(resolved_staging_root) if incremental else None
+        if stage_metadata and stage_metadata.get("incremental") is not None and stage_metadata.get("tree_entries") is not None:
+            incremental_plan = stage_metadata["incremental"]
+            lock_entries = {path: TreeEntry(**entry) for path, entry in stage_metadata["tree_entries"].items()}
+    elif incremental:
+        all_entries = list_tree_entries_at_ref(repo_root, release_ref)
+        lock_entries = {path: entry for path, entry in all_entries.items() if managed_set.matches(path)}
+        previous_lock = load_sync_lock(effective_lock_path)
+        installed_entries = list_tree_entries_at_ref(repo_root, "HEAD") if previous_lock and resolve_ref(repo_root, "HEAD") else None
+        incremental_plan = plan_incremental_sync(previous_lock, lock_entries, installed_entries)
+        files_at_ref = sorted({*incremental_plan["added_paths"], *incremental_plan["modified_paths"]})
     else:
         files_at_ref = list_files_at_ref(repo_root, release_ref)
 
-    changed_managed_paths = sorted(
-        path
-        for path in files_at_ref
-        if any(path_matches_pattern(path, pattern) for pattern in contract["managed_patterns"])
-    )
-    if not changed_managed_paths:
+    changed_managed_paths = sorted(managed_set.filter_paths(files_at_ref))
+    deleted_managed_paths = managed_set.filter_paths(incremental_plan["deleted_paths"]) if incremental_plan else []
+    has_incremental_baseline = bool(incremental_plan and incremental_plan["baseline_release_ref"] is not None)
+    if not changed_managed_paths and not has_incremental_baseline:
         return {
             "status": "fail",
             "repo_root": contract["repo_root"],
@@ -141,17 +231,40 @@ def run_sync_apply(
             "notes": ["staged export tree contains no managed paths to apply"] if resolved_staging_root is not None else ["release ref contains no managed paths to apply"],
         }
 
-    if resolved_staging_root is None:
-        checkout_paths_from_ref(repo_root, release_ref, changed_managed_paths)
+    # checkout、刪除與 projection 的寫入都進同一個 transaction，最後只 commit 一次。
+    transaction = prestaged_transaction or ApplyTransaction.begin(repo_root)
+    try:
+        if resolved_staging_root is None:
+            emit_event(on_event, "phase", phase="checkout", state="start", path_count=len(changed_managed_paths))
+            with trace_phase("checkout"):
+                stage_paths_from_ref(repo_root, release_ref, changed_managed_paths, transaction)
+            emit_event(on_event, "phase", phase="checkout", state="done")
+        removed_managed_paths = stage_deleted_managed_paths(repo_root, deleted_managed_paths, transaction)
+    except BaseException:
+        transaction.rollback()
+        raise
+    for rel_path in changed_managed_paths:
+        emit_event(on_event, "managed-path", path=rel_path, action="apply")
+    for rel_path in removed_managed_paths:
+        emit_event(on_event, "managed-path", path=rel_path, action="delete")
     projection_ran = False
+    projection_strategy_counts = None
     mount_result = None
     notes = ["restored managed paths from release ref"] if resolved_staging_root is None else ["loaded managed paths from staged export tree"]
+    if has_incremental_baseline:
+        notes.append(
+            f"incremental sync applied {len(changed_managed_paths)} changed and removed {len(removed_managed_paths)} deleted managed paths; "
+            f"skipped {incremental_plan['skipped_file_count']} files ({incremental_plan['skipped_bytes']} bytes)"
+        )
     if allow_staging_warning:
         notes.append("sync precheck warning was limited to the staged export tree and was ignored for apply")
+    for recovered in recovered_transactions:
+        notes.append(f"{recovered['outcome']} interrupted apply transaction {recovered['id']} ({recovered['path_count']} paths)")
 
     if resolved_mode == "staging-plus-projection":
         projection_target = projection_script or (repo_root / contract["projection_artifact_path"])
         if not projection_target.exists():
+            transaction.rollback()
             return {
                 "status": "fail",
                 "repo_root": contract["repo_root"],
@@ -165,17 +278,26 @@ def run_sync_apply(
                 "failed_stage": "projection-bootstrap",
                 "notes": ["projection script path does not exist"],
             }
-        projection_module = load_projection_module(projection_target)
-        projection_result = projection_module.run_projection_stub(
-            repo_root=repo_root,
-            manifest_path=manifest_path,
-            source_root=resolved_staging_root,
-            bootstrap_overlay_index_file=True,
-            emit_obsidian_restricted_mount_sample=emit_obsidian_restricted_mount_sample,
-            obsidian_mount_output_dir=obsidian_mount_output_dir,
-            force_obsidian_mount_sample=force_obsidian_mount_sample,
-        )
+        emit_event(on_event, "phase", phase="projection", state="start")
+        # pipeline 預先 stage 的檔案也在這個 transaction 裡；projection 把其餘寫入加進來後一次 commit。
+        try:
+            projection_module = load_projection_module(projection_target)
+            projection_result = projection_module.run_projection_stub(
+                repo_root=repo_root,
+                manifest_path=manifest_path,
+                source_root=resolved_staging_root,
+                bootstrap_overlay_index_file=True,
+                emit_obsidian_restricted_mount_sample=emit_obsidian_restricted_mount_sample,
+                obsidian_mount_output_dir=obsidian_mount_output_dir,
+                force_obsidian_mount_sample=force_obsidian_mount_sample,
+                transaction=transaction,
+            )
+        except BaseException:
+            transaction.rollback()
+            raise
         projection_ran = True
+        projection_strategy_counts = projection_result.get("strategy_counts")
+        emit_event(on_event, "phase", phase="projection", state="done", status=projection_result["status"])
         if projection_result.get("obsidian_mount_sample_generated"):
             mount_result = {
                 "output_dir": projection_result.get("obsidian_mount_output_dir"),
@@ -195,6 +317,16 @@ def run_sync_apply(
                 "failed_stage": "projection-bootstrap",
                 "notes": notes,
             }
+    else:
+        with trace_phase("commit"):
+            try:
+                transaction.commit()
+            except BaseException:
+                transaction.rollback()
+                raise
+    if resolved_staging_root is None:
+        # 與 `git checkout <ref> -- <paths>` 相同，index 也指向 release 的內容。
+        update_index_from_ref(repo_root, release_ref, [*changed_managed_paths, *removed_managed_paths])
 
     if emit_obsidian_restricted_mount_sample and mount_result is None:
         mount_result = run_generate_downstream_obsidian_mount(
@@ -204,6 +336,12 @@ def run_sync_apply(
         )
         notes.extend(mount_result.get("notes", []))
 
+    sync_lock_written = None
+    if lock_entries is not None:
+        resolved_release = stage_metadata.get("resolved_source_ref") if stage_metadata else resolve_ref(repo_root, release_ref)
+        profile_name = stage_metadata.get("profile_name") if stage_metadata else None
+        sync_lock_written = write_json_file(effective_lock_path, build_sync_lock(release_ref, resolved_release, profile_name, lock_entries))
+
     return {
         "status": "pass",
         "repo_root": contract["repo_root"],
@@ -211,9 +349,14 @@ def run_sync_apply(
         "release_ref": release_ref,
         "sync_mode": resolved_mode,
         "projection_ran": projection_ran,
+        "projection_strategy_counts": projection_strategy_counts,
         "obsidian_mount_sample_generated": bool(mount_result),
         "obsidian_mount_output_dir": mount_result.get("output_dir") if mount_result else None,
         "changed_managed_paths": changed_managed_paths,
+        "deleted_managed_paths": removed_managed_paths,
+        "incremental": incremental_plan,
+        "sync_lock_path": sync_lock_written,
+        "recovered_transactions": recovered_transactions,
         "failed_stage": None,
         "notes": notes,
     }
@@ -231,10 +374,20 @@ def format_text_report(result: dict) -> str:
         f"obsidian_mount_output_dir: {result['obsidian_mount_output_dir']}",
         f"failed_stage: {result['failed_stage']}",
     ]
+    if result.get("projection_strategy_counts"):
+        lines.append("projection_strategy_counts: " + ", ".join(f"{name}={count}" for name, count in result["projection_strategy_counts"].items()))
+    if result.get("incremental"):
+        plan = result["incremental"]
+        lines.append(f"incremental_baseline_release_ref: {plan['baseline_release_ref']}")
+        lines.append(f"incremental_skipped: files={plan['skipped_file_count']} bytes={plan['skipped_bytes']}")
     if result["changed_managed_paths"]:
         lines.append("changed_managed_paths:")
         for item in result["changed_managed_paths"]:
             lines.append(f"  - {item}")
+    if result.get("deleted_managed_paths"):
+        lines.append("deleted_managed_paths:")
+        for item in result["deleted_managed_paths"]:
+            lines.append(f"  - {item}")
     if result["notes"]:
         lines.append("notes:")
         for item in result["notes"]:
@@ -288,7 +441,15 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="若 sample 已存在且內容不同，允許覆蓋",
     )
+    parser.add_argument("--incremental", action="store_true", help="依 sync lock 的 tree OID 只套用新增、變更或刪除的 managed paths")
+    parser.add_argument("--sync-lock", type=Path, default=None, help="sync lock 路徑；預設為 <repo-root>/.workflow-core/sync-lock.json")
+    parser.add_argument(
+        "--rollback-pending",
+        action="store_true",
+        help="若上次 apply 中斷留下 transaction journal，先整批還原而不是續跑",
+    )
     parser.add_argument("--json", action="store_true", help="輸出 JSON")
+    parser.add_argument("--ndjson", action="store_true", help="逐行輸出 NDJSON progress events，最後附上精簡 summary record")
     return parser
 
 
@@ -308,16 +469,25 @@ def main(argv: list[str] | None = None) -> int:
             emit_obsidian_restricted_mount_sample=bool(args.emit_obsidian_restricted_mount_sample),
             obsidian_mount_output_dir=args.obsidian_mount_output_dir.resolve() if args.obsidian_mount_output_dir else None,
             force_obsidian_mount_sample=bool(args.force_obsidian_mount_sample),
+            incremental=bool(args.incremental),
+            sync_lock_path=args.sync_lock.resolve() if args.sync_lock else None,
+            rollback_pending=bool(args.rollback_pending),
+            on_event=write_ndjson_record if args.ndjson else None,
         )
     except Exception as exc:
-        if args.json:
+        if args.ndjson:
+            write_ndjson_error(exc)
+        elif args.json:
             print(json.dumps({"status": "error", "error": str(exc)}, ensure_ascii=False, indent=2), file=sys.stderr)
         else:
             print(f"workflow-core sync apply error: {exc}", file=sys.stderr)
         return EXIT_ERROR
 
-    if args.json:
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+    timings = collect_timings()
+    if args.ndjson:
+        write_ndjson_record({"event": "summary", **summarize_result_for_stream(result), "manifest_cache": manifest_cache_stats(), "timings": timings})
+    elif args.json:
+        print(json.dumps({**result, "manifest_cache": manifest_cache_stats(), "timings": timings}, ensure_ascii=False, indent=2))
     else:
         print(format_text_report(result))
     return exit_code_for_status(result["status"])
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""檔案用途：把同一個 workflow-core release 一次 stage 進共用 blob store，再以 process pool 對多個 downstream 執行 apply / projection / verify。"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from workflow_core_contracts import REMOTE_FETCH_MODES  # noqa: E402
+from workflow_core_manifest import manifest_cache_stats, manifest_default_path  # noqa: E402
+from workflow_core_sync_stage import run_sync_stage  # noqa: E402
+from workflow_core_sync_update import apply_and_verify_staged_release, prepare_staging_root  # noqa: E402
+from workflow_core_tracing import collect_timings, trace_phase, traced  # noqa: E402
+
+
+EXIT_PASS = 0
+EXIT_WARN = 10
+EXIT_FAIL = 20
+EXIT_ERROR = 30
+
+
+def load_downstream_list(list_path: Path) -> list[Path]:
+    """One repo root per line; blank lines and `#` comments are skipped, relative paths resolve against the list file."""
+    roots: list[Path] = []
+    for line in list_path.read_text(encoding="utf-8").splitlines():
+        value = line.split("#", 1)[0].strip()
+        if value:
+            candidate = Path(value).expanduser()
+            roots.append((candidate if candidate.is_absolute() else list_path.parent / candidate).resolve())
+    return roots
+
+
+def pool_context() -> multiprocessing.context.BaseContext:
+    # fork 讓 worker 直接沿用已載入的 scripts 與 sys.path；不支援 fork 的平台才退回預設 start method。
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def downstream_record(repo_root: Path, outcome: dict | None = None, error: str | None = None) -> dict:
+    apply_result = (outcome or {}).get("apply_result") or {}
+    return {
+        "repo_root": str(repo_root),
+        "status": outcome["status"] if outcome else "error",
+        "failed_stage": outcome["failed_stage"] if outcome else None,
+        "changed_managed_path_count": len(apply_result.get("changed_managed_paths", [])),
+        "error": error,
+        "apply_result": outcome.get("apply_result") if outcome else None,
+        "verify_result": outcome.get("verify_result") if outcome else None,
+        "notes": outcome.get("notes", []) if outcome else [],
+    }
+
+
+@traced("sync-fanout")
+def run_sync_fanout(
+    source_repo: Path,
+    release_ref: str,
+    downstream_roots: list[Path],
+    source_ref: str | None = None,
+    source_remote: str | None = None,
+    profile_name: str | None = None,
+    manifest_path: Path | None = None,
+    staging_root: Path | None = None,
+    sync_mode: str | None = None,
+    jobs: int | None = None,
+    blob_store_keep_releases: int | None = None,
+    remote_fetch: str = "full",
+) -> dict:
+    """Stage `release_ref` once in `source_repo`, then apply + verify it in every downstream on a process pool.
+
+    The shared staging root is assembled from `source_repo`'s blob store, so the upstream manifest is parsed and
+    each blob is read out of git once no matter how many downstreams there are. Downstreams only read the staging
+    root; a failure or crash in one is reported for that repo and does not stop the others.
+    """
+    if not downstream_roots:
+        raise ValueError("at least one downstream repo root is required")
+    unique_roots = list(dict.fromkeys(root.resolve() for root in downstream_roots))
+    effective_staging_root, _ = prepare_staging_root(source_repo, release_ref, staging_root, replace_staging_root=False)
+
+    with trace_phase("stage-once"):
+        stage_result = run_sync_stage(
+            repo_root=source_repo,
+            release_ref=release_ref,
+            source_ref=source_ref,
+            source_remote=source_remote,
+            profile_name=profile_name,
+            staging_root=effective_staging_root,
+            manifest_path=manifest_path,
+            blob_store=True,
+            blob_store_keep_releases=blob_store_keep_releases,
+            remote_fetch=remote_fetch,
+        )
+    if stage_result["status"] != "pass":
+        return {
+            "status": "fail",
+            "source_repo": str(source_repo.resolve()),
+            "release_ref": release_ref,
+            "staging_root": str(effective_staging_root),
+            "jobs": 0,
+            "stage_result": stage_result,
+            "counts": {},
+            "downstreams": [],
+            "notes": ["shared stage failed; no downstream was touched", *stage_result.get("notes", [])],
+        }
+
+    worker_count = max(1, min(jobs or os.cpu_count() or 1, len(unique_roots)))
+    records: dict[Path, dict] = {}
+    with trace_phase("downstreams"):
+        with ProcessPoolExecutor(max_workers=worker_count, mp_context=pool_context()) as pool:
+            futures = {
+                root: pool.submit(
+                    apply_and_verify_staged_release,
+                    repo_root=root,
+                    manifest_path=manifest_default_path(root),
+                    release_ref=release_ref,
+                    staging_root=effective_staging_root,
+                    sync_mode=sync_mode,
+                )
+                for root in unique_roots
+                if root.is_dir()
+            }
+            for root in unique_roots:
+                if root not in futures:
+                    records[root] = downstream_record(root, error=f"downstream repo root does not exist: {root}")
+            for root, future in futures.items():
+                try:
+                    records[root] = downstream_record(root, future.result())
+                except Exception as exc:
+                    # 包含 worker 當掉時的 BrokenProcessPool：只記在該 repo，其餘 repo 的結果照常彙整。
+                    records[root] = downstream_record(root, error=f"{type(exc).__name__}: {exc}")
+
+    downstreams = [records[root] for root in unique_roots]
+    counts: dict[str, int] = {}
+    for record in downstreams:
+        counts[record["status"]] = counts.get(record["status"], 0) + 1
+    failed = [record["repo_root"] for record in downstreams if record["status"] != "pass"]
+    notes = [
+        f"staged {stage_result['selected_path_count']} paths once "
+        f"(fetched {stage_result['blob_store']['fetched_objects']} new objects, reused {stage_result['blob_store']['reused_objects']})",
+        f"synced {len(downstreams)} downstream repos with {worker_count} worker processes",
+    ]
+    if failed:
+        notes.append(f"{len(failed)} downstream repos did not pass: {', '.join(failed)}")
+    return {
+        "status": "fail" if failed else "pass",
+        "source_repo": str(source_repo.resolve()),
+        "release_ref": release_ref,
+        "staging_root": str(effective_staging_root),
+        "jobs": worker_count,
+        "stage_result": stage_result,
+        "counts": counts,
+        "downstreams": downstreams,
+        "notes": notes,
+    }
+
+
+def format_text_report(result: dict) -> str:
+    lines = [
+        f"workflow-core sync fan-out: {result['status']}",
+        f"source_repo: {result['source_repo']}",
+        f"release_ref: {result['release_ref']}",
+        f"staging_root: {result['staging_root']}",
+        f"jobs: {result['jobs']}",
+    ]
+    for record in result["downstreams"]:
+        if record["status"] == "pass":
+            detail = f"{record['changed_managed_path_count']} managed paths"
+        else:
+            detail = record["error"] or f"failed_stage={record['failed_stage']}"
+        lines.append(f"  - [{record['status']}] {record['repo_root']} ({detail})")
+    if result["notes"]:
+        lines.append("notes:")
+        for item in result["notes"]:
+            lines.append(f"  - {item}")
+    return "\n".join(lines)
+
+
+def exit_code_for_status(status: str) -> int:
+    if status == "pass":
+        return EXIT_PASS
+    if status == "warn":
+        return EXIT_WARN
+    if status == "fail":
+        return EXIT_FAIL
+    return EXIT_ERROR
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source-repo", type=Path, default=Path.cwd(), help="含 release ref 的 upstream（或 mirror）repo，共用 blob store 與 staging root 也放在這裡")
+    parser.add_argument("--release-ref", required=True, help="要同步的 workflow-core release ref")
+    parser.add_argument("--source-ref", default=None, help="來源 ref；未指定時預設為 --release-ref")
+    parser.add_argument("--source-remote", default=None, help="可選的 remote 名稱；指定時先 fetch 進 --source-repo 再 stage")
+    parser.add_argument("--profile", default=None, help="export profile name；未指定時使用 manifest active profile")
+    parser.add_argument("--manifest", type=Path, default=None, help="source repo 的 workflow-core canonical manifest path")
+    parser.add_argument("--staging-root", type=Path, default=None, help="共用 staging root；未指定時使用 source repo 的預設位置")
+    parser.add_argument("--downstream", type=Path, action="append", default=[], help="downstream repo 根目錄，可重複指定")
+    parser.add_argument("--downstream-list", type=Path, default=None, help="每行一個 downstream repo 根目錄的清單檔（# 為註解）")
+    parser.add_argument("--jobs", type=int, default=None, help="同時處理的 downstream 數量（預設：CPU 數）")
+    parser.add_argument(
+        "--sync-mode",
+        choices=["direct-root", "staging-plus-projection"],
+        default=None,
+        help="同步模式，未指定時依各 downstream manifest 自動判定",
+    )
+    parser.add_argument("--blob-store-keep-releases", type=int, default=None, help="stage 後對共用 blob store 執行 gc，只保留最近使用的 N 個 release")
+    parser.add_argument(
+        "--remote-fetch",
+        choices=list(REMOTE_FETCH_MODES),
+        default="full",
+        help="搭配 --source-remote：partial 以 --depth=1 與 blob:none filter fetch，只補抓 export profile 選到的 blobs",
+    )
+    parser.add_argument("--json", action="store_true", help="輸出 JSON")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        downstream_roots = [path.resolve() for path in args.downstream]
+        if args.downstream_list is not None:
+            downstream_roots.extend(load_downstream_list(args.downstream_list.resolve()))
+        result = run_sync_fanout(
+            source_repo=args.source_repo.resolve(),
+            release_ref=args.release_ref,
+            downstream_roots=downstream_roots,
+            source_ref=args.source_ref,
+            source_remote=args.source_remote,
+            profile_name=args.profile,
+            manifest_path=args.manifest.resolve() if args.manifest else None,
+            staging_root=args.staging_root.resolve() if args.staging_root else None,
+            sync_mode=args.sync_mode,
+            jobs=args.jobs,
+            blob_store_keep_releases=args.blob_store_keep_releases,
+            remote_fetch=args.remote_fetch,
+        )
+    except Exception as exc:
+        if args.json:
+            print(json.dumps({"status": "error", "error": str(exc)}, ensure_ascii=False, indent=2), file=sys.stderr)
+        else:
+            print(f"workflow-core sync fan-out error: {exc}", file=sys.stderr)
+        return EXIT_ERROR
+
+    timings = collect_timings()
+    if args.json:
+        print(json.dumps({**result, "manifest_cache": manifest_cache_stats(), "timings": timings}, ensure_ascii=False, indent=2))
+    else:
+        print(format_text_report(result))
+    return exit_code_for_status(result["status"])
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
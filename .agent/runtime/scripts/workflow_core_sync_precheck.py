@@ -5,32 +5,55 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import shutil
 import subprocess
 import sys
 from pathlib import Path
-from typing import Any
+from typing import IO, Any, Callable, Iterable, Iterator
 
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
+if __name__ == "__main__":
+    from workflow_core_daemon import exit_if_delegated
+
+    exit_if_delegated("sync_precheck")
+
+from workflow_core_change_journal import INCREMENTAL_UNTRACKED_MODES, ChangeJournal, JournalPlan, path_is_covered  # noqa: E402
+from workflow_core_contracts import (  # noqa: E402
+    ProgressCallback,
+    emit_event,
+    summarize_result_for_stream,
+    write_ndjson_error,
+    write_ndjson_record,
+)
 from workflow_core_manifest import (  # noqa: E402
+    CompiledPatternSet,
+    classify_path_by_pattern_sets,
+    compile_patterns,
     get_managed_patterns,
     get_overlay_patterns,
     get_state_patterns,
     load_manifest,
+    manifest_cache_stats,
     manifest_default_path,
     normalize_path,
-    path_matches_pattern,
+    pattern_anchor,
 )
+from workflow_core_tracing import collect_timings, count_bytes_read, count_subprocess, trace_phase, traced  # noqa: E402
 
 
 EXIT_PASS = 0
 EXIT_WARN = 10
 EXIT_FAIL = 20
 EXIT_ERROR = 30
+UNTRACKED_FILES_MODES = ("all", "normal", "no")
+PRECHECK_SCOPES = ("full", "managed")
+STATUS_READ_CHUNK_SIZE = 1 << 16
+
 
 def merge_patterns(defaults: list[str], extras: list[str] | None) -> list[str]:
     merged: list[str] = []
@@ -41,69 +64,187 @@ def merge_patterns(defaults: list[str], extras: list[str] | None) -> list[str]:
     return merged
 
 
-def parse_porcelain_line(line: str) -> dict[str, Any]:
-    raw_status = line[:2]
-    payload = line[3:].strip() if len(line) > 3 else ""
-    if " -> " in payload:
-        source_path, path = payload.split(" -> ", 1)
-        source_path = source_path.strip()
-        path = path.strip()
-    else:
-        source_path = None
-        path = payload
+def make_status_entry(raw_status: str, path: str, source_path: str | None, raw_line: str) -> dict[str, Any]:
     return {
         "raw_status": raw_status,
         "staged_status": raw_status[0],
         "unstaged_status": raw_status[1] if len(raw_status) > 1 else " ",
         "path": normalize_path(path),
         "source_path": normalize_path(source_path) if source_path else None,
-        "raw_line": line,
+        "raw_line": raw_line,
     }
 
 
-def list_git_status(repo_root: Path) -> list[dict[str, Any]]:
+def parse_porcelain_v2_record(record: str, next_field: Callable[[], str]) -> dict[str, Any] | None:
+    """Parse one `git status --porcelain=v2 -z` record; rename/copy records pull their origin path from `next_field`.
+
+    `raw_status` keeps the v1 two-letter shape (`.` becomes a space, untracked is `??`).
+    """
+    kind = record[:1]
+    if kind in {"#", "!"}:
+        return None
+    if kind == "?":
+        return make_status_entry("??", record[2:], None, record)
+    if kind == "1":
+        fields = record.split(" ", 8)
+        source_path = None
+    elif kind == "2":
+        fields = record.split(" ", 9)
+        source_path = next_field()
+    elif kind == "u":
+        fields = record.split(" ", 10)
+        source_path = None
+    else:
+        raise RuntimeError(f"unexpected git status record: {record!r}")
+    raw_line = f"{record}\t{source_path}" if source_path else record
+    return make_status_entry(fields[1].replace(".", " "), fields[-1], source_path, raw_line)
+
+
+def iter_nul_fields(stream: IO[bytes]) -> Iterator[str]:
+    pending = b""
+    while True:
+        chunk = stream.read1(STATUS_READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        count_bytes_read(len(chunk))
+        fields = (pending + chunk).split(b"\0")
+        pending = fields.pop()
+        for field in fields:
+            yield os.fsdecode(field)
+    if pending:
+        yield os.fsdecode(pending)
+
+
+def git_status_command(repo_root: Path, untracked_files: str = "all", pathspecs: list[str] | None = None) -> list[str]:
+    if untracked_files not in UNTRACKED_FILES_MODES:
+        raise ValueError(f"unsupported untracked-files mode: {untracked_files}")
+    command = ["git", "-C", str(repo_root), "status", "--porcelain=v2", "-z", f"--untracked-files={untracked_files}"]
+    if pathspecs:
+        command.extend(["--", *pathspecs])
+    return command
+
+
+def iter_git_status(
+    repo_root: Path,
+    untracked_files: str = "all",
+    pathspecs: list[str] | None = None,
+    optional_locks: bool = True,
+) -> Iterator[dict[str, Any]]:
+    """Yield status entries while `git status` is still writing, so classification overlaps the scan.
+
+    `optional_locks=False` stops git from refreshing the index as a side effect, which keeps the change journal's
+    index fingerprint stable across its own scans.
+    """
     if shutil.which("git") is None:
         raise RuntimeError("git command not found on PATH")
     if not repo_root.exists():
         raise RuntimeError(f"repo root does not exist: {repo_root}")
 
-    proc = subprocess.run(
-        ["git", "-C", str(repo_root), "status", "--porcelain=v1", "--untracked-files=all"],
-        check=False,
-        capture_output=True,
-        text=True,
+    proc = subprocess.Popen(
+        git_status_command(repo_root, untracked_files, pathspecs),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=None if optional_locks else {**os.environ, "GIT_OPTIONAL_LOCKS": "0"},
     )
-    if proc.returncode != 0:
-        message = proc.stderr.strip() or proc.stdout.strip() or "git status failed"
-        raise RuntimeError(message)
+    count_subprocess()
+    try:
+        fields = iter_nul_fields(proc.stdout)
+        for record in fields:
+            entry = parse_porcelain_v2_record(record, lambda: next(fields, ""))
+            if entry is not None:
+                yield entry
+        stderr = proc.stderr.read().decode("utf-8", errors="replace")
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+        proc.stderr.close()
+    if returncode != 0:
+        raise RuntimeError(stderr.strip() or "git status failed")
+
+
+def list_git_status(repo_root: Path, untracked_files: str = "all", pathspecs: list[str] | None = None) -> list[dict[str, Any]]:
+    return list(iter_git_status(repo_root, untracked_files=untracked_files, pathspecs=pathspecs))
+
+
+def scope_pathspecs(patterns: list[str]) -> list[tuple[str, str]]:
+    """(magic, path) pathspecs covering `patterns`: outermost literal anchors, plus the raw pattern for unanchored globs.
+
+    Git's default pathspec matching lets `*` cross `/`, which mirrors `fnmatch`, so globs such as `**/__pycache__/**`
+    can be passed through unchanged.
+    """
+    anchors: set[str] = set()
+    globs: set[str] = set()
+    for pattern in patterns:
+        anchor = pattern_anchor(pattern)
+        if not anchor or any(char in anchor for char in "*?["):
+            globs.add(normalize_path(pattern))
+        else:
+            anchors.add(anchor)
+    outermost: list[str] = []
+    for anchor in sorted(anchors):
+        if not any(anchor.startswith(kept + "/") for kept in outermost):
+            outermost.append(anchor)
+    return [*(("literal", anchor) for anchor in outermost), *(("", pattern) for pattern in sorted(globs))]
+
+
+def format_pathspec(magic: str, path: str, exclude: bool = False) -> str:
+    words = ",".join(item for item in ["exclude" if exclude else "", magic] if item)
+    return f":({words}){path}" if words else path
 
-    entries: list[dict[str, Any]] = []
-    for line in proc.stdout.splitlines():
-        if line.strip():
-            entries.append(parse_porcelain_line(line))
-    return entries
+
+def probe_outside_scope(repo_root: Path, scoped: list[tuple[str, str]]) -> str | None:
+    """Cheap "is anything else dirty?" check: tracked changes only, stopped at the first hit. Returns that path."""
+    excludes = [format_pathspec(magic, path, exclude=True) for magic, path in scoped]
+    entries = iter_git_status(repo_root, untracked_files="no", pathspecs=[".", *excludes])
+    try:
+        first = next(entries, None)
+    finally:
+        entries.close()
+    return first["path"] if first else None
+
+
+def journal_status_entries(repo_root: Path, plan: JournalPlan, untracked_files: str) -> list[dict[str, Any]]:
+    """Baseline entries outside the changed paths, plus a pathspec-limited `git status` over just the changed paths."""
+    kept = [
+        entry
+        for entry in plan.baseline_entries
+        if not path_is_covered(entry["path"], plan.changed_paths) and not path_is_covered(entry["source_path"], plan.changed_paths)
+    ]
+    fresh: list[dict[str, Any]] = []
+    if plan.changed_paths:
+        fresh = list(
+            iter_git_status(
+                repo_root,
+                untracked_files=untracked_files,
+                pathspecs=[format_pathspec("literal", path) for path in sorted(plan.changed_paths)],
+                optional_locks=False,
+            )
+        )
+    # 與完整掃描相同的順序：tracked 變更在前、untracked 在後，各自依路徑排序。
+    return sorted([*kept, *fresh], key=lambda entry: (entry["raw_status"] == "??", entry["path"]))
 
 
 def classify_path(
     path: str,
-    managed_patterns: list[str],
-    overlay_patterns: list[str],
-    state_patterns: list[str],
+    managed_patterns: list[str] | CompiledPatternSet,
+    overlay_patterns: list[str] | CompiledPatternSet,
+    state_patterns: list[str] | CompiledPatternSet,
 ) -> str:
-    if any(path_matches_pattern(path, pattern) for pattern in state_patterns):
-        return "state"
-    if any(path_matches_pattern(path, pattern) for pattern in overlay_patterns):
-        return "overlay"
-    if any(path_matches_pattern(path, pattern) for pattern in managed_patterns):
-        return "managed"
-    return "unclassified"
+    return classify_path_by_pattern_sets(
+        path,
+        [
+            ("state", compile_patterns(state_patterns)),
+            ("overlay", compile_patterns(overlay_patterns)),
+            ("managed", compile_patterns(managed_patterns)),
+        ],
+    )
 
 
 def classify_entry(
     entry: dict[str, Any],
-    managed_patterns: list[str],
-    overlay_patterns: list[str],
-    state_patterns: list[str],
+    managed_patterns: list[str] | CompiledPatternSet,
+    overlay_patterns: list[str] | CompiledPatternSet,
+    state_patterns: list[str] | CompiledPatternSet,
 ) -> dict[str, Any]:
     candidate_paths = [entry["path"]]
     if entry.get("source_path"):
@@ -131,15 +272,21 @@ def classify_entry(
 
 
 def summarize_dirty_entries(
-    entries: list[dict[str, Any]],
+    entries: Iterable[dict[str, Any]],
     managed_patterns: list[str],
     overlay_patterns: list[str],
     state_patterns: list[str],
+    on_event: ProgressCallback | None = None,
 ) -> dict[str, Any]:
-    annotated_entries = [
-        classify_entry(entry, managed_patterns, overlay_patterns, state_patterns)
-        for entry in entries
-    ]
+    """Classify entries as they arrive (`entries` may be the live `iter_git_status` stream)."""
+    managed_set = compile_patterns(managed_patterns)
+    overlay_set = compile_patterns(overlay_patterns)
+    state_set = compile_patterns(state_patterns)
+    annotated_entries: list[dict[str, Any]] = []
+    for entry in entries:
+        annotated = classify_entry(entry, managed_set, overlay_set, state_set)
+        annotated_entries.append(annotated)
+        emit_event(on_event, "dirty-entry", path=annotated["path"], raw_status=annotated["raw_status"], category=annotated["category"])
 
     summary = {
         "dirty_entries": annotated_entries,
@@ -151,6 +298,7 @@ def summarize_dirty_entries(
     return summary
 
 
+@traced("sync-precheck")
 def run_sync_precheck(
     repo_root: Path,
     release_ref: str,
@@ -159,9 +307,19 @@ def run_sync_precheck(
     managed_prefixes: list[str] | None = None,
     overlay_prefixes: list[str] | None = None,
     state_prefixes: list[str] | None = None,
+    untracked_files: str = "all",
+    pathspecs: list[str] | None = None,
+    scope: str = "full",
+    probe_outside: bool = True,
+    use_change_journal: bool = True,
+    on_event: ProgressCallback | None = None,
 ) -> dict[str, Any]:
     if not str(release_ref or "").strip():
         raise ValueError("release_ref is required")
+    if scope not in PRECHECK_SCOPES:
+        raise ValueError(f"unsupported precheck scope: {scope}")
+    if scope != "full" and pathspecs:
+        raise ValueError("--pathspec cannot be combined with a scoped precheck")
 
     resolved_manifest_path = manifest_path.resolve() if manifest_path else manifest_default_path(repo_root.resolve())
     manifest = load_manifest(resolved_manifest_path)
@@ -170,10 +328,57 @@ def run_sync_precheck(
     merged_overlay = merge_patterns(get_overlay_patterns(manifest), overlay_prefixes)
     merged_state = merge_patterns(get_state_patterns(manifest), state_prefixes)
 
-    entries = list_git_status(repo_root)
-    dirty_summary = summarize_dirty_entries(entries, merged_managed, merged_overlay, merged_state)
-
     notes: list[str] = []
+    scoped = scope_pathspecs([*merged_managed, *merged_state]) if scope == "managed" else []
+    effective_pathspecs = [format_pathspec(magic, path) for magic, path in scoped] if scoped else pathspecs
+
+    journal: ChangeJournal | None = None
+    plan = JournalPlan("full", None, "disabled")
+    if not use_change_journal:
+        pass
+    elif effective_pathspecs:
+        plan = JournalPlan("full", None, "pathspec-limited")
+    elif untracked_files not in INCREMENTAL_UNTRACKED_MODES:
+        plan = JournalPlan("full", None, f"untracked-files-{untracked_files}")
+    else:
+        journal = ChangeJournal(repo_root)
+        plan = journal.plan(untracked_files)
+
+    scanned_entries: list[dict[str, Any]] = []
+
+    def record_entries(stream: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        for entry in stream:
+            scanned_entries.append(entry)
+            yield entry
+
+    emit_event(on_event, "phase", phase="git-status", state="start")
+    with trace_phase("git-status"):
+        if plan.mode == "incremental":
+            status_entries: Iterable[dict[str, Any]] = journal_status_entries(repo_root, plan, untracked_files)
+        else:
+            status_entries = iter_git_status(
+                repo_root,
+                untracked_files=untracked_files,
+                pathspecs=effective_pathspecs,
+                optional_locks=plan.cursor is None,
+            )
+        dirty_summary = summarize_dirty_entries(
+            record_entries(status_entries),
+            merged_managed,
+            merged_overlay,
+            merged_state,
+            on_event=on_event,
+        )
+    entries = dirty_summary["dirty_entries"]
+    emit_event(on_event, "phase", phase="git-status", state="done", entry_count=len(entries))
+    change_journal = plan.report()
+    change_journal["baseline_saved"] = bool(journal and plan.cursor and journal.save_baseline(plan.cursor, scanned_entries))
+
+    outside_scope_dirty_path = None
+    if scoped and probe_outside:
+        with trace_phase("outside-scope-probe"):
+            outside_scope_dirty_path = probe_outside_scope(repo_root, scoped)
+
     manual_review_reasons: list[str] = []
 
     if dirty_summary["overlay_only_paths"]:
@@ -182,11 +387,14 @@ def run_sync_precheck(
         manual_review_reasons.append("state-dirty")
     if dirty_summary["unclassified_paths"]:
         manual_review_reasons.append("unclassified-dirty")
+    if outside_scope_dirty_path:
+        manual_review_reasons.append("outside-scope-dirty")
+        notes.append(f"tracked changes exist outside the managed/state scope (first: {outside_scope_dirty_path})")
 
     if dirty_summary["core_divergence_paths"]:
         status = "fail"
         notes.append("core managed paths contain local divergence; upstream/downstream ownership must be reconciled before sync")
-    elif strict_clean and entries:
+    elif strict_clean and (entries or outside_scope_dirty_path):
         status = "fail"
         notes.append("strict-clean is enabled and the working tree is not clean")
     elif manual_review_reasons:
@@ -201,8 +409,14 @@ def run_sync_precheck(
         "repo_root": str(repo_root.resolve()),
         "manifest_path": str(resolved_manifest_path),
         "release_ref": release_ref,
-        "clean_worktree": not entries,
+        "clean_worktree": not entries and not outside_scope_dirty_path,
         "strict_clean": strict_clean,
+        "untracked_files": untracked_files,
+        "pathspecs": list(effective_pathspecs or []),
+        "scope": "managed" if scoped else "full",
+        "outside_scope_probed": bool(scoped and probe_outside),
+        "outside_scope_dirty_path": outside_scope_dirty_path,
+        "change_journal": change_journal,
         "core_divergence_paths": dirty_summary["core_divergence_paths"],
         "overlay_only_paths": dirty_summary["overlay_only_paths"],
         "state_only_paths": dirty_summary["state_only_paths"],
@@ -224,9 +438,13 @@ def format_text_report(result: dict[str, Any]) -> str:
         f"manifest_path: {result['manifest_path']}",
         f"release_ref: {result['release_ref']}",
         f"clean_worktree: {result['clean_worktree']}",
+        f"scope: {result.get('scope', 'full')}",
         f"manual_review_required: {result['manual_review_required']}",
     ]
 
+    if result.get("outside_scope_dirty_path"):
+        lines.append(f"outside_scope_dirty_path: {result['outside_scope_dirty_path']}")
+
     sections = [
         ("core_divergence_paths", result.get("core_divergence_paths", [])),
         ("overlay_only_paths", result.get("overlay_only_paths", [])),
@@ -294,7 +512,38 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="若 working tree 有任何 dirty path，直接視為 fail",
     )
+    parser.add_argument(
+        "--untracked-files",
+        choices=UNTRACKED_FILES_MODES,
+        default="all",
+        help="傳給 git status 的 untracked 掃描模式；no 可略過大型 overlay tree 的 untracked 檔案",
+    )
+    parser.add_argument(
+        "--pathspec",
+        action="append",
+        default=[],
+        help="只對指定 pathspec 執行 git status，可重複指定（例如 managed anchors）",
+    )
+    parser.add_argument(
+        "--scope",
+        choices=PRECHECK_SCOPES,
+        default="full",
+        help="managed：只對 managed/state pattern anchors 執行 git status，範圍外另以只看 tracked 變更的快速 probe 檢查",
+    )
+    parser.add_argument(
+        "--skip-outside-probe",
+        dest="probe_outside",
+        action="store_false",
+        help="--scope managed 時略過範圍外的 dirty probe",
+    )
+    parser.add_argument(
+        "--no-change-journal",
+        dest="use_change_journal",
+        action="store_false",
+        help="不使用 change journal，一律完整執行 git status",
+    )
     parser.add_argument("--json", action="store_true", help="輸出 JSON")
+    parser.add_argument("--ndjson", action="store_true", help="逐行輸出 NDJSON progress events，最後附上精簡 summary record")
     return parser
 
 
@@ -311,16 +560,27 @@ def main(argv: list[str] | None = None) -> int:
             managed_prefixes=list(args.managed_prefix or []),
             overlay_prefixes=list(args.overlay_prefix or []),
             state_prefixes=list(args.state_prefix or []),
+            untracked_files=args.untracked_files,
+            pathspecs=list(args.pathspec or []),
+            scope=args.scope,
+            probe_outside=bool(args.probe_outside),
+            use_change_journal=bool(args.use_change_journal),
+            on_event=write_ndjson_record if args.ndjson else None,
         )
     except Exception as exc:
-        if args.json:
+        if args.ndjson:
+            write_ndjson_error(exc)
+        elif args.json:
             print(json.dumps({"status": "error", "error": str(exc)}, ensure_ascii=False, indent=2), file=sys.stderr)
         else:
             print(f"workflow-core sync precheck error: {exc}", file=sys.stderr)
         return EXIT_ERROR
 
-    if args.json:
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+    timings = collect_timings()
+    if args.ndjson:
+        write_ndjson_record({"event": "summary", **summarize_result_for_stream(result), "manifest_cache": manifest_cache_stats(), "timings": timings})
+    elif args.json:
+        print(json.dumps({**result, "manifest_cache": manifest_cache_stats(), "timings": timings}, ensure_ascii=False, indent=2))
     else:
         print(format_text_report(result))
     return exit_code_for_status(result["status"])
@@ -13,23 +13,50 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
+if __name__ == "__main__":
+    from workflow_core_daemon import exit_if_delegated
+
+    exit_if_delegated("sync_stage")
+
+from workflow_core_blob_store import BlobStore  # noqa: E402
 from workflow_core_contracts import (  # noqa: E402
+    PARTIAL_CLONE_FILTER,
+    PARTIAL_FETCH_REMOTE,
+    REMOTE_FETCH_MODES,
+    ProgressCallback,
+    TreeEntry,
+    bundle_tree_entries,
+    default_sync_lock_path,
+    emit_event,
+    extract_release_bundle,
+    fetch_missing_blobs,
     fetch_ref,
-    read_bytes_at_ref,
+    list_tree_entries_at_ref,
+    list_tree_entries_for_paths,
+    load_release_bundle,
+    load_sync_lock,
+    partial_fetch_object_repo,
+    plan_incremental_sync,
     read_text_at_ref,
     resolve_ref,
     safe_ref_label,
+    summarize_result_for_stream,
     write_json_file,
+    write_ndjson_error,
+    write_ndjson_record,
+    write_paths_from_ref,
 )
 from workflow_core_manifest import (  # noqa: E402
+    compile_patterns,
     get_default_export_profile_name,
     get_export_profile,
     get_state_patterns,
     load_manifest_text,
+    manifest_cache_stats,
     manifest_default_path,
     normalize_path,
-    path_matches_pattern,
 )
+from workflow_core_tracing import collect_timings, trace_phase, traced  # noqa: E402
 
 
 EXIT_PASS = 0
@@ -57,20 +84,171 @@ def list_files_at_ref(repo_root: Path, ref: str) -> list[str]:
 
 
 def select_export_paths(files_at_ref: list[str], includes: list[str], excludes: list[str]) -> list[str]:
-    selected: list[str] = []
-    for path in files_at_ref:
-        if not any(path_matches_pattern(path, pattern) for pattern in includes):
-            continue
-        if any(path_matches_pattern(path, pattern) for pattern in excludes):
-            continue
-        selected.append(path)
-    return selected
+    return compile_patterns(includes).filter_paths(files_at_ref, excludes=compile_patterns(excludes))
 
 
 def metadata_path_for_staging_root(staging_root: Path) -> Path:
     return staging_root / "workflow-core-stage-metadata.json"
 
 
+def load_stage_metadata(staging_root: Path) -> dict | None:
+    metadata_path = metadata_path_for_staging_root(staging_root)
+    if not metadata_path.exists():
+        return None
+    return json.loads(metadata_path.read_text(encoding="utf-8"))
+
+
+def plan_incremental_stage(
+    repo_root: Path,
+    selected_paths: list[str],
+    all_entries: dict[str, TreeEntry],
+    profile_name: str,
+    sync_lock_path: Path | None,
+) -> tuple[dict[str, TreeEntry], dict, list[str]]:
+    tree_entries = {path: all_entries[path] for path in selected_paths if path in all_entries}
+    previous_lock = load_sync_lock(sync_lock_path or default_sync_lock_path(repo_root))
+    if previous_lock is not None and previous_lock.get("profile_name") != profile_name:
+        previous_lock = None
+    installed_entries = list_tree_entries_at_ref(repo_root, "HEAD") if previous_lock and resolve_ref(repo_root, "HEAD") else None
+    incremental_plan = plan_incremental_sync(previous_lock, tree_entries, installed_entries)
+    changed = {*incremental_plan["added_paths"], *incremental_plan["modified_paths"]}
+    return tree_entries, incremental_plan, [path for path in selected_paths if path in changed]
+
+
+def incremental_stage_note(incremental_plan: dict) -> str:
+    if incremental_plan["baseline_release_ref"] is None:
+        return "no usable sync lock found; staged the full export tree"
+    return (
+        f"staged only paths changed since {incremental_plan['baseline_release_ref']}; "
+        f"skipped {incremental_plan['skipped_file_count']} files ({incremental_plan['skipped_bytes']} bytes)"
+    )
+
+
+def stage_from_blob_store(
+    repo_root: Path,
+    release_ref: str,
+    paths: list[str],
+    entries: dict[str, TreeEntry],
+    output_root: Path,
+    keep_releases: int | None,
+    on_event: ProgressCallback | None = None,
+    object_repo: Path | None = None,
+) -> tuple[list[str], dict]:
+    store = BlobStore.for_repo(repo_root)
+    wanted = {path: entries[path] for path in paths}
+    with trace_phase("blob-store-fetch"):
+        fetch_counts = store.fetch_missing(object_repo or repo_root, wanted)
+    with trace_phase("blob-store-assemble"):
+        link_counts = store.assemble(wanted, output_root, on_event=on_event)
+    store.record_release(release_ref, entries)
+    gc_result = store.gc(keep_releases) if keep_releases is not None else None
+    return list(paths), {
+        "store_root": str(store.root.resolve()),
+        **fetch_counts,
+        "hardlinked_paths": link_counts["hardlink"],
+        "copied_paths": link_counts["copy"],
+        "gc": gc_result,
+    }
+
+
+def stage_from_release_bundle(
+    repo_root: Path,
+    release_ref: str,
+    bundle_path: Path,
+    staging_root: Path | None = None,
+    incremental: bool = False,
+    sync_lock_path: Path | None = None,
+    on_event: ProgressCallback | None = None,
+) -> dict:
+    """Stage straight from a release bundle: the index already lists the export tree, so no git objects or patterns are needed."""
+    emit_event(on_event, "phase", phase="load-bundle", state="start")
+    bundle = load_release_bundle(bundle_path)
+    if bundle.get("release_ref") != release_ref:
+        raise RuntimeError(f"release bundle was built for {bundle.get('release_ref')}, not {release_ref}")
+    profile = bundle["profile"]
+    selected_paths = [item["path"] for item in bundle["files"]]
+    emit_event(on_event, "phase", phase="load-bundle", state="done", selected_path_count=len(selected_paths))
+
+    resolved_staging_root = default_staging_root(repo_root, release_ref, staging_root)
+    ensure_empty_output_dir(resolved_staging_root)
+
+    incremental_plan = None
+    tree_entries = None
+    paths_to_write = selected_paths
+    if incremental:
+        tree_entries, incremental_plan, paths_to_write = plan_incremental_stage(
+            repo_root,
+            selected_paths,
+            bundle_tree_entries(bundle),
+            profile["name"],
+            sync_lock_path,
+        )
+
+    emit_event(on_event, "phase", phase="write-paths", state="start", path_count=len(paths_to_write))
+    with trace_phase("write-paths"):
+        written_paths = extract_release_bundle(bundle, paths_to_write, resolved_staging_root, on_event=on_event)
+    emit_event(on_event, "phase", phase="write-paths", state="done", written_path_count=len(written_paths))
+
+    metadata_payload = {
+        "release_ref": release_ref,
+        "source_ref": release_ref,
+        "resolved_source_ref": bundle["resolved_source_ref"],
+        "source_remote": None,
+        "fetched_ref": None,
+        "bundle_path": bundle["index_path"],
+        "manifest_path": bundle["manifest_path"],
+        "profile_name": profile["name"],
+        "profile_status": profile["status"],
+        "profile_purpose": profile["purpose"],
+        "selected_paths": selected_paths,
+        "selected_path_count": len(selected_paths),
+        "written_paths": written_paths,
+        "deferred_paths": profile["deferred_paths"],
+        "notes": profile["notes"],
+        "incremental": incremental_plan,
+        "blob_store": None,
+        "remote_fetch": None,
+        "tree_entries": {path: entry._asdict() for path, entry in tree_entries.items()} if tree_entries is not None else None,
+    }
+    metadata_path = write_json_file(metadata_path_for_staging_root(resolved_staging_root), metadata_payload)
+
+    notes = ["materialized workflow-core export tree from release bundle (sha256-verified)"]
+    if incremental_plan is not None:
+        notes.append(incremental_stage_note(incremental_plan))
+
+    return {
+        "status": "pass",
+        "repo_root": str(repo_root.resolve()),
+        "release_ref": release_ref,
+        "source_ref": release_ref,
+        "resolved_source_ref": bundle["resolved_source_ref"],
+        "source_remote": None,
+        "bundle_path": bundle["index_path"],
+        "profile_name": profile["name"],
+        "staging_root": str(resolved_staging_root),
+        "metadata_path": metadata_path,
+        "selected_path_count": len(selected_paths),
+        "selected_paths": selected_paths,
+        "written_path_count": len(written_paths),
+        "incremental": incremental_plan,
+        "blob_store": None,
+        "remote_fetch": None,
+        "notes": notes,
+    }
+
+
+def remote_fetch_report(mode: str, source_remote: str | None, fetch_log: list[dict], object_repo: Path | None = None) -> dict | None:
+    if not source_remote:
+        return None
+    return {
+        "mode": mode,
+        "object_repo": str(object_repo.resolve()) if object_repo is not None else None,
+        "fetches": fetch_log,
+        "total_bytes": sum(record["bytes"] for record in fetch_log),
+    }
+
+
+@traced("sync-stage")
 def run_sync_stage(
     repo_root: Path,
     release_ref: str,
@@ -79,31 +257,75 @@ def run_sync_stage(
     profile_name: str | None = None,
     staging_root: Path | None = None,
     manifest_path: Path | None = None,
+    incremental: bool = False,
+    sync_lock_path: Path | None = None,
+    bundle_path: Path | None = None,
+    blob_store: bool = False,
+    blob_store_keep_releases: int | None = None,
+    remote_fetch: str = "full",
+    on_event: ProgressCallback | None = None,
 ) -> dict:
     if not str(release_ref or "").strip():
         raise ValueError("release_ref is required")
+    if remote_fetch not in REMOTE_FETCH_MODES:
+        raise ValueError(f"unsupported remote fetch mode: {remote_fetch}")
+    if remote_fetch == "partial" and not source_remote:
+        raise ValueError("--remote-fetch partial requires --source-remote")
+    if bundle_path is not None:
+        if source_remote:
+            raise ValueError("--bundle cannot be combined with --source-remote")
+        if blob_store:
+            raise ValueError("--bundle cannot be combined with --blob-store")
+        return stage_from_release_bundle(
+            repo_root=repo_root,
+            release_ref=release_ref,
+            bundle_path=bundle_path,
+            staging_root=staging_root,
+            incremental=incremental,
+            sync_lock_path=sync_lock_path,
+            on_event=on_event,
+        )
 
     manifest_rel_path = normalize_path(
         str((manifest_path or manifest_default_path(repo_root)).resolve().relative_to(repo_root.resolve()))
     )
     requested_source_ref = source_ref or release_ref
     fetched_ref: str | None = None
+    partial_fetch = remote_fetch == "partial"
+    fetch_log: list[dict] = []
 
+    emit_event(on_event, "phase", phase="resolve-source-ref", state="start")
+    # partial 模式的 shallow / promisor objects 只進 `.workflow-core/` 下的 scratch repo，git 讀取都改走 object_repo。
+    object_repo = partial_fetch_object_repo(repo_root, source_remote) if partial_fetch else repo_root
+    fetch_remote = PARTIAL_FETCH_REMOTE if partial_fetch else source_remote
     if source_remote:
         fetched_ref = f"refs/workflow-core/fetched/{safe_ref_label(source_remote)}-{safe_ref_label(requested_source_ref)}"
-        resolved_source_ref = fetch_ref(repo_root, source_remote, requested_source_ref, fetched_ref)
+        resolved_source_ref = fetch_ref(
+            object_repo,
+            fetch_remote,
+            requested_source_ref,
+            fetched_ref,
+            depth=1 if partial_fetch else None,
+            blob_filter=PARTIAL_CLONE_FILTER if partial_fetch else None,
+            fetch_log=fetch_log,
+        )
+        if partial_fetch:
+            # 只有 commit 與 trees 進來；先補 manifest blob，profile 選出路徑後再一次補齊那些 blobs。
+            fetch_missing_blobs(object_repo, fetch_remote, resolved_source_ref, [manifest_rel_path], fetch_log)
     else:
         resolved_source_ref = resolve_ref(repo_root, requested_source_ref)
         if resolved_source_ref is None:
             raise RuntimeError(f"source ref does not resolve: {requested_source_ref}")
 
-    manifest_text = read_text_at_ref(repo_root, resolved_source_ref, manifest_rel_path)
+    emit_event(on_event, "phase", phase="resolve-source-ref", state="done", resolved_source_ref=resolved_source_ref)
+
+    manifest_text = read_text_at_ref(object_repo, resolved_source_ref, manifest_rel_path)
     manifest = load_manifest_text(manifest_text, source_label=f"{resolved_source_ref}:{manifest_rel_path}")
     resolved_profile_name = profile_name or get_default_export_profile_name(manifest)
     profile = get_export_profile(manifest, resolved_profile_name)
 
     effective_excludes = [*profile["excludes"], *get_state_patterns(manifest)]
-    files_at_ref = list_files_at_ref(repo_root, resolved_source_ref)
+    files_at_ref = list_files_at_ref(object_repo, resolved_source_ref)
     selected_paths = select_export_paths(files_at_ref, profile["includes"], effective_excludes)
     if not selected_paths:
         return {
@@ -113,44 +335,101 @@ def run_sync_stage(
             "source_ref": requested_source_ref,
             "resolved_source_ref": resolved_source_ref,
             "source_remote": source_remote,
+            "bundle_path": None,
             "profile_name": resolved_profile_name,
             "staging_root": None,
             "metadata_path": None,
             "selected_path_count": 0,
             "selected_paths": [],
+            "written_path_count": 0,
+            "incremental": None,
+            "blob_store": None,
+            "remote_fetch": remote_fetch_report(remote_fetch, source_remote, fetch_log, object_repo if partial_fetch else None),
             "notes": ["export profile matched no files at the requested source ref"],
         }
 
+    if partial_fetch:
+        with trace_phase("fetch-selected-blobs"):
+            fetch_missing_blobs(object_repo, fetch_remote, resolved_source_ref, selected_paths, fetch_log)
+
+    def load_tree_entries() -> dict[str, TreeEntry]:
+        if partial_fetch:
+            return list_tree_entries_for_paths(object_repo, resolved_source_ref, selected_paths)
+        return list_tree_entries_at_ref(object_repo, resolved_source_ref)
+
     resolved_staging_root = default_staging_root(repo_root, release_ref, staging_root)
     ensure_empty_output_dir(resolved_staging_root)
 
-    written_paths: list[str] = []
-    for rel_path in selected_paths:
-        target_path = resolved_staging_root / rel_path
-        target_path.parent.mkdir(parents=True, exist_ok=True)
-        target_path.write_bytes(read_bytes_at_ref(repo_root, resolved_source_ref, rel_path))
-        written_paths.append(rel_path)
+    incremental_plan = None
+    tree_entries = None
+    paths_to_write = selected_paths
+    if incremental:
+        tree_entries, incremental_plan, paths_to_write = plan_incremental_stage(
+            repo_root,
+            selected_paths,
+            load_tree_entries(),
+            profile["name"],
+            sync_lock_path,
+        )
+
+    blob_store_stats = None
+    emit_event(on_event, "phase", phase="write-paths", state="start", path_count=len(paths_to_write))
+    with trace_phase("write-paths"):
+        if blob_store:
+            all_entries = tree_entries if tree_entries is not None else load_tree_entries()
+            written_paths, blob_store_stats = stage_from_blob_store(
+                repo_root,
+                release_ref,
+                paths_to_write,
+                {path: all_entries[path] for path in selected_paths},
+                resolved_staging_root,
+                blob_store_keep_releases,
+                on_event=on_event,
+                object_repo=object_repo,
+            )
+        else:
+            written_paths = write_paths_from_ref(object_repo, resolved_source_ref, paths_to_write, resolved_staging_root, on_event=on_event)
+    emit_event(on_event, "phase", phase="write-paths", state="done", written_path_count=len(written_paths))
 
+    fetch_report = remote_fetch_report(remote_fetch, source_remote, fetch_log, object_repo if partial_fetch else None)
     metadata_payload = {
         "release_ref": release_ref,
         "source_ref": requested_source_ref,
         "resolved_source_ref": resolved_source_ref,
         "source_remote": source_remote,
         "fetched_ref": fetched_ref,
+        "bundle_path": None,
         "manifest_path": manifest_rel_path,
         "profile_name": profile["name"],
         "profile_status": profile["status"],
         "profile_purpose": profile["purpose"],
-        "selected_paths": written_paths,
-        "selected_path_count": len(written_paths),
+        "selected_paths": selected_paths,
+        "selected_path_count": len(selected_paths),
+        "written_paths": written_paths,
         "deferred_paths": profile["deferred_paths"],
         "notes": profile["notes"],
+        "incremental": incremental_plan,
+        "blob_store": blob_store_stats,
+        "remote_fetch": fetch_report,
+        "tree_entries": {path: entry._asdict() for path, entry in tree_entries.items()} if tree_entries is not None else None,
     }
     metadata_path = write_json_file(metadata_path_for_staging_root(resolved_staging_root), metadata_payload)
 
     notes = ["materialized workflow-core export tree into staging root"]
     if source_remote:
         notes.append("fetched source ref from remote before staging export tree")
+    if partial_fetch:
+        notes.append(
+            f"partial remote fetch (depth=1, {PARTIAL_CLONE_FILTER}) transferred {fetch_report['total_bytes']} bytes "
+            f"over {len(fetch_report['fetches'])} fetches"
+        )
+    if incremental_plan is not None:
+        notes.append(incremental_stage_note(incremental_plan))
+    if blob_store_stats is not None:
+        notes.append(
+            f"assembled staging root from blob store; fetched {blob_store_stats['fetched_objects']} new objects, "
+            f"reused {blob_store_stats['reused_objects']}"
+        )
 
     return {
         "status": "pass",
@@ -159,11 +438,16 @@ def run_sync_stage(
         "source_ref": requested_source_ref,
         "resolved_source_ref": resolved_source_ref,
         "source_remote": source_remote,
+        "bundle_path": None,
         "profile_name": profile["name"],
         "staging_root": str(resolved_staging_root),
         "metadata_path": metadata_path,
-        "selected_path_count": len(written_paths),
-        "selected_paths": written_paths,
+        "selected_path_count": len(selected_paths),
+        "selected_paths": selected_paths,
+        "written_path_count": len(written_paths),
+        "incremental": incremental_plan,
+        "blob_store": blob_store_stats,
+        "remote_fetch": fetch_report,
         "notes": notes,
     }
 
@@ -176,11 +460,31 @@ def format_text_report(result: dict) -> str:
         f"source_ref: {result['source_ref']}",
         f"resolved_source_ref: {result['resolved_source_ref']}",
         f"source_remote: {result['source_remote']}",
+        f"bundle_path: {result.get('bundle_path')}",
         f"profile_name: {result['profile_name']}",
         f"staging_root: {result['staging_root']}",
         f"metadata_path: {result['metadata_path']}",
         f"selected_path_count: {result['selected_path_count']}",
+        f"written_path_count: {result['written_path_count']}",
     ]
+    if result.get("incremental"):
+        plan = result["incremental"]
+        lines.append(f"incremental_baseline_release_ref: {plan['baseline_release_ref']}")
+        lines.append(
+            f"incremental_changes: added={len(plan['added_paths'])} modified={len(plan['modified_paths'])} deleted={len(plan['deleted_paths'])}"
+        )
+        lines.append(f"incremental_skipped: files={plan['skipped_file_count']} bytes={plan['skipped_bytes']}")
+    if result.get("blob_store"):
+        store = result["blob_store"]
+        lines.append(
+            f"blob_store: fetched={store['fetched_objects']} ({store['fetched_bytes']} bytes) reused={store['reused_objects']} "
+            f"hardlinked={store['hardlinked_paths']} copied={store['copied_paths']}"
+        )
+    if result.get("remote_fetch"):
+        report = result["remote_fetch"]
+        lines.append(f"remote_fetch: mode={report['mode']} total_bytes={report['total_bytes']}")
+        for record in report["fetches"]:
+            lines.append(f"  - {record['kind']}: {record['bytes']} bytes")
     if result["selected_paths"]:
         lines.append("selected_paths:")
         for item in result["selected_paths"]:
@@ -211,7 +515,19 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--profile", default=None, help="export profile name；未指定時使用 manifest active profile")
     parser.add_argument("--staging-root", type=Path, default=None, help="staging root；未指定時預設為 .workflow-core/staging/<release-ref>")
     parser.add_argument("--manifest", type=Path, default=None, help="manifest 路徑；預設為 repo-root/core_ownership_manifest.yml")
+    parser.add_argument("--incremental", action="store_true", help="依 sync lock 的 tree OID 只 stage 新增或變更的路徑")
+    parser.add_argument("--sync-lock", type=Path, default=None, help="sync lock 路徑；預設為 <repo-root>/.workflow-core/sync-lock.json")
+    parser.add_argument("--bundle", type=Path, default=None, help="release create --bundle 產生的 bundle index JSON；指定時直接從 bundle stage，不需 git objects")
+    parser.add_argument("--blob-store", action="store_true", help="經由 .workflow-core/objects 的 OID blob store 以 hardlink 組裝 staging root，只抓取本 release 新增的 blobs")
+    parser.add_argument("--blob-store-keep-releases", type=int, default=None, help="stage 後對 blob store 執行 gc，只保留最近使用的 N 個 release")
+    parser.add_argument(
+        "--remote-fetch",
+        choices=list(REMOTE_FETCH_MODES),
+        default="full",
+        help="搭配 --source-remote：partial 以 --depth=1 與 blob:none filter fetch，只補抓 export profile 選到的 blobs",
+    )
     parser.add_argument("--json", action="store_true", help="輸出 JSON")
+    parser.add_argument("--ndjson", action="store_true", help="逐行輸出 NDJSON progress events，最後附上精簡 summary record")
     return parser
 
 
@@ -229,16 +545,28 @@ def main(argv: list[str] | None = None) -> int:
             profile_name=args.profile,
             staging_root=args.staging_root.resolve() if args.staging_root else None,
             manifest_path=manifest_path,
+            incremental=bool(args.incremental),
+            sync_lock_path=args.sync_lock.resolve() if args.sync_lock else None,
+            bundle_path=args.bundle.resolve() if args.bundle else None,
+            blob_store=bool(args.blob_store),
+            blob_store_keep_releases=args.blob_store_keep_releases,
+            remote_fetch=args.remote_fetch,
+            on_event=write_ndjson_record if args.ndjson else None,
         )
     except Exception as exc:
-        if args.json:
+        if args.ndjson:
+            write_ndjson_error(exc)
+        elif args.json:
             print(json.dumps({"status": "error", "error": str(exc)}, ensure_ascii=False, indent=2), file=sys.stderr)
         else:
             print(f"workflow-core sync stage error: {exc}", file=sys.stderr)
         return EXIT_ERROR
 
-    if args.json:
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+    timings = collect_timings()
+    if args.ndjson:
+        write_ndjson_record({"event": "summary", **summarize_result_for_stream(result), "manifest_cache": manifest_cache_stats(), "timings": timings})
+    elif args.json:
+        print(json.dumps({**result, "manifest_cache": manifest_cache_stats(), "timings": timings}, ensure_ascii=False, indent=2))
     else:
         print(format_text_report(result))
     return exit_code_for_status(result["status"])
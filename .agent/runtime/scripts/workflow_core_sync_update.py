@@ -7,17 +7,37 @@ import argparse
 import json
 import shutil
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable
 
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
-from workflow_core_manifest import manifest_default_path  # noqa: E402
-from workflow_core_sync_apply import run_sync_apply  # noqa: E402
+if __name__ == "__main__":
+    from workflow_core_daemon import exit_if_delegated
+
+    exit_if_delegated("sync_update")
+
+from workflow_core_contracts import (  # noqa: E402
+    DEFAULT_WORKTREE_PRUNE_PATTERNS,
+    REMOTE_FETCH_MODES,
+    evaluate_manifest_contract,
+    git_blob_oid,
+    is_skipped_worktree_file,
+)
+from workflow_core_manifest import compile_patterns, get_worktree_prune_patterns, manifest_cache_stats, manifest_default_path  # noqa: E402
+from workflow_core_pipeline import DEFAULT_PIPELINE_QUEUE_SIZE, DEFAULT_PIPELINE_WORKERS, PipelineStage, run_pipeline  # noqa: E402
+from workflow_core_projection import target_is_current, write_projected_file  # noqa: E402
+from workflow_core_sync_apply import run_sync_apply, select_sync_mode  # noqa: E402
+from workflow_core_sync_precheck import run_sync_precheck  # noqa: E402
 from workflow_core_sync_stage import default_staging_root, run_sync_stage  # noqa: E402
 from workflow_core_sync_verify import run_sync_verify  # noqa: E402
+from workflow_core_tracing import TRACER, collect_timings, traced  # noqa: E402
+from workflow_core_transaction import ApplyTransaction, recover_pending_transactions  # noqa: E402
 
 
 EXIT_PASS = 0
@@ -48,6 +68,124 @@ def prepare_staging_root(repo_root: Path, release_ref: str, staging_root: Path |
     return resolved, True
 
 
+def projected_path_filter(contract: dict) -> Callable[[str], bool]:
+    """Same selection projection applies to the staged tree: managed, not pruned, not a skipped build artifact."""
+    managed_set = compile_patterns(contract["managed_patterns"])
+    prune_set = compile_patterns([*DEFAULT_WORKTREE_PRUNE_PATTERNS, *get_worktree_prune_patterns(contract["manifest"])])
+    return lambda path: managed_set.matches(path) and not prune_set.matches(path) and not is_skipped_worktree_file(path)
+
+
+def run_pipelined_stage(
+    repo_root: Path,
+    manifest_path: Path,
+    release_ref: str,
+    staging_root: Path,
+    contract: dict,
+    stage_kwargs: dict,
+    workers: int,
+    queue_size: int,
+) -> tuple[dict, dict, ApplyTransaction, dict]:
+    """Stage → project → verify path by path while the apply precheck runs alongside.
+
+    Each path stage writes (as it lands, including blob-store and bundle assembly) flows through a bounded queue
+    to projection workers, which write changed managed files into an apply transaction, and on to a verify consumer
+    that hashes every staged copy (or the unchanged repo file) against the OID the release tree records for it.
+    Nothing in the repo changes here: sync apply commits the transaction only after the precheck gate passes.
+    """
+    is_projected = projected_path_filter(contract)
+    transaction = ApplyTransaction.begin(repo_root)
+    transaction_lock = threading.Lock()
+
+    def project(written: tuple[str, str]) -> tuple[str, str, Path, str] | None:
+        rel_path, oid = written
+        if not is_projected(rel_path):
+            return None
+        source_path = staging_root / rel_path
+        if target_is_current(source_path, repo_root / rel_path):
+            return rel_path, "unchanged", repo_root / rel_path, oid
+        with transaction_lock:
+            staged_path = transaction.stage_write(rel_path)
+        write_projected_file(source_path, staged_path)
+        return rel_path, "staged", staged_path, oid
+
+    def verify(item: tuple[str, str, Path, str]) -> tuple[str, str, bool]:
+        rel_path, action, checked_path, oid = item
+        # 以 release tree 的 OID 為準，而不是和 staging 來源互相比對。
+        try:
+            aligned = git_blob_oid(checked_path.read_bytes(), len(oid)) == oid
+        except OSError:
+            aligned = False
+        return rel_path, action, aligned
+
+    def produce(emit: Callable[[tuple[str, str]], None]) -> dict:
+        def forward(event: dict) -> None:
+            if event.get("event") == "path-written":
+                emit((event["path"], event["oid"]))
+
+        return run_sync_stage(**stage_kwargs, on_event=forward)
+
+    parent_stack = TRACER.current_stack()
+
+    def run_gate() -> dict:
+        with TRACER.adopt(parent_stack):
+            return run_sync_precheck(repo_root=repo_root, release_ref=release_ref, manifest_path=manifest_path)
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="sync-precheck") as gate:
+        precheck_future = gate.submit(run_gate)
+        try:
+            stage_result, outcomes, report = run_pipeline(
+                produce,
+                [PipelineStage("project", project, workers), PipelineStage("verify", verify, 1)],
+                queue_size=queue_size,
+            )
+        except BaseException:
+            transaction.discard()
+            raise
+        precheck = precheck_future.result()
+
+    report.update(
+        {
+            "workers": workers,
+            "staged_paths": sorted(path for path, action, _ in outcomes if action == "staged"),
+            "unchanged_path_count": sum(1 for _, action, _ in outcomes if action == "unchanged"),
+            "misaligned_paths": sorted(path for path, _, aligned in outcomes if not aligned),
+        }
+    )
+    return stage_result, precheck, transaction, report
+
+
+def apply_and_verify_staged_release(
+    repo_root: Path,
+    manifest_path: Path,
+    release_ref: str,
+    staging_root: Path,
+    **apply_kwargs,
+) -> dict:
+    """Apply then verify one repo against an already staged export tree.
+
+    Module-level (and so picklable by name) because the fan-out driver runs it once per downstream in a process pool.
+    """
+    apply_result = run_sync_apply(repo_root=repo_root, manifest_path=manifest_path, release_ref=release_ref, staging_root=staging_root, **apply_kwargs)
+    prestaged_transaction = apply_kwargs.get("prestaged_transaction")
+    if prestaged_transaction is not None:
+        # apply 在 precheck 未通過等提早結束時不會 commit；已 commit 時 discard 不會有作用。
+        prestaged_transaction.discard()
+    notes = list(apply_result.get("notes", []))
+    if apply_result["status"] != "pass":
+        return {"status": "fail", "failed_stage": "sync-apply", "apply_result": apply_result, "verify_result": None, "notes": notes}
+
+    verify_result = run_sync_verify(repo_root=repo_root, manifest_path=manifest_path, release_ref=release_ref, staging_root=staging_root)
+    notes.extend(verify_result.get("notes", []))
+    return {
+        "status": verify_result["status"],
+        "failed_stage": None if verify_result["status"] == "pass" else "sync-verify",
+        "apply_result": apply_result,
+        "verify_result": verify_result,
+        "notes": notes,
+    }
+
+
+@traced("sync-update")
 def run_sync_update(
     repo_root: Path,
     manifest_path: Path,
@@ -62,6 +200,15 @@ def run_sync_update(
     setup_obsidian_restricted_access: bool = False,
     obsidian_mount_output_dir: Path | None = None,
     force_obsidian_mount_sample: bool = False,
+    incremental: bool = False,
+    sync_lock_path: Path | None = None,
+    bundle_path: Path | None = None,
+    blob_store: bool = False,
+    blob_store_keep_releases: int | None = None,
+    remote_fetch: str = "full",
+    pipeline: bool = False,
+    pipeline_workers: int = DEFAULT_PIPELINE_WORKERS,
+    pipeline_queue_size: int = DEFAULT_PIPELINE_QUEUE_SIZE,
 ) -> dict:
     effective_staging_root, replaced_existing_staging_root = prepare_staging_root(
         repo_root=repo_root,
@@ -70,21 +217,64 @@ def run_sync_update(
         replace_staging_root=replace_staging_root,
     )
 
-    stage_result = run_sync_stage(
-        repo_root=repo_root,
-        release_ref=release_ref,
-        source_ref=source_ref,
-        source_remote=source_remote,
-        profile_name=profile_name,
-        staging_root=effective_staging_root,
-        manifest_path=manifest_path,
-    )
+    stage_kwargs = {
+        "repo_root": repo_root,
+        "release_ref": release_ref,
+        "source_ref": source_ref,
+        "source_remote": source_remote,
+        "profile_name": profile_name,
+        "staging_root": effective_staging_root,
+        "manifest_path": manifest_path,
+        "incremental": incremental,
+        "sync_lock_path": sync_lock_path,
+        "bundle_path": bundle_path,
+        "blob_store": blob_store,
+        "blob_store_keep_releases": blob_store_keep_releases,
+        "remote_fetch": remote_fetch,
+    }
+    pipeline_notes: list[str] = []
+    pipeline_report = None
+    precheck_result = None
+    prestaged_transaction = None
+    stage_result = None
+    if pipeline:
+        contract = evaluate_manifest_contract(repo_root, manifest_path)
+        if select_sync_mode(sync_mode, contract["projection_artifact_path"]) == "staging-plus-projection":
+            # 先處理上次中斷的 transaction，避免 apply 把這次預先 stage 的 transaction 誤當成殘留。
+            for recovered in recover_pending_transactions(repo_root):
+                pipeline_notes.append(f"{recovered['outcome']} interrupted apply transaction {recovered['id']} ({recovered['path_count']} paths)")
+            stage_result, precheck_result, prestaged_transaction, pipeline_report = run_pipelined_stage(
+                repo_root,
+                manifest_path,
+                release_ref,
+                effective_staging_root,
+                contract,
+                stage_kwargs,
+                max(pipeline_workers, 1),
+                pipeline_queue_size,
+            )
+            if pipeline_report["misaligned_paths"]:
+                prestaged_transaction.discard()
+                prestaged_transaction = None
+                pipeline_notes.append("pipelined projection copies did not match the release tree OIDs; fell back to sequential projection")
+            else:
+                pipeline_notes.append(
+                    f"pipelined stage/project/verify with {pipeline_report['workers']} workers; "
+                    f"prestaged {len(pipeline_report['staged_paths'])} changed managed paths"
+                )
+        else:
+            pipeline_notes.append("pipeline needs staging-plus-projection sync mode; ran phases sequentially")
+    if stage_result is None:
+        stage_result = run_sync_stage(**stage_kwargs)
 
     notes = list(stage_result.get("notes", []))
     if replaced_existing_staging_root:
         notes.append("replaced existing staging root before running one-click sync")
+    notes.extend(pipeline_notes)
 
     if stage_result["status"] != "pass":
+        if prestaged_transaction is not None:
+            prestaged_transaction.discard()
         return {
             "status": "fail",
             "repo_root": str(repo_root.resolve()),
@@ -100,50 +290,29 @@ def run_sync_update(
             "stage_result": stage_result,
             "apply_result": None,
             "verify_result": None,
+            "pipeline": pipeline_report,
             "notes": notes,
         }
 
-    apply_result = run_sync_apply(
+    outcome = apply_and_verify_staged_release(
         repo_root=repo_root,
         manifest_path=manifest_path,
         release_ref=release_ref,
+        staging_root=effective_staging_root,
         sync_mode=sync_mode,
         projection_script=projection_script,
-        staging_root=effective_staging_root,
         emit_obsidian_restricted_mount_sample=setup_obsidian_restricted_access,
         obsidian_mount_output_dir=obsidian_mount_output_dir,
         force_obsidian_mount_sample=force_obsidian_mount_sample,
+        incremental=incremental,
+        sync_lock_path=sync_lock_path,
+        precheck_result=precheck_result,
+        prestaged_transaction=prestaged_transaction,
     )
-    notes.extend(apply_result.get("notes", []))
-    if apply_result["status"] != "pass":
-        return {
-            "status": "fail",
-            "repo_root": str(repo_root.resolve()),
-            "manifest_path": str(manifest_path.resolve()),
-            "release_ref": release_ref,
-            "source_ref": source_ref or release_ref,
-            "source_remote": source_remote,
-            "staging_root": str(effective_staging_root),
-            "replaced_existing_staging_root": replaced_existing_staging_root,
-            "setup_obsidian_restricted_access": setup_obsidian_restricted_access,
-            "obsidian_mount_sample_generated": bool(apply_result.get("obsidian_mount_sample_generated")),
-            "failed_stage": "sync-apply",
-            "stage_result": stage_result,
-            "apply_result": apply_result,
-            "verify_result": None,
-            "notes": notes,
-        }
-
-    verify_result = run_sync_verify(
-        repo_root=repo_root,
-        manifest_path=manifest_path,
-        release_ref=release_ref,
-        staging_root=effective_staging_root,
-    )
-    notes.extend(verify_result.get("notes", []))
-
+    apply_result = outcome["apply_result"]
+    notes.extend(outcome["notes"])
     return {
-        "status": verify_result["status"],
+        "status": outcome["status"],
         "repo_root": str(repo_root.resolve()),
         "manifest_path": str(manifest_path.resolve()),
         "release_ref": release_ref,
@@ -153,10 +322,11 @@ def run_sync_update(
         "replaced_existing_staging_root": replaced_existing_staging_root,
         "setup_obsidian_restricted_access": setup_obsidian_restricted_access,
         "obsidian_mount_sample_generated": bool(apply_result.get("obsidian_mount_sample_generated")),
-        "failed_stage": None if verify_result["status"] == "pass" else "sync-verify",
+        "failed_stage": outcome["failed_stage"],
         "stage_result": stage_result,
         "apply_result": apply_result,
-        "verify_result": verify_result,
+        "verify_result": outcome["verify_result"],
+        "pipeline": pipeline_report,
         "notes": notes,
     }
 
@@ -181,6 +351,12 @@ def format_text_report(result: dict) -> str:
         lines.append(f"sync_apply_status: {result['apply_result']['status']}")
     if result.get("verify_result"):
         lines.append(f"sync_verify_status: {result['verify_result']['status']}")
+    if result.get("pipeline"):
+        report = result["pipeline"]
+        lines.append(
+            f"pipeline: workers={report['workers']} wall_ms={report['wall_ms']} staged={len(report['staged_paths'])} "
+            f"unchanged={report['unchanged_path_count']} misaligned={len(report['misaligned_paths'])}"
+        )
     if result["notes"]:
         lines.append("notes:")
         for item in result["notes"]:
@@ -231,6 +407,24 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="若 sample 已存在且內容不同，允許覆蓋",
     )
+    parser.add_argument("--incremental", action="store_true", help="依 sync lock 的 tree OID 只同步新增、變更或刪除的路徑")
+    parser.add_argument("--sync-lock", type=Path, default=None, help="sync lock 路徑；預設為 <repo-root>/.workflow-core/sync-lock.json")
+    parser.add_argument("--bundle", type=Path, default=None, help="release bundle index JSON；指定時 stage 直接讀 bundle，不需 fetch upstream")
+    parser.add_argument("--blob-store", action="store_true", help="stage 時經由 .workflow-core/objects 的 OID blob store 以 hardlink 組裝 staging root")
+    parser.add_argument("--blob-store-keep-releases", type=int, default=None, help="stage 後對 blob store 執行 gc，只保留最近使用的 N 個 release")
+    parser.add_argument(
+        "--remote-fetch",
+        choices=list(REMOTE_FETCH_MODES),
+        default="full",
+        help="搭配 --source-remote：partial 以 --depth=1 與 blob:none filter fetch，只補抓 export profile 選到的 blobs",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="以有界 queue 串接 stage → projection → verify，並在 stage 期間同時執行 apply precheck（需 staging-plus-projection 模式）",
+    )
+    parser.add_argument("--pipeline-workers", type=int, default=DEFAULT_PIPELINE_WORKERS, help="pipeline 中 projection worker 數量")
+    parser.add_argument("--pipeline-queue-size", type=int, default=DEFAULT_PIPELINE_QUEUE_SIZE, help="pipeline 各階段之間 queue 的容量上限")
     parser.add_argument("--json", action="store_true", help="輸出 JSON")
     return parser
 
@@ -255,6 +449,15 @@ def main(argv: list[str] | None = None) -> int:
             setup_obsidian_restricted_access=bool(args.setup_obsidian_restricted_access),
             obsidian_mount_output_dir=args.obsidian_mount_output_dir.resolve() if args.obsidian_mount_output_dir else None,
             force_obsidian_mount_sample=bool(args.force_obsidian_mount_sample),
+            incremental=bool(args.incremental),
+            sync_lock_path=args.sync_lock.resolve() if args.sync_lock else None,
+            bundle_path=args.bundle.resolve() if args.bundle else None,
+            blob_store=bool(args.blob_store),
+            blob_store_keep_releases=args.blob_store_keep_releases,
+            remote_fetch=args.remote_fetch,
+            pipeline=bool(args.pipeline),
+            pipeline_workers=args.pipeline_workers,
+            pipeline_queue_size=args.pipeline_queue_size,
         )
     except Exception as exc:
         if args.json:
@@ -263,8 +466,9 @@ def main(argv: list[str] | None = None) -> int:
             print(f"workflow-core sync update error: {exc}", file=sys.stderr)
         return EXIT_ERROR
 
+    timings = collect_timings()
     if args.json:
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+        print(json.dumps({**result, "manifest_cache": manifest_cache_stats(), "timings": timings}, ensure_ascii=False, indent=2))
     else:
         print(format_text_report(result))
     return exit_code_for_status(result["status"])
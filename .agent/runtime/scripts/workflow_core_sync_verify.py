@@ -4,9 +4,10 @@
 from __future__ import annotations
 
 import argparse
-import importlib.util
 import json
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
@@ -14,9 +15,26 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
-from workflow_core_contracts import evaluate_manifest_contract, run_shell_command, worktree_path_matches_ref  # noqa: E402
-from workflow_core_manifest import manifest_default_path  # noqa: E402
+if __name__ == "__main__":
+    from workflow_core_daemon import exit_if_delegated
+
+    exit_if_delegated("sync_verify")
+
+from workflow_core_contracts import (  # noqa: E402
+    ProgressCallback,
+    emit_event,
+    evaluate_manifest_contract,
+    files_have_same_content,
+    load_script_module,
+    paths_matching_ref,
+    run_shell_command,
+    summarize_result_for_stream,
+    write_ndjson_record,
+)
+from workflow_core_manifest import compile_patterns, manifest_cache_stats, manifest_default_path  # noqa: E402
 from workflow_core_sync_precheck import run_sync_precheck  # noqa: E402
+from workflow_core_sync_stage import load_stage_metadata  # noqa: E402
+from workflow_core_tracing import collect_timings, traced  # noqa: E402
 
 
 EXIT_PASS = 0
@@ -26,22 +44,35 @@ EXIT_ERROR = 30
 
 
 def load_module(file_path: Path, module_name: str):
-    spec = importlib.util.spec_from_file_location(module_name, file_path)
-    if spec is None or spec.loader is None:
-        raise RuntimeError(f"unable to load module: {file_path}")
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
+    return load_script_module(file_path, module_name)
 
 
 def worktree_path_matches_staging_root(repo_root: Path, staging_root: Path, path: str) -> bool:
     worktree_path = repo_root / path
     source_path = staging_root / path
-    if not worktree_path.exists() or not source_path.exists():
+    if not worktree_path.is_file() or not source_path.is_file():
         return False
-    return worktree_path.read_bytes() == source_path.read_bytes()
+    return files_have_same_content(worktree_path, source_path)
+
+
+def paths_matching_staging_root(repo_root: Path, staging_root: Path, paths: list[str], max_workers: int | None = None) -> list[str]:
+    if len(paths) < 2:
+        return [path for path in paths if worktree_path_matches_staging_root(repo_root, staging_root, path)]
+    workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        matches = list(executor.map(lambda path: worktree_path_matches_staging_root(repo_root, staging_root, path), paths))
+    return [path for path, matched in zip(paths, matches) if matched]
 
 
+def release_deleted_managed_paths(staging_root: Path, managed_patterns: list[str]) -> list[str]:
+    metadata = load_stage_metadata(staging_root)
+    plan = metadata.get("incremental") if metadata else None
+    if not plan:
+        return []
+    return compile_patterns(managed_patterns).filter_paths(plan.get("deleted_paths", []))
+
+
+@traced("sync-verify")
 def run_sync_verify(
     repo_root: Path,
     manifest_path: Path,
@@ -50,28 +81,32 @@ def run_sync_verify(
     preflight_command: str | None = None,
     smoke_command: str | None = None,
     staging_root: Path | None = None,
+    on_event: ProgressCallback | None = None,
 ) -> dict:
     contract = evaluate_manifest_contract(repo_root, manifest_path, extra_required_live_paths=required_live_paths)
     failures: list[str] = []
     notes: list[str] = []
     preflight_context_notes: list[str] = []
+    deleted_paths = release_deleted_managed_paths(staging_root, contract["managed_patterns"]) if staging_root is not None else []
 
+    emit_event(on_event, "phase", phase="preflight", state="start")
     if preflight_command:
         preflight_ok, preflight_output = run_shell_command(repo_root, preflight_command)
     else:
         precheck = run_sync_precheck(repo_root=repo_root, release_ref=release_ref, manifest_path=manifest_path)
         if precheck["core_divergence_paths"]:
             if staging_root is not None:
-                aligned_paths = [
-                    path for path in precheck["core_divergence_paths"] if worktree_path_matches_staging_root(repo_root, staging_root, path)
-                ]
+                aligned_paths = {
+                    *paths_matching_staging_root(repo_root, staging_root, precheck["core_divergence_paths"]),
+                    *(path for path in deleted_paths if not (repo_root / path).exists()),
+                }
                 context_label = "staged export tree"
             else:
-                aligned_paths = [
-                    path for path in precheck["core_divergence_paths"] if worktree_path_matches_ref(repo_root, release_ref, path)
-                ]
+                aligned_paths = set(paths_matching_ref(repo_root, release_ref, precheck["core_divergence_paths"]))
                 context_label = "requested release ref"
             unexpected_paths = [path for path in precheck["core_divergence_paths"] if path not in aligned_paths]
+            for path in precheck["core_divergence_paths"]:
+                emit_event(on_event, "managed-path", path=path, action="verify", aligned=path in aligned_paths)
             if unexpected_paths:
                 preflight_ok = False
                 preflight_output = "; ".join(
@@ -88,6 +123,9 @@ def run_sync_verify(
             preflight_ok = precheck["status"] != "fail"
             preflight_output = "; ".join(precheck.get("notes", []))
 
+    emit_event(on_event, "phase", phase="preflight", state="done", ok=preflight_ok)
+
+    emit_event(on_event, "phase", phase="portable-smoke", state="start")
     if smoke_command:
         portable_smoke_ok, smoke_output = run_shell_command(repo_root, smoke_command)
     else:
@@ -95,6 +133,9 @@ def run_sync_verify(
         smoke_result = smoke_module.run_portable_smoke(repo_root=repo_root, manifest_path=manifest_path)
         portable_smoke_ok = smoke_result["status"] == "pass"
         smoke_output = "; ".join(smoke_result.get("notes", []))
+    emit_event(on_event, "phase", phase="portable-smoke", state="done", ok=portable_smoke_ok)
+
+    lingering_deleted_paths = [path for path in deleted_paths if (repo_root / path).exists()]
 
     live_paths_ok = contract["live_path_contract_ok"]
     agent_entry_contract_ok = contract["agent_entry_present"]
@@ -112,6 +153,8 @@ def run_sync_verify(
         failures.append(f"portable smoke failed: {smoke_output}")
     if not skills_split_ok:
         failures.append("skills split contract is violated")
+    if lingering_deleted_paths:
+        failures.append(f"managed paths removed by the release are still present: {', '.join(lingering_deleted_paths)}")
 
     status = "fail" if failures else "pass"
     if status == "pass":
@@ -172,6 +215,7 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--smoke-command", default=None, help="自訂 smoke command")
     parser.add_argument("--staging-root", type=Path, default=None, help="可選的 staged/export tree root，用於獨立 downstream repo verify")
     parser.add_argument("--json", action="store_true", help="輸出 JSON")
+    parser.add_argument("--ndjson", action="store_true", help="逐行輸出 NDJSON progress events，最後附上精簡 summary record")
     return parser
 
 
@@ -189,16 +233,20 @@ def main(argv: list[str] | None = None) -> int:
             preflight_command=args.preflight_command,
             smoke_command=args.smoke_command,
             staging_root=args.staging_root.resolve() if args.staging_root else None,
+            on_event=write_ndjson_record if args.ndjson else None,
         )
     except Exception as exc:
-        if args.json:
+        if args.json or args.ndjson:
             print(json.dumps({"status": "error", "error": str(exc)}, ensure_ascii=False, indent=2), file=sys.stderr)
         else:
             print(f"workflow-core sync verify error: {exc}", file=sys.stderr)
         return EXIT_ERROR
 
-    if args.json:
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+    timings = collect_timings()
+    if args.ndjson:
+        write_ndjson_record({"event": "summary", **summarize_result_for_stream(result), "manifest_cache": manifest_cache_stats(), "timings": timings})
+    elif args.json:
+        print(json.dumps({**result, "manifest_cache": manifest_cache_stats(), "timings": timings}, ensure_ascii=False, indent=2))
     else:
         print(format_text_report(result))
     return exit_code_for_status(result["status"])
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Lightweight phase tracing for workflow-core wrappers (wall/CPU time, git subprocesses, bytes, peak RSS)."""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+
+TRACE_FILE_ENV = "WORKFLOW_CORE_TRACE_FILE"
+COUNTER_NAMES = ("subprocesses", "bytes_read", "bytes_written")
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def peak_rss_kb() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports KiB.
+    return int(peak / 1024) if sys.platform == "darwin" else int(peak)
+
+
+class PhaseTracer:
+    """Phase stacks are per thread; counters are process-wide, so a phase's deltas include work done by concurrent threads."""
+
+    def __init__(self) -> None:
+        self.counters = dict.fromkeys(COUNTER_NAMES, 0)
+        self.phases: list[dict[str, Any]] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    @property
+    def _stack(self) -> list[str]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters = dict.fromkeys(COUNTER_NAMES, 0)
+            self.phases = []
+        self._local.stack = []
+        self._origin = time.perf_counter()
+
+    def add(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] += amount
+
+    def current_stack(self) -> list[str]:
+        return list(self._stack)
+
+    @contextmanager
+    def adopt(self, parent_stack: list[str]) -> Iterator[None]:
+        """Nest phases recorded on a worker thread under the phase that spawned it."""
+        previous = getattr(self._local, "stack", None)
+        self._local.stack = list(parent_stack)
+        try:
+            yield
+        finally:
+            self._local.stack = previous if previous is not None else []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        wall_started = time.perf_counter()
+        if not self._stack and not self.phases:
+            self._origin = wall_started
+        self._stack.append(name)
+        path = "/".join(self._stack)
+        counters_before = dict(self.counters)
+        # 以執行緒 CPU 計時：pipeline 與 smoke 的 worker 執行緒各自記錄自己的 phase，不互相灌水。
+        cpu_started = time.thread_time()
+        try:
+            yield
+        finally:
+            wall_finished = time.perf_counter()
+            self._stack.pop()
+            record = {
+                "name": name,
+                "path": path,
+                "depth": len(self._stack),
+                "start_ms": round((wall_started - self._origin) * 1000, 3),
+                "wall_ms": round((wall_finished - wall_started) * 1000, 3),
+                "cpu_ms": round((time.thread_time() - cpu_started) * 1000, 3),
+                **{counter: self.counters[counter] - counters_before[counter] for counter in COUNTER_NAMES},
+                "peak_rss_kb": peak_rss_kb(),
+                "thread": threading.current_thread().name,
+            }
+            with self._lock:
+                self.phases.append(record)
+
+    def report(self) -> dict[str, Any]:
+        phases = sorted(self.phases, key=lambda item: (item["start_ms"], item["depth"]))
+        return {
+            "total_wall_ms": round(sum(phase["wall_ms"] for phase in phases if phase["depth"] == 0), 3),
+            "phases": phases,
+            **{f"total_{counter}": self.counters[counter] for counter in COUNTER_NAMES},
+            "peak_rss_kb": peak_rss_kb(),
+        }
+
+
+TRACER = PhaseTracer()
+
+
+def traced(name: str) -> Callable[[F], F]:
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with TRACER.phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def trace_phase(name: str):
+    return TRACER.phase(name)
+
+
+def count_subprocess(amount: int = 1) -> None:
+    TRACER.add("subprocesses", amount)
+
+
+def count_bytes_read(amount: int) -> None:
+    TRACER.add("bytes_read", amount)
+
+
+def count_bytes_written(amount: int) -> None:
+    TRACER.add("bytes_written", amount)
+
+
+def chrome_trace_events(report: dict[str, Any]) -> list[dict[str, Any]]:
+    pid = os.getpid()
+    thread_ids: dict[str, int] = {}
+    return [
+        {
+            "name": phase["name"],
+            "cat": "workflow-core",
+            "ph": "X",
+            "ts": int(phase["start_ms"] * 1000),
+            "dur": int(phase["wall_ms"] * 1000),
+            "pid": pid,
+            "tid": thread_ids.setdefault(phase.get("thread", "MainThread"), len(thread_ids)),
+            "args": {key: phase[key] for key in ("path", "cpu_ms", *COUNTER_NAMES, "peak_rss_kb")},
+        }
+        for phase in report["phases"]
+    ]
+
+
+def write_chrome_trace(report: dict[str, Any], target_path: Path) -> str:
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"traceEvents": chrome_trace_events(report), "displayTimeUnit": "ms"}
+    target_path.write_text(json.dumps(payload, ensure_ascii=False) + "\n", encoding="utf-8")
+    return str(target_path.resolve())
+
+
+def collect_timings() -> dict[str, Any]:
+    """Return the `timings` block for one wrapper invocation and reset the tracer (daemon processes run many)."""
+    report = TRACER.report()
+    trace_file = os.environ.get(TRACE_FILE_ENV)
+    if trace_file:
+        report["trace_file"] = write_chrome_trace(report, Path(trace_file))
+    TRACER.reset()
+    return report
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""Crash-safe managed-path writes: stage into a sibling directory, journal the swaps, flush the repo filesystem once, then rename into place."""
+
+from __future__ import annotations
+
+import ctypes
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+
+TRANSACTION_ROOT_REL = ".workflow-core/transactions"
+JOURNAL_FORMAT = 1
+JOURNAL_FILE_NAME = "journal.json"
+RECOVERY_ACTIONS = ("resume", "rollback")
+
+
+def transaction_root(repo_root: Path) -> Path:
+    return repo_root / TRANSACTION_ROOT_REL
+
+
+def load_syncfs():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        syncfs = ctypes.CDLL(None, use_errno=True).syncfs
+    except (OSError, AttributeError):
+        return None
+    syncfs.argtypes = [ctypes.c_int]
+    return syncfs
+
+
+SYNCFS = load_syncfs()
+
+
+def fsync_path(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY | (getattr(os, "O_DIRECTORY", 0) if path.is_dir() else 0))
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_directories(directories: set[Path]) -> None:
+    # Windows 無法開啟目錄做 fsync；rename 的持久性由檔案系統本身處理。
+    if os.name == "nt":
+        return
+    for directory in sorted(directories):
+        if directory.is_dir():
+            fsync_path(directory)
+
+
+def durability_barrier(repo_root: Path, files: list[Path], directories: set[Path] | None = None) -> None:
+    """Make `files` and the entries of their parent (plus `directories`) durable before the journal moves on.
+
+    On Linux this is one syncfs(2) on the repo's filesystem, not a system-wide sync; elsewhere, or if syncfs fails,
+    each file and directory is fsynced.
+    """
+    if SYNCFS is not None:
+        fd = os.open(repo_root, os.O_RDONLY)
+        try:
+            if SYNCFS(fd) == 0:
+                return
+        finally:
+            os.close(fd)
+    for path in files:
+        if path.is_file() and not path.is_symlink():
+            fsync_path(path)
+    fsync_directories({*(directories or set()), *(path.parent for path in files)})
+
+
+def write_journal(journal_path: Path, journal: dict[str, Any]) -> None:
+    temp_path = journal_path.with_name(f"{journal_path.name}.tmp")
+    with temp_path.open("w", encoding="utf-8") as handle:
+        handle.write(json.dumps(journal, ensure_ascii=False, indent=2) + "\n")
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temp_path, journal_path)
+    fsync_directories({journal_path.parent})
+
+
+class ApplyTransaction:
+    """Journaled batch of managed-path replacements and deletions under `.workflow-core/transactions/<id>/`.
+
+    States: `staging` (nothing in the repo touched yet) -> `prepared` (all new blobs durable) -> `committing` -> removed
+    (`committed` in memory). A leftover `staging` journal is discarded on recovery; `prepared` / `committing` journals can be
+    resumed or rolled back, because every swap is idempotent and the replaced file is kept (as a hardlink) under `backup/`
+    until the end. One transaction may collect writes and deletes from several producers before its single commit.
+    """
+
+    def __init__(self, repo_root: Path, txn_dir: Path, journal: dict[str, Any]) -> None:
+        self.repo_root = repo_root
+        self.txn_dir = txn_dir
+        self.journal = journal
+
+    @classmethod
+    def begin(cls, repo_root: Path) -> "ApplyTransaction":
+        txn_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        txn_dir = transaction_root(repo_root) / txn_id
+        (txn_dir / "new").mkdir(parents=True)
+        transaction = cls(repo_root, txn_dir, {"format": JOURNAL_FORMAT, "id": txn_id, "state": "staging", "operations": []})
+        transaction.save()
+        return transaction
+
+    @classmethod
+    def load(cls, repo_root: Path, txn_dir: Path) -> "ApplyTransaction":
+        try:
+            journal = json.loads((txn_dir / JOURNAL_FILE_NAME).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            journal = {"format": JOURNAL_FORMAT, "id": txn_dir.name, "state": "staging", "operations": []}
+        if journal.get("format") != JOURNAL_FORMAT:
+            raise RuntimeError(f"unsupported apply journal format: {txn_dir / JOURNAL_FILE_NAME}")
+        return cls(repo_root, txn_dir, journal)
+
+    @property
+    def state(self) -> str:
+        return str(self.journal["state"])
+
+    @property
+    def operations(self) -> list[dict[str, str]]:
+        return self.journal["operations"]
+
+    def staged_paths(self) -> set[str]:
+        return {operation["path"] for operation in self.operations}
+
+    def save(self) -> None:
+        write_journal(self.txn_dir / JOURNAL_FILE_NAME, self.journal)
+
+    def new_path(self, rel_path: str) -> Path:
+        return self.txn_dir / "new" / rel_path
+
+    def backup_path(self, rel_path: str) -> Path:
+        return self.txn_dir / "backup" / rel_path
+
+    def stage_write(self, rel_path: str) -> Path:
+        """Reserve the staged location for `rel_path`; the caller writes the new content there."""
+        if self.state != "staging":
+            raise RuntimeError(f"transaction {self.journal['id']} is already {self.state}")
+        action = "replace" if (self.repo_root / rel_path).exists() else "create"
+        self.operations.append({"path": rel_path, "action": action})
+        staged = self.new_path(rel_path)
+        staged.parent.mkdir(parents=True, exist_ok=True)
+        return staged
+
+    def stage_delete(self, rel_path: str) -> None:
+        if self.state != "staging":
+            raise RuntimeError(f"transaction {self.journal['id']} is already {self.state}")
+        self.operations.append({"path": rel_path, "action": "delete"})
+
+    def prepare(self) -> None:
+        durability_barrier(self.repo_root, [self.new_path(op["path"]) for op in self.operations if op["action"] != "delete"])
+        self.journal["state"] = "prepared"
+        self.save()
+
+    def commit(self) -> None:
+        if self.state == "staging":
+            self.prepare()
+        self.journal["state"] = "committing"
+        self.save()
+        for operation in self.operations:
+            self.apply_operation(operation)
+        # rename 只改目錄項；換入後 fsync 目標所在目錄，commit 才算持久。
+        durability_barrier(self.repo_root, [], {(self.repo_root / op["path"]).parent for op in self.operations})
+        self.discard()
+        self.journal["state"] = "committed"
+
+    def apply_operation(self, operation: dict[str, str]) -> None:
+        target = self.repo_root / operation["path"]
+        backup = self.backup_path(operation["path"])
+        if operation["action"] == "delete":
+            if target.exists() or target.is_symlink():
+                backup.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(target, backup)
+            return
+        staged = self.new_path(operation["path"])
+        if not staged.exists() and not staged.is_symlink():
+            # 已在先前（中斷的）commit 中換入。
+            return
+        if operation["action"] == "replace" and target.exists() and not backup.exists():
+            backup.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(target, backup)
+            except OSError:
+                shutil.copy2(target, backup)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staged, target)
+
+    def rollback(self) -> None:
+        if self.state in ("staging", "committed"):
+            # 尚未動到 repo，或已完整換入：只需清掉 transaction 目錄。
+            self.discard()
+            return
+        for operation in reversed(self.operations):
+            target = self.repo_root / operation["path"]
+            backup = self.backup_path(operation["path"])
+            if backup.exists() or backup.is_symlink():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(backup, target)
+            elif operation["action"] == "create" and not self.new_path(operation["path"]).exists() and target.exists():
+                target.unlink()
+        self.discard()
+
+    def discard(self) -> None:
+        shutil.rmtree(self.txn_dir, ignore_errors=True)
+        root = transaction_root(self.repo_root)
+        for directory in (root, root.parent):
+            try:
+                directory.rmdir()
+            except OSError:
+                break
+
+
+def pending_transactions(repo_root: Path) -> list[Path]:
+    root = transaction_root(repo_root)
+    if not root.is_dir():
+        return []
+    return sorted(path for path in root.iterdir() if path.is_dir())
+
+
+def recover_pending_transactions(repo_root: Path, action: str = "resume") -> list[dict[str, Any]]:
+    """Finish (`resume`) or undo (`rollback`) journals left by an interrupted apply; unprepared ones are always discarded."""
+    if action not in RECOVERY_ACTIONS:
+        raise ValueError(f"unsupported recovery action: {action}")
+    recovered: list[dict[str, Any]] = []
+    for txn_dir in pending_transactions(repo_root):
+        transaction = ApplyTransaction.load(repo_root, txn_dir)
+        state = transaction.state
+        if state == "staging":
+            transaction.discard()
+            outcome = "discarded"
+        elif action == "resume":
+            transaction.commit()
+            outcome = "resumed"
+        else:
+            transaction.rollback()
+            outcome = "rolled-back"
+        recovered.append(
+            {"id": transaction.journal["id"], "state": state, "outcome": outcome, "path_count": len(transaction.operations)}
+        )
+    return recovered
@@ -5,6 +5,7 @@ import json
 import os
 import pty
 import select
+import selectors
 import shlex
 import signal
 import struct
@@ -106,6 +107,29 @@ def resolve_command_for_spawn(command: list[str]) -> list[str]:
     return [*interpreter_command, candidate, *command[1:]]
 
 
+def advance_shutdown(proc: subprocess.Popen[bytes], shutdown_state: dict[str, float | bool | None], now: float) -> bool:
+    """Step the HUP -> TERM -> KILL shutdown sequence; returns True once the PTY and control fds should be closed."""
+    if shutdown_state["requested_at"] is None or proc.poll() is not None:
+        return False
+
+    if not shutdown_state["hup_sent"]:
+        signal_process_group(proc, signal.SIGHUP)
+        signal_process_group(proc, signal.SIGCONT)
+        shutdown_state["hup_sent"] = True
+
+    elapsed = now - float(shutdown_state["requested_at"])
+
+    if elapsed >= 0.2 and not shutdown_state["term_sent"]:
+        signal_process_group(proc, signal.SIGTERM)
+        shutdown_state["term_sent"] = True
+
+    if elapsed >= 0.35 and not shutdown_state["kill_sent"]:
+        signal_process_group(proc, signal.SIGKILL)
+        shutdown_state["kill_sent"] = True
+
+    return elapsed >= 0.1
+
+
 def forward_stream(
     proc: subprocess.Popen[bytes],
     master_fd: int | None,
@@ -118,37 +142,20 @@ def forward_stream(
     control_open = control_fd is not None
     control_buffer = b""
 
-    def advance_shutdown(now: float) -> None:
+    def step_shutdown(now: float) -> None:
         nonlocal master_fd, master_open, control_fd, control_open
-        if shutdown_state["requested_at"] is None or proc.poll() is not None:
+        if not advance_shutdown(proc, shutdown_state, now):
             return
-
-        if not shutdown_state["hup_sent"]:
-            signal_process_group(proc, signal.SIGHUP)
-            signal_process_group(proc, signal.SIGCONT)
-            shutdown_state["hup_sent"] = True
-
-        elapsed = now - float(shutdown_state["requested_at"])
-
-        if elapsed >= 0.1 and master_open:
+        if master_open:
             master_fd = close_fd(master_fd)
             master_open = False
-
-        if elapsed >= 0.1 and control_open:
+        if control_open:
             control_fd = close_fd(control_fd)
             control_open = False
 
-        if elapsed >= 0.2 and not shutdown_state["term_sent"]:
-            signal_process_group(proc, signal.SIGTERM)
-            shutdown_state["term_sent"] = True
-
-        if elapsed >= 0.35 and not shutdown_state["kill_sent"]:
-            signal_process_group(proc, signal.SIGKILL)
-            shutdown_state["kill_sent"] = True
-
     while master_open or proc.poll() is None:
         if shutdown_state["requested_at"] is not None:
-            advance_shutdown(time.monotonic())
+            step_shutdown(time.monotonic())
 
         read_fds = [master_fd] if master_open else []
         if stdin_open:
@@ -162,7 +169,7 @@ def forward_stream(
         ready, _, _ = select.select(read_fds, [], [], 0.1)
 
         if shutdown_state["requested_at"] is not None:
-            advance_shutdown(time.monotonic())
+            step_shutdown(time.monotonic())
 
         if master_open and master_fd in ready:
             try:
@@ -204,11 +211,142 @@ def forward_stream(
     return proc.wait()
 
 
+HIGH_THROUGHPUT_MIN_BUFFER = 64 * 1024
+HIGH_THROUGHPUT_MAX_BUFFER = 1024 * 1024
+
+
+def write_all(fd: int, view: memoryview) -> None:
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def open_selector(sources: dict[str, int]) -> selectors.BaseSelector:
+    """Prefer epoll; fall back to poll when a source (e.g. stdin redirected from /dev/null or a file) rejects epoll."""
+    selector_classes = [getattr(selectors, name) for name in ("EpollSelector", "PollSelector") if hasattr(selectors, name)]
+    for selector_class in [*selector_classes, selectors.SelectSelector]:
+        selector = selector_class()
+        try:
+            for name, fd in sources.items():
+                selector.register(fd, selectors.EVENT_READ, name)
+        except PermissionError:
+            selector.close()
+            continue
+        return selector
+    raise RuntimeError("no selector accepts the bridge file descriptors")
+
+
+def forward_stream_high_throughput(
+    proc: subprocess.Popen[bytes],
+    master_fd: int | None,
+    control_fd: int | None,
+    shutdown_state: dict[str, float | bool | None],
+    stdout_fd: int | None = None,
+) -> int:
+    """`forward_stream` for output floods: epoll, reads into one reusable buffer, coalesced `os.write` flushes.
+
+    While the PTY keeps reporting readable data the loop keeps appending into the buffer and only writes once it
+    is full or the PTY goes idle, so a burst costs a few large writes instead of a read+write+flush per chunk.
+    The buffer doubles (up to 1 MiB) whenever a flush finds it full.
+    """
+    stdin_fd = sys.stdin.fileno()
+    stdout_fd = sys.stdout.fileno() if stdout_fd is None else stdout_fd
+    sys.stdout.flush()
+    sources = {"master": master_fd, "stdin": stdin_fd, "control": control_fd}
+    selector = open_selector({name: fd for name, fd in sources.items() if fd is not None})
+    output = bytearray(HIGH_THROUGHPUT_MIN_BUFFER)
+    output_view = memoryview(output)
+    filled = 0
+    control_buffer = bytearray()
+
+    def close_registered(fd: int | None) -> None:
+        if fd is not None and fd in selector.get_map():
+            selector.unregister(fd)
+
+    def flush_output() -> None:
+        nonlocal filled, output, output_view
+        if not filled:
+            return
+        write_all(stdout_fd, output_view[:filled])
+        grow = filled == len(output) and len(output) < HIGH_THROUGHPUT_MAX_BUFFER
+        filled = 0
+        if grow:
+            output_view.release()
+            output = bytearray(len(output) * 2)
+            output_view = memoryview(output)
+
+    def read_master() -> bool:
+        nonlocal filled
+        try:
+            count = os.readv(master_fd, [output_view[filled:]])
+        except OSError:
+            count = 0
+        filled += count
+        return count > 0
+
+    try:
+        while master_fd is not None or proc.poll() is None:
+            if shutdown_state["requested_at"] is not None and advance_shutdown(proc, shutdown_state, time.monotonic()):
+                flush_output()
+                close_registered(master_fd)
+                close_registered(control_fd)
+                master_fd = close_fd(master_fd)
+                control_fd = close_fd(control_fd)
+
+            if not selector.get_map():
+                break
+
+            for key, _ in selector.select(0.1):
+                if key.data == "master" and master_fd is not None:
+                    master_alive = read_master()
+                    # Under load the PTY stays readable: fill the buffer before writing once.
+                    # When it goes idle, flush right away to keep interactive latency low.
+                    while master_alive and filled < len(output) and select.select([master_fd], [], [], 0)[0]:
+                        master_alive = read_master()
+                    flush_output()
+                    if not master_alive:
+                        close_registered(master_fd)
+                        master_fd = None
+                elif key.data == "stdin":
+                    data = os.read(stdin_fd, 65536)
+                    if not data or master_fd is None:
+                        close_registered(stdin_fd)
+                        continue
+                    try:
+                        write_all(master_fd, memoryview(data))
+                    except OSError:
+                        close_registered(stdin_fd)
+                elif key.data == "control" and control_fd is not None:
+                    try:
+                        data = os.read(control_fd, 65536)
+                    except OSError:
+                        data = b""
+                    if not data:
+                        close_registered(control_fd)
+                        control_fd = None
+                        continue
+                    control_buffer += data
+                    newline = control_buffer.find(b"\n")
+                    while newline >= 0:
+                        handle_control_message(proc, master_fd, bytes(control_buffer[:newline]))
+                        del control_buffer[: newline + 1]
+                        newline = control_buffer.find(b"\n")
+        flush_output()
+    finally:
+        selector.close()
+    return proc.wait()
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("--cwd", required=True)
     parser.add_argument("--cols", type=int, default=160)
     parser.add_argument("--rows", type=int, default=40)
+    parser.add_argument(
+        "--high-throughput",
+        action="store_true",
+        help="use the epoll + coalesced os.write output path for agents that flood the terminal",
+    )
     parser.add_argument("command", nargs=argparse.REMAINDER)
     args = parser.parse_args()
 
@@ -222,6 +360,9 @@ def main() -> int:
 
     command = resolve_command_for_spawn(command)
 
+    # Probe the extension's control pipe before openpty(): when fd 3 was not inherited,
+    # the PTY master would otherwise take fd 3 and be mistaken for the control channel.
+    control_fd = maybe_open_control_fd(3)
     master_fd, slave_fd = pty.openpty()
     set_winsize(slave_fd, args.rows, args.cols)
 
@@ -253,7 +394,6 @@ def main() -> int:
         )
         return 127
     os.close(slave_fd)
-    control_fd = maybe_open_control_fd(3)
     shutdown_state: dict[str, float | bool | None] = {
         "requested_at": None,
         "hup_sent": False,
@@ -272,6 +412,8 @@ def main() -> int:
     signal.signal(signal.SIGINT, terminate)
 
     try:
+        if args.high_throughput:
+            return forward_stream_high_throughput(proc, master_fd, control_fd, shutdown_state)
         return forward_stream(proc, master_fd, control_fd, shutdown_state)
     finally:
         if proc.poll() is None:
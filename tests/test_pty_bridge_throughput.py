@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+tests/test_pty_bridge_throughput.py
+===================================
+用途：驗證 PTY bridge 的 high-throughput 輸出路徑與一般路徑輸出一致，並量測大量輸出時的吞吐量
+職責：
+  - 驗證 --high-throughput 會逐位元組轉送 child 輸出，且 exit code 不變
+  - benchmark 預設 skip；設定 WORKFLOW_CORE_BENCHMARKS=1 才會執行
+===================================
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import subprocess
+import sys
+import time
+import unittest
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BRIDGE_FILE = REPO_ROOT / ".agent" / "runtime" / "tools" / "vscode_terminal_pty" / "codex_pty_bridge.py"
+BENCHMARKS_ENABLED = os.environ.get("WORKFLOW_CORE_BENCHMARKS") == "1"
+
+# PTY line discipline 會把 \n 轉成 \r\n，因此 synthetic stream 只用不含換行的可列印字元。
+FLOOD_SCRIPT = """
+import hashlib, sys
+total = int(sys.argv[1])
+block = bytes(range(33, 127)) * 700
+digest = hashlib.sha256()
+sent = 0
+while sent < total:
+    chunk = block[: min(len(block), total - sent)]
+    sys.stdout.buffer.write(chunk)
+    digest.update(chunk)
+    sent += len(chunk)
+sys.stdout.buffer.flush()
+sys.stderr.write(digest.hexdigest())
+sys.stderr.flush()
+sys.exit(7)
+"""
+
+
+def run_bridge(total_bytes: int, high_throughput: bool) -> tuple[int, bytes, float]:
+    command = [sys.executable, str(BRIDGE_FILE), "--cwd", str(REPO_ROOT)]
+    if high_throughput:
+        command.append("--high-throughput")
+    command.extend(["--", sys.executable, "-c", FLOOD_SCRIPT, str(total_bytes)])
+    started = time.perf_counter()
+    proc = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE)
+    chunks: list[bytes] = []
+    # 以 read1 持續讀取，避免量測端本身成為瓶頸。
+    while chunk := proc.stdout.read1(1024 * 1024):
+        chunks.append(chunk)
+    proc.stdout.close()
+    returncode = proc.wait(timeout=120)
+    return returncode, b"".join(chunks), time.perf_counter() - started
+
+
+def expected_stream(total_bytes: int) -> bytes:
+    block = bytes(range(33, 127)) * 700
+    return (block * (total_bytes // len(block) + 1))[:total_bytes]
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "PTY bridge 僅在 Linux 驗證")
+class PtyBridgeThroughputTest(unittest.TestCase):
+    def test_high_throughput_mode_forwards_stream_byte_for_byte(self) -> None:
+        total_bytes = 3 * 1024 * 1024 + 17
+        expected = expected_stream(total_bytes)
+        for high_throughput in (False, True):
+            with self.subTest(high_throughput=high_throughput):
+                returncode, stdout, _ = run_bridge(total_bytes, high_throughput)
+                # stderr 與 stdout 共用同一個 PTY，digest 會接在資料後面。
+                self.assertEqual(returncode, 7)
+                self.assertEqual(stdout[:total_bytes], expected)
+                self.assertEqual(stdout[total_bytes:], hashlib.sha256(expected).hexdigest().encode())
+
+    @unittest.skipUnless(BENCHMARKS_ENABLED, "設定 WORKFLOW_CORE_BENCHMARKS=1 才執行 benchmark")
+    def test_benchmark_high_throughput_flood(self) -> None:
+        total_bytes = 256 * 1024 * 1024
+        results = {}
+        for high_throughput in (False, True):
+            returncode, stdout, elapsed = run_bridge(total_bytes, high_throughput)
+            self.assertEqual(returncode, 7)
+            self.assertEqual(len(stdout), total_bytes + 64)
+            results["high-throughput" if high_throughput else "standard"] = elapsed
+        for mode, elapsed in results.items():
+            print(f"[benchmark] pty bridge {mode}: {total_bytes / elapsed / 1024 / 1024:.1f} MiB/s ({elapsed:.3f}s)")
+
+
+if __name__ == "__main__":
+    unittest.main()
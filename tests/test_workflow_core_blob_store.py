@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""focused tests for the OID-keyed workflow-core blob store."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = REPO_ROOT / ".agent" / "runtime" / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+def load_module(module_name: str, file_path: Path):
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"無法載入模組：{file_path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def init_git_repo(repo_root: Path) -> None:
+    subprocess.run(["git", "init", "-q", str(repo_root)], check=True)
+    subprocess.run(["git", "-C", str(repo_root), "config", "user.name", "Test User"], check=True)
+    subprocess.run(["git", "-C", str(repo_root), "config", "user.email", "test@example.com"], check=True)
+
+
+def commit_files(repo_root: Path, files: dict[str, str], message: str) -> str:
+    for rel_path, text in files.items():
+        target = repo_root / rel_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(text, encoding="utf-8")
+    subprocess.run(["git", "-C", str(repo_root), "add", "-A"], check=True)
+    subprocess.run(["git", "-C", str(repo_root), "commit", "-q", "-m", message], check=True)
+    return subprocess.run(["git", "-C", str(repo_root), "rev-parse", "HEAD"], check=True, capture_output=True, text=True).stdout.strip()
+
+
+class WorkflowCoreBlobStoreTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.blob_store = load_module("test_workflow_core_blob_store_module", SCRIPTS_DIR / "workflow_core_blob_store.py")
+        cls.contracts = load_module("test_workflow_core_blob_store_contracts", SCRIPTS_DIR / "workflow_core_contracts.py")
+
+    def stage_release(self, repo_root: Path, store, ref: str, output_root: Path) -> dict[str, int]:
+        entries = self.contracts.list_tree_entries_at_ref(repo_root, ref)
+        counts = store.fetch_missing(repo_root, entries)
+        store.assemble(entries, output_root)
+        store.record_release(ref, entries)
+        return counts
+
+    def test_second_release_only_fetches_new_blobs_and_gc_evicts_least_recent(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            repo_root = root / "repo"
+            init_git_repo(repo_root)
+            first = commit_files(repo_root, {"a.md": "shared\n", "b.md": "one\n"}, "one")
+            second = commit_files(repo_root, {"b.md": "two\n"}, "two")
+            store = self.blob_store.BlobStore(root / "objects")
+
+            first_counts = self.stage_release(repo_root, store, first, root / "stage-1")
+            second_counts = self.stage_release(repo_root, store, second, root / "stage-2")
+            staged = {path: (root / "stage-2" / path).read_text(encoding="utf-8") for path in ["a.md", "b.md"]}
+            shared_links = (root / "stage-2" / "a.md").stat().st_nlink
+            object_count_before_gc = len(store.list_objects())
+            gc_result = store.gc(keep_releases=1)
+            object_count_after_gc = len(store.list_objects())
+            restaged_counts = store.fetch_missing(repo_root, self.contracts.list_tree_entries_at_ref(repo_root, second))
+
+        self.assertEqual(first_counts, {"fetched_objects": 2, "fetched_bytes": 11, "reused_objects": 0})
+        self.assertEqual(second_counts, {"fetched_objects": 1, "fetched_bytes": 4, "reused_objects": 1})
+        self.assertEqual(staged, {"a.md": "shared\n", "b.md": "two\n"})
+        self.assertEqual(shared_links, 3)
+        self.assertEqual(object_count_before_gc, 3)
+        self.assertEqual(gc_result["kept_releases"], [second])
+        self.assertEqual(gc_result["evicted_releases"], [first])
+        self.assertEqual(gc_result["removed_objects"], 1)
+        self.assertEqual(object_count_after_gc, 2)
+        self.assertEqual(restaged_counts["fetched_objects"], 0)
+
+    def test_objects_are_read_only_and_tampered_objects_are_refetched(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            repo_root = root / "repo"
+            init_git_repo(repo_root)
+            commit = commit_files(repo_root, {"a.md": "shared\n"}, "one")
+            store = self.blob_store.BlobStore(root / "objects")
+            self.stage_release(repo_root, store, commit, root / "stage-1")
+            staged = root / "stage-1" / "a.md"
+            object_mode = stat.S_IMODE(staged.stat().st_mode)
+            untouched_counts = store.fetch_missing(repo_root, self.contracts.list_tree_entries_at_ref(repo_root, commit))
+            # 模擬使用者把唯讀限制拿掉後，經由 hardlink 原地改寫成同樣大小的內容。
+            os.chmod(staged, 0o644)
+            staged.write_text("SHARED\n", encoding="utf-8")
+            tampered_counts = store.fetch_missing(repo_root, self.contracts.list_tree_entries_at_ref(repo_root, commit))
+            store.assemble(self.contracts.list_tree_entries_at_ref(repo_root, commit), root / "stage-2")
+            restaged = (root / "stage-2" / "a.md").read_text(encoding="utf-8")
+
+        self.assertEqual(object_mode, 0o444)
+        self.assertEqual(untouched_counts["fetched_objects"], 0)
+        self.assertEqual(tampered_counts["fetched_objects"], 1)
+        self.assertEqual(restaged, "shared\n")
+
+    def test_git_blob_oid_matches_git_hash_object(self) -> None:
+        payload = b"workflow-core blob\n"
+        expected = subprocess.run(["git", "hash-object", "--stdin"], input=payload, check=True, capture_output=True).stdout.decode().strip()
+        self.assertEqual(self.blob_store.git_blob_oid(payload), expected)
+
+    def test_cli_stats_and_gc_report_json(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_git_repo(repo_root)
+            commit = commit_files(repo_root, {"a.md": "a\n"}, "one")
+            store = self.blob_store.BlobStore.for_repo(repo_root)
+            self.stage_release(repo_root, store, commit, repo_root / ".workflow-core" / "staging" / "one")
+
+            def run_cli(*args: str) -> dict:
+                proc = subprocess.run(
+                    [sys.executable, str(SCRIPTS_DIR / "workflow_core_blob_store.py"), *args, "--repo-root", str(repo_root), "--json"],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                )
+                return json.loads(proc.stdout)
+
+            stats = run_cli("stats")
+            gc_result = run_cli("gc", "--keep-releases", "0")
+
+        self.assertEqual(stats["object_count"], 1)
+        self.assertEqual(stats["releases"][commit]["object_count"], 1)
+        self.assertEqual(gc_result["status"], "pass")
+        self.assertEqual(gc_result["evicted_releases"], [commit])
+        self.assertEqual(gc_result["removed_objects"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
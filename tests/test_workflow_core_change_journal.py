@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""focused tests for the inotify-backed workflow-core change journal."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = REPO_ROOT / ".agent" / "runtime" / "scripts"
+MANIFEST_FILE = REPO_ROOT / "core_ownership_manifest.yml"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+def load_module(module_name: str, file_path: Path):
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"無法載入模組：{file_path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def init_repo_with_manifest(repo_root: Path) -> None:
+    subprocess.run(["git", "init", "-q", str(repo_root)], check=True)
+    subprocess.run(["git", "-C", str(repo_root), "config", "user.name", "Test User"], check=True)
+    subprocess.run(["git", "-C", str(repo_root), "config", "user.email", "test@example.com"], check=True)
+    (repo_root / "core_ownership_manifest.yml").write_text(MANIFEST_FILE.read_text(encoding="utf-8"), encoding="utf-8")
+    (repo_root / "README.md").write_text("seed\n", encoding="utf-8")
+    subprocess.run(["git", "-C", str(repo_root), "add", "."], check=True)
+    subprocess.run(["git", "-C", str(repo_root), "commit", "-q", "-m", "seed"], check=True)
+
+
+def dirty_paths(result: dict) -> list[tuple[str, str]]:
+    return sorted((entry["raw_status"], entry["path"]) for entry in result["dirty_entries"])
+
+
+class WorkflowCoreChangeJournalTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.journal = load_module("test_workflow_core_change_journal_module", SCRIPTS_DIR / "workflow_core_change_journal.py")
+        cls.precheck = load_module("test_workflow_core_change_journal_precheck", SCRIPTS_DIR / "workflow_core_sync_precheck.py")
+
+    def test_changed_directory_covers_its_subtree(self) -> None:
+        changed = frozenset({"docs/new", "README.md"})
+
+        self.assertTrue(self.journal.path_is_covered("docs/new/a/b.md", changed))
+        self.assertTrue(self.journal.path_is_covered("README.md", changed))
+        self.assertFalse(self.journal.path_is_covered("docs/newer.md", changed))
+        self.assertFalse(self.journal.path_is_covered(None, changed))
+
+    def test_dead_or_silent_watcher_falls_back_to_full_scan(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_repo_with_manifest(repo_root)
+            journal = self.journal.ChangeJournal(repo_root)
+            state = {"pid": os.getpid(), "started_at": time.time(), "heartbeat": time.time() - 60, "generation": 1}
+            journal.write_json(journal.state_path, state)
+            silent_reason = journal.plan("all").reason
+            journal.write_json(journal.state_path, {**state, "pid": 2**22 + 1, "heartbeat": time.time()})
+            (repo_root / "README.md").write_text("changed\n", encoding="utf-8")
+
+            result = self.precheck.run_sync_precheck(repo_root, release_ref="core-v1")
+
+        self.assertEqual(silent_reason, "watcher-heartbeat-stale")
+        self.assertEqual(result["change_journal"]["mode"], "full")
+        self.assertEqual(result["change_journal"]["reason"], "watcher-not-running")
+        self.assertFalse(result["change_journal"]["baseline_saved"])
+        self.assertEqual(dirty_paths(result), [(" M", "README.md")])
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify 僅在 Linux 提供")
+    def test_incremental_precheck_matches_full_scan(self) -> None:
+        if not self.journal.inotify_available():
+            self.skipTest("inotify 無法透過 libc 使用")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_repo_with_manifest(repo_root)
+            cli = [sys.executable, str(SCRIPTS_DIR / "workflow_core_change_journal.py")]
+            subprocess.run([*cli, "start", "--repo-root", str(repo_root), "--json"], check=True, capture_output=True)
+            try:
+                first = self.precheck.run_sync_precheck(repo_root, release_ref="core-v1")
+                (repo_root / "README.md").write_text("changed\n", encoding="utf-8")
+                (repo_root / "notes" / "deep").mkdir(parents=True)
+                (repo_root / "notes" / "deep" / "todo.md").write_text("todo\n", encoding="utf-8")
+                second = self.precheck.run_sync_precheck(repo_root, release_ref="core-v1")
+                (repo_root / "README.md").write_text("seed\n", encoding="utf-8")
+                third = self.precheck.run_sync_precheck(repo_root, release_ref="core-v1")
+                full = self.precheck.run_sync_precheck(repo_root, release_ref="core-v1", use_change_journal=False)
+            finally:
+                stopped = subprocess.run([*cli, "stop", "--repo-root", str(repo_root), "--json"], check=True, capture_output=True, text=True)
+
+        self.assertEqual((first["change_journal"]["mode"], first["change_journal"]["reason"]), ("full", "no-baseline"))
+        self.assertEqual(second["change_journal"]["mode"], "incremental")
+        self.assertEqual(dirty_paths(second), [(" M", "README.md"), ("??", "notes/deep/todo.md")])
+        self.assertEqual(third["change_journal"]["mode"], "incremental")
+        self.assertEqual(third["change_journal"]["changed_path_count"], 1)
+        self.assertEqual(dirty_paths(third), dirty_paths(full))
+        self.assertEqual(full["change_journal"]["reason"], "disabled")
+        self.assertTrue(json.loads(stopped.stdout)["stopped"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""focused tests for shared workflow-core contract and git helpers."""
+
+from __future__ import annotations
+
+import importlib.util
+import random
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = REPO_ROOT / ".agent" / "runtime" / "scripts"
+MANIFEST_FILE = REPO_ROOT / "core_ownership_manifest.yml"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+def load_module(module_name: str, file_path: Path):
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"無法載入模組：{file_path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def init_git_repo(repo_root: Path) -> None:
+    subprocess.run(["git", "init", "-q", str(repo_root)], check=True)
+    subprocess.run(["git", "-C", str(repo_root), "config", "user.name", "Test User"], check=True)
+    subprocess.run(["git", "-C", str(repo_root), "config", "user.email", "test@example.com"], check=True)
+
+
+OVERLAP_SEGMENTS = ["a", "b", "bc", "c.md", "x", "docs", "*", "*.md", "b?", "[bc]", "**", ".", ""]
+
+
+def random_pattern(generator: random.Random) -> str:
+    pattern = "/".join(generator.choice(OVERLAP_SEGMENTS) for _ in range(generator.randint(1, 4)))
+    pattern += generator.choice(["", "", "/**", "/"])
+    return f"./{pattern}" if generator.random() < 0.1 else pattern
+
+
+def commit_all(repo_root: Path, message: str) -> str:
+    subprocess.run(["git", "-C", str(repo_root), "add", "."], check=True)
+    subprocess.run(["git", "-C", str(repo_root), "commit", "-q", "-m", message], check=True)
+    proc = subprocess.run(["git", "-C", str(repo_root), "rev-parse", "HEAD"], check=True, capture_output=True, text=True)
+    return proc.stdout.strip()
+
+
+class WorkflowCoreContractsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.contracts = load_module("test_workflow_core_contracts_module", SCRIPTS_DIR / "workflow_core_contracts.py")
+
+    def test_blob_reader_streams_multiple_blobs_through_one_session(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_git_repo(repo_root)
+            (repo_root / "docs").mkdir()
+            (repo_root / "docs" / "a.md").write_text("alpha\n", encoding="utf-8")
+            (repo_root / "docs" / "with space.md").write_text("spaced\n", encoding="utf-8")
+            (repo_root / "empty.txt").write_bytes(b"")
+            (repo_root / "binary.bin").write_bytes(bytes(range(256)) * 4)
+            commit = commit_all(repo_root, "seed")
+
+            with self.contracts.GitBlobReader(repo_root) as reader:
+                alpha = reader.read_bytes(commit, "docs/a.md")
+                spaced = reader.read_text(commit, "./docs/with space.md")
+                empty = reader.read_bytes(commit, "empty.txt")
+                binary = reader.read_bytes("HEAD", "binary.bin")
+                process = reader._proc
+
+        self.assertEqual(alpha, b"alpha\n")
+        self.assertEqual(spaced, "spaced\n")
+        self.assertEqual(empty, b"")
+        self.assertEqual(binary, bytes(range(256)) * 4)
+        self.assertIsNotNone(process)
+        self.assertIsNotNone(process.returncode)
+
+    def test_blob_reader_reports_missing_path_and_keeps_session_usable(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_git_repo(repo_root)
+            (repo_root / "docs").mkdir()
+            (repo_root / "docs" / "a.md").write_text("alpha\n", encoding="utf-8")
+            commit_all(repo_root, "seed")
+
+            with self.contracts.GitBlobReader(repo_root) as reader:
+                with self.assertRaises(RuntimeError):
+                    reader.read_bytes("HEAD", "docs/missing.md")
+                with self.assertRaises(RuntimeError):
+                    reader.read_bytes("HEAD", "docs")
+                alpha = reader.read_bytes("HEAD", "docs/a.md")
+
+        self.assertEqual(alpha, b"alpha\n")
+
+    def test_write_paths_from_ref_matches_per_file_git_show(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            repo_root = root / "repo"
+            output_root = root / "out"
+            init_git_repo(repo_root)
+            paths = [f"pkg/module_{index}.py" for index in range(20)]
+            for index, rel_path in enumerate(paths):
+                target = repo_root / rel_path
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_text(f"value = {index}\n" * (index + 1), encoding="utf-8")
+            commit = commit_all(repo_root, "seed")
+
+            written = self.contracts.write_paths_from_ref(repo_root, commit, paths, output_root)
+            mismatched = [
+                rel_path
+                for rel_path in paths
+                if (output_root / rel_path).read_bytes() != self.contracts.read_bytes_at_ref(repo_root, commit, rel_path)
+            ]
+
+        self.assertEqual(written, paths)
+        self.assertEqual(mismatched, [])
+
+    def test_paths_matching_ref_batches_diff_and_matches_per_path_check(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_git_repo(repo_root)
+            paths = ["docs/same.md", "docs/changed.md", "docs/[glob].md", "docs/deleted.md"]
+            for rel_path in paths:
+                target = repo_root / rel_path
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_text("v1\n", encoding="utf-8")
+            commit = commit_all(repo_root, "seed")
+            (repo_root / "docs" / "changed.md").write_text("v2\n", encoding="utf-8")
+            (repo_root / "docs" / "deleted.md").unlink()
+            (repo_root / "docs" / "untracked.md").write_text("new\n", encoding="utf-8")
+            candidates = [*paths, "docs/untracked.md"]
+
+            with patch.object(self.contracts, "GIT_PATHSPEC_BATCH_SIZE", 2):
+                batched = self.contracts.paths_matching_ref(repo_root, commit, candidates)
+            per_path = [path for path in candidates if self.contracts.worktree_path_matches_ref(repo_root, commit, path)]
+
+        self.assertEqual(batched, ["docs/same.md", "docs/[glob].md", "docs/untracked.md"])
+        self.assertEqual(batched, per_path)
+
+    def create_worktree_fixture(self, repo_root: Path) -> None:
+        init_git_repo(repo_root)
+        (repo_root / ".gitignore").write_text("node_modules/\n", encoding="utf-8")
+        for rel_path in [
+            ".agent/workflows/dev-team.md",
+            ".agent/workflows/removed.md",
+            ".agent/skills_local/custom/SKILL.md",
+            ".agent/runtime/scripts/__pycache__/x.cpython-311.pyc",
+            "node_modules/pkg/index.js",
+            ".workflow-core/staging/core-v1/.agent/workflows/dev-team.md",
+            "maintainers/index.md",
+        ]:
+            target = repo_root / rel_path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text("x\n", encoding="utf-8")
+        commit_all(repo_root, "seed")
+        (repo_root / ".agent" / "workflows" / "removed.md").unlink()
+        (repo_root / ".agent" / "workflows" / "untracked.md").write_text("new\n", encoding="utf-8")
+
+    def test_git_worktree_listing_uses_index_and_skips_ignored_deleted_and_pruned_paths(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            self.create_worktree_fixture(repo_root)
+
+            files = self.contracts.list_worktree_files(
+                repo_root,
+                prune_patterns=[".agent/skills_local/**", "maintainers/**"],
+                mode="git",
+            )
+
+        self.assertEqual(files, [".agent/workflows/dev-team.md", ".agent/workflows/untracked.md", ".gitignore"])
+
+    def test_scan_worktree_listing_prunes_subtrees_without_entering_them(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            self.create_worktree_fixture(repo_root)
+            visited: list[str] = []
+            real_scandir = self.contracts.os.scandir
+
+            def recording_scandir(path):
+                visited.append(Path(path).relative_to(repo_root).as_posix())
+                return real_scandir(path)
+
+            with patch.object(self.contracts.os, "scandir", side_effect=recording_scandir):
+                files = self.contracts.list_worktree_files(
+                    repo_root,
+                    prune_patterns=[".agent/skills_local/**", "maintainers/**", "node_modules/**"],
+                    mode="scan",
+                )
+
+        self.assertEqual(files, [".agent/workflows/dev-team.md", ".agent/workflows/untracked.md", ".gitignore"])
+        self.assertNotIn(".agent/skills_local", visited)
+        self.assertNotIn("maintainers", visited)
+        self.assertNotIn("node_modules", visited)
+        self.assertNotIn(".workflow-core", visited)
+        self.assertFalse(any(item.startswith(".git/") or item == ".git" for item in visited))
+
+    def test_auto_worktree_listing_falls_back_to_scan_outside_git_top_level(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            self.create_worktree_fixture(repo_root)
+            staging_root = repo_root / ".workflow-core" / "staging" / "core-v1"
+
+            files = self.contracts.list_worktree_files(staging_root)
+
+        self.assertEqual(files, [".agent/workflows/dev-team.md"])
+
+    def test_overlapping_pattern_pairs_matches_pairwise_patterns_overlap(self) -> None:
+        generator = random.Random(20260412)
+        for _ in range(400):
+            left = [random_pattern(generator) for _ in range(generator.randint(0, 12))]
+            right = [random_pattern(generator) for _ in range(generator.randint(0, 12))]
+            expected = {
+                (left_index, right_index)
+                for left_index, left_pattern in enumerate(left)
+                for right_index, right_pattern in enumerate(right)
+                if self.contracts.patterns_overlap(left_pattern, right_pattern)
+            }
+            self.assertEqual(self.contracts.overlapping_pattern_pairs(left, right), expected, (left, right))
+
+    def test_managed_path_violations_match_brute_force_on_canonical_manifest(self) -> None:
+        manifest = self.contracts.load_manifest(MANIFEST_FILE)
+        managed = self.contracts.get_managed_patterns(manifest)
+        forbidden = [
+            *self.contracts.get_overlay_patterns(manifest),
+            *self.contracts.collect_split_targets(manifest),
+            *self.contracts.collect_review_required_skill_dirs(manifest),
+            *self.contracts.collect_local_install_targets(manifest),
+            # 加入刻意重疊的 forbidden pattern，確保比對的不只是空集合。
+            ".agent/workflows/*.md",
+            ".agent",
+        ]
+        expected = sorted(
+            {
+                f"{managed_pattern} overlaps {forbidden_pattern}"
+                for managed_pattern in managed
+                for forbidden_pattern in forbidden
+                if self.contracts.patterns_overlap(managed_pattern, forbidden_pattern)
+            }
+        )
+        pairs = self.contracts.overlapping_pattern_pairs(managed, forbidden)
+
+        self.assertTrue(expected)
+        self.assertEqual(sorted({f"{managed[left]} overlaps {forbidden[right]}" for left, right in pairs}), expected)
+        self.assertEqual(self.contracts.collect_managed_path_violations(manifest), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
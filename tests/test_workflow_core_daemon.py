@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""focused tests for the optional workflow-core wrapper daemon."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = REPO_ROOT / ".agent" / "runtime" / "scripts"
+MANIFEST_FILE = REPO_ROOT / "core_ownership_manifest.yml"
+
+
+def load_module(module_name: str, file_path: Path):
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"無法載入模組：{file_path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def init_git_repo(repo_root: Path) -> None:
+    subprocess.run(["git", "init", "-q", str(repo_root)], check=True)
+    subprocess.run(["git", "-C", str(repo_root), "config", "user.name", "Test User"], check=True)
+    subprocess.run(["git", "-C", str(repo_root), "config", "user.email", "test@example.com"], check=True)
+
+
+def commit_all(repo_root: Path, message: str) -> None:
+    subprocess.run(["git", "-C", str(repo_root), "add", "."], check=True)
+    subprocess.run(["git", "-C", str(repo_root), "commit", "-q", "-m", message], check=True)
+
+
+@unittest.skipUnless(hasattr(os, "getuid"), "workflow-core daemon requires Unix sockets")
+class WorkflowCoreDaemonTest(unittest.TestCase):
+    def run_script(self, script: str, args: list[str], env: dict[str, str]) -> subprocess.CompletedProcess[str]:
+        return subprocess.run(
+            [sys.executable, str(SCRIPTS_DIR / script), *args],
+            check=False,
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+
+    def test_cli_delegates_to_running_daemon_and_falls_back_without_it(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            repo_root = root / "repo"
+            init_git_repo(repo_root)
+            (repo_root / "core_ownership_manifest.yml").write_text(MANIFEST_FILE.read_text(encoding="utf-8"), encoding="utf-8")
+            commit_all(repo_root, "seed")
+            env = {**os.environ, "WORKFLOW_CORE_DAEMON_SOCKET": str(root / "daemon.sock")}
+            env.pop("WORKFLOW_CORE_DAEMON", None)
+            precheck_args = ["--repo-root", str(repo_root), "--release-ref", "core-v1", "--json"]
+
+            fallback = self.run_script("workflow_core_sync_precheck.py", precheck_args, env)
+
+            daemon = subprocess.Popen(
+                [sys.executable, str(SCRIPTS_DIR / "workflow_core_daemon.py"), "serve", "--idle-timeout", "30"],
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                deadline = time.monotonic() + 10
+                while not (root / "daemon.sock").exists() and time.monotonic() < deadline:
+                    time.sleep(0.05)
+                first = self.run_script("workflow_core_sync_precheck.py", precheck_args, env)
+                second = self.run_script("workflow_core_sync_precheck.py", precheck_args, env)
+                # 只有這個 request 帶 trace 檔設定；daemon 需依 client 環境逐 request 套用。
+                traced = self.run_script(
+                    "workflow_core_sync_precheck.py", precheck_args, {**env, "WORKFLOW_CORE_TRACE_FILE": str(root / "trace.json")}
+                )
+                untraced = self.run_script("workflow_core_sync_precheck.py", precheck_args, env)
+                status = json.loads(self.run_script("workflow_core_daemon.py", ["status", "--json"], env).stdout)
+                stopped = self.run_script("workflow_core_daemon.py", ["stop", "--json"], env)
+                daemon.wait(timeout=10)
+            finally:
+                if daemon.poll() is None:
+                    daemon.kill()
+                    daemon.wait()
+
+        fallback_payload = json.loads(fallback.stdout)
+        first_payload = json.loads(first.stdout)
+        second_payload = json.loads(second.stdout)
+        self.assertEqual(fallback.returncode, 0)
+        self.assertEqual(first.returncode, 0)
+        self.assertEqual(first_payload["status"], fallback_payload["status"])
+        self.assertEqual(first_payload["dirty_entries"], fallback_payload["dirty_entries"])
+        self.assertEqual(status["status"], "ok")
+        self.assertEqual(status["requests"], 4)
+        self.assertGreater(first_payload["manifest_cache"]["misses"], 0)
+        self.assertGreater(second_payload["manifest_cache"]["hits"], 0)
+        self.assertEqual(second_payload["manifest_cache"]["misses"], 0)
+        self.assertEqual(json.loads(traced.stdout)["timings"]["trace_file"], str((root / "trace.json").resolve()))
+        self.assertNotIn("trace_file", json.loads(untraced.stdout)["timings"])
+        self.assertEqual(stopped.returncode, 0)
+        self.assertEqual(daemon.returncode, 0)
+
+    def test_client_only_trusts_own_socket_in_private_directory(self) -> None:
+        daemon = load_module("test_workflow_core_daemon_module", SCRIPTS_DIR / "workflow_core_daemon.py")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            private_dir = Path(temp_dir) / "private"
+            private_dir.mkdir(mode=0o700)
+            socket_path = private_dir / "daemon.sock"
+            regular_path = private_dir / "regular.sock"
+            regular_path.write_text("", encoding="utf-8")
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+                server.bind(str(socket_path))
+                trusted = daemon.socket_is_trusted(socket_path)
+                regular = daemon.socket_is_trusted(regular_path)
+                # 其他使用者建立的 socket，或位於他人可寫目錄的 socket，都必須改在本地執行。
+                with patch.object(daemon.os, "getuid", return_value=os.getuid() + 1):
+                    foreign_owner = daemon.socket_is_trusted(socket_path)
+                private_dir.chmod(0o777)
+                shared_dir = daemon.socket_is_trusted(socket_path)
+                with patch.dict(os.environ, {"WORKFLOW_CORE_DAEMON_SOCKET": str(socket_path)}):
+                    os.environ.pop("WORKFLOW_CORE_DAEMON", None)
+                    delegated = daemon.delegate_to_daemon("sync_precheck", ["--json"])
+                private_dir.chmod(0o700)
+            with patch.dict(os.environ, {}, clear=True):
+                default_path = daemon.default_socket_path()
+
+        self.assertTrue(trusted)
+        self.assertFalse(regular)
+        self.assertFalse(foreign_owner)
+        self.assertFalse(shared_dir)
+        self.assertIsNone(delegated)
+        self.assertEqual(default_path.parent.name, f"workflow-core-daemon-{os.getuid()}")
+
+
+
+if __name__ == "__main__":
+    unittest.main()
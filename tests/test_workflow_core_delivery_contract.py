@@ -105,6 +105,47 @@ class WorkflowCoreDeliveryContractTest(unittest.TestCase):
         self.assertIn(".agent/workflows/dev-team.md", result["projected_paths"])
         self.assertEqual(projected_text, "projected workflow\n")
 
+    def test_projection_skips_identical_files_and_reports_strategy_counts(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            repo_root = root / "downstream"
+            staging_root = root / "staging"
+            write_manifest(repo_root)
+            create_required_live_path_anchors(repo_root, include_index=True)
+            workflows_dir = staging_root / ".agent" / "workflows"
+            workflows_dir.mkdir(parents=True, exist_ok=True)
+            (workflows_dir / "dev-team.md").write_text("v1\n", encoding="utf-8")
+            (workflows_dir / "qa.md").write_text("qa\n", encoding="utf-8")
+
+            def project(strategy: str = "auto") -> dict:
+                return self.projection.run_projection_stub(
+                    repo_root=repo_root,
+                    manifest_path=repo_root / "core_ownership_manifest.yml",
+                    source_root=staging_root,
+                    strategy=strategy,
+                )
+
+            first = project()
+            target = repo_root / ".agent" / "workflows" / "dev-team.md"
+            first_inode = target.stat().st_ino
+            repeat = project()
+            repeat_inode = target.stat().st_ino
+            (workflows_dir / "dev-team.md").write_text("v2\n", encoding="utf-8")
+            linked = project("hardlink")
+            linked_text = target.read_text(encoding="utf-8")
+            shares_inode = target.stat().st_ino == (workflows_dir / "dev-team.md").stat().st_ino
+
+        written = sum(count for name, count in first["strategy_counts"].items() if name != "unchanged")
+        self.assertEqual(written, 2)
+        self.assertEqual(repeat["strategy_counts"]["unchanged"], 2)
+        for result in (first, repeat, linked):
+            self.assertEqual(sum(result["strategy_counts"].values()), len(result["projected_paths"]))
+        self.assertEqual(repeat_inode, first_inode)
+        self.assertEqual(linked["strategy_counts"]["unchanged"], 1)
+        self.assertEqual(linked["strategy_counts"]["hardlink"], 1)
+        self.assertEqual(linked_text, "v2\n")
+        self.assertTrue(shares_inode)
+
     def test_projection_cli_alias_can_emit_obsidian_restricted_mount_sample(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
             repo_root = Path(temp_dir)
@@ -149,3 +190,65 @@ class WorkflowCoreDeliveryContractTest(unittest.TestCase):
         self.assertEqual(result["status"], "pass")
         self.assertTrue(result["checks"]["required_live_paths_present"])
         self.assertEqual(result["missing_required_live_paths"], [])
+
+    def test_portable_smoke_reports_broken_schema_skill_script_and_doc_link(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            write_manifest(repo_root)
+            create_required_live_path_anchors(repo_root, include_index=True)
+            (repo_root / ".agent" / "skills" / "schemas").mkdir(parents=True)
+            (repo_root / ".agent" / "skills" / "schemas" / "broken.schema.json").write_text("{", encoding="utf-8")
+            (repo_root / ".agent" / "skills" / "code-reviewer" / "scripts").mkdir(parents=True)
+            (repo_root / ".agent" / "skills" / "code-reviewer" / "scripts" / "code_reviewer.py").write_text("def broken(:\n", encoding="utf-8")
+            (repo_root / ".agent" / "workflows" / "dev-team.md").write_text(
+                "[missing](./references/missing.md) [overlay](../../project_rules.md) [web](https://example.com)\n",
+                encoding="utf-8",
+            )
+
+            result = self.smoke.run_portable_smoke(
+                repo_root=repo_root,
+                manifest_path=repo_root / "core_ownership_manifest.yml",
+                jobs=4,
+            )
+
+        details = {item["name"]: item["details"] for item in result["check_results"]}
+        self.assertEqual(result["status"], "fail")
+        self.assertEqual(result["failures"], ["skill_scripts_compile", "schema_files_valid", "doc_links_resolve"])
+        self.assertEqual(details["doc_links_resolve"]["broken"], [".agent/workflows/dev-team.md -> ./references/missing.md"])
+        self.assertEqual(details["doc_links_resolve"]["skipped_count"], 1)
+        self.assertTrue(all(item["duration_ms"] >= 0 for item in result["check_results"]))
+        self.assertTrue(result["checks"]["manifest_profiles_consistent"])
+
+    def test_portable_smoke_changed_only_selects_covering_checks(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            write_manifest(repo_root)
+            create_required_live_path_anchors(repo_root, include_index=True)
+            manifest_path = repo_root / "core_ownership_manifest.yml"
+
+            schema_only = self.smoke.run_portable_smoke(repo_root, manifest_path, changed_paths=[".agent/skills/schemas/a.schema.json"])
+            unrelated = self.smoke.run_portable_smoke(repo_root, manifest_path, changed_paths=["README"])
+            manifest_changed = self.smoke.run_portable_smoke(repo_root, manifest_path, changed_paths=["core_ownership_manifest.yml"])
+            overlay_doc = self.smoke.run_portable_smoke(repo_root, manifest_path, changed_paths=["doc/notes.md"])
+            overlay_role = self.smoke.run_portable_smoke(repo_root, manifest_path, changed_paths=[".agent/roles/custom.md"])
+            runbook_before = self.smoke.run_portable_smoke(repo_root, manifest_path, changed_paths=["ops/runbooks/deploy.md"])
+            # covers 由 manifest 推導：新增 required live path 後，該路徑下的變動就會觸發 anchor 檢查。
+            manifest_text = manifest_path.read_text(encoding="utf-8")
+            manifest_path.write_text(
+                manifest_text.replace('  required_live_paths:\n', '  required_live_paths:\n    - "ops/runbooks/**"\n', 1), encoding="utf-8"
+            )
+            (repo_root / "ops" / "runbooks").mkdir(parents=True)
+            runbook_after = self.smoke.run_portable_smoke(repo_root, manifest_path, changed_paths=["ops/runbooks/deploy.md"])
+
+        self.assertEqual(
+            sorted(schema_only["checks"]),
+            ["doc_links_resolve", "required_live_paths_present", "schema_files_valid", "skill_scripts_compile"],
+        )
+        self.assertEqual(overlay_doc["checks"], {})
+        self.assertEqual(list(overlay_role["checks"]), ["required_live_paths_present"])
+        self.assertEqual(runbook_before["checks"], {})
+        self.assertEqual(runbook_after["checks"], {"required_live_paths_present": True})
+        self.assertEqual(unrelated["status"], "pass")
+        self.assertEqual(unrelated["checks"], {})
+        self.assertEqual(len(unrelated["skipped_checks"]), len(self.smoke.SMOKE_CHECKS))
+        self.assertEqual(manifest_changed["skipped_checks"], [])
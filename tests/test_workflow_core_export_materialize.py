@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import importlib.util
 import json
+import os
 import subprocess
 import tempfile
 import unittest
@@ -54,6 +55,7 @@ def write_manifest(
     extra_profile_includes: list[str] | None = None,
     extra_managed_patterns: list[str] | None = None,
     split_required: list[dict[str, str]] | None = None,
+    excluded_paths: list[str] | None = None,
 ) -> None:
     profile_includes = [
         "core_ownership_manifest.yml",
@@ -93,9 +95,13 @@ def write_manifest(
         'managed_paths:',
     ]
     lines.extend(f'  - path: "{pattern}"' for pattern in managed_patterns)
+    if excluded_paths:
+        lines.append('excluded_paths:')
+        lines.extend(f'  - path: "{pattern}"' for pattern in excluded_paths)
+    else:
+        lines.append('excluded_paths: []')
     lines.extend(
         [
-            'excluded_paths: []',
             'split_required: []',
             'export_profiles:',
             '  - name: "curated-core-v1"',
@@ -145,6 +151,43 @@ def create_sample_tree(repo_root: Path) -> None:
     (repo_root / ".agent" / "skills" / "_shared" / "__init__.py").write_text("shared\n", encoding="utf-8")
 
 
+def legacy_include_pattern_statuses(module, repo_root: Path, result: dict) -> list[dict[str, object]]:
+    manifest_module = load_module("test_workflow_core_export_materialize_manifest", SCRIPTS_DIR / "workflow_core_manifest.py")
+    manifest = manifest_module.load_manifest(repo_root / "core_ownership_manifest.yml")
+    profile = manifest_module.get_export_profile(manifest, result["profile_name"])
+    effective_excludes = [*profile["excludes"], *manifest_module.get_state_patterns(manifest)]
+    files_at_ref = module.list_files_at_ref(repo_root, result["source_ref"])
+    worktree_files = module.list_worktree_files(repo_root)
+
+    def legacy_matches(paths: list[str], pattern: str) -> list[str]:
+        return [
+            path
+            for path in paths
+            if manifest_module.path_matches_pattern(path, pattern)
+            and not any(manifest_module.path_matches_pattern(path, exclude) for exclude in effective_excludes)
+        ]
+
+    statuses: list[dict[str, object]] = []
+    for pattern in profile["includes"]:
+        source_ref_matches = legacy_matches(files_at_ref, pattern)
+        worktree_matches = legacy_matches(worktree_files, pattern)
+        if source_ref_matches:
+            status = "ready"
+        elif worktree_matches:
+            status = "worktree-only"
+        else:
+            status = "missing"
+        statuses.append(
+            {
+                "pattern": pattern,
+                "status": status,
+                "source_ref_matches": source_ref_matches,
+                "worktree_matches": worktree_matches,
+            }
+        )
+    return statuses
+
+
 class WorkflowCoreExportMaterializeTest(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
@@ -252,6 +295,89 @@ class WorkflowCoreExportMaterializeTest(unittest.TestCase):
         self.assertEqual(result["status"], "pass")
         self.assertIn(".agent/skills/INDEX.md", result["selected_paths"])
 
+    def test_analyze_export_profile_matches_legacy_per_pattern_scan(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_git_repo(repo_root)
+            write_manifest(
+                repo_root,
+                extra_profile_includes=[".agent/skills/python-expert/**", ".agent/skills/*/references/*.md", ".agent/templates/**"],
+                extra_managed_patterns=[".agent/skills/python-expert/**", ".agent/skills/*/references/*.md", ".agent/templates/**"],
+            )
+            write_runtime_scripts(repo_root)
+            create_sample_tree(repo_root)
+            (repo_root / ".agent" / "skills" / "refactor" / "references").mkdir(parents=True, exist_ok=True)
+            (repo_root / ".agent" / "skills" / "refactor" / "references" / "smells.md").write_text("smells\n", encoding="utf-8")
+            commit_all(repo_root, "seed export tree")
+            (repo_root / ".agent" / "templates").mkdir(parents=True, exist_ok=True)
+            (repo_root / ".agent" / "templates" / "handoff.md").write_text("worktree only\n", encoding="utf-8")
+            (repo_root / ".agent" / "skills_local" / "custom").mkdir(parents=True, exist_ok=True)
+            (repo_root / ".agent" / "skills_local" / "custom" / "SKILL.md").write_text("state\n", encoding="utf-8")
+
+            result = self.export_materialize.analyze_export_profile(
+                repo_root=repo_root,
+                manifest_path=repo_root / "core_ownership_manifest.yml",
+            )
+            legacy_statuses = legacy_include_pattern_statuses(self.export_materialize, repo_root, result)
+
+        self.assertEqual(result["include_pattern_statuses"], legacy_statuses)
+        self.assertIn(".agent/templates/**", result["worktree_only_include_patterns"])
+        self.assertIn(".agent/skills/python-expert/**", result["missing_include_patterns"])
+        self.assertIn(".agent/skills/*/references/*.md", result["ready_include_patterns"])
+
+    def test_analyze_export_profile_worktree_matches_agree_with_plain_scandir_listing(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_git_repo(repo_root)
+            write_manifest(
+                repo_root,
+                extra_profile_includes=[".agent/templates/**"],
+                extra_managed_patterns=[".agent/templates/**"],
+                excluded_paths=[".agent/templates/local/**"],
+            )
+            write_runtime_scripts(repo_root)
+            create_sample_tree(repo_root)
+            commit_all(repo_root, "seed export tree")
+            # overlay（excluded_paths）底下但被 include 選到的 worktree-only 檔案，不可因 overlay prune 而消失。
+            (repo_root / ".agent" / "templates" / "local").mkdir(parents=True, exist_ok=True)
+            (repo_root / ".agent" / "templates" / "local" / "handoff.md").write_text("overlay draft\n", encoding="utf-8")
+            (repo_root / ".agent" / "skills_local" / "custom").mkdir(parents=True, exist_ok=True)
+            (repo_root / ".agent" / "skills_local" / "custom" / "SKILL.md").write_text("state\n", encoding="utf-8")
+
+            result = self.export_materialize.analyze_export_profile(
+                repo_root=repo_root,
+                manifest_path=repo_root / "core_ownership_manifest.yml",
+            )
+            manifest_module = load_module("test_workflow_core_export_materialize_manifest", SCRIPTS_DIR / "workflow_core_manifest.py")
+            manifest = manifest_module.load_manifest(repo_root / "core_ownership_manifest.yml")
+            profile = manifest_module.get_export_profile(manifest, result["profile_name"])
+            effective_excludes = [*profile["excludes"], *manifest_module.get_state_patterns(manifest)]
+
+            scanned: list[str] = []
+            pending = [repo_root]
+            while pending:
+                with os.scandir(pending.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name != ".git":
+                                pending.append(Path(entry.path))
+                        elif entry.is_file(follow_symlinks=False):
+                            scanned.append(Path(entry.path).relative_to(repo_root).as_posix())
+
+        expected = {
+            pattern: sorted(
+                path
+                for path in scanned
+                if manifest_module.path_matches_pattern(path, pattern)
+                and not any(manifest_module.path_matches_pattern(path, exclude) for exclude in effective_excludes)
+            )
+            for pattern in profile["includes"]
+        }
+        actual = {item["pattern"]: sorted(item["worktree_matches"]) for item in result["include_pattern_statuses"]}
+        self.assertEqual(actual, expected)
+        self.assertIn(".agent/templates/local/handoff.md", actual[".agent/templates/**"])
+        self.assertIn(".agent/templates/**", result["worktree_only_include_patterns"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""focused tests for workflow-core manifest pattern helpers."""
+
+from __future__ import annotations
+
+import copy
+import importlib.util
+import pickle
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = REPO_ROOT / ".agent" / "runtime" / "scripts"
+MANIFEST_FILE = REPO_ROOT / "core_ownership_manifest.yml"
+
+
+def load_module(module_name: str, file_path: Path):
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"無法載入模組：{file_path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+EDGE_PATTERNS = [
+    "a/b/**",
+    "a/**",
+    "a",
+    "a/b",
+    "a/b/c.md",
+    "*.py",
+    "a/*/x",
+    "a/b?/**",
+    "/**",
+    "x//**",
+    "a/[bc]/y",
+    "",
+    "./a/d",
+    "docs/**/*.md",
+    "a/b/",
+]
+PATH_SEGMENTS = ["a", "b", "bc", "c.md", "x", "y", "d", "docs", "q.py", "", ".", "c"]
+
+
+class WorkflowCoreManifestPatternTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.manifest = load_module("test_workflow_core_manifest_module", SCRIPTS_DIR / "workflow_core_manifest.py")
+
+    def assert_equivalent(self, patterns: list[str], paths: list[str]) -> None:
+        pattern_set = self.manifest.CompiledPatternSet(patterns)
+        expected = {
+            path: [pattern for pattern in pattern_set.patterns if self.manifest.path_matches_pattern(path, pattern)]
+            for path in paths
+        }
+        self.assertEqual({path: pattern_set.matching_patterns(path) for path in paths}, expected)
+        self.assertEqual({path: pattern_set.matches(path) for path in paths}, {path: bool(value) for path, value in expected.items()})
+
+    def test_compiled_pattern_set_matches_path_matches_pattern_on_edge_cases(self) -> None:
+        generator = random.Random(20260320)
+        paths = []
+        for _ in range(2000):
+            path = "/".join(generator.choice(PATH_SEGMENTS) for _ in range(generator.randint(1, 5)))
+            paths.append(f"./{path}" if generator.random() < 0.1 else path)
+        self.assert_equivalent(EDGE_PATTERNS, paths)
+
+    def test_compiled_pattern_set_matches_canonical_manifest_patterns(self) -> None:
+        manifest = self.manifest.load_manifest(MANIFEST_FILE)
+        patterns = [
+            *self.manifest.get_managed_patterns(manifest),
+            *self.manifest.get_overlay_patterns(manifest),
+            *self.manifest.get_state_patterns(manifest),
+        ]
+        paths = [
+            ".agent/workflows/AGENT_ENTRY.md",
+            ".agent/skills/code-reviewer/SKILL.md",
+            ".agent/skills_local/custom/SKILL.md",
+            ".agent/state/skills/INDEX.local.md",
+            ".agent/runtime/scripts/__pycache__/x.pyc",
+            "doc/implementation_plan_index.md",
+            "project_maintainers/chat/README.md",
+            "maintainers/index.md",
+            "README.md",
+        ]
+        self.assert_equivalent(patterns, paths)
+
+    def test_compiled_pattern_set_buckets_and_unmatched_patterns(self) -> None:
+        pattern_set = self.manifest.CompiledPatternSet(["docs/**", "*.md", "src", "missing/**"])
+        excludes = self.manifest.CompiledPatternSet(["docs/private/**"])
+        paths = ["docs/a.md", "docs/private/b.md", "src/main.py", "README.md"]
+
+        buckets = pattern_set.match_paths(paths, excludes=excludes)
+
+        self.assertEqual(buckets["docs/**"], ["docs/a.md"])
+        self.assertEqual(buckets["*.md"], ["docs/a.md", "README.md"])
+        self.assertEqual(buckets["src"], ["src/main.py"])
+        self.assertEqual(buckets["missing/**"], [])
+        self.assertEqual(pattern_set.unmatched_patterns(paths), ["missing/**"])
+        self.assertEqual(pattern_set.filter_paths(paths, excludes=excludes), ["docs/a.md", "src/main.py", "README.md"])
+
+    def test_classify_path_by_pattern_sets_uses_first_matching_category(self) -> None:
+        ordered_sets = [
+            ("state", self.manifest.compile_patterns([".agent/state/**"])),
+            ("managed", self.manifest.compile_patterns([".agent/**"])),
+        ]
+
+        self.assertEqual(self.manifest.classify_path_by_pattern_sets(".agent/state/x.json", ordered_sets), "state")
+        self.assertEqual(self.manifest.classify_path_by_pattern_sets(".agent/roles/qa.md", ordered_sets), "managed")
+        self.assertEqual(self.manifest.classify_path_by_pattern_sets("README.md", ordered_sets), "unclassified")
+
+
+class WorkflowCoreManifestCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.manifest = load_module("test_workflow_core_manifest_cache_module", SCRIPTS_DIR / "workflow_core_manifest.py")
+
+    def test_cache_reuses_snapshot_until_manifest_content_changes(self) -> None:
+        cache = self.manifest.ManifestCache()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manifest_path = Path(temp_dir) / "core_ownership_manifest.yml"
+            manifest_path.write_text(MANIFEST_FILE.read_text(encoding="utf-8"), encoding="utf-8")
+
+            first = cache.load(manifest_path)
+            second = cache.load(manifest_path)
+            manifest_path.write_text(MANIFEST_FILE.read_text(encoding="utf-8") + "\n# touched\n", encoding="utf-8")
+            third = cache.load(manifest_path)
+
+        self.assertIs(first, second)
+        self.assertNotEqual(first.sha256, third.sha256)
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2, "disk_hits": 0, "entries": 2})
+
+    def test_cached_manifest_is_immutable(self) -> None:
+        snapshot = self.manifest.ManifestCache().load(MANIFEST_FILE)
+
+        with self.assertRaises(TypeError):
+            snapshot.manifest["version"] = 99
+        with self.assertRaises(TypeError):
+            snapshot.manifest.update({})
+        self.assertIsInstance(snapshot.manifest, dict)
+
+    def test_cached_manifest_copies_and_pickles_as_plain_dicts(self) -> None:
+        snapshot = self.manifest.ManifestCache().load(MANIFEST_FILE)
+        parsed = self.manifest.parse_manifest_text(MANIFEST_FILE.read_text(encoding="utf-8"))
+
+        for clone in (copy.deepcopy(snapshot.manifest), pickle.loads(pickle.dumps(snapshot.manifest))):
+            # 副本必須是可修改的一般 dict / list，且巢狀 mapping 也一併還原。
+            self.assertIs(type(clone), dict)
+            self.assertEqual(clone, parsed)
+            nested = next(value for value in clone.values() if isinstance(value, dict))
+            self.assertIs(type(nested), dict)
+            clone["version"] = 99
+        self.assertIs(type(copy.copy(snapshot.manifest)), dict)
+        self.assertNotEqual(snapshot.manifest.get("version"), 99)
+
+    def test_getters_read_snapshot_views_and_return_lists(self) -> None:
+        snapshot = self.manifest.ManifestCache().load(MANIFEST_FILE)
+        parsed = self.manifest.parse_manifest_text(MANIFEST_FILE.read_text(encoding="utf-8"))
+        profile_name = self.manifest.get_default_export_profile_name(parsed)
+
+        getters = ["get_managed_patterns", "get_overlay_patterns", "get_state_patterns", "get_required_live_paths", "get_worktree_prune_patterns"]
+        for getter in getters:
+            with self.subTest(getter=getter):
+                # snapshot 路徑與未凍結的 dict 路徑結果一致，且每次都回傳可修改的新 list。
+                cached = getattr(self.manifest, getter)(snapshot.manifest)
+                self.assertEqual(cached, getattr(self.manifest, getter)(parsed))
+                self.assertIs(type(cached), list)
+                cached.append("mutated")
+                self.assertNotIn("mutated", getattr(self.manifest, getter)(snapshot.manifest))
+        profile = self.manifest.get_export_profile(snapshot.manifest, profile_name)
+        self.assertEqual(profile, self.manifest.get_export_profile(parsed, profile_name))
+        self.assertIs(type(profile["includes"]), list)
+        self.assertIs(type(self.manifest.get_export_profiles(snapshot.manifest)[0]["includes"]), list)
+        with self.assertRaises(KeyError):
+            self.manifest.get_export_profile(snapshot.manifest, "no-such-profile")
+        with patch.object(self.manifest, "get_managed_patterns", side_effect=AssertionError("recomputed")):
+            self.assertEqual(self.manifest.get_state_patterns(snapshot.manifest), list(snapshot.state_patterns))
+
+    def test_cache_evicts_least_recently_used_snapshots(self) -> None:
+        cache = self.manifest.ManifestCache()
+        text = MANIFEST_FILE.read_text(encoding="utf-8")
+        limit = self.manifest.MANIFEST_CACHE_MAX_ENTRIES
+
+        first = cache.load_text(text, source_label="revision-0")
+        for index in range(1, limit + 5):
+            cache.load_text(text + f"\n# revision {index}\n", source_label=f"revision-{index}")
+        reloaded = cache.load_text(text, source_label="revision-0")
+
+        self.assertEqual(cache.stats()["entries"], limit)
+        self.assertIsNot(reloaded, first)
+
+    def test_disk_cache_skips_parser_in_fresh_cache(self) -> None:
+        text = MANIFEST_FILE.read_text(encoding="utf-8")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_dir = Path(temp_dir) / "cache"
+            warm = self.manifest.ManifestCache(disk_cache_dir=cache_dir)
+            expected = warm.load_text(text).manifest
+
+            cold = self.manifest.ManifestCache(disk_cache_dir=cache_dir)
+            loaded = cold.load_text(text).manifest
+
+        self.assertEqual(loaded, expected)
+        self.assertEqual(cold.stats()["disk_hits"], 1)
+        self.assertEqual(cold.stats()["misses"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+tests/test_workflow_core_performance_benchmarks.py
+==================================================
+用途：量測 workflow-core wrapper 熱路徑在大型 synthetic repo 上的成本
+職責：
+  - 預設 skip；設定 WORKFLOW_CORE_BENCHMARKS=1 才會執行
+  - 每個 benchmark 都會先驗證新舊路徑輸出一致，再把耗時印到 stdout
+==================================================
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = REPO_ROOT / ".agent" / "runtime" / "scripts"
+MANIFEST_FILE = REPO_ROOT / "core_ownership_manifest.yml"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+BENCHMARKS_ENABLED = os.environ.get("WORKFLOW_CORE_BENCHMARKS") == "1"
+
+
+def load_module(module_name: str, file_path: Path):
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"無法載入模組：{file_path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def init_git_repo(repo_root: Path) -> None:
+    subprocess.run(["git", "init", "-q", str(repo_root)], check=True)
+    subprocess.run(["git", "-C", str(repo_root), "config", "user.name", "Test User"], check=True)
+    subprocess.run(["git", "-C", str(repo_root), "config", "user.email", "test@example.com"], check=True)
+
+
+def commit_all(repo_root: Path, message: str) -> str:
+    subprocess.run(["git", "-C", str(repo_root), "add", "."], check=True)
+    subprocess.run(["git", "-C", str(repo_root), "commit", "-q", "-m", message], check=True)
+    proc = subprocess.run(["git", "-C", str(repo_root), "rev-parse", "HEAD"], check=True, capture_output=True, text=True)
+    return proc.stdout.strip()
+
+
+def create_synthetic_tree(repo_root: Path, file_count: int) -> list[str]:
+    paths: list[str] = []
+    for index in range(file_count):
+        rel_path = f".agent/skills/skill-{index % 50:02d}/scripts/module_{index:05d}.py"
+        target = repo_root / rel_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(f"VALUE = {index}\n", encoding="utf-8")
+        paths.append(rel_path)
+    return paths
+
+
+def synthetic_paths(count: int) -> list[str]:
+    roots = [".agent/skills", ".agent/runtime/scripts", "project_maintainers/chat", "node_modules/pkg", "doc/logs"]
+    return [f"{roots[index % len(roots)]}/group-{index % 97:02d}/file_{index:06d}.md" for index in range(count)]
+
+
+def report(label: str, baseline_seconds: float, optimized_seconds: float) -> None:
+    speedup = baseline_seconds / optimized_seconds if optimized_seconds else float("inf")
+    print(f"\n[benchmark] {label}: baseline={baseline_seconds:.3f}s optimized={optimized_seconds:.3f}s speedup={speedup:.1f}x")
+
+
+@unittest.skipUnless(BENCHMARKS_ENABLED, "set WORKFLOW_CORE_BENCHMARKS=1 to run workflow-core benchmarks")
+class WorkflowCorePerformanceBenchmarks(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.contracts = load_module("bench_workflow_core_contracts", SCRIPTS_DIR / "workflow_core_contracts.py")
+        cls.manifest = load_module("bench_workflow_core_manifest", SCRIPTS_DIR / "workflow_core_manifest.py")
+
+    def test_batched_blob_reader_vs_per_file_git_show(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            repo_root = root / "repo"
+            init_git_repo(repo_root)
+            paths = create_synthetic_tree(repo_root, 3000)
+            commit = commit_all(repo_root, "seed synthetic tree")
+
+            started = time.perf_counter()
+            for rel_path in paths:
+                target = root / "per-file" / rel_path
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(self.contracts.read_bytes_at_ref(repo_root, commit, rel_path))
+            baseline_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            self.contracts.write_paths_from_ref(repo_root, commit, paths, root / "batched")
+            optimized_seconds = time.perf_counter() - started
+
+            for rel_path in paths[:: max(1, len(paths) // 100)]:
+                self.assertEqual((root / "per-file" / rel_path).read_bytes(), (root / "batched" / rel_path).read_bytes())
+
+        report(f"blob transport ({len(paths)} files)", baseline_seconds, optimized_seconds)
+        self.assertLess(optimized_seconds, baseline_seconds)
+
+    def test_batched_ref_verification_vs_per_path_git_diff(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_git_repo(repo_root)
+            paths = create_synthetic_tree(repo_root, 2000)
+            commit = commit_all(repo_root, "seed synthetic tree")
+            for rel_path in paths[::10]:
+                (repo_root / rel_path).write_text("changed\n", encoding="utf-8")
+
+            started = time.perf_counter()
+            baseline = [path for path in paths if self.contracts.worktree_path_matches_ref(repo_root, commit, path)]
+            baseline_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            optimized = self.contracts.paths_matching_ref(repo_root, commit, paths)
+            optimized_seconds = time.perf_counter() - started
+
+        self.assertEqual(optimized, baseline)
+        report(f"ref verification ({len(paths)} paths)", baseline_seconds, optimized_seconds)
+        self.assertLess(optimized_seconds, baseline_seconds)
+
+    def test_compiled_pattern_set_scaling(self) -> None:
+        manifest = self.manifest.load_manifest(MANIFEST_FILE)
+        state_patterns = self.manifest.get_state_patterns(manifest)
+        overlay_patterns = self.manifest.get_overlay_patterns(manifest)
+        managed_patterns = self.manifest.get_managed_patterns(manifest)
+        ordered_sets = [
+            ("state", self.manifest.CompiledPatternSet(state_patterns)),
+            ("overlay", self.manifest.CompiledPatternSet(overlay_patterns)),
+            ("managed", self.manifest.CompiledPatternSet(managed_patterns)),
+        ]
+
+        def classify_baseline(path: str) -> str:
+            for category, patterns in [("state", state_patterns), ("overlay", overlay_patterns), ("managed", managed_patterns)]:
+                if any(self.manifest.path_matches_pattern(path, pattern) for pattern in patterns):
+                    return category
+            return "unclassified"
+
+        for count in [1_000, 10_000, 100_000]:
+            paths = synthetic_paths(count)
+
+            started = time.perf_counter()
+            baseline = [classify_baseline(path) for path in paths]
+            baseline_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            optimized = [self.manifest.classify_path_by_pattern_sets(path, ordered_sets) for path in paths]
+            optimized_seconds = time.perf_counter() - started
+
+            self.assertEqual(optimized, baseline)
+            report(f"pattern classification ({count} paths)", baseline_seconds, optimized_seconds)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""focused tests for the bounded-queue workflow-core pipeline."""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = REPO_ROOT / ".agent" / "runtime" / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+def load_module(module_name: str, file_path: Path):
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"無法載入模組：{file_path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class WorkflowCorePipelineTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.pipeline = load_module("test_workflow_core_pipeline_module", SCRIPTS_DIR / "workflow_core_pipeline.py")
+
+    def test_items_flow_through_all_stages_with_bounded_queues(self) -> None:
+        active = {"project": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def project(item: int) -> int | None:
+            with lock:
+                active["project"] += 1
+                active["peak"] = max(active["peak"], active["project"])
+            time.sleep(0.005)
+            with lock:
+                active["project"] -= 1
+            return None if item % 5 == 0 else item * 10
+
+        def produce(emit) -> str:
+            for item in range(40):
+                emit(item)
+            return "staged"
+
+        produced, outputs, report = self.pipeline.run_pipeline(
+            produce,
+            [self.pipeline.PipelineStage("project", project, 4), self.pipeline.PipelineStage("verify", lambda item: item + 1)],
+            queue_size=3,
+        )
+
+        self.assertEqual(produced, "staged")
+        self.assertEqual(sorted(outputs), [item * 10 + 1 for item in range(40) if item % 5 != 0])
+        self.assertEqual(report["stages"]["project"]["items"], 40)
+        self.assertEqual(report["stages"]["project"]["emitted"], 32)
+        self.assertEqual(report["stages"]["verify"]["items"], 32)
+        self.assertLessEqual(report["stages"]["project"]["max_queue_depth"], 3)
+        self.assertGreater(active["peak"], 1)
+
+    def test_stage_error_aborts_producer_and_is_reraised(self) -> None:
+        emitted: list[int] = []
+
+        def project(item: int) -> int:
+            if item == 2:
+                raise OSError("disk full")
+            return item
+
+        def produce(emit) -> None:
+            for item in range(1000):
+                emit(item)
+                emitted.append(item)
+
+        with self.assertRaisesRegex(OSError, "disk full"):
+            self.pipeline.run_pipeline(produce, [self.pipeline.PipelineStage("project", project, 1)], queue_size=1)
+        self.assertLess(len(emitted), 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
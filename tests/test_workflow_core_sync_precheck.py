@@ -8,6 +8,8 @@ tests/test_workflow_core_sync_precheck.py
   - 驗證 overlay/state dirty 會回 warn 與 manual review
   - 驗證 core managed path dirty 會直接 fail
   - 驗證 strict-clean 會把非 core dirty 升級成 fail
+  - 驗證 porcelain v2 -z 解析、untracked-files 模式與 pathspec 範圍
+  - 驗證 managed scope 只掃 anchors，範圍外以 tracked-only probe 回報
 =========================================
 """
 
@@ -136,6 +138,37 @@ class WorkflowCoreSyncPrecheckTest(unittest.TestCase):
         self.assertEqual(payload["status"], "fail")
         self.assertIn("doc/plans/Idx-999_plan.md", payload["overlay_only_paths"])
 
+    def test_cli_ndjson_streams_dirty_entries_before_compact_summary(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_git_repo(repo_root)
+            write_manifest(repo_root)
+            commit_all(repo_root, "seed manifest")
+            for rel_path in [".agent/workflows/dev-team.md", "doc/plans/Idx-999_plan.md"]:
+                dirty_path = repo_root / rel_path
+                dirty_path.parent.mkdir(parents=True, exist_ok=True)
+                dirty_path.write_text("draft\n", encoding="utf-8")
+
+            stdout = io.StringIO()
+            with patch("sys.stdout", stdout):
+                exit_code = self.precheck.main(
+                    ["--repo-root", str(repo_root), "--release-ref", "core-v20260319-1", "--ndjson"]
+                )
+
+        records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(exit_code, self.precheck.EXIT_FAIL)
+        self.assertEqual([record["event"] for record in records], ["phase", "dirty-entry", "dirty-entry", "phase", "summary"])
+        self.assertEqual(
+            {record["path"]: record["category"] for record in records if record["event"] == "dirty-entry"},
+            {".agent/workflows/dev-team.md": "managed", "doc/plans/Idx-999_plan.md": "overlay"},
+        )
+        summary = records[-1]
+        self.assertEqual(summary["status"], "fail")
+        self.assertEqual(summary["dirty_entries_count"], 2)
+        self.assertEqual(summary["core_divergence_paths_count"], 1)
+        self.assertNotIn("dirty_entries", summary)
+        self.assertIn("manifest_cache", summary)
+
     def test_missing_manifest_returns_error(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
             repo_root = Path(temp_dir)
@@ -159,6 +192,23 @@ class WorkflowCoreSyncPrecheckTest(unittest.TestCase):
         self.assertEqual(payload["status"], "error")
         self.assertIn("manifest not found", payload["error"])
 
+    def test_cli_ndjson_reports_errors_as_single_line_record(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_git_repo(repo_root)
+            stdout = io.StringIO()
+            stderr = io.StringIO()
+            with patch("sys.stdout", stdout), patch("sys.stderr", stderr):
+                exit_code = self.precheck.main(["--repo-root", str(repo_root), "--release-ref", "core-v20260319-1", "--ndjson"])
+
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(exit_code, self.precheck.EXIT_ERROR)
+        self.assertEqual(stderr.getvalue(), "")
+        self.assertEqual(len(lines), 1)
+        record = json.loads(lines[0])
+        self.assertEqual((record["event"], record["status"]), ("error", "error"))
+        self.assertIn("manifest not found", record["error"])
+
     def test_review_required_skill_package_is_unclassified_warn(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
             repo_root = Path(temp_dir)
@@ -175,5 +225,90 @@ class WorkflowCoreSyncPrecheckTest(unittest.TestCase):
         self.assertIn(".agent/skills/explore-cli-tool/SKILL.md", result["unclassified_paths"])
 
 
+    def test_v2_status_keeps_unusual_rename_paths_intact(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_git_repo(repo_root)
+            write_manifest(repo_root)
+            odd_source = repo_root / "doc" / "plans" / 'a -> "b" 計畫.md'
+            odd_source.parent.mkdir(parents=True, exist_ok=True)
+            odd_source.write_text("plan\n", encoding="utf-8")
+            commit_all(repo_root, "seed manifest")
+            (repo_root / ".agent" / "workflows").mkdir(parents=True, exist_ok=True)
+            subprocess.run(
+                ["git", "-C", str(repo_root), "mv", 'doc/plans/a -> "b" 計畫.md', ".agent/workflows/moved plan.md"],
+                check=True,
+            )
+
+            entries = self.precheck.list_git_status(repo_root)
+            result = self.precheck.run_sync_precheck(repo_root, release_ref="core-v20260319-1")
+
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]["raw_status"], "R ")
+        self.assertEqual(entries[0]["path"], ".agent/workflows/moved plan.md")
+        self.assertEqual(entries[0]["source_path"], 'doc/plans/a -> "b" 計畫.md')
+        self.assertEqual(result["core_divergence_paths"], [".agent/workflows/moved plan.md"])
+
+    def test_untracked_files_no_and_pathspec_limit_status_scan(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_git_repo(repo_root)
+            write_manifest(repo_root)
+            tracked = repo_root / "doc" / "plans" / "tracked.md"
+            tracked.parent.mkdir(parents=True, exist_ok=True)
+            tracked.write_text("v1\n", encoding="utf-8")
+            commit_all(repo_root, "seed manifest")
+            tracked.write_text("v2\n", encoding="utf-8")
+            untracked = repo_root / ".agent" / "workflows" / "draft.md"
+            untracked.parent.mkdir(parents=True, exist_ok=True)
+            untracked.write_text("draft\n", encoding="utf-8")
+
+            without_untracked = self.precheck.run_sync_precheck(repo_root, release_ref="core-v20260319-1", untracked_files="no")
+            scoped = self.precheck.run_sync_precheck(repo_root, release_ref="core-v20260319-1", pathspecs=[".agent/workflows"])
+
+        self.assertEqual([entry["path"] for entry in without_untracked["dirty_entries"]], ["doc/plans/tracked.md"])
+        self.assertEqual(without_untracked["status"], "warn")
+        self.assertEqual([entry["path"] for entry in scoped["dirty_entries"]], [".agent/workflows/draft.md"])
+        self.assertEqual(scoped["status"], "fail")
+        self.assertEqual(scoped["pathspecs"], [".agent/workflows"])
+
+
+    def test_managed_scope_ignores_untracked_overlay_and_probes_tracked_changes_outside(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_git_repo(repo_root)
+            write_manifest(repo_root)
+            tracked_overlay = repo_root / "doc" / "plans" / "tracked.md"
+            tracked_overlay.parent.mkdir(parents=True, exist_ok=True)
+            tracked_overlay.write_text("v1\n", encoding="utf-8")
+            commit_all(repo_root, "seed manifest")
+            vendor_dir = repo_root / "vendor" / "generated"
+            vendor_dir.mkdir(parents=True)
+            for index in range(20):
+                (vendor_dir / f"file-{index}.txt").write_text("generated\n", encoding="utf-8")
+            state_path = repo_root / ".agent" / "state" / "skills" / "audit.log"
+            state_path.parent.mkdir(parents=True, exist_ok=True)
+            state_path.write_text("entry\n", encoding="utf-8")
+
+            clean_outside = self.precheck.run_sync_precheck(repo_root, release_ref="core-v20260319-1", scope="managed")
+            tracked_overlay.write_text("v2\n", encoding="utf-8")
+            dirty_outside = self.precheck.run_sync_precheck(repo_root, release_ref="core-v20260319-1", scope="managed")
+            skipped_probe = self.precheck.run_sync_precheck(
+                repo_root, release_ref="core-v20260319-1", scope="managed", probe_outside=False
+            )
+
+        self.assertEqual(clean_outside["scope"], "managed")
+        self.assertEqual([entry["path"] for entry in clean_outside["dirty_entries"]], [".agent/state/skills/audit.log"])
+        self.assertEqual(clean_outside["unclassified_paths"], [])
+        self.assertIsNone(clean_outside["outside_scope_dirty_path"])
+        self.assertIn(":(literal).agent/workflows", clean_outside["pathspecs"])
+        self.assertEqual(dirty_outside["outside_scope_dirty_path"], "doc/plans/tracked.md")
+        self.assertIn("outside-scope-dirty", dirty_outside["manual_review_reasons"])
+        self.assertEqual(dirty_outside["overlay_only_paths"], [])
+        self.assertFalse(skipped_probe["outside_scope_probed"])
+        self.assertIsNone(skipped_probe["outside_scope_dirty_path"])
+        self.assertNotIn("outside-scope-dirty", skipped_probe["manual_review_reasons"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""focused tests for workflow-core phase tracing."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = REPO_ROOT / ".agent" / "runtime" / "scripts"
+MANIFEST_FILE = REPO_ROOT / "core_ownership_manifest.yml"
+
+
+def load_module(module_name: str, file_path: Path):
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"無法載入模組：{file_path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def init_git_repo(repo_root: Path) -> None:
+    subprocess.run(["git", "init", "-q", str(repo_root)], check=True)
+    subprocess.run(["git", "-C", str(repo_root), "config", "user.name", "Test User"], check=True)
+    subprocess.run(["git", "-C", str(repo_root), "config", "user.email", "test@example.com"], check=True)
+
+
+class WorkflowCoreTracingTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.tracing = load_module("test_workflow_core_tracing_module", SCRIPTS_DIR / "workflow_core_tracing.py")
+
+    def setUp(self) -> None:
+        self.tracing.TRACER.reset()
+
+    def test_nested_phases_report_paths_and_counter_deltas(self) -> None:
+        @self.tracing.traced("outer")
+        def outer() -> None:
+            self.tracing.count_subprocess()
+            with self.tracing.trace_phase("inner"):
+                self.tracing.count_subprocess(2)
+                self.tracing.count_bytes_read(100)
+            self.tracing.count_bytes_written(7)
+
+        outer()
+        report = self.tracing.collect_timings()
+
+        phases = {phase["path"]: phase for phase in report["phases"]}
+        self.assertEqual(list(phases), ["outer", "outer/inner"])
+        self.assertEqual(phases["outer"]["depth"], 0)
+        self.assertEqual(phases["outer/inner"]["depth"], 1)
+        self.assertEqual(phases["outer"]["subprocesses"], 3)
+        self.assertEqual(phases["outer/inner"]["subprocesses"], 2)
+        self.assertEqual(phases["outer/inner"]["bytes_read"], 100)
+        self.assertEqual(phases["outer/inner"]["bytes_written"], 0)
+        self.assertEqual(phases["outer"]["bytes_written"], 7)
+        self.assertGreaterEqual(phases["outer"]["wall_ms"], phases["outer/inner"]["wall_ms"])
+        self.assertEqual(report["total_wall_ms"], phases["outer"]["wall_ms"])
+        self.assertEqual(report["total_subprocesses"], 3)
+        self.assertEqual(self.tracing.TRACER.phases, [])
+
+    def test_phase_cpu_time_excludes_other_threads(self) -> None:
+        def spin() -> None:
+            deadline = time.perf_counter() + 0.3
+            while time.perf_counter() < deadline:
+                pass
+
+        # 等待中的 phase 不可被算進其他執行緒（pipeline worker、smoke thread pool）耗用的 CPU。
+        with self.tracing.trace_phase("wait-for-worker"):
+            worker = threading.Thread(target=spin)
+            worker.start()
+            worker.join()
+        phase = self.tracing.collect_timings()["phases"][0]
+
+        self.assertGreaterEqual(phase["wall_ms"], 300)
+        self.assertLess(phase["cpu_ms"], phase["wall_ms"] / 2)
+
+    def test_collect_timings_writes_chrome_trace_when_configured(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            trace_path = Path(temp_dir) / "traces" / "run.json"
+            with self.tracing.trace_phase("sync-update"):
+                with self.tracing.trace_phase("sync-stage"):
+                    pass
+            with patch.dict(os.environ, {self.tracing.TRACE_FILE_ENV: str(trace_path)}):
+                report = self.tracing.collect_timings()
+            trace = json.loads(trace_path.read_text(encoding="utf-8"))
+
+        self.assertEqual(report["trace_file"], str(trace_path.resolve()))
+        self.assertEqual([event["name"] for event in trace["traceEvents"]], ["sync-update", "sync-stage"])
+        self.assertTrue(all(event["ph"] == "X" for event in trace["traceEvents"]))
+        self.assertEqual(trace["traceEvents"][1]["args"]["path"], "sync-update/sync-stage")
+
+    def test_wrapper_json_includes_timings_block(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_git_repo(repo_root)
+            (repo_root / "core_ownership_manifest.yml").write_text(MANIFEST_FILE.read_text(encoding="utf-8"), encoding="utf-8")
+            env = {**os.environ, "WORKFLOW_CORE_DAEMON": "0"}
+            env.pop(self.tracing.TRACE_FILE_ENV, None)
+            proc = subprocess.run(
+                [
+                    sys.executable,
+                    str(SCRIPTS_DIR / "workflow_core_sync_precheck.py"),
+                    "--repo-root",
+                    str(repo_root),
+                    "--release-ref",
+                    "core-v1",
+                    "--json",
+                ],
+                check=False,
+                capture_output=True,
+                text=True,
+                env=env,
+            )
+
+        payload = json.loads(proc.stdout)
+        timings = payload["timings"]
+        self.assertEqual([phase["path"] for phase in timings["phases"]], ["sync-precheck", "sync-precheck/git-status"])
+        self.assertGreaterEqual(timings["total_subprocesses"], 1)
+        self.assertEqual(timings["phases"][1]["subprocesses"], 1)
+        self.assertGreater(timings["peak_rss_kb"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
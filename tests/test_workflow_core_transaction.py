@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""focused tests for the journaled workflow-core apply transaction."""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = REPO_ROOT / ".agent" / "runtime" / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+def load_module(module_name: str, file_path: Path):
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"無法載入模組：{file_path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_files(root: Path, files: dict[str, str]) -> None:
+    for rel_path, text in files.items():
+        target = root / rel_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(text, encoding="utf-8")
+
+
+def read_files(root: Path, rel_paths: list[str]) -> dict[str, str | None]:
+    return {rel_path: (root / rel_path).read_text(encoding="utf-8") if (root / rel_path).exists() else None for rel_path in rel_paths}
+
+
+class WorkflowCoreTransactionTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.transaction = load_module("test_workflow_core_transaction_module", SCRIPTS_DIR / "workflow_core_transaction.py")
+        cls.projection = load_module("test_workflow_core_transaction_projection", SCRIPTS_DIR / "workflow_core_projection.py")
+
+    def stage_interrupted_commit(self, repo_root: Path):
+        write_files(repo_root, {"a.md": "old a\n", "b.md": "old b\n", "gone.md": "gone\n"})
+        txn = self.transaction.ApplyTransaction.begin(repo_root)
+        txn.stage_write("a.md").write_text("new a\n", encoding="utf-8")
+        txn.stage_write("dir/c.md").write_text("new c\n", encoding="utf-8")
+        txn.stage_write("b.md").write_text("new b\n", encoding="utf-8")
+        txn.stage_delete("gone.md")
+        txn.prepare()
+        txn.journal["state"] = "committing"
+        txn.save()
+        # 模擬在換入第二個檔案後中斷。
+        for operation in txn.operations[:2]:
+            txn.apply_operation(operation)
+        return txn
+
+    def test_commit_swaps_all_paths_and_removes_journal(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            write_files(repo_root, {"a.md": "old a\n", "gone.md": "gone\n"})
+            txn = self.transaction.ApplyTransaction.begin(repo_root)
+            txn.stage_write("a.md").write_text("new a\n", encoding="utf-8")
+            txn.stage_write("dir/c.md").write_text("new c\n", encoding="utf-8")
+            txn.stage_delete("gone.md")
+            untouched_before_commit = read_files(repo_root, ["a.md", "dir/c.md"])
+            txn.commit()
+
+            files = read_files(repo_root, ["a.md", "dir/c.md", "gone.md"])
+            leftover = self.transaction.pending_transactions(repo_root)
+
+        self.assertEqual(untouched_before_commit, {"a.md": "old a\n", "dir/c.md": None})
+        self.assertEqual(files, {"a.md": "new a\n", "dir/c.md": "new c\n", "gone.md": None})
+        self.assertEqual(leftover, [])
+
+    def test_commit_without_syncfs_fsyncs_staged_files_and_swapped_directories(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            write_files(repo_root, {"a.md": "old a\n", "old/gone.md": "gone\n"})
+            txn = self.transaction.ApplyTransaction.begin(repo_root)
+            staged = txn.stage_write("dir/c.md")
+            staged.write_text("new c\n", encoding="utf-8")
+            txn.stage_delete("old/gone.md")
+            synced: list[Path] = []
+            with patch.object(self.transaction, "SYNCFS", None), patch.object(
+                self.transaction, "fsync_path", side_effect=synced.append
+            ):
+                txn.commit()
+
+        self.assertIn(staged, synced)
+        self.assertIn(staged.parent, synced)
+        self.assertIn(repo_root / "dir", synced)
+        self.assertIn(repo_root / "old", synced)
+
+    def test_interrupted_commit_can_be_resumed(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            self.stage_interrupted_commit(repo_root)
+
+            recovered = self.transaction.recover_pending_transactions(repo_root, "resume")
+            files = read_files(repo_root, ["a.md", "b.md", "dir/c.md", "gone.md"])
+            leftover = self.transaction.pending_transactions(repo_root)
+
+        self.assertEqual([item["outcome"] for item in recovered], ["resumed"])
+        self.assertEqual(files, {"a.md": "new a\n", "b.md": "new b\n", "dir/c.md": "new c\n", "gone.md": None})
+        self.assertEqual(leftover, [])
+
+    def test_interrupted_commit_can_be_rolled_back(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            self.stage_interrupted_commit(repo_root)
+
+            recovered = self.transaction.recover_pending_transactions(repo_root, "rollback")
+            files = read_files(repo_root, ["a.md", "b.md", "dir/c.md", "gone.md"])
+
+        self.assertEqual([item["outcome"] for item in recovered], ["rolled-back"])
+        self.assertEqual(files, {"a.md": "old a\n", "b.md": "old b\n", "dir/c.md": None, "gone.md": "gone\n"})
+
+    def test_write_projected_file_replaces_linked_targets_for_every_strategy(self) -> None:
+        for strategy in ("copy", "hardlink", "auto"):
+            for link_kind in ("hardlink", "symlink"):
+                with self.subTest(strategy=strategy, link_kind=link_kind), tempfile.TemporaryDirectory() as temp_dir:
+                    root = Path(temp_dir)
+                    write_files(root, {"staging/a.md": "new\n", "outside/a.md": "keep\n"})
+                    target = root / "repo" / "a.md"
+                    target.parent.mkdir(parents=True)
+                    # 目標先前是 hardlink（例如 --strategy hardlink）或指向 repo 外的 symlink。
+                    if link_kind == "hardlink":
+                        os.link(root / "outside" / "a.md", target)
+                    else:
+                        target.symlink_to(root / "outside" / "a.md")
+
+                    self.projection.write_projected_file(root / "staging" / "a.md", target, strategy)
+
+                    self.assertEqual((root / "outside" / "a.md").read_text(encoding="utf-8"), "keep\n")
+                    self.assertEqual(target.read_text(encoding="utf-8"), "new\n")
+                    self.assertFalse(target.is_symlink())
+
+    def test_projection_failure_while_staging_leaves_managed_surface_untouched(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            repo_root = root / "downstream"
+            staging_root = root / "staging"
+            write_files(repo_root, {".agent/workflows/a.md": "old a\n", ".agent/workflows/b.md": "old b\n"})
+            write_files(staging_root, {".agent/workflows/a.md": "new a\n", ".agent/workflows/b.md": "new b\n"})
+            paths = [".agent/workflows/a.md", ".agent/workflows/b.md"]
+            real_write = self.projection.write_projected_file
+            calls: list[Path] = []
+
+            def failing_write(source_path: Path, target_path: Path, strategy: str = "auto") -> str:
+                calls.append(target_path)
+                if len(calls) == 2:
+                    raise OSError("disk full")
+                return real_write(source_path, target_path, strategy)
+
+            with patch.object(self.projection, "write_projected_file", side_effect=failing_write):
+                with self.assertRaises(OSError):
+                    self.projection.materialize_managed_paths(repo_root, staging_root, paths)
+            files = read_files(repo_root, paths)
+            leftover = self.transaction.pending_transactions(repo_root)
+
+        self.assertEqual(files, {".agent/workflows/a.md": "old a\n", ".agent/workflows/b.md": "old b\n"})
+        self.assertEqual(leftover, [])
+
+    def test_projection_commits_caller_transaction_with_deletes_in_one_swap(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            repo_root = root / "downstream"
+            staging_root = root / "staging"
+            write_files(repo_root, {".agent/workflows/a.md": "old a\n", ".agent/workflows/gone.md": "gone\n"})
+            write_files(staging_root, {".agent/workflows/a.md": "new a\n", ".agent/workflows/b.md": "new b\n"})
+            paths = [".agent/workflows/a.md", ".agent/workflows/b.md"]
+
+            failing = self.transaction.ApplyTransaction.begin(repo_root)
+            failing.stage_delete(".agent/workflows/gone.md")
+            with patch.object(self.projection, "write_projected_file", side_effect=OSError("disk full")):
+                with self.assertRaises(OSError):
+                    self.projection.materialize_managed_paths(repo_root, staging_root, paths, transaction=failing)
+            after_failure = read_files(repo_root, [*paths, ".agent/workflows/gone.md"])
+
+            shared = self.transaction.ApplyTransaction.begin(repo_root)
+            shared.stage_delete(".agent/workflows/gone.md")
+            # 模擬 pipeline 已預先寫好 a.md；projection 只補寫 b.md。
+            shared.stage_write(".agent/workflows/a.md").write_text("new a\n", encoding="utf-8")
+            projected, counts = self.projection.materialize_managed_paths(repo_root, staging_root, paths, transaction=shared)
+            after_commit = read_files(repo_root, [*paths, ".agent/workflows/gone.md"])
+            leftover = self.transaction.pending_transactions(repo_root)
+
+        self.assertEqual(
+            after_failure,
+            {".agent/workflows/a.md": "old a\n", ".agent/workflows/b.md": None, ".agent/workflows/gone.md": "gone\n"},
+        )
+        self.assertEqual(
+            after_commit,
+            {".agent/workflows/a.md": "new a\n", ".agent/workflows/b.md": "new b\n", ".agent/workflows/gone.md": None},
+        )
+        self.assertEqual(shared.state, "committed")
+        self.assertEqual(leftover, [])
+        self.assertEqual(projected, paths)
+        self.assertEqual(counts["prestaged"], 1)
+        self.assertEqual(sum(counts.values()), len(projected))
+
+
+if __name__ == "__main__":
+    unittest.main()
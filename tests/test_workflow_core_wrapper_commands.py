@@ -5,11 +5,13 @@ from __future__ import annotations
 
 import importlib.util
 import json
+import os
 import subprocess
 import sys
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -48,8 +50,11 @@ def write_runtime_scripts(repo_root: Path) -> None:
     target_dir.mkdir(parents=True, exist_ok=True)
     files_to_copy = [
         "workflow_core_manifest.py",
+        "workflow_core_blob_store.py",
+        "workflow_core_change_journal.py",
         "workflow_core_contracts.py",
         "workflow_core_obsidian_restricted_mount.py",
+        "workflow_core_pipeline.py",
         "workflow_core_release_precheck.py",
         "workflow_core_release_create.py",
         "workflow_core_release_publish_notes.py",
@@ -59,6 +64,8 @@ def write_runtime_scripts(repo_root: Path) -> None:
         "workflow_core_sync_apply.py",
         "workflow_core_sync_verify.py",
         "workflow_core_projection.py",
+        "workflow_core_tracing.py",
+        "workflow_core_transaction.py",
     ]
     for filename in files_to_copy:
         (target_dir / filename).write_text((SCRIPTS_DIR / filename).read_text(encoding="utf-8"), encoding="utf-8")
@@ -115,8 +122,10 @@ class WorkflowCoreWrapperCommandsTest(unittest.TestCase):
         cls.release_precheck = load_module("test_workflow_core_release_precheck", SCRIPTS_DIR / "workflow_core_release_precheck.py")
         cls.release_create = load_module("test_workflow_core_release_create", SCRIPTS_DIR / "workflow_core_release_create.py")
         cls.release_publish = load_module("test_workflow_core_release_publish_notes", SCRIPTS_DIR / "workflow_core_release_publish_notes.py")
+        cls.release_diff = load_module("test_workflow_core_release_diff", SCRIPTS_DIR / "workflow_core_release_diff.py")
         cls.sync_stage = load_module("test_workflow_core_sync_stage", SCRIPTS_DIR / "workflow_core_sync_stage.py")
         cls.sync_update = load_module("test_workflow_core_sync_update", SCRIPTS_DIR / "workflow_core_sync_update.py")
+        cls.sync_fanout = load_module("test_workflow_core_sync_fanout", SCRIPTS_DIR / "workflow_core_sync_fanout.py")
         cls.sync_apply = load_module("test_workflow_core_sync_apply", SCRIPTS_DIR / "workflow_core_sync_apply.py")
         cls.sync_verify = load_module("test_workflow_core_sync_verify", SCRIPTS_DIR / "workflow_core_sync_verify.py")
 
@@ -134,6 +143,47 @@ class WorkflowCoreWrapperCommandsTest(unittest.TestCase):
         self.assertTrue(result["portable_smoke_ok"])
         self.assertTrue(result["skills_mutable_split_ok"])
 
+    def test_release_steps_reuse_contract_snapshot_until_inputs_change(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_git_repo(repo_root)
+            write_manifest(repo_root)
+            write_runtime_scripts(repo_root)
+            create_required_live_paths(repo_root, include_index=True)
+            commit_all(repo_root, "seed")
+            manifest_path = repo_root / "core_ownership_manifest.yml"
+
+            first = self.release_precheck.run_release_precheck(repo_root, manifest_path, "candidate")
+            notes = self.release_publish.run_release_publish_notes(repo_root, manifest_path, "candidate", output_path=repo_root / "out")
+            # anchor 仍存在，但符合 `.agent/workflows/**` 的檔案變了，也不可沿用舊 snapshot。
+            (repo_root / ".agent" / "workflows" / "added.md").write_text("new\n", encoding="utf-8")
+            glob_changed = self.release_precheck.run_release_precheck(repo_root, manifest_path, "candidate")
+            (repo_root / "doc" / "implementation_plan_index.md").unlink()
+            anchor_removed = self.release_precheck.run_release_precheck(repo_root, manifest_path, "candidate")
+            (repo_root / "doc" / "implementation_plan_index.md").write_text("# Index\n", encoding="utf-8")
+            manifest_path.write_text(manifest_path.read_text(encoding="utf-8") + "# trailing comment\n", encoding="utf-8")
+            manifest_changed = self.release_precheck.run_release_precheck(repo_root, manifest_path, "candidate")
+            uncached = self.release_precheck.run_release_precheck(repo_root, manifest_path, "candidate", use_contract_snapshot=False)
+            snapshot_exists = (repo_root / ".git" / "workflow-core" / "contract-snapshot.json").is_file()
+            untracked = subprocess.run(
+                ["git", "-C", str(repo_root), "status", "--porcelain", "--untracked-files=all"],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+
+        self.assertEqual((first["contract_snapshot"]["status"], first["contract_snapshot"]["reason"]), ("miss", "missing"))
+        self.assertEqual(notes["contract_snapshot"]["status"], "hit")
+        self.assertEqual(notes["status"], "pass")
+        self.assertEqual((glob_changed["contract_snapshot"]["status"], glob_changed["contract_snapshot"]["reason"]), ("miss", "matches-changed"))
+        self.assertEqual((anchor_removed["contract_snapshot"]["status"], anchor_removed["contract_snapshot"]["reason"]), ("miss", "anchors-changed"))
+        self.assertEqual(anchor_removed["status"], "fail")
+        self.assertEqual(manifest_changed["contract_snapshot"]["reason"], "inputs-changed")
+        self.assertEqual(manifest_changed["status"], "pass")
+        self.assertIsNone(uncached["contract_snapshot"])
+        self.assertTrue(snapshot_exists)
+        self.assertNotIn("contract-snapshot", untracked)
+
     def test_release_precheck_fails_when_portable_smoke_fails(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
             repo_root = Path(temp_dir)
@@ -195,6 +245,65 @@ class WorkflowCoreWrapperCommandsTest(unittest.TestCase):
             self.assertEqual(metadata_path.parent, repo_root / "maintainers" / "release_artifacts")
             self.assertTrue(metadata_path.exists())
 
+    def test_release_create_bundle_can_be_staged_without_git_objects(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            upstream_root = root / "upstream"
+            downstream_root = root / "downstream"
+            init_git_repo(upstream_root)
+            write_manifest(upstream_root)
+            write_runtime_scripts(upstream_root)
+            create_required_live_paths(upstream_root, include_index=True)
+            workflows_dir = upstream_root / ".agent" / "workflows"
+            (workflows_dir / "example.md").write_text("same\n", encoding="utf-8")
+            (workflows_dir / "copy.md").write_text("same\n", encoding="utf-8")
+            commit_all(upstream_root, "seed")
+
+            create_result = self.release_create.run_release_create(
+                repo_root=upstream_root,
+                manifest_path=upstream_root / "core_ownership_manifest.yml",
+                release_ref="core-v20260402-1",
+                output_path=root / "artifacts",
+                bundle=True,
+            )
+            bundle = create_result["bundle"]
+            index = json.loads(Path(bundle["index_path"]).read_text(encoding="utf-8"))
+            example_entry = next(item for item in index["files"] if item["path"] == ".agent/workflows/example.md")
+            copy_entry = next(item for item in index["files"] if item["path"] == ".agent/workflows/copy.md")
+
+            init_git_repo(downstream_root)
+            write_manifest(downstream_root)
+            commit_all(downstream_root, "seed downstream")
+            stage_result = self.sync_stage.run_sync_stage(
+                repo_root=downstream_root,
+                release_ref="core-v20260402-1",
+                staging_root=root / "staging",
+                bundle_path=Path(bundle["index_path"]),
+            )
+            staged_example = (root / "staging" / ".agent" / "workflows" / "example.md").read_text(encoding="utf-8")
+
+            pack_path = Path(bundle["pack_path"])
+            tampered = bytearray(pack_path.read_bytes())
+            tampered[example_entry["offset"]] ^= 0xFF
+            pack_path.write_bytes(bytes(tampered))
+            with self.assertRaisesRegex(RuntimeError, "sha256"):
+                self.sync_stage.run_sync_stage(
+                    repo_root=downstream_root,
+                    release_ref="core-v20260402-1",
+                    staging_root=root / "staging-tampered",
+                    bundle_path=Path(bundle["index_path"]),
+                )
+
+        self.assertEqual(create_result["status"], "pass")
+        self.assertIn(bundle["index_path"], create_result["created_artifacts"])
+        self.assertEqual(example_entry["offset"], copy_entry["offset"])
+        self.assertLess(index["pack_size"], index["total_bytes"])
+        self.assertRegex(example_entry["oid"], r"^[0-9a-f]{40,64}$")
+        self.assertEqual(stage_result["status"], "pass")
+        self.assertEqual(stage_result["bundle_path"], bundle["index_path"])
+        self.assertEqual(stage_result["selected_paths"], sorted(item["path"] for item in index["files"]))
+        self.assertEqual(staged_example, "same\n")
+
     def test_release_create_metadata_does_not_collide_with_publish_notes_sidecar(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
             repo_root = Path(temp_dir)
@@ -226,6 +335,65 @@ class WorkflowCoreWrapperCommandsTest(unittest.TestCase):
             self.assertTrue(notes_json_path.exists())
             self.assertNotEqual(metadata_path.name, notes_json_path.name)
 
+    def test_release_diff_groups_tree_oid_changes_by_include_pattern(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_git_repo(repo_root)
+            write_manifest(repo_root)
+            write_runtime_scripts(repo_root)
+            create_required_live_paths(repo_root, include_index=True)
+            workflows_dir = repo_root / ".agent" / "workflows"
+            (workflows_dir / "example.md").write_text("v1\n", encoding="utf-8")
+            (workflows_dir / "old_name.md").write_text("moved content\n", encoding="utf-8")
+            (workflows_dir / "removed.md").write_text("bye\n", encoding="utf-8")
+            subprocess.run(["git", "-C", str(repo_root), "tag", "core-v20260501-1", commit_all(repo_root, "release one")], check=True)
+            (workflows_dir / "example.md").write_text("version two\n", encoding="utf-8")
+            (workflows_dir / "old_name.md").rename(workflows_dir / "new_name.md")
+            (workflows_dir / "removed.md").unlink()
+            (workflows_dir / "added.md").write_text("new\n", encoding="utf-8")
+            (repo_root / "unexported.txt").write_text("not in the profile\n", encoding="utf-8")
+            subprocess.run(["git", "-C", str(repo_root), "tag", "core-v20260501-2", commit_all(repo_root, "release two")], check=True)
+
+            result = self.release_diff.run_release_diff(repo_root=repo_root, from_ref="core-v20260501-1", to_ref="core-v20260501-2")
+            contracts = load_module("test_workflow_core_release_diff_contracts", SCRIPTS_DIR / "workflow_core_contracts.py")
+            with contracts.GitBlobReader(repo_root) as reader:
+                profile = self.release_diff.load_profile_at_ref(reader, "core-v20260501-1", "core_ownership_manifest.yml", None)
+            installed = self.release_diff.select_profile_entries(contracts.list_tree_entries_at_ref(repo_root, "core-v20260501-1"), profile)
+            lock = contracts.build_sync_lock("core-v20260501-1", None, profile["name"], installed)
+            contracts.write_json_file(repo_root / ".workflow-core" / "sync-lock.json", lock)
+            cli = subprocess.run(
+                [
+                    sys.executable,
+                    str(SCRIPTS_DIR / "workflow_core_release_diff.py"),
+                    "--repo-root",
+                    str(repo_root),
+                    "--to-ref",
+                    "core-v20260501-2",
+                    "--json",
+                ],
+                check=False,
+                capture_output=True,
+                text=True,
+            )
+
+        self.assertEqual(result["status"], "pass")
+        self.assertEqual(
+            {key: result["summary"][key] for key in ("added", "modified", "removed", "renamed")},
+            {"added": 1, "modified": 1, "removed": 1, "renamed": 1},
+        )
+        self.assertEqual(result["summary"]["byte_delta"], len("new\n") + len("version two\n") - len("v1\n") - len("bye\n"))
+        self.assertEqual([group["include_pattern"] for group in result["groups"]], [".agent/workflows/**"])
+        group = result["groups"][0]
+        self.assertEqual(group["added"], [{"path": ".agent/workflows/added.md", "size": 4}])
+        self.assertEqual(group["removed"], [{"path": ".agent/workflows/removed.md", "size": 4}])
+        self.assertEqual(group["modified"][0]["path"], ".agent/workflows/example.md")
+        self.assertEqual(group["renamed"], [{"from": ".agent/workflows/old_name.md", "to": ".agent/workflows/new_name.md", "size": 14}])
+        self.assertEqual(cli.returncode, 0, cli.stderr)
+        from_lock = json.loads(cli.stdout)
+        self.assertEqual(from_lock["from"]["kind"], "lock")
+        self.assertEqual(from_lock["from"]["release_ref"], "core-v20260501-1")
+        self.assertEqual(from_lock["summary"], result["summary"])
+
     def test_release_publish_notes_writes_markdown(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
             repo_root = Path(temp_dir)
@@ -296,6 +464,53 @@ class WorkflowCoreWrapperCommandsTest(unittest.TestCase):
         self.assertIn(".agent/workflows/example.md", result["changed_managed_paths"])
         self.assertEqual(restored, "v1\n")
 
+    def test_sync_apply_direct_root_checks_out_through_git_filters(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_git_repo(repo_root)
+            write_manifest(repo_root)
+            write_runtime_scripts(repo_root)
+            create_required_live_paths(repo_root, include_index=True)
+            (repo_root / ".gitattributes").write_text(".agent/workflows/*.md text eol=crlf\n", encoding="utf-8")
+            workflows_dir = repo_root / ".agent" / "workflows"
+            (workflows_dir / "example.md").write_bytes(b"v1\r\n")
+            (workflows_dir / "removed.md").write_bytes(b"to be removed\r\n")
+            first_commit = commit_all(repo_root, "release one")
+            subprocess.run(["git", "-C", str(repo_root), "tag", "core-v20260319-eol-1", first_commit], check=True)
+            (workflows_dir / "example.md").write_bytes(b"v2\r\n")
+            (workflows_dir / "removed.md").unlink()
+            second_commit = commit_all(repo_root, "release two")
+            subprocess.run(["git", "-C", str(repo_root), "tag", "core-v20260319-eol-2", second_commit], check=True)
+            subprocess.run(["git", "-C", str(repo_root), "reset", "-q", "--hard", first_commit], check=True)
+
+            def apply(release_ref: str) -> dict:
+                return self.sync_apply.run_sync_apply(
+                    repo_root=repo_root,
+                    manifest_path=repo_root / "core_ownership_manifest.yml",
+                    release_ref=release_ref,
+                    sync_mode="direct-root",
+                    incremental=True,
+                )
+
+            first_result = apply("core-v20260319-eol-1")
+            commit_all(repo_root, "install release one")
+            second_result = apply("core-v20260319-eol-2")
+            example_bytes = (workflows_dir / "example.md").read_bytes()
+            removed_in_index = subprocess.run(
+                ["git", "-C", str(repo_root), "ls-files", "--", ".agent/workflows/removed.md"],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout.strip()
+
+        self.assertEqual(first_result["status"], "pass", first_result["notes"])
+        self.assertEqual(second_result["status"], "pass", second_result["notes"])
+        self.assertEqual(second_result["deleted_managed_paths"], [".agent/workflows/removed.md"])
+        # 內容需經 eol filter，與 `git checkout` 寫出的一致，而不是 blob 的原始 LF。
+        self.assertEqual(example_bytes, b"v2\r\n")
+        # 刪除的 managed path 也要從 index 移除，避免 git status 出現殘留的刪除。
+        self.assertEqual(removed_in_index, "")
+
     def test_sync_apply_materializes_managed_paths_from_staging_root(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
             repo_root = Path(temp_dir)
@@ -442,6 +657,167 @@ class WorkflowCoreWrapperCommandsTest(unittest.TestCase):
         self.assertEqual(verify_result["status"], "pass")
         self.assertEqual(restored, "remote staged workflow\n")
 
+    def test_sync_stage_partial_remote_fetch_skips_unselected_blobs(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            upstream_root = root / "upstream"
+            bare_root = root / "upstream.git"
+            downstream_root = root / "downstream"
+
+            init_git_repo(upstream_root)
+            write_manifest(upstream_root)
+            write_runtime_scripts(upstream_root)
+            create_required_live_paths(upstream_root, include_index=True)
+            (upstream_root / ".agent" / "workflows" / "example.md").write_text("partial staged workflow\n", encoding="utf-8")
+            (upstream_root / "maintainer").mkdir()
+            (upstream_root / "maintainer" / "large-fixture.bin").write_bytes(os.urandom(2 * 1024 * 1024))
+            commit_all(upstream_root, "seed upstream release with maintainer-only fixture")
+            subprocess.run(["git", "-C", str(upstream_root), "commit", "-q", "--allow-empty", "-m", "second upstream commit"], check=True)
+            subprocess.run(["git", "-C", str(upstream_root), "tag", "core-v20260320-partial"], check=True)
+            subprocess.run(["git", "clone", "-q", "--bare", str(upstream_root), str(bare_root)], check=True)
+            subprocess.run(["git", "-C", str(bare_root), "config", "uploadpack.allowFilter", "true"], check=True)
+            large_oid = subprocess.run(
+                ["git", "-C", str(bare_root), "rev-parse", "core-v20260320-partial:maintainer/large-fixture.bin"],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout.strip()
+
+            init_git_repo(downstream_root)
+            write_manifest(downstream_root)
+            write_runtime_scripts(downstream_root)
+            create_required_live_paths(downstream_root, include_index=False)
+            commit_all(downstream_root, "seed downstream baseline")
+            subprocess.run(["git", "-C", str(downstream_root), "remote", "add", "workflow-core-upstream", str(bare_root)], check=True)
+            subprocess.run(["git", "-C", str(downstream_root), "fetch", "-q", "workflow-core-upstream"], check=True)
+
+            def downstream_git_state() -> tuple[str, str, bool]:
+                config = (downstream_root / ".git" / "config").read_text(encoding="utf-8")
+                refs = subprocess.run(
+                    ["git", "-C", str(downstream_root), "for-each-ref", "--format=%(refname) %(objectname)"],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+                return config, refs, (downstream_root / ".git" / "shallow").exists()
+
+            before_state = downstream_git_state()
+            stage_result = self.sync_stage.run_sync_stage(
+                repo_root=downstream_root,
+                release_ref="core-v20260320-partial",
+                source_remote="workflow-core-upstream",
+                remote_fetch="partial",
+                blob_store=True,
+            )
+            staged = (Path(stage_result["staging_root"]) / ".agent" / "workflows" / "example.md").read_text(encoding="utf-8")
+            object_repo = Path(stage_result["remote_fetch"]["object_repo"])
+            missing = subprocess.run(
+                ["git", "-C", str(object_repo), "rev-list", "--objects", "--missing=print", stage_result["resolved_source_ref"]],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout.split()
+            scratch_shallow = (object_repo / "shallow").is_file()
+            after_state = downstream_git_state()
+
+        report = stage_result["remote_fetch"]
+        self.assertEqual(stage_result["status"], "pass")
+        self.assertEqual(staged, "partial staged workflow\n")
+        self.assertEqual(report["mode"], "partial")
+        self.assertEqual(report["fetches"][0]["kind"], "ref")
+        self.assertEqual({record["kind"] for record in report["fetches"][1:]}, {"blobs"})
+        self.assertTrue(all(record["filter_honored"] for record in report["fetches"]))
+        self.assertEqual(report["total_bytes"], sum(record["bytes"] for record in report["fetches"]))
+        self.assertLess(report["total_bytes"], 256 * 1024)
+        self.assertIn(f"?{large_oid}", missing)
+        self.assertTrue(scratch_shallow)
+        self.assertEqual(object_repo.parent.resolve(), (downstream_root / ".git" / "workflow-core" / "partial-fetch").resolve())
+        self.assertEqual(after_state, before_state)
+        self.assertFalse(after_state[2])
+
+    def test_sync_update_partial_remote_fetch_keeps_scratch_repo_out_of_worktree(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            upstream_root = root / "upstream"
+            bare_root = root / "upstream.git"
+            downstream_root = root / "downstream"
+
+            init_git_repo(upstream_root)
+            write_manifest(upstream_root)
+            write_runtime_scripts(upstream_root)
+            create_required_live_paths(upstream_root, include_index=True)
+            (upstream_root / ".agent" / "workflows" / "example.md").write_text("partial synced workflow\n", encoding="utf-8")
+            commit_all(upstream_root, "seed upstream release")
+            subprocess.run(["git", "-C", str(upstream_root), "tag", "core-v20260320-partial-update"], check=True)
+            subprocess.run(["git", "clone", "-q", "--bare", str(upstream_root), str(bare_root)], check=True)
+            subprocess.run(["git", "-C", str(bare_root), "config", "uploadpack.allowFilter", "true"], check=True)
+
+            init_git_repo(downstream_root)
+            write_manifest(downstream_root)
+            write_runtime_scripts(downstream_root)
+            create_required_live_paths(downstream_root, include_index=False)
+            commit_all(downstream_root, "seed downstream baseline")
+            subprocess.run(["git", "-C", str(downstream_root), "remote", "add", "workflow-core-upstream", str(bare_root)], check=True)
+
+            result = self.sync_update.run_sync_update(
+                repo_root=downstream_root,
+                manifest_path=downstream_root / "core_ownership_manifest.yml",
+                release_ref="core-v20260320-partial-update",
+                source_remote="workflow-core-upstream",
+                remote_fetch="partial",
+            )
+            example_text = (downstream_root / ".agent" / "workflows" / "example.md").read_text(encoding="utf-8")
+            untracked = subprocess.run(
+                ["git", "-C", str(downstream_root), "status", "--porcelain", "--untracked-files=all"],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+
+        # scratch repo 位於 git dir，不能在 precheck 中被當成 unclassified dirty paths。
+        self.assertEqual(result["status"], "pass", result["notes"])
+        self.assertEqual(example_text, "partial synced workflow\n")
+        self.assertNotIn("partial-fetch", untracked)
+
+    def test_sync_stage_partial_remote_fetch_requires_remote(self) -> None:
+        with self.assertRaisesRegex(ValueError, "requires --source-remote"):
+            self.sync_stage.run_sync_stage(repo_root=Path.cwd(), release_ref="core-v1", remote_fetch="partial")
+
+    def test_sync_stage_and_apply_emit_progress_events(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir) / "repo"
+            init_git_repo(repo_root)
+            write_manifest(repo_root)
+            write_runtime_scripts(repo_root)
+            create_required_live_paths(repo_root, include_index=True)
+            (repo_root / ".agent" / "workflows" / "example.md").write_text("v1\n", encoding="utf-8")
+            baseline_commit = commit_all(repo_root, "baseline")
+            subprocess.run(["git", "-C", str(repo_root), "tag", "core-v20260402-events", baseline_commit], check=True)
+            stage_events: list[dict] = []
+            apply_events: list[dict] = []
+
+            stage_result = self.sync_stage.run_sync_stage(
+                repo_root=repo_root,
+                release_ref="core-v20260402-events",
+                staging_root=Path(temp_dir) / "staging",
+                on_event=stage_events.append,
+            )
+            apply_result = self.sync_apply.run_sync_apply(
+                repo_root=repo_root,
+                manifest_path=repo_root / "core_ownership_manifest.yml",
+                release_ref="core-v20260402-events",
+                on_event=apply_events.append,
+            )
+
+        written = [event["path"] for event in stage_events if event["event"] == "path-written"]
+        self.assertEqual(written, stage_result["selected_paths"])
+        self.assertEqual(stage_events[-1], {"event": "phase", "phase": "write-paths", "state": "done", "written_path_count": len(written)})
+        self.assertEqual(
+            [event["path"] for event in apply_events if event["event"] == "managed-path"],
+            apply_result["changed_managed_paths"],
+        )
+        self.assertIn({"event": "phase", "phase": "checkout", "state": "done"}, apply_events)
+
     def test_sync_update_runs_stage_apply_verify_with_single_command(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
             root = Path(temp_dir)
@@ -525,6 +901,189 @@ class WorkflowCoreWrapperCommandsTest(unittest.TestCase):
         self.assertIn("obsidian-knowledge/10-inbox/pending-review-notes", snippet_text)
         self.assertFalse(stale_exists)
 
+    def test_sync_update_incremental_only_stages_and_applies_changed_paths(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            upstream_root = root / "upstream"
+            downstream_root = root / "downstream"
+
+            init_git_repo(upstream_root)
+            write_manifest(upstream_root)
+            write_runtime_scripts(upstream_root)
+            create_required_live_paths(upstream_root, include_index=True)
+            workflows_dir = upstream_root / ".agent" / "workflows"
+            (workflows_dir / "example.md").write_text("v1\n", encoding="utf-8")
+            (workflows_dir / "removed.md").write_text("to be removed\n", encoding="utf-8")
+            first_commit = commit_all(upstream_root, "seed release one")
+            subprocess.run(["git", "-C", str(upstream_root), "tag", "core-v20260401-1", first_commit], check=True)
+            (workflows_dir / "example.md").write_text("v2\n", encoding="utf-8")
+            (workflows_dir / "added.md").write_text("new\n", encoding="utf-8")
+            (workflows_dir / "removed.md").unlink()
+            second_commit = commit_all(upstream_root, "seed release two")
+            subprocess.run(["git", "-C", str(upstream_root), "tag", "core-v20260401-2", second_commit], check=True)
+
+            init_git_repo(downstream_root)
+            write_manifest(downstream_root)
+            write_runtime_scripts(downstream_root)
+            create_required_live_paths(downstream_root, include_index=False)
+            commit_all(downstream_root, "seed downstream")
+            subprocess.run(["git", "-C", str(downstream_root), "remote", "add", "workflow-core-upstream", str(upstream_root)], check=True)
+
+            def sync(release_ref: str) -> dict:
+                return self.sync_update.run_sync_update(
+                    repo_root=downstream_root,
+                    manifest_path=downstream_root / "core_ownership_manifest.yml",
+                    release_ref=release_ref,
+                    source_remote="workflow-core-upstream",
+                    incremental=True,
+                )
+
+            first_result = sync("core-v20260401-1")
+            commit_all(downstream_root, "install release one")
+            second_result = sync("core-v20260401-2")
+
+            lock = json.loads((downstream_root / ".workflow-core" / "sync-lock.json").read_text(encoding="utf-8"))
+            example_text = (downstream_root / ".agent" / "workflows" / "example.md").read_text(encoding="utf-8")
+            added_exists = (downstream_root / ".agent" / "workflows" / "added.md").exists()
+            removed_exists = (downstream_root / ".agent" / "workflows" / "removed.md").exists()
+
+        self.assertEqual(first_result["status"], "pass")
+        self.assertIsNone(first_result["stage_result"]["incremental"]["baseline_release_ref"])
+        self.assertEqual(second_result["status"], "pass", second_result["notes"])
+        plan = second_result["stage_result"]["incremental"]
+        self.assertEqual(plan["baseline_release_ref"], "core-v20260401-1")
+        self.assertEqual(plan["added_paths"], [".agent/workflows/added.md"])
+        self.assertEqual(plan["modified_paths"], [".agent/workflows/example.md"])
+        self.assertEqual(plan["deleted_paths"], [".agent/workflows/removed.md"])
+        self.assertGreater(plan["skipped_file_count"], 0)
+        self.assertGreater(plan["skipped_bytes"], 0)
+        self.assertEqual(second_result["stage_result"]["written_path_count"], 2)
+        self.assertEqual(second_result["apply_result"]["deleted_managed_paths"], [".agent/workflows/removed.md"])
+        self.assertEqual(example_text, "v2\n")
+        self.assertTrue(added_exists)
+        self.assertFalse(removed_exists)
+        self.assertEqual(lock["release_ref"], "core-v20260401-2")
+        self.assertIn(".agent/workflows/added.md", lock["entries"])
+        self.assertNotIn(".agent/workflows/removed.md", lock["entries"])
+
+    def test_sync_update_blob_store_reuses_unchanged_blobs_across_releases(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            upstream_root = root / "upstream"
+            downstream_root = root / "downstream"
+
+            init_git_repo(upstream_root)
+            write_manifest(upstream_root)
+            write_runtime_scripts(upstream_root)
+            create_required_live_paths(upstream_root, include_index=True)
+            workflows_dir = upstream_root / ".agent" / "workflows"
+            (workflows_dir / "example.md").write_text("v1\n", encoding="utf-8")
+            first_commit = commit_all(upstream_root, "seed release one")
+            subprocess.run(["git", "-C", str(upstream_root), "tag", "core-v20260402-1", first_commit], check=True)
+            (workflows_dir / "example.md").write_text("v2\n", encoding="utf-8")
+            (workflows_dir / "run.sh").write_text("#!/bin/sh\n", encoding="utf-8")
+            (workflows_dir / "run.sh").chmod(0o755)
+            second_commit = commit_all(upstream_root, "seed release two")
+            subprocess.run(["git", "-C", str(upstream_root), "tag", "core-v20260402-2", second_commit], check=True)
+            v1_oid = subprocess.run(
+                ["git", "-C", str(upstream_root), "rev-parse", f"{first_commit}:.agent/workflows/example.md"],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout.strip()
+
+            init_git_repo(downstream_root)
+            write_manifest(downstream_root)
+            write_runtime_scripts(downstream_root)
+            create_required_live_paths(downstream_root, include_index=False)
+            commit_all(downstream_root, "seed downstream")
+            subprocess.run(["git", "-C", str(downstream_root), "remote", "add", "workflow-core-upstream", str(upstream_root)], check=True)
+
+            def sync(release_ref: str) -> dict:
+                return self.sync_update.run_sync_update(
+                    repo_root=downstream_root,
+                    manifest_path=downstream_root / "core_ownership_manifest.yml",
+                    release_ref=release_ref,
+                    source_remote="workflow-core-upstream",
+                    blob_store=True,
+                    blob_store_keep_releases=1,
+                )
+
+            first_result = sync("core-v20260402-1")
+            commit_all(downstream_root, "install release one")
+            second_result = sync("core-v20260402-2")
+
+            objects_root = downstream_root / ".workflow-core" / "objects"
+            staged_example = Path(second_result["staging_root"]) / ".agent" / "workflows" / "example.md"
+            example_text = (downstream_root / ".agent" / "workflows" / "example.md").read_text(encoding="utf-8")
+            staged_link_count = staged_example.stat().st_nlink
+            # 權限依 git tree 決定，不可沿用唯讀 object 的 0444。
+            example_mode = (downstream_root / ".agent" / "workflows" / "example.md").stat().st_mode & 0o777
+            script_mode = (downstream_root / ".agent" / "workflows" / "run.sh").stat().st_mode & 0o777
+            v1_object_exists = (objects_root / v1_oid[:2] / v1_oid[2:]).exists()
+
+        self.assertEqual(first_result["status"], "pass", first_result["notes"])
+        self.assertEqual(second_result["status"], "pass", second_result["notes"])
+        first_store = first_result["stage_result"]["blob_store"]
+        second_store = second_result["stage_result"]["blob_store"]
+        self.assertEqual(first_store["reused_objects"], 0)
+        self.assertEqual(second_store["fetched_objects"], 2)
+        self.assertEqual(second_store["reused_objects"], first_store["fetched_objects"] - 1)
+        self.assertEqual(second_store["hardlinked_paths"], second_result["stage_result"]["written_path_count"] - 1)
+        self.assertEqual(second_store["gc"]["evicted_releases"], ["core-v20260402-1"])
+        self.assertEqual(second_store["gc"]["removed_objects"], 1)
+        self.assertFalse(v1_object_exists)
+        self.assertEqual(staged_link_count, 2)
+        self.assertEqual(example_text, "v2\n")
+        self.assertEqual(example_mode, 0o644)
+        self.assertEqual(script_mode, 0o755)
+
+    def test_sync_fanout_stages_once_and_isolates_downstream_failures(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            upstream_root = root / "upstream"
+            init_git_repo(upstream_root)
+            write_manifest(upstream_root)
+            write_runtime_scripts(upstream_root)
+            create_required_live_paths(upstream_root, include_index=True)
+            (upstream_root / ".agent" / "workflows" / "example.md").write_text("fan-out release\n", encoding="utf-8")
+            subprocess.run(["git", "-C", str(upstream_root), "tag", "core-v20260501-fanout", commit_all(upstream_root, "release")], check=True)
+
+            downstream_roots = []
+            for name in ["downstream-a", "downstream-b", "downstream-diverged"]:
+                downstream_root = root / name
+                init_git_repo(downstream_root)
+                write_manifest(downstream_root)
+                write_runtime_scripts(downstream_root)
+                create_required_live_paths(downstream_root, include_index=False)
+                commit_all(downstream_root, f"seed {name}")
+                downstream_roots.append(downstream_root)
+            (root / "downstream-diverged" / ".agent" / "workflows" / "AGENT_ENTRY.md").write_text("local edit\n", encoding="utf-8")
+            list_file = root / "downstreams.txt"
+            list_file.write_text("# fan-out targets\ndownstream-a\ndownstream-b  # second\n", encoding="utf-8")
+
+            result = self.sync_fanout.run_sync_fanout(
+                source_repo=upstream_root,
+                release_ref="core-v20260501-fanout",
+                downstream_roots=[*self.sync_fanout.load_downstream_list(list_file), downstream_roots[2], root / "missing"],
+                jobs=2,
+            )
+            synced = [(path / ".agent" / "workflows" / "example.md").read_text(encoding="utf-8") for path in downstream_roots[:2]]
+            diverged_example_exists = (downstream_roots[2] / ".agent" / "workflows" / "example.md").exists()
+
+        records = {Path(record["repo_root"]).name: record for record in result["downstreams"]}
+        self.assertEqual(result["status"], "fail")
+        self.assertEqual(result["jobs"], 2)
+        self.assertEqual(result["stage_result"]["blob_store"]["reused_objects"], 0)
+        self.assertEqual(result["counts"], {"pass": 2, "fail": 1, "error": 1})
+        self.assertEqual(records["downstream-a"]["status"], "pass", records["downstream-a"]["notes"])
+        self.assertEqual(records["downstream-b"]["status"], "pass")
+        self.assertEqual(records["downstream-diverged"]["failed_stage"], "sync-apply")
+        self.assertEqual(records["downstream-diverged"]["apply_result"]["failed_stage"], "precheck")
+        self.assertIn("does not exist", records["missing"]["error"])
+        self.assertEqual(synced, ["fan-out release\n", "fan-out release\n"])
+        self.assertFalse(diverged_example_exists)
+
     def test_sync_update_cli_errors_when_custom_staging_root_is_not_empty_without_replace_flag(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
             repo_root = Path(temp_dir)
@@ -589,6 +1148,157 @@ class WorkflowCoreWrapperCommandsTest(unittest.TestCase):
         self.assertEqual(result["apply_result"]["status"], "fail")
         self.assertIsNone(result["verify_result"])
 
+    def test_sync_update_pipeline_prestages_only_changed_managed_paths(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            upstream_root = root / "upstream"
+            downstream_root = root / "downstream"
+
+            init_git_repo(upstream_root)
+            write_manifest(upstream_root)
+            write_runtime_scripts(upstream_root)
+            create_required_live_paths(upstream_root, include_index=True)
+            workflows_dir = upstream_root / ".agent" / "workflows"
+            (workflows_dir / "example.md").write_text("v1\n", encoding="utf-8")
+            first_commit = commit_all(upstream_root, "seed release one")
+            subprocess.run(["git", "-C", str(upstream_root), "tag", "core-v20260403-1", first_commit], check=True)
+            (workflows_dir / "example.md").write_text("v2\n", encoding="utf-8")
+            second_commit = commit_all(upstream_root, "seed release two")
+            subprocess.run(["git", "-C", str(upstream_root), "tag", "core-v20260403-2", second_commit], check=True)
+
+            init_git_repo(downstream_root)
+            write_manifest(downstream_root)
+            write_runtime_scripts(downstream_root)
+            create_required_live_paths(downstream_root, include_index=False)
+            commit_all(downstream_root, "seed downstream")
+            subprocess.run(["git", "-C", str(downstream_root), "remote", "add", "workflow-core-upstream", str(upstream_root)], check=True)
+
+            def sync(release_ref: str) -> dict:
+                return self.sync_update.run_sync_update(
+                    repo_root=downstream_root,
+                    manifest_path=downstream_root / "core_ownership_manifest.yml",
+                    release_ref=release_ref,
+                    source_remote="workflow-core-upstream",
+                    pipeline=True,
+                    pipeline_workers=3,
+                    pipeline_queue_size=2,
+                )
+
+            first_result = sync("core-v20260403-1")
+            commit_all(downstream_root, "install release one")
+            second_result = sync("core-v20260403-2")
+
+            example_text = (downstream_root / ".agent" / "workflows" / "example.md").read_text(encoding="utf-8")
+            transactions_exist = (downstream_root / ".workflow-core" / "transactions").exists()
+
+        self.assertEqual(first_result["status"], "pass", first_result["notes"])
+        self.assertEqual(second_result["status"], "pass", second_result["notes"])
+        report = second_result["pipeline"]
+        self.assertEqual(report["workers"], 3)
+        self.assertEqual(report["staged_paths"], [".agent/workflows/example.md"])
+        self.assertGreater(report["unchanged_path_count"], 0)
+        self.assertEqual(report["misaligned_paths"], [])
+        self.assertEqual(report["stages"]["project"]["items"], second_result["stage_result"]["written_path_count"])
+        self.assertLessEqual(report["stages"]["project"]["max_queue_depth"], 2)
+        self.assertEqual(second_result["apply_result"]["projection_strategy_counts"]["copy"], 0)
+        self.assertEqual(second_result["apply_result"]["projection_strategy_counts"]["prestaged"], 1)
+        self.assertEqual(example_text, "v2\n")
+        self.assertFalse(transactions_exist)
+
+    def test_sync_update_pipeline_verifies_staged_copies_against_tree_oids(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_git_repo(repo_root)
+            write_manifest(repo_root)
+            write_runtime_scripts(repo_root)
+            create_required_live_paths(repo_root, include_index=True)
+            managed_file = repo_root / ".agent" / "workflows" / "example.md"
+            managed_file.write_text("v1\n", encoding="utf-8")
+            commit_all(repo_root, "baseline")
+            managed_file.write_text("v2\n", encoding="utf-8")
+            release_commit = commit_all(repo_root, "release")
+            subprocess.run(["git", "-C", str(repo_root), "tag", "core-v20260403-oid", release_commit], check=True)
+            managed_file.write_text("v1\n", encoding="utf-8")
+            subprocess.run(["git", "-C", str(repo_root), "commit", "-qam", "roll back"], check=True)
+
+            # 模擬 projection 寫壞 staged copy：verify 必須以 tree OID 抓出，而不是信任 staging 來源。
+            def corrupt_write(source_path: Path, target_path: Path) -> str:
+                target_path.parent.mkdir(parents=True, exist_ok=True)
+                target_path.write_bytes(source_path.read_bytes() + b"corrupt\n")
+                return "copy"
+
+            with patch.object(self.sync_update, "write_projected_file", corrupt_write):
+                result = self.sync_update.run_sync_update(
+                    repo_root=repo_root,
+                    manifest_path=repo_root / "core_ownership_manifest.yml",
+                    release_ref="core-v20260403-oid",
+                    pipeline=True,
+                )
+            managed_text = managed_file.read_text(encoding="utf-8")
+
+        self.assertEqual(result["pipeline"]["misaligned_paths"], [".agent/workflows/example.md"])
+        self.assertEqual(result["status"], "pass", result["notes"])
+        self.assertTrue(any("release tree OIDs" in note for note in result["notes"]))
+        self.assertEqual(managed_text, "v2\n")
+
+    def test_sync_update_pipeline_leaves_repo_untouched_when_precheck_fails(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_root = Path(temp_dir)
+            init_git_repo(repo_root)
+            write_manifest(repo_root)
+            write_runtime_scripts(repo_root)
+            create_required_live_paths(repo_root, include_index=True)
+            managed_file = repo_root / ".agent" / "workflows" / "example.md"
+            managed_file.write_text("v1\n", encoding="utf-8")
+            baseline_commit = commit_all(repo_root, "baseline")
+            subprocess.run(["git", "-C", str(repo_root), "tag", "core-v20260403-diverge", baseline_commit], check=True)
+            managed_file.write_text("local divergent change\n", encoding="utf-8")
+
+            result = self.sync_update.run_sync_update(
+                repo_root=repo_root,
+                manifest_path=repo_root / "core_ownership_manifest.yml",
+                release_ref="core-v20260403-diverge",
+                pipeline=True,
+            )
+            managed_text = managed_file.read_text(encoding="utf-8")
+            transactions_exist = (repo_root / ".workflow-core" / "transactions").exists()
+
+        self.assertEqual(result["status"], "fail")
+        self.assertEqual(result["failed_stage"], "sync-apply")
+        self.assertEqual(result["apply_result"]["failed_stage"], "precheck")
+        self.assertEqual(result["pipeline"]["staged_paths"], [".agent/workflows/example.md"])
+        self.assertEqual(managed_text, "local divergent change\n")
+        self.assertFalse(transactions_exist)
+
+    def test_sync_verify_compares_staging_root_by_size_then_content(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            repo_root = root / "repo"
+            staging_root = root / "staging"
+            cases = {
+                "same.md": (b"abc" * 1000, b"abc" * 1000),
+                "same-size.md": (b"abc" * 1000, b"abd" * 1000),
+                "other-size.md": (b"abc", b"abcd"),
+                "empty.md": (b"", b""),
+            }
+            for rel_path, (worktree_bytes, staged_bytes) in cases.items():
+                (repo_root / rel_path).parent.mkdir(parents=True, exist_ok=True)
+                (staging_root / rel_path).parent.mkdir(parents=True, exist_ok=True)
+                (repo_root / rel_path).write_bytes(worktree_bytes)
+                (staging_root / rel_path).write_bytes(staged_bytes)
+            (repo_root / "worktree-only.md").write_bytes(b"x")
+
+            matched = self.sync_verify.paths_matching_staging_root(
+                repo_root,
+                staging_root,
+                [*cases, "worktree-only.md"],
+                max_workers=3,
+            )
+            with_small_chunks = self.sync_verify.files_have_same_content(repo_root / "same-size.md", staging_root / "same-size.md", chunk_size=7)
+
+        self.assertEqual(matched, ["same.md", "empty.md"])
+        self.assertFalse(with_small_chunks)
+
     def test_sync_verify_passes_with_manifest_backed_checks(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
             repo_root = Path(temp_dir)